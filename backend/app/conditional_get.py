@@ -0,0 +1,98 @@
+"""ETag / If-None-Match for the heavy read endpoints.
+
+The household queue, admin stats, analytics and series radar used to be
+rebuilt and re-sent on every page load. Their ETag is now derived from the
+``request_data`` row in ``data_versions`` (bumped by triggers on every write
+to the tables behind them, see ``database.REQUEST_DATA_TABLES``), the
+endpoint, its query string and the viewer. When the client's If-None-Match
+matches, the route answers 304 before calling the service.
+
+Payloads also depend on the clock (days open, SLA breaches, overdue
+blockers), so the tag includes the current ``etag_time_bucket_seconds``
+window: a revalidation can return a body at most that old.
+
+Responses carry ``Cache-Control: private, no-cache``, so browsers keep the
+body and revalidate on every fetch without any client-side changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+CACHE_CONTROL = "private, no-cache"
+
+_lock = threading.Lock()
+_stats: dict[str, dict[str, int]] = {}
+
+
+def data_version(conn: sqlite3.Connection, scope: str = "request_data") -> int | None:
+    """Current version of ``scope``; None when the schema has no version table."""
+    try:
+        row = conn.execute("SELECT version FROM data_versions WHERE scope = ?", (scope,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return None if row is None else int(row[0])
+
+
+def _etag(endpoint: str, version: int, request: Request, viewer: str) -> str:
+    bucket = int(time.time() // max(settings.etag_time_bucket_seconds, 1))
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    key = f"{endpoint}|{version}|{bucket}|{viewer}|{query}"
+    return 'W/"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: W/"x" and "x" name the same representation.
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+def _record(endpoint: str, not_modified: bool) -> None:
+    with _lock:
+        counters = _stats.setdefault(endpoint, {"requests": 0, "not_modified": 0})
+        counters["requests"] += 1
+        counters["not_modified"] += int(not_modified)
+
+
+def check(
+    request: Request,
+    response: Response,
+    endpoint: str,
+    version: int | None,
+    viewer: dict,
+) -> Response | None:
+    """304 response if the client's copy is current; otherwise tag ``response`` and return None."""
+    if version is None:
+        return None
+    etag = _etag(endpoint, version, request, str(viewer.get("user_id", "")))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request, etag):
+        _record(endpoint, True)
+        return Response(status_code=304, headers=headers)
+    _record(endpoint, False)
+    response.headers.update(headers)
+    return None
+
+
+def stats() -> dict:
+    """Per-endpoint request and 304 counts with the hit rate."""
+    with _lock:
+        snapshot = {endpoint: dict(counters) for endpoint, counters in _stats.items()}
+    for counters in snapshot.values():
+        counters["hit_rate"] = round(counters["not_modified"] / counters["requests"], 3) if counters["requests"] else 0.0
+    return snapshot
+
+
+def reset_stats() -> None:
+    with _lock:
+        _stats.clear()
@@ -11,11 +11,69 @@ class Settings(BaseSettings):
     ngrok_authtoken: str = ""
     ngrok_domain: str = ""
     request_sla_days: int = 7
+    # Worker threads for SQLite work; each connection is pinned to one of them.
+    db_worker_threads: int = 8
+    db_pool_size: int = 8
+    db_pool_timeout_seconds: float = 10.0
+    db_busy_timeout_ms: int = 5000
+    db_cache_size_kib: int = 20000
+    db_mmap_size_bytes: int = 268435456
+    library_match_ttl_seconds: int = 120
+    library_match_concurrency: int = 5
+    # Answer every user's "in library" checks from the admin-built mirror; only
+    # safe when no Jellyfin user has library or parental restrictions.
+    library_mirror_shared_visibility: bool = False
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+    http2_enabled: bool = True
+    tmdb_cache_max_entries: int = 2000
+    tmdb_cache_details_ttl_seconds: int = 21600
+    tmdb_cache_search_ttl_seconds: int = 600
+    tmdb_cache_db_path: str = ""
+    # Analytics rollup rows older than this are folded into monthly rows.
+    analytics_rollup_daily_retention_days: int = 400
+    # Queue notification fan-out for a background worker instead of writing it inline.
+    notification_outbox_enabled: bool = False
+    notification_outbox_drain_interval_seconds: float = 2.0
+    notification_outbox_batch_size: int = 500
+    # Idle notification streams send a comment this often to keep proxies from closing them.
+    notification_stream_heartbeat_seconds: float = 25.0
+    # Lifetime of the ticket a client trades its session token for to open the stream.
+    notification_stream_ticket_ttl_seconds: int = 60
+    # Nightly retention pass (see services/retention_service.py); days of 0 keep rows forever.
+    retention_enabled: bool = False
+    retention_notification_read_days: int = 90
+    retention_notification_unread_days: int = 365
+    # Per-type read-notification overrides, e.g. "comment_added=30,sla_escalated=0".
+    retention_notification_type_days: str = ""
+    retention_comment_days: int = 0
+    retention_history_note_days: int = 0
+    retention_archive_enabled: bool = False
+    retention_batch_size: int = 500
+    retention_time_budget_seconds: float = 30.0
+    # ETags on time-dependent read endpoints roll over at least this often.
+    etag_time_bucket_seconds: int = 300
+    # Memoized admin analytics/simulations (see services/analytics_cache.py); 0 disables.
+    analytics_cache_max_age_seconds: int = 300
+    # Background recompute of stale cached analytics; 0 leaves it to the next request.
+    analytics_cache_refresh_interval_seconds: float = 0.0
 
     @property
     def cors_origin_list(self) -> list[str]:
         return [o.strip() for o in self.cors_origins.split(",")]
 
+    @property
+    def retention_notification_type_day_map(self) -> dict[str, int]:
+        overrides: dict[str, int] = {}
+        for item in self.retention_notification_type_days.split(","):
+            type_, _, days = item.partition("=")
+            if type_.strip() and days.strip():
+                overrides[type_.strip()] = int(days)
+        return overrides
+
     class Config:
         env_file = ".env"
 
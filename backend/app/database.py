@@ -1,23 +1,384 @@
+import asyncio
 import sqlite3
 import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from app.config import settings
+from app.db_executor import db_executor
+from app.lifecycle_flags import lifecycle_flags_sql
+
+# Tables whose writes bump the 'request_data' version.
+REQUEST_DATA_TABLES = (
+    "requests",
+    "request_history",
+    "request_supporters",
+    "request_comments",
+    "request_blockers",
+    "sla_policy",
+    "series_continuation_snapshots",
+)
+
+# Tables the retention job moves expired rows into ``<table>_archive`` from
+# (see services/retention_service.py).
+ARCHIVED_TABLES = ("request_notifications", "request_comments", "request_history")
+
+# Lead-time buckets of the analytics_daily_fulfillments rollup (see
+# services/analytics_rollups.py): whole days, capped, -1 with no lead time.
+LEAD_BUCKET_CAP = 60
+
+_LEAD_DAYS = "(julianday({done}) - julianday(r.created_at))"
+_LEAD_BUCKET = (
+    "CASE WHEN julianday({done}) >= julianday(r.created_at) "
+    f"THEN MIN(CAST({_LEAD_DAYS} AS INTEGER), {LEAD_BUCKET_CAP}) ELSE -1 END"
+)
+
+
+def lead_bucket_sql(done: str) -> str:
+    """Lead-time bucket of the request ``r`` fulfilled at ``done``."""
+    return _LEAD_BUCKET.format(done=done)
+
+
+def lead_days_sql(done: str) -> str:
+    """Lead time in days of ``r`` fulfilled at ``done``, 0 where there is no bucket."""
+    return f"CASE WHEN {lead_bucket_sql(done)} >= 0 THEN {_LEAD_DAYS.format(done=done)} ELSE 0 END"
+
+
+# Run with every connection the pool takes back, once its transaction is
+# settled; services register them at import (e.g. notification_bus.flush).
+_checkin_hooks: list[Callable[[sqlite3.Connection], object]] = []
+
+
+def add_checkin_hook(hook: Callable[[sqlite3.Connection], object]) -> None:
+    if hook not in _checkin_hooks:
+        _checkin_hooks.append(hook)
+
+
+def _run_checkin_hooks(conn: sqlite3.Connection) -> None:
+    for hook in _checkin_hooks:
+        hook(conn)
+
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "mediamanager.db")
 
 
-def get_db_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+def _configure_connection(conn: sqlite3.Connection) -> None:
     conn.row_factory = sqlite3.Row
+    # Only takes effect on a brand-new file (before WAL writes the header);
+    # lets the retention job hand freed pages back with incremental_vacuum.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(settings.db_busy_timeout_ms)}")
+    # Negative cache_size is in KiB rather than pages.
+    conn.execute(f"PRAGMA cache_size=-{int(settings.db_cache_size_kib)}")
+    conn.execute(f"PRAGMA mmap_size={int(settings.db_mmap_size_bytes)}")
+
+
+def get_db_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    _configure_connection(conn)
     return conn
 
 
-def get_db():
-    conn = get_db_connection()
-    try:
+class PoolTimeout(sqlite3.OperationalError):
+    """No pooled connection became free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Fixed-size pool of configured connections to one database file.
+
+    Connections are opened lazily up to ``size`` and then reused; PRAGMAs are
+    applied once when a connection is opened. Each pooled connection is
+    pinned to a db_executor lane for its whole life, so it keeps its thread
+    across checkouts.
+    """
+
+    def __init__(self, path: str, size: int, timeout: float):
+        self.path = path
+        self.size = max(int(size), 1)
+        self.timeout = timeout
+        self._idle: list[sqlite3.Connection] = []
+        self._open = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        _configure_connection(conn)
+        db_executor.bind(conn)
+        return conn
+
+    def try_checkout(self) -> sqlite3.Connection | None:
+        """Return an idle connection without blocking or opening a new one."""
+        with self._condition:
+            if self._idle:
+                self.checkouts += 1
+                return self._idle.pop()
+        return None
+
+    def checkout(self, timeout: float | None = None) -> sqlite3.Connection:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited_from: float | None = None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    conn = None
+                    break
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    self.wait_seconds += time.monotonic() - waited_from
+                    raise PoolTimeout("Timed out waiting for a database connection")
+                self._condition.wait(remaining)
+            if waited_from is not None:
+                self.wait_seconds += time.monotonic() - waited_from
+            self.checkouts += 1
+
+        if conn is None:
+            try:
+                conn = self._open_connection()
+            except Exception:
+                with self._condition:
+                    self._open -= 1
+                    self._condition.notify()
+                raise
+        return conn
+
+    def checkin(self, conn: sqlite3.Connection) -> None:
+        """Return a connection; any transaction left open is rolled back."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            _run_checkin_hooks(conn)
+            self._discard(conn)
+            return
+        # The borrower's writes are committed (or gone) now, so hooks (e.g.
+        # waking notification streams) see settled rows.
+        _run_checkin_hooks(conn)
+
+        with self._condition:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+                db_executor.release(conn)
+                return
+            self._idle.append(conn)
+            self._condition.notify()
+
+    async def acquire(self) -> sqlite3.Connection:
+        conn = self.try_checkout()
+        if conn is None:
+            # Opening a connection or waiting for a free one must not block the loop.
+            conn = await asyncio.to_thread(self.checkout)
+        return conn
+
+    async def release(self, conn: sqlite3.Connection) -> None:
+        await db_executor.run(conn, self.checkin, conn)
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        db_executor.release(conn)
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def warm(self) -> None:
+        """Open connections up to the pool size so first requests skip setup."""
+        opened = [self.checkout() for _ in range(self.size)]
+        for conn in opened:
+            self.checkin(conn)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for conn in idle:
+            conn.close()
+            db_executor.release(conn)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_ms_total": round(self.wait_seconds * 1000, 1),
+                "timeouts": self.timeouts,
+            }
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Pool for the current DB_PATH (tests and benchmarks repoint it)."""
+    with _pools_lock:
+        pool = _pools.get(DB_PATH)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(DB_PATH, settings.db_pool_size, settings.db_pool_timeout_seconds)
+            _pools[DB_PATH] = pool
+        return pool
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+async def get_db():
+    # Pooled connections are pinned to one executor lane, so the event loop
+    # never blocks on SQLite and a connection never hops threads.
+    async with get_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+def add_maintained_request_columns(conn: sqlite3.Connection) -> None:
+    """Add the trigger-maintained columns on requests and request_history.
+
+    - ``requests.supporter_count``, kept in step with request_supporters so
+      queue queries read a column instead of a correlated COUNT(*) per row;
+    - ``created_at_epoch`` on both tables (see services/timestamps.py), so
+      ages and lead times are integer math instead of parsing the mixed
+      CURRENT_TIMESTAMP / isoformat() strings row by row;
+    - ``requests.lifecycle_flags``, the lifecycle rule markers found in
+      admin_note as bits (see lifecycle_flags.py), recomputed whenever
+      admin_note is written so a rewritten note re-arms the rules.
+
+    Queries read these columns unconditionally. Idempotent; unit tests that
+    build a partial schema by hand call it too.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    try:
+        conn.execute("SELECT supporter_count FROM requests LIMIT 1")
+    except sqlite3.OperationalError:
+        conn.execute("ALTER TABLE requests ADD COLUMN supporter_count INTEGER NOT NULL DEFAULT 0")
+        if "request_supporters" in tables:
+            conn.execute(
+                """
+                UPDATE requests
+                SET supporter_count = (
+                    SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = requests.id
+                )
+                """
+            )
+    if "request_supporters" in tables:
+        conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS trg_supporter_count_insert
+            AFTER INSERT ON request_supporters
+            BEGIN
+                UPDATE requests SET supporter_count = supporter_count + 1 WHERE id = NEW.request_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_supporter_count_delete
+            AFTER DELETE ON request_supporters
+            BEGIN
+                UPDATE requests SET supporter_count = supporter_count - 1 WHERE id = OLD.request_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_supporter_count_move
+            AFTER UPDATE OF request_id ON request_supporters
+            WHEN OLD.request_id IS NOT NEW.request_id
+            BEGIN
+                UPDATE requests SET supporter_count = supporter_count - 1 WHERE id = OLD.request_id;
+                UPDATE requests SET supporter_count = supporter_count + 1 WHERE id = NEW.request_id;
+            END;
+        """)
+
+    for table in ("requests", "request_history"):
+        if table not in tables:
+            continue
+        try:
+            conn.execute(f"SELECT created_at_epoch FROM {table} LIMIT 1")
+        except sqlite3.OperationalError:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN created_at_epoch INTEGER")
+            conn.execute(f"UPDATE {table} SET created_at_epoch = CAST(strftime('%s', created_at) AS INTEGER)")
+        conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_created_epoch_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                UPDATE {table} SET created_at_epoch = CAST(strftime('%s', NEW.created_at) AS INTEGER)
+                WHERE id = NEW.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_created_epoch_update
+            AFTER UPDATE OF created_at ON {table}
+            WHEN OLD.created_at IS NOT NEW.created_at
+            BEGIN
+                UPDATE {table} SET created_at_epoch = CAST(strftime('%s', NEW.created_at) AS INTEGER)
+                WHERE id = NEW.id;
+            END;
+        """)
+
+    if "requests" in tables and any(
+        row[1] == "admin_note" for row in conn.execute("PRAGMA table_info(requests)")
+    ):
+        try:
+            conn.execute("SELECT lifecycle_flags FROM requests LIMIT 1")
+        except sqlite3.OperationalError:
+            conn.execute("ALTER TABLE requests ADD COLUMN lifecycle_flags INTEGER NOT NULL DEFAULT 0")
+        has_trigger = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_requests_lifecycle_flags_update'"
+        ).fetchone()
+        if not has_trigger:
+            # Also resets bits set before the flags were derived from the note.
+            conn.execute(f"UPDATE requests SET lifecycle_flags = {lifecycle_flags_sql('admin_note')}")
+        flags = lifecycle_flags_sql("NEW.admin_note")
+        conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_requests_lifecycle_flags_insert
+            AFTER INSERT ON requests
+            WHEN NEW.lifecycle_flags IS NOT {flags}
+            BEGIN
+                UPDATE requests SET lifecycle_flags = {flags} WHERE id = NEW.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_requests_lifecycle_flags_update
+            AFTER UPDATE OF admin_note, lifecycle_flags ON requests
+            WHEN NEW.lifecycle_flags IS NOT {flags}
+            BEGIN
+                UPDATE requests SET lifecycle_flags = {flags} WHERE id = NEW.id;
+            END;
+        """)
+    conn.commit()
 
 
 def init_db():
@@ -346,4 +707,499 @@ def init_db():
     """)
     conn.commit()
 
+    # Migration: trigger-maintained data versions.
+    # In-process caches compare these counters to decide whether what they
+    # hold still matches the tables. The lead_times scope moves whenever a
+    # fulfilled history entry, or the request it belongs to, changes.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope       TEXT PRIMARY KEY,
+            version     INTEGER NOT NULL DEFAULT 0
+        );
+
+        INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('lead_times', 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_lead_times_history_insert
+        AFTER INSERT ON request_history
+        WHEN NEW.new_status = 'fulfilled'
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'lead_times';
+        END;
+
+        -- Only the columns lead times read: stamping created_at_epoch is not a change.
+        CREATE TRIGGER IF NOT EXISTS trg_lead_times_history_update
+        AFTER UPDATE OF request_id, new_status, created_at ON request_history
+        WHEN OLD.new_status = 'fulfilled' OR NEW.new_status = 'fulfilled'
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'lead_times';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_lead_times_history_delete
+        AFTER DELETE ON request_history
+        WHEN OLD.new_status = 'fulfilled'
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'lead_times';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_lead_times_request_update
+        AFTER UPDATE OF created_at, media_type ON requests
+        WHEN (OLD.created_at IS NOT NEW.created_at OR OLD.media_type IS NOT NEW.media_type)
+          AND EXISTS (
+              SELECT 1 FROM request_history
+              WHERE request_id = NEW.id AND new_status = 'fulfilled'
+          )
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'lead_times';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_lead_times_request_delete
+        AFTER DELETE ON requests
+        WHEN EXISTS (
+            SELECT 1 FROM request_history
+            WHERE request_id = OLD.id AND new_status = 'fulfilled'
+        )
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'lead_times';
+        END;
+    """)
+    conn.commit()
+
+    # Migration: local mirror of the Jellyfin library.
+    # Kept in sync by library_mirror_service so presence checks and
+    # auto-fulfillment are indexed lookups instead of Jellyfin title searches.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS library_items (
+            jellyfin_item_id  TEXT PRIMARY KEY,
+            media_type        TEXT NOT NULL CHECK(media_type IN ('movie', 'tv')),
+            name              TEXT NOT NULL,
+            tmdb_id           INTEGER,
+            imdb_id           TEXT,
+            tvdb_id           TEXT,
+            date_last_saved   TEXT,
+            synced_at         TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_library_items_tmdb ON library_items(media_type, tmdb_id);
+        CREATE INDEX IF NOT EXISTS idx_library_items_imdb ON library_items(imdb_id);
+        CREATE INDEX IF NOT EXISTS idx_library_items_tvdb ON library_items(tvdb_id);
+
+        CREATE TABLE IF NOT EXISTS library_sync_state (
+            id                       INTEGER PRIMARY KEY CHECK(id = 1),
+            last_full_sync_at        TEXT,
+            last_incremental_sync_at TEXT,
+            max_date_last_saved      TEXT
+        );
+
+        INSERT OR IGNORE INTO library_sync_state (id) VALUES (1);
+    """)
+    conn.commit()
+
+    # Migration: incremental auto-fulfillment watermarks.
+    # fulfillment_service only joins library items synced, or requests
+    # created, after the previous cycle; the last cycle's stats live here too.
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_library_items_synced_at ON library_items(synced_at);
+
+        CREATE TABLE IF NOT EXISTS fulfillment_state (
+            id                  INTEGER PRIMARY KEY CHECK(id = 1),
+            item_watermark      TEXT,
+            request_watermark   INTEGER,
+            last_run_at         TEXT,
+            last_duration_ms    REAL,
+            last_matched        INTEGER,
+            last_fulfilled      INTEGER
+        );
+
+        INSERT OR IGNORE INTO fulfillment_state (id) VALUES (1);
+    """)
+    conn.commit()
+
+    # Migration: trigger-maintained supporter_count and created_at epochs.
+    add_maintained_request_columns(conn)
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_requests_status_supporters
+            ON requests(status, supporter_count DESC, created_at);
+        -- The open priority queue (supporters, then age) is a walk of this index.
+        CREATE INDEX IF NOT EXISTS idx_requests_open_priority
+            ON requests(supporter_count DESC, created_at, id)
+            WHERE status IN ('pending', 'approved');
+    """)
+    conn.commit()
+
+    # Migration: composite/covering indexes matched to the hot query shapes.
+    # tests/test_query_plans.py fails if one of those queries falls back to a
+    # full table scan.
+    conn.executescript("""
+        -- Community request / duplicate / preflight lookups by title.
+        CREATE INDEX IF NOT EXISTS idx_requests_tmdb_media_status
+            ON requests(tmdb_id, media_type, status);
+        -- "My requests": supporter rows by user, joined to requests by id.
+        CREATE INDEX IF NOT EXISTS idx_request_supporters_user_request
+            ON request_supporters(user_id, request_id);
+        -- Request timeline.
+        CREATE INDEX IF NOT EXISTS idx_request_history_request_created
+            ON request_history(request_id, created_at);
+        -- Lead times, recently-fulfilled hints and continuation radar join
+        -- fulfilled history to requests; throughput filters by date.
+        CREATE INDEX IF NOT EXISTS idx_request_history_status_request
+            ON request_history(new_status, request_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_request_history_status_created
+            ON request_history(new_status, created_at);
+        -- Notification list (newest first) and unread filters.
+        CREATE INDEX IF NOT EXISTS idx_request_notifications_user_read_created
+            ON request_notifications(user_id, is_read, created_at);
+        CREATE INDEX IF NOT EXISTS idx_request_notifications_user_created
+            ON request_notifications(user_id, created_at, id);
+        -- Comment thread per request.
+        CREATE INDEX IF NOT EXISTS idx_request_comments_request_created
+            ON request_comments(request_id, created_at);
+    """)
+    conn.commit()
+
+    # Migration: data versions for paginated list counts.
+    # pagination.cached_count reuses a list's total until its scope moves:
+    # 'requests' on any change to which requests exist or how they filter
+    # (including supporters, for "my requests"), 'backlog' likewise.
+    conn.executescript("""
+        INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('requests', 0);
+        INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('backlog', 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_requests_version_insert
+        AFTER INSERT ON requests
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'requests';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_requests_version_update
+        AFTER UPDATE OF status, user_id, media_type, title, admin_note ON requests
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'requests';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_requests_version_delete
+        AFTER DELETE ON requests
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'requests';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_requests_version_supporter_insert
+        AFTER INSERT ON request_supporters
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'requests';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_requests_version_supporter_update
+        AFTER UPDATE OF request_id, user_id ON request_supporters
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'requests';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_requests_version_supporter_delete
+        AFTER DELETE ON request_supporters
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'requests';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_backlog_version_insert
+        AFTER INSERT ON backlog
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'backlog';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_backlog_version_update
+        AFTER UPDATE OF status, type ON backlog
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'backlog';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_backlog_version_delete
+        AFTER DELETE ON backlog
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'backlog';
+        END;
+
+        -- Keyset order for the admin backlog list.
+        CREATE INDEX IF NOT EXISTS idx_backlog_created ON backlog(created_at, id);
+    """)
+    conn.commit()
+
+    # Migration: open-queue snapshot version.
+    # queue_snapshot keeps the ranked open queue in memory until this moves:
+    # only on writes that can change queue membership or order.
+    conn.executescript("""
+        INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('open_queue', 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_open_queue_version_insert
+        AFTER INSERT ON requests
+        WHEN NEW.status IN ('pending', 'approved')
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'open_queue';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_open_queue_version_update
+        AFTER UPDATE OF status, supporter_count, created_at ON requests
+        WHEN (OLD.status IN ('pending', 'approved') OR NEW.status IN ('pending', 'approved'))
+         AND (OLD.status IS NOT NEW.status
+              OR OLD.supporter_count IS NOT NEW.supporter_count
+              OR OLD.created_at IS NOT NEW.created_at)
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'open_queue';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_open_queue_version_delete
+        AFTER DELETE ON requests
+        WHEN OLD.status IN ('pending', 'approved')
+        BEGIN
+            UPDATE data_versions SET version = version + 1 WHERE scope = 'open_queue';
+        END;
+    """)
+    conn.commit()
+
+    # Migration: analytics rollups (see services/analytics_rollups.py).
+    # Triggers keep per-day aggregates current on every write; existing
+    # databases are backfilled once at startup (analytics_rollups.ensure_built).
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS analytics_daily_requests (
+            day         TEXT NOT NULL,
+            media_type  TEXT NOT NULL,
+            status      TEXT NOT NULL,
+            requests    INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, media_type, status)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS analytics_daily_fulfillments (
+            day            TEXT NOT NULL,
+            media_type     TEXT NOT NULL,
+            lead_bucket    INTEGER NOT NULL,
+            fulfilled      INTEGER NOT NULL DEFAULT 0,
+            lead_days_sum  REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, media_type, lead_bucket)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS analytics_daily_supporters (
+            day         TEXT PRIMARY KEY,
+            supporters  INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS analytics_requester_totals (
+            username  TEXT PRIMARY KEY,
+            requests  INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+            id                INTEGER PRIMARY KEY CHECK (id = 1),
+            built_at          TEXT,
+            compacted_at      TEXT,
+            folded_before     TEXT,
+            last_duration_ms  REAL
+        );
+
+        INSERT OR IGNORE INTO analytics_rollup_state (id) VALUES (1);
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_requests_insert
+        AFTER INSERT ON requests
+        BEGIN
+            INSERT INTO analytics_daily_requests (day, media_type, status, requests)
+            VALUES (COALESCE(date(NEW.created_at), ''), NEW.media_type, NEW.status, 1)
+            ON CONFLICT (day, media_type, status) DO UPDATE SET requests = requests + 1;
+            INSERT INTO analytics_requester_totals (username, requests)
+            VALUES (NEW.username, 1)
+            ON CONFLICT (username) DO UPDATE SET requests = requests + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_requests_delete
+        AFTER DELETE ON requests
+        BEGIN
+            UPDATE analytics_daily_requests SET requests = requests - 1
+            WHERE day = COALESCE(date(OLD.created_at), '') AND media_type = OLD.media_type AND status = OLD.status;
+            UPDATE analytics_requester_totals SET requests = requests - 1 WHERE username = OLD.username;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_requests_move
+        AFTER UPDATE OF status, media_type, created_at ON requests
+        WHEN OLD.status IS NOT NEW.status
+          OR OLD.media_type IS NOT NEW.media_type
+          OR COALESCE(date(OLD.created_at), '') IS NOT COALESCE(date(NEW.created_at), '')
+        BEGIN
+            UPDATE analytics_daily_requests SET requests = requests - 1
+            WHERE day = COALESCE(date(OLD.created_at), '') AND media_type = OLD.media_type AND status = OLD.status;
+            INSERT INTO analytics_daily_requests (day, media_type, status, requests)
+            VALUES (COALESCE(date(NEW.created_at), ''), NEW.media_type, NEW.status, 1)
+            ON CONFLICT (day, media_type, status) DO UPDATE SET requests = requests + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_requester_move
+        AFTER UPDATE OF username ON requests
+        WHEN OLD.username IS NOT NEW.username
+        BEGIN
+            UPDATE analytics_requester_totals SET requests = requests - 1 WHERE username = OLD.username;
+            INSERT INTO analytics_requester_totals (username, requests)
+            VALUES (NEW.username, 1)
+            ON CONFLICT (username) DO UPDATE SET requests = requests + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_fulfillments_insert
+        AFTER INSERT ON request_history
+        WHEN NEW.new_status = 'fulfilled'
+        BEGIN
+            INSERT INTO analytics_daily_fulfillments (day, media_type, lead_bucket, fulfilled, lead_days_sum)
+            SELECT COALESCE(date(NEW.created_at), ''), COALESCE(r.media_type, 'unknown'),
+                   {lead_bucket_sql("NEW.created_at")}, 1,
+                   {lead_days_sql("NEW.created_at")}
+            FROM (SELECT NEW.request_id AS request_id) h
+            LEFT JOIN requests r ON r.id = h.request_id
+            WHERE true
+            ON CONFLICT (day, media_type, lead_bucket) DO UPDATE
+            SET fulfilled = fulfilled + 1, lead_days_sum = lead_days_sum + excluded.lead_days_sum;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_fulfillments_delete
+        AFTER DELETE ON request_history
+        WHEN OLD.new_status = 'fulfilled'
+        BEGIN
+            INSERT INTO analytics_daily_fulfillments (day, media_type, lead_bucket, fulfilled, lead_days_sum)
+            SELECT COALESCE(date(OLD.created_at), ''), COALESCE(r.media_type, 'unknown'),
+                   {lead_bucket_sql("OLD.created_at")}, -1,
+                   -{lead_days_sql("OLD.created_at")}
+            FROM (SELECT OLD.request_id AS request_id) h
+            LEFT JOIN requests r ON r.id = h.request_id
+            WHERE true
+            ON CONFLICT (day, media_type, lead_bucket) DO UPDATE
+            SET fulfilled = fulfilled - 1, lead_days_sum = lead_days_sum + excluded.lead_days_sum;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_supporters_insert
+        AFTER INSERT ON request_supporters
+        BEGIN
+            INSERT INTO analytics_daily_supporters (day, supporters)
+            VALUES (COALESCE(date(NEW.created_at), ''), 1)
+            ON CONFLICT (day) DO UPDATE SET supporters = supporters + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_supporters_delete
+        AFTER DELETE ON request_supporters
+        BEGIN
+            UPDATE analytics_daily_supporters SET supporters = supporters - 1
+            WHERE day = COALESCE(date(OLD.created_at), '');
+        END;
+    """)
+    conn.commit()
+
+    # Lifecycle rules select requests by status and age (created_at_epoch).
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_requests_status_created_epoch ON requests(status, created_at_epoch)"
+    )
+    conn.commit()
+
+    # Migration: notification outbox (see services/notification_dispatcher.py).
+    # One row per queued request event; recipients NULL means the request's
+    # supporters at drain time.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id      INTEGER NOT NULL,
+            type            TEXT NOT NULL,
+            message         TEXT NOT NULL,
+            actor_user_id   TEXT,
+            actor_name      TEXT,
+            exclude_user_id TEXT,
+            recipients      TEXT,
+            created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    conn.commit()
+
+    # Migration: per-user notification counters. The summary endpoint reads
+    # these by primary key instead of aggregating the user's whole history;
+    # triggers keep them exact for every insert, read-flag change and delete.
+    counters_exist = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notification_counters'"
+    ).fetchone()
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            user_id  TEXT NOT NULL,
+            type     TEXT NOT NULL,
+            total    INTEGER NOT NULL DEFAULT 0,
+            unread   INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, type)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS trg_notification_counters_insert
+        AFTER INSERT ON request_notifications
+        BEGIN
+            INSERT INTO notification_counters (user_id, type, total, unread)
+            VALUES (NEW.user_id, NEW.type, 1, NEW.is_read = 0)
+            ON CONFLICT (user_id, type) DO UPDATE
+            SET total = total + 1, unread = unread + excluded.unread;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_notification_counters_delete
+        AFTER DELETE ON request_notifications
+        BEGIN
+            UPDATE notification_counters
+            SET total = total - 1, unread = unread - (OLD.is_read = 0)
+            WHERE user_id = OLD.user_id AND type = OLD.type;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_notification_counters_update
+        AFTER UPDATE OF user_id, type, is_read ON request_notifications
+        WHEN OLD.user_id IS NOT NEW.user_id OR OLD.type IS NOT NEW.type
+            OR (OLD.is_read = 0) IS NOT (NEW.is_read = 0)
+        BEGIN
+            UPDATE notification_counters
+            SET total = total - 1, unread = unread - (OLD.is_read = 0)
+            WHERE user_id = OLD.user_id AND type = OLD.type;
+            INSERT INTO notification_counters (user_id, type, total, unread)
+            VALUES (NEW.user_id, NEW.type, 1, NEW.is_read = 0)
+            ON CONFLICT (user_id, type) DO UPDATE
+            SET total = total + 1, unread = unread + excluded.unread;
+        END;
+    """)
+    if not counters_exist:
+        conn.execute(
+            """
+            INSERT INTO notification_counters (user_id, type, total, unread)
+            SELECT user_id, type, COUNT(*), SUM(is_read = 0)
+            FROM request_notifications
+            GROUP BY user_id, type
+            """
+        )
+    conn.commit()
+
+    # Migration: retention (see services/retention_service.py). Digests keep
+    # per-month counts of read notifications the retention job removed;
+    # archive tables are unindexed copies of the source columns.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS notification_digests (
+            user_id           TEXT NOT NULL,
+            type              TEXT NOT NULL,
+            month             TEXT NOT NULL,
+            notifications     INTEGER NOT NULL DEFAULT 0,
+            first_created_at  TEXT,
+            last_created_at   TEXT,
+            PRIMARY KEY (user_id, type, month)
+        ) WITHOUT ROWID;
+    """)
+    for table in ARCHIVED_TABLES:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_archive AS SELECT * FROM {table} WHERE 0")
+    conn.commit()
+
+    # Migration: 'request_data' version for conditional GETs (app/conditional_get.py).
+    # Bumped by any write to the tables behind the queue, stats, analytics and
+    # radar responses, so an unchanged version means an unchanged payload.
+    conn.execute("INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('request_data', 0)")
+    for table in REQUEST_DATA_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_request_data_version_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE scope = 'request_data';
+                END
+            """)
+    conn.commit()
+    # Refresh planner statistics so the indexes above (notably the partial
+    # open-queue index) are preferred over a status lookup plus a sort.
+    conn.execute("PRAGMA optimize=0x10002")
+
     conn.close()
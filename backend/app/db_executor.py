@@ -0,0 +1,152 @@
+"""Runs blocking SQLite work off the event loop.
+
+Every router is ``async def`` but the services underneath are plain sqlite3
+calls. Running them inline blocks the uvicorn event loop, so one slow
+analytics or duplicate-grouping request stalls every other request on the
+worker. This module gives each connection a *lane*: a single worker thread
+out of a bounded pool (``settings.db_worker_threads``). All work for a
+connection runs on its lane, so a connection is only ever touched by one
+thread at a time and always the same one, and the event loop only awaits
+the result.
+
+Two ways to use it from a route:
+
+* Routes that only talk to the database are written as plain ``def`` bodies
+  and wrapped with :func:`offload_db`; the whole body runs on the lane of the
+  ``db`` dependency.
+* Routes that mix database work with awaited HTTP calls stay ``async def``
+  and wrap each service call in ``await run_db(db, fn, *args)``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import itertools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class DBExecutor:
+    """Bounded set of single-thread lanes with connections pinned to a lane."""
+
+    def __init__(self, lanes: int):
+        self.size = max(int(lanes), 1)
+        self._lanes: list[ThreadPoolExecutor] | None = None
+        self._assignments: dict[int, int] = {}
+        self._pending = [0] * self.size
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+
+    def _executors(self) -> list[ThreadPoolExecutor]:
+        if self._lanes is None:
+            with self._lock:
+                if self._lanes is None:
+                    self._lanes = [
+                        ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-lane-{index}")
+                        for index in range(self.size)
+                    ]
+        return self._lanes
+
+    def _pick_lane(self) -> int:
+        # Least busy lane, ties broken round-robin so idle lanes share load.
+        with self._lock:
+            start = next(self._round_robin) % self.size
+            order = [(start + offset) % self.size for offset in range(self.size)]
+            return min(order, key=lambda index: self._pending[index])
+
+    def lane_for(self, conn: sqlite3.Connection) -> int:
+        with self._lock:
+            lane = self._assignments.get(id(conn))
+        if lane is None:
+            # Connections opened elsewhere (tests, scripts) still get a stable lane.
+            lane = (id(conn) >> 4) % self.size
+        return lane
+
+    async def _run_on_lane(self, lane: int, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self._pending[lane] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, **kwargs)
+            return await loop.run_in_executor(self._executors()[lane], call)
+        finally:
+            with self._lock:
+                self._pending[lane] -= 1
+
+    async def run(self, conn: sqlite3.Connection, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the lane that owns ``conn``."""
+        return await self._run_on_lane(self.lane_for(conn), fn, *args, **kwargs)
+
+    def bind(self, conn: sqlite3.Connection) -> int:
+        """Pin an already open connection to a lane until :meth:`release`."""
+        lane = self._pick_lane()
+        with self._lock:
+            self._assignments[id(conn)] = lane
+        return lane
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._assignments.pop(id(conn), None)
+
+    async def connect(self, factory: Callable[[], sqlite3.Connection]) -> sqlite3.Connection:
+        """Open a connection on a lane and pin it there until :meth:`close`."""
+        lane = self._pick_lane()
+        conn = await self._run_on_lane(lane, factory)
+        with self._lock:
+            self._assignments[id(conn)] = lane
+        return conn
+
+    async def close(self, conn: sqlite3.Connection) -> None:
+        lane = self.lane_for(conn)
+        try:
+            await self._run_on_lane(lane, conn.close)
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lanes": self.size,
+                "pinned_connections": len(self._assignments),
+                "pending_by_lane": list(self._pending),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            lanes, self._lanes = self._lanes, None
+        for lane in lanes or []:
+            lane.shutdown(wait=True)
+
+
+db_executor = DBExecutor(settings.db_worker_threads)
+
+
+async def run_db(conn: sqlite3.Connection, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call against ``conn`` on its lane and await the result.
+
+    ``conn`` is passed to ``fn`` as the first positional argument, matching
+    the ``service_fn(conn, ...)`` convention used by the services.
+    """
+    return await db_executor.run(conn, fn, conn, *args, **kwargs)
+
+
+def offload_db(route: Callable[..., T]) -> Callable[..., Any]:
+    """Run a synchronous route body on the lane of its ``db`` dependency.
+
+    FastAPI reads the wrapped signature, so dependencies and validation are
+    unchanged; only the body moves off the event loop.
+    """
+
+    @functools.wraps(route)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        conn = kwargs["db"]
+        return await db_executor.run(conn, route, *args, **kwargs)
+
+    return wrapper
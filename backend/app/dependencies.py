@@ -1,11 +1,14 @@
+import time
+
 from fastapi import Depends, HTTPException, Request
 import jwt
 
 from app.config import settings
 
+STREAM_TICKET_SCOPE = "notification_stream"
 
-async def get_current_user(request: Request) -> dict:
-    token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+
+def _decode_token(token: str) -> dict:
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
@@ -15,6 +18,44 @@ async def get_current_user(request: Request) -> dict:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+async def get_current_user(request: Request) -> dict:
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    payload = _decode_token(token)
+    if payload.get("scope"):
+        # Scoped tickets (see issue_stream_ticket) are not session tokens.
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+
+def issue_stream_ticket(user: dict) -> tuple[str, int]:
+    """A short-lived token that only opens the notification stream.
+
+    EventSource cannot send headers, so the stream URL carries a ticket
+    instead of the session token: it expires after
+    ``notification_stream_ticket_ttl_seconds`` and holds no Jellyfin token,
+    so one that ends up in an access log is of little use.
+    """
+    ttl = max(int(settings.notification_stream_ticket_ttl_seconds), 1)
+    payload = {
+        "user_id": user["user_id"],
+        "username": user.get("username"),
+        "is_admin": bool(user.get("is_admin")),
+        "scope": STREAM_TICKET_SCOPE,
+        "exp": int(time.time()) + ttl,
+    }
+    return jwt.encode(payload, settings.secret_key, algorithm="HS256"), ttl
+
+
+async def get_stream_user(request: Request) -> dict:
+    # The Authorization header, or a stream ticket as ?ticket= (EventSource cannot send headers).
+    if request.headers.get("Authorization"):
+        return await get_current_user(request)
+    payload = _decode_token(request.query_params.get("ticket", "").strip())
+    if payload.get("scope") != STREAM_TICKET_SCOPE:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+
 async def require_admin(user: dict = Depends(get_current_user)) -> dict:
     if not user.get("is_admin"):
         raise HTTPException(status_code=403, detail="Admin access required")
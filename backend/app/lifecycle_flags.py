@@ -0,0 +1,32 @@
+"""Lifecycle rule markers and the ``requests.lifecycle_flags`` bits they map to.
+
+Each lifecycle rule in services/request_service.py tags a request by
+appending a note that starts with its marker. ``lifecycle_flags`` is derived
+from those markers by triggers (see ``database.add_maintained_request_columns``)
+so rule eligibility is an integer predicate; rewriting ``admin_note`` (a
+status change, a bulk update, a duplicate merge) clears the bits with the
+markers and the rules fire again.
+
+Kept outside the services package so database.py can build the triggers
+without importing the services.
+"""
+
+ESCALATION_MARKER = "[AUTO-ESCALATED]"
+PENDING_REMINDER_MARKER = "[AUTO-PENDING-REMINDER]"
+DENIED_AUTO_CLOSE_MARKER = "[AUTO-CLOSED-DENIED]"
+
+LIFECYCLE_FLAG_ESCALATED = 1
+LIFECYCLE_FLAG_PENDING_REMINDER = 2
+LIFECYCLE_FLAG_DENIED_CLOSED = 4
+LIFECYCLE_RULE_MARKERS = (
+    (LIFECYCLE_FLAG_ESCALATED, ESCALATION_MARKER),
+    (LIFECYCLE_FLAG_PENDING_REMINDER, PENDING_REMINDER_MARKER),
+    (LIFECYCLE_FLAG_DENIED_CLOSED, DENIED_AUTO_CLOSE_MARKER),
+)
+
+
+def lifecycle_flags_sql(note_sql: str) -> str:
+    """SQL for the ``lifecycle_flags`` value implied by the markers in ``note_sql``."""
+    return " | ".join(
+        f"((COALESCE({note_sql}, '') LIKE '%{marker}%') * {flag})" for flag, marker in LIFECYCLE_RULE_MARKERS
+    )
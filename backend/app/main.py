@@ -6,119 +6,192 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import init_db, get_db_connection
+from app.database import init_db, get_pool, close_pools
+from app.db_executor import db_executor, run_db
 from app.routers import auth, tmdb, requests, jellyfin, admin, backlog, tunnel, books, comments, notifications
-from app.services.jellyfin_client import jellyfin_client
-from app.services.request_service import (
-    get_open_requests,
-    auto_fulfill_request,
-    run_request_lifecycle_rules,
-)
+from app.services import analytics_cache, analytics_rollups, library_mirror_service, notification_dispatcher, retention_service
+from app.services.fulfillment_service import run_fulfillment_cycle
+from app.services.http_clients import close_http_clients
+from app.services.tmdb_cache import tmdb_cache
+from app.services.request_service import get_sla_policy, run_request_lifecycle_rules
 
 logger = logging.getLogger(__name__)
 
-LIBRARY_CHECK_INTERVAL = 300  # 5 minutes
+LIBRARY_MIRROR_SYNC_INTERVAL = 300  # 5 minutes
 REQUEST_ESCALATION_INTERVAL = 86400  # daily
+ANALYTICS_COMPACTION_INTERVAL = 86400  # nightly
+RETENTION_INTERVAL = 86400  # nightly
 
 
-async def check_library_for_fulfilled_requests():
-    """Background task that checks if any open requests are now in the Jellyfin library."""
-    import httpx
+async def sync_library_mirror():
+    """Background task keeping the local Jellyfin library mirror current.
 
+    Runs immediately at startup (full sync), then incrementally. Each sync
+    is followed by an auto-fulfillment cycle over what changed.
+    """
     while True:
-        await asyncio.sleep(LIBRARY_CHECK_INTERVAL)
         try:
-            conn = get_db_connection()
-            open_requests = get_open_requests(conn)
-            if not open_requests:
-                conn.close()
-                continue
-
-            # Get a valid Jellyfin token from the most recently active admin
-            admin_row = conn.execute(
-                "SELECT user_id, jellyfin_token FROM user_roles WHERE role = 'admin' AND jellyfin_token IS NOT NULL AND jellyfin_token != '' LIMIT 1"
-            ).fetchone()
-
-            if not admin_row or not admin_row["jellyfin_token"]:
-                logger.debug("No admin Jellyfin token available for auto-fulfill check")
-                conn.close()
-                continue
-
-            admin_token = admin_row["jellyfin_token"]
-            admin_user_id = admin_row["user_id"]
-
-            for req in open_requests:
-                if req["media_type"] == "book":
-                    continue
-                try:
-                    item_type = "Movie" if req["media_type"] == "movie" else "Series"
-                    async with httpx.AsyncClient() as client:
-                        resp = await client.get(
-                            f"{jellyfin_client.base_url}/Users/{admin_user_id}/Items",
-                            params={
-                                "SearchTerm": req["title"],
-                                "IncludeItemTypes": item_type,
-                                "Recursive": "true",
-                                "Limit": 10,
-                                "Fields": "ProviderIds",
-                            },
-                            headers={
-                                "Authorization": jellyfin_client._auth_header(admin_token),
-                            },
-                        )
-                        if resp.status_code == 401:
-                            logger.warning("Admin Jellyfin token expired for auto-fulfill")
-                            break
-                        if resp.status_code != 200:
-                            continue
-                        data = resp.json()
-
-                    for item in data.get("Items", []):
-                        provider_ids = item.get("ProviderIds", {})
-                        if str(provider_ids.get("Tmdb", "")) == str(req["tmdb_id"]):
-                            logger.info(
-                                "Auto-fulfilling request #%d (%s) - found in library",
-                                req["id"], req["title"],
-                            )
-                            auto_fulfill_request(conn, req["id"])
-                            break
-                except Exception:
-                    logger.debug("Error checking request #%d", req["id"], exc_info=True)
-                    continue
-
-            conn.close()
+            result = await library_mirror_service.sync_library(get_pool().connection)
+            if result:
+                logger.info(
+                    "Library mirror %s sync: fetched=%d upserted=%d removed=%d",
+                    result["mode"],
+                    result["fetched"],
+                    result["upserted"],
+                    result["removed"],
+                )
+            async with get_pool().connection() as conn:
+                if await run_db(conn, library_mirror_service.mirror_ready):
+                    cycle = await run_db(conn, run_fulfillment_cycle)
+                    logger.log(
+                        logging.INFO if cycle["fulfilled"] else logging.DEBUG,
+                        "Auto-fulfillment cycle: matched=%d fulfilled=%d in %.1fms",
+                        cycle["matched"],
+                        cycle["fulfilled"],
+                        cycle["duration_ms"],
+                    )
         except Exception:
-            logger.exception("Error in library check background task")
+            logger.exception("Error in library mirror sync task")
+
+        await asyncio.sleep(LIBRARY_MIRROR_SYNC_INTERVAL)
 
 
 async def run_daily_request_lifecycle():
     """Daily lifecycle automation for request queue maintenance rules."""
     while True:
         try:
-            conn = get_db_connection()
-            result = run_request_lifecycle_rules(conn)
-            if any(result.values()):
+            async with get_pool().connection() as conn:
+                result = await run_db(conn, run_request_lifecycle_rules)
+            if result["escalated"] or result["reminded"] or result["auto_closed_denied"]:
                 logger.info(
-                    "Lifecycle rules applied: escalated=%d reminded=%d auto_closed_denied=%d",
+                    "Lifecycle rules applied: escalated=%d reminded=%d auto_closed_denied=%d in %.1fms (%s)",
                     result["escalated"],
                     result["reminded"],
                     result["auto_closed_denied"],
+                    result["duration_ms"],
+                    ", ".join(f"{name}={ms}ms" for name, ms in result["timings_ms"].items()),
                 )
-            conn.close()
         except Exception:
             logger.exception("Error in request lifecycle automation task")
 
         await asyncio.sleep(REQUEST_ESCALATION_INTERVAL)
 
 
+async def run_nightly_analytics_compaction():
+    """Nightly reconcile/fold pass over the analytics rollup tables."""
+    while True:
+        await asyncio.sleep(ANALYTICS_COMPACTION_INTERVAL)
+        try:
+            async with get_pool().connection() as conn:
+                result = await run_db(conn, analytics_rollups.compact_rollups)
+            logger.info(
+                "Analytics rollups compacted: pruned=%d folded=%d in %.1fms",
+                result["pruned_rows"],
+                result["folded_rows"],
+                result["duration_ms"],
+            )
+        except Exception:
+            logger.exception("Error in analytics rollup compaction task")
+
+
+async def run_nightly_retention():
+    """Nightly retention pass over notifications, comments and history (retention_enabled)."""
+    while True:
+        await asyncio.sleep(RETENTION_INTERVAL)
+        try:
+            async with get_pool().connection() as conn:
+                result = await run_db(conn, retention_service.run_retention)
+            logger.info(
+                "Retention removed %d rows (archived=%d digests=%d) in %d batches, "
+                "freed=%dB reclaimed=%dB complete=%s in %.1fms",
+                result["rows_removed"],
+                result["rows_archived"],
+                result["digest_rows"],
+                result["batches"],
+                result["freed_bytes"],
+                result["reclaimed_bytes"],
+                result["complete"],
+                result["duration_ms"],
+            )
+        except Exception:
+            logger.exception("Error in retention task")
+
+
+def _refresh_analytics_cache(conn) -> int:
+    return analytics_cache.refresh(conn, sla_days=get_sla_policy(conn)["target_days"])
+
+
+async def run_analytics_cache_refresh():
+    """Recompute stale cached admin analytics (analytics_cache_refresh_interval_seconds)."""
+    while True:
+        try:
+            async with get_pool().connection() as conn:
+                refreshed = await run_db(conn, _refresh_analytics_cache)
+            if refreshed:
+                logger.info("Analytics cache refreshed %d result(s)", refreshed)
+        except Exception:
+            logger.exception("Error in analytics cache refresh task")
+        await asyncio.sleep(settings.analytics_cache_refresh_interval_seconds)
+
+
+async def run_notification_outbox_worker():
+    """Drain queued notification fan-out (notification_outbox_enabled).
+
+    With the outbox disabled this runs once at startup to flush anything
+    queued while it was enabled, then exits.
+    """
+    while True:
+        drained_full_batch = False
+        try:
+            async with get_pool().connection() as conn:
+                result = await run_db(conn, notification_dispatcher.drain_outbox)
+            if result["events"]:
+                logger.debug(
+                    "Notification outbox drained: events=%d notifications=%d",
+                    result["events"],
+                    result["notifications"],
+                )
+            drained_full_batch = result["events"] >= settings.notification_outbox_batch_size
+        except Exception:
+            logger.exception("Error in notification outbox worker")
+
+        if drained_full_batch:
+            continue
+        if not settings.notification_outbox_enabled:
+            return
+        await asyncio.sleep(settings.notification_outbox_drain_interval_seconds)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
-    library_task = asyncio.create_task(check_library_for_fulfilled_requests())
+    get_pool().warm()
+    async with get_pool().connection() as conn:
+        if await run_db(conn, analytics_rollups.ensure_built):
+            logger.info("Analytics rollups backfilled from the source tables")
+    library_mirror_task = asyncio.create_task(sync_library_mirror())
     lifecycle_task = asyncio.create_task(run_daily_request_lifecycle())
+    compaction_task = asyncio.create_task(run_nightly_analytics_compaction())
+    outbox_task = asyncio.create_task(run_notification_outbox_worker())
+    retention_task = asyncio.create_task(run_nightly_retention()) if settings.retention_enabled else None
+    analytics_cache_task = (
+        asyncio.create_task(run_analytics_cache_refresh())
+        if settings.analytics_cache_refresh_interval_seconds > 0
+        else None
+    )
     yield
-    library_task.cancel()
+    library_mirror_task.cancel()
     lifecycle_task.cancel()
+    compaction_task.cancel()
+    outbox_task.cancel()
+    if retention_task:
+        retention_task.cancel()
+    if analytics_cache_task:
+        analytics_cache_task.cancel()
+    await close_http_clients()
+    tmdb_cache.close()
+    close_pools()
+    db_executor.shutdown()
 
 
 app = FastAPI(title="Media Manager", version="1.0.0", lifespan=lifespan)
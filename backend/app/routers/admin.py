@@ -1,12 +1,15 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 
 import httpx
 
+from app import conditional_get
+from app.config import settings
 from app.dependencies import require_admin, get_current_user
 from app.database import get_db
+from app.db_executor import db_executor, offload_db, run_db
 from app.schemas import (
     RequestUpdate,
     RequestResponse,
@@ -16,7 +19,13 @@ from app.schemas import (
     DuplicateMergeResponse,
 )
 from app.services import request_service
+from app.services import analytics_rollups
+from app.services import fulfillment_service
+from app.services import library_mirror_service
+from app.services import notification_dispatcher
 from app.services import series_continuation_service
+from app.services.http_clients import http_client_stats, jellyfin_http, tmdb_http
+from app.services.tmdb_cache import tmdb_cache
 from app.services.jellyfin_client import jellyfin_client
 from app.services.tmdb_client import tmdb_client
 
@@ -26,7 +35,8 @@ router = APIRouter()
 # --- Requests ---
 
 @router.get("/requests", response_model=PaginatedResponse)
-async def get_all_requests(
+@offload_db
+def get_all_requests(
     status: str | None = Query(None),
     user_id: str | None = Query(None),
     media_type: str | None = Query(None, pattern="^(movie|tv|book)$"),
@@ -34,23 +44,33 @@ async def get_all_requests(
     limit: int = Query(20, ge=1, le=500),
     sort: str = Query("priority", pattern="^(priority|newest|oldest|supporters)$"),
     include_auto_closed_denied: bool = Query(False),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str | None = Query(None, max_length=512),
+    include_total: bool = Query(True),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
-    return request_service.get_all_requests(
-        db,
-        status,
-        user_id,
-        media_type,
-        page,
-        limit,
-        sort,
-        include_auto_closed_denied=include_auto_closed_denied,
-    )
+    try:
+        return request_service.get_all_requests(
+            db,
+            status,
+            user_id,
+            media_type,
+            page,
+            limit,
+            sort,
+            include_auto_closed_denied=include_auto_closed_denied,
+            cursor=cursor,
+            cursor_mode=pagination == "cursor",
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/requests/duplicates", response_model=list[DuplicateGroupResponse])
-async def list_duplicate_request_groups(
+@offload_db
+def list_duplicate_request_groups(
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
@@ -58,7 +78,8 @@ async def list_duplicate_request_groups(
 
 
 @router.post("/requests/duplicates/merge", response_model=DuplicateMergeResponse)
-async def merge_duplicate_request_group(
+@offload_db
+def merge_duplicate_request_group(
     body: DuplicateMergeRequest,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -87,27 +108,37 @@ async def update_request(
     # When fulfilling, auto-search Jellyfin for a matching item
     jellyfin_item_id: str | None = None
     if body.status == "fulfilled":
-        row = db.execute("SELECT title, media_type, jellyfin_item_id FROM requests WHERE id = ?", (request_id,)).fetchone()
+        row = await run_db(
+            db,
+            lambda conn: conn.execute(
+                "SELECT title, media_type, tmdb_id, jellyfin_item_id FROM requests WHERE id = ?", (request_id,)
+            ).fetchone(),
+        )
         if row:
-            # Only auto-link if not already linked
-            if not row["jellyfin_item_id"] and row["media_type"] in ("movie", "tv"):
-                try:
-                    match = await jellyfin_client.search_item_by_title(
-                        user_id=admin["user_id"],
-                        token=admin["jellyfin_token"],
-                        title=row["title"],
-                        media_type=row["media_type"],
-                    )
-                    if match:
-                        jellyfin_item_id = match["Id"]
-                except Exception:
-                    pass  # Non-fatal — fulfill without link
-            else:
+            if row["jellyfin_item_id"]:
                 jellyfin_item_id = row["jellyfin_item_id"]  # preserve existing
+            elif row["media_type"] in ("movie", "tv"):
+                # Exact TMDB match from the local library mirror first, then
+                # fall back to a Jellyfin title search.
+                jellyfin_item_id = await run_db(
+                    db, library_mirror_service.find_library_item, row["media_type"], row["tmdb_id"]
+                )
+                if not jellyfin_item_id:
+                    try:
+                        match = await jellyfin_client.search_item_by_title(
+                            user_id=admin["user_id"],
+                            token=admin["jellyfin_token"],
+                            title=row["title"],
+                            media_type=row["media_type"],
+                        )
+                        if match:
+                            jellyfin_item_id = match["Id"]
+                    except Exception:
+                        pass  # Non-fatal — fulfill without link
 
     try:
-        result = request_service.update_request_status(
-            db, request_id, body.status, admin["user_id"], body.admin_note,
+        result = await run_db(
+            db, request_service.update_request_status, request_id, body.status, admin["user_id"], body.admin_note,
             jellyfin_item_id=jellyfin_item_id,
         )
         return result
@@ -146,7 +177,8 @@ class RequestBlockerUpdate(BaseModel):
 
 
 @router.post("/requests/bulk-status")
-async def bulk_update_request_statuses(
+@offload_db
+def bulk_update_request_statuses(
     body: BulkRequestStatusUpdate,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -165,7 +197,8 @@ async def bulk_update_request_statuses(
 
 
 @router.patch("/requests/{request_id}/jellyfin-link", response_model=RequestResponse)
-async def update_jellyfin_link(
+@offload_db
+def update_jellyfin_link(
     request_id: int,
     body: JellyfinLinkUpdate,
     admin: dict = Depends(require_admin),
@@ -187,15 +220,22 @@ async def update_jellyfin_link(
 
 
 @router.get("/stats")
-async def get_stats(
+@offload_db
+def get_stats(
+    request: Request,
+    response: Response,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
+    not_modified = conditional_get.check(request, response, "admin_stats", conditional_get.data_version(db), admin)
+    if not_modified:
+        return not_modified
     return request_service.get_request_stats(db)
 
 
 @router.get("/reply-pack")
-async def get_reply_pack(
+@offload_db
+def get_reply_pack(
     limit: int = Query(8, ge=1, le=25),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -204,7 +244,8 @@ async def get_reply_pack(
 
 
 @router.get("/requester-digest-pack")
-async def get_requester_digest_pack(
+@offload_db
+def get_requester_digest_pack(
     limit: int = Query(6, ge=1, le=25),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -213,7 +254,8 @@ async def get_requester_digest_pack(
 
 
 @router.get("/review-loop")
-async def get_request_review_loop(
+@offload_db
+def get_request_review_loop(
     limit: int = Query(8, ge=1, le=25),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -222,7 +264,8 @@ async def get_request_review_loop(
 
 
 @router.put("/requests/{request_id}/blocker", response_model=RequestResponse)
-async def set_request_blocker(
+@offload_db
+def set_request_blocker(
     request_id: int,
     body: RequestBlockerUpdate,
     admin: dict = Depends(require_admin),
@@ -247,7 +290,8 @@ async def set_request_blocker(
 
 
 @router.delete("/requests/{request_id}/blocker", response_model=RequestResponse)
-async def delete_request_blocker(
+@offload_db
+def delete_request_blocker(
     request_id: int,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -265,7 +309,8 @@ class RoleUpdate(BaseModel):
 
 
 @router.get("/users")
-async def get_users(
+@offload_db
+def get_users(
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
@@ -276,7 +321,8 @@ async def get_users(
 
 
 @router.patch("/users/{user_id}")
-async def update_user_role(
+@offload_db
+def update_user_role(
     user_id: str,
     body: RoleUpdate,
     admin: dict = Depends(require_admin),
@@ -312,24 +358,24 @@ async def health_check(admin: dict = Depends(require_admin)):
 
     # Jellyfin
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{jellyfin_client.base_url}/System/Info/Public",
-            )
-            if resp.status_code == 200:
-                info = resp.json()
-                checks["jellyfin"] = {
-                    "status": "ok",
-                    "url": jellyfin_client.base_url,
-                    "server_name": info.get("ServerName"),
-                    "version": info.get("Version"),
-                }
-            else:
-                checks["jellyfin"] = {
-                    "status": "error",
-                    "url": jellyfin_client.base_url,
-                    "detail": f"HTTP {resp.status_code}",
-                }
+        resp = await jellyfin_http.get().get(
+            f"{jellyfin_client.base_url}/System/Info/Public",
+            timeout=5.0,
+        )
+        if resp.status_code == 200:
+            info = resp.json()
+            checks["jellyfin"] = {
+                "status": "ok",
+                "url": jellyfin_client.base_url,
+                "server_name": info.get("ServerName"),
+                "version": info.get("Version"),
+            }
+        else:
+            checks["jellyfin"] = {
+                "status": "error",
+                "url": jellyfin_client.base_url,
+                "detail": f"HTTP {resp.status_code}",
+            }
     except Exception as e:
         checks["jellyfin"] = {
             "status": "error",
@@ -340,44 +386,69 @@ async def health_check(admin: dict = Depends(require_admin)):
     # TMDB
     try:
         from app.config import settings
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(
-                f"{settings.tmdb_base_url}/configuration",
-                params={"api_key": settings.tmdb_api_key},
-            )
-            checks["tmdb"] = {
-                "status": "ok" if resp.status_code == 200 else "error",
-                "detail": None if resp.status_code == 200 else f"HTTP {resp.status_code}",
-            }
+        resp = await tmdb_http.get().get(
+            f"{settings.tmdb_base_url}/configuration",
+            params={"api_key": settings.tmdb_api_key},
+            timeout=5.0,
+        )
+        checks["tmdb"] = {
+            "status": "ok" if resp.status_code == 200 else "error",
+            "detail": None if resp.status_code == 200 else f"HTTP {resp.status_code}",
+        }
     except Exception as e:
         checks["tmdb"] = {"status": "error", "detail": str(e)}
 
     # Database
     try:
-        from app.database import get_db_connection
-        conn = get_db_connection()
-        conn.execute("SELECT 1").fetchone()
-        conn.close()
-        checks["database"] = {"status": "ok"}
+        from app.database import get_pool
+        pool = get_pool()
+        async with pool.connection() as conn:
+            await run_db(conn, lambda c: c.execute("SELECT 1").fetchone())
+            fulfillment = await run_db(conn, fulfillment_service.get_fulfillment_state)
+            rollups = await run_db(conn, analytics_rollups.get_rollup_state)
+            outbox_pending = await run_db(conn, notification_dispatcher.pending_outbox_events)
+        checks["database"] = {
+            "status": "ok",
+            "pool": pool.stats(),
+            "executor": db_executor.stats(),
+        }
+        checks["auto_fulfillment"] = fulfillment
+        checks["analytics_rollups"] = rollups
+        checks["notification_outbox"] = {
+            "enabled": settings.notification_outbox_enabled,
+            "pending_events": outbox_pending,
+        }
     except Exception as e:
         checks["database"] = {"status": "error", "detail": str(e)}
 
+    checks["http_clients"] = http_client_stats()
+    checks["tmdb_cache"] = tmdb_cache.stats()
+    checks["conditional_get"] = conditional_get.stats()
     return checks
 
 
 @router.get("/analytics")
-async def get_analytics(
+@offload_db
+def get_analytics(
+    request: Request,
+    response: Response,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
-    from app.services.analytics_service import get_analytics as _get_analytics
+    from app.services import analytics_cache
+
+    # The SLA policy is a request_data table, so the version covers sla_days too.
+    not_modified = conditional_get.check(request, response, "admin_analytics", conditional_get.data_version(db), admin)
+    if not_modified:
+        return not_modified
 
     policy = request_service.get_sla_policy(db)
-    return _get_analytics(db, sla_days=policy["target_days"])
+    return analytics_cache.get_analytics(db, sla_days=policy["target_days"])
 
 
 @router.get("/sla-policy")
-async def get_sla_policy(
+@offload_db
+def get_sla_policy(
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
@@ -385,7 +456,8 @@ async def get_sla_policy(
 
 
 @router.patch("/sla-policy")
-async def patch_sla_policy(
+@offload_db
+def patch_sla_policy(
     body: SlaPolicyUpdate,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -396,15 +468,16 @@ async def patch_sla_policy(
 
 
 @router.post("/sla-policy/apply-recommended")
-async def apply_recommended_sla_policy(
+@offload_db
+def apply_recommended_sla_policy(
     body: SlaPolicyApplyRecommendedRequest | None = None,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
-    from app.services.analytics_service import get_analytics as _get_analytics
+    from app.services import analytics_cache
 
     current_policy = request_service.get_sla_policy(db)
-    analytics = _get_analytics(db, sla_days=current_policy["target_days"])
+    analytics = analytics_cache.get_analytics(db, sla_days=current_policy["target_days"])
     recommended_target = analytics.get("recommended_sla_days")
 
     if recommended_target is None:
@@ -427,31 +500,34 @@ async def apply_recommended_sla_policy(
 
 
 @router.get("/sla-policy/simulate")
-async def simulate_sla_policy_targets(
+@offload_db
+def simulate_sla_policy_targets(
     targets: str = Query("3,5,7,10,14"),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
-    from app.services.analytics_service import get_sla_target_simulation
+    from app.services import analytics_cache
 
+    # Comma-separated targets and/or inclusive ranges, e.g. "3,5,7" or "1-90".
     parsed_targets: list[int] = []
     for raw_target in targets.split(","):
         token = raw_target.strip()
         if not token:
             continue
+        start, _, end = token.partition("-")
         try:
-            value = int(token)
+            values = range(int(start), int(end or start) + 1)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid SLA target: {token}")
-        if value < 1 or value > 90:
+        if not values or values.start < 1 or values.stop - 1 > 90:
             raise HTTPException(status_code=400, detail="SLA targets must be between 1 and 90 days")
-        parsed_targets.append(value)
+        parsed_targets.extend(values)
 
     if not parsed_targets:
         raise HTTPException(status_code=400, detail="At least one SLA target is required")
 
     policy = request_service.get_sla_policy(db)
-    return get_sla_target_simulation(
+    return analytics_cache.get_sla_target_simulation(
         db,
         parsed_targets,
         current_target_days=policy["target_days"],
@@ -459,7 +535,8 @@ async def simulate_sla_policy_targets(
 
 
 @router.get("/sla-worklist")
-async def get_sla_worklist(
+@offload_db
+def get_sla_worklist(
     state: str = Query("all", pattern="^(all|breached|due_soon|on_track)$"),
     limit: int = Query(200, ge=1, le=1000),
     admin: dict = Depends(require_admin),
@@ -469,7 +546,8 @@ async def get_sla_worklist(
 
 
 @router.post("/sla-worklist/escalate")
-async def bulk_escalate_sla_worklist(
+@offload_db
+def bulk_escalate_sla_worklist(
     body: SlaEscalationBulkRequest,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -491,6 +569,8 @@ class ContinuationDismissRequest(BaseModel):
 
 @router.get("/series-continuation")
 async def get_series_continuation_radar(
+    request: Request,
+    response: Response,
     refresh: bool = Query(False),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -501,6 +581,11 @@ async def get_series_continuation_radar(
     Pass ?refresh=true to fetch fresh TMDB data for stale snapshots before
     returning the radar; otherwise the cached snapshot data is used.
     """
+    if not refresh:
+        version = await run_db(db, conditional_get.data_version)
+        not_modified = conditional_get.check(request, response, "series_radar", version, admin)
+        if not_modified:
+            return not_modified
     refresh_summary = None
     if refresh:
         refresh_summary = await series_continuation_service.refresh_radar(
@@ -508,7 +593,7 @@ async def get_series_continuation_radar(
             tmdb_client.get_tv_details,
             only_stale=True,
         )
-    candidates = series_continuation_service.list_radar_candidates(db)
+    candidates = await run_db(db, series_continuation_service.list_radar_candidates)
     return {
         "candidates": candidates,
         "count": len(candidates),
@@ -517,7 +602,8 @@ async def get_series_continuation_radar(
 
 
 @router.post("/series-continuation/{tmdb_id}/queue")
-async def queue_series_continuation(
+@offload_db
+def queue_series_continuation(
     tmdb_id: int,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -534,7 +620,8 @@ async def queue_series_continuation(
 
 
 @router.post("/series-continuation/{tmdb_id}/dismiss")
-async def dismiss_series_continuation(
+@offload_db
+def dismiss_series_continuation(
     tmdb_id: int,
     body: ContinuationDismissRequest,
     admin: dict = Depends(require_admin),
@@ -554,18 +641,18 @@ async def dismiss_series_continuation(
 @router.post("/jellyfin/scan")
 async def trigger_jellyfin_scan(admin: dict = Depends(require_admin)):
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(
-                f"{jellyfin_client.base_url}/Library/Refresh",
-                headers={
-                    "Authorization": jellyfin_client._auth_header(admin["jellyfin_token"]),
-                },
-            )
-            if resp.status_code == 204:
-                return {"status": "ok", "message": "Library scan started"}
-            elif resp.status_code == 401:
-                raise HTTPException(status_code=401, detail="Jellyfin session expired. Please log out and log back in.")
-            else:
-                raise HTTPException(status_code=resp.status_code, detail=f"Jellyfin returned {resp.status_code}")
+        resp = await jellyfin_http.get().post(
+            f"{jellyfin_client.base_url}/Library/Refresh",
+            headers={
+                "Authorization": jellyfin_client._auth_header(admin["jellyfin_token"]),
+            },
+            timeout=10.0,
+        )
+        if resp.status_code == 204:
+            return {"status": "ok", "message": "Library scan started"}
+        elif resp.status_code == 401:
+            raise HTTPException(status_code=401, detail="Jellyfin session expired. Please log out and log back in.")
+        else:
+            raise HTTPException(status_code=resp.status_code, detail=f"Jellyfin returned {resp.status_code}")
     except httpx.ConnectError:
         raise HTTPException(status_code=502, detail="Cannot connect to Jellyfin server")
@@ -6,11 +6,38 @@ from app.config import settings
 from app.schemas import LoginRequest, LoginResponse, UserInfo
 from app.dependencies import get_current_user
 from app.database import get_db
+from app.db_executor import run_db
 from app.services.jellyfin_client import jellyfin_client
 
 router = APIRouter()
 
 
+def _sync_user_role(conn, user_id: str, username: str, access_token: str, jellyfin_admin: bool) -> bool:
+    # Check app-level role (Jellyfin admin always gets admin access)
+    app_role = conn.execute(
+        "SELECT role FROM user_roles WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    is_admin = jellyfin_admin or (app_role and app_role["role"] == "admin")
+
+    # Upsert user into user_roles table so we track all users who have logged in
+    existing = conn.execute("SELECT user_id FROM user_roles WHERE user_id = ?", (user_id,)).fetchone()
+    if not existing:
+        role = "admin" if jellyfin_admin else "user"
+        conn.execute(
+            "INSERT INTO user_roles (user_id, username, role, jellyfin_token) VALUES (?, ?, ?, ?)",
+            (user_id, username, role, access_token),
+        )
+        conn.commit()
+    else:
+        # Keep username and token in sync
+        conn.execute(
+            "UPDATE user_roles SET username = ?, jellyfin_token = ? WHERE user_id = ?",
+            (username, access_token, user_id),
+        )
+        conn.commit()
+    return bool(is_admin)
+
+
 @router.post("/login", response_model=LoginResponse)
 async def login(body: LoginRequest, db=Depends(get_db)):
     try:
@@ -28,28 +55,7 @@ async def login(body: LoginRequest, db=Depends(get_db)):
     username = user_data.get("Name", "")
     jellyfin_admin = user_data.get("Policy", {}).get("IsAdministrator", False)
 
-    # Check app-level role (Jellyfin admin always gets admin access)
-    app_role = db.execute(
-        "SELECT role FROM user_roles WHERE user_id = ?", (user_id,)
-    ).fetchone()
-    is_admin = jellyfin_admin or (app_role and app_role["role"] == "admin")
-
-    # Upsert user into user_roles table so we track all users who have logged in
-    existing = db.execute("SELECT user_id FROM user_roles WHERE user_id = ?", (user_id,)).fetchone()
-    if not existing:
-        role = "admin" if jellyfin_admin else "user"
-        db.execute(
-            "INSERT INTO user_roles (user_id, username, role, jellyfin_token) VALUES (?, ?, ?, ?)",
-            (user_id, username, role, access_token),
-        )
-        db.commit()
-    else:
-        # Keep username and token in sync
-        db.execute(
-            "UPDATE user_roles SET username = ?, jellyfin_token = ? WHERE user_id = ?",
-            (username, access_token, user_id),
-        )
-        db.commit()
+    is_admin = await run_db(db, _sync_user_role, user_id, username, access_token, jellyfin_admin)
 
     payload = {
         "user_id": user_id,
@@ -1,19 +1,23 @@
-import math
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.dependencies import get_current_user, require_admin
 from app.database import get_db
+from app.db_executor import offload_db
 from app.schemas import BacklogCreate, BacklogResponse, BacklogUpdate
+from app.services.pagination import cached_count, fetch_page, order_by, page_payload
 
 router = APIRouter()
 
+BACKLOG_SORT_KEYS = [("created_at", True, "created_at"), ("id", True, "id")]
+
 
 # --- User endpoints ---
 
 @router.post("", response_model=BacklogResponse)
-async def create_report(
+@offload_db
+def create_report(
     body: BacklogCreate,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
@@ -32,7 +36,8 @@ async def create_report(
 
 
 @router.get("/mine")
-async def get_my_reports(
+@offload_db
+def get_my_reports(
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
 ):
@@ -46,11 +51,15 @@ async def get_my_reports(
 # --- Admin endpoints ---
 
 @router.get("")
-async def get_all_backlog(
+@offload_db
+def get_all_backlog(
     status: str | None = Query(None),
     type: str | None = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(500, ge=1, le=500),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str | None = Query(None, max_length=512),
+    include_total: bool = Query(True),
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
@@ -64,24 +73,43 @@ async def get_all_backlog(
         params.append(type)
 
     where = ("WHERE " + " AND ".join(where_parts)) if where_parts else ""
-    total = db.execute(f"SELECT COUNT(*) FROM backlog {where}", params).fetchone()[0]
-    offset = (page - 1) * limit
-    rows = db.execute(
-        f"SELECT * FROM backlog {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
-        params + [limit, offset],
-    ).fetchall()
-
-    return {
-        "items": [dict(r) for r in rows],
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": math.ceil(total / limit) if total > 0 else 1,
-    }
+    total = cached_count(db, "backlog", f"SELECT COUNT(*) FROM backlog {where}", params) if include_total else None
+    cursor_mode = pagination == "cursor" or cursor is not None
+    next_cursor = None
+    if cursor_mode:
+        try:
+            rows, next_cursor = fetch_page(
+                db,
+                f"SELECT * FROM backlog {where}",
+                params,
+                BACKLOG_SORT_KEYS,
+                sort="newest",
+                limit=limit,
+                cursor=cursor,
+                has_where=bool(where),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        offset = (page - 1) * limit
+        rows = db.execute(
+            f"SELECT * FROM backlog {where} ORDER BY {order_by(BACKLOG_SORT_KEYS)} LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+
+    return page_payload(
+        [dict(r) for r in rows],
+        total=total,
+        page=page,
+        limit=limit,
+        cursor_mode=cursor_mode,
+        next_cursor=next_cursor,
+    )
 
 
 @router.patch("/{item_id}", response_model=BacklogResponse)
-async def update_backlog_item(
+@offload_db
+def update_backlog_item(
     item_id: int,
     body: BacklogUpdate,
     admin: dict = Depends(require_admin),
@@ -128,7 +156,8 @@ async def update_backlog_item(
 
 
 @router.delete("/{item_id}")
-async def delete_backlog_item(
+@offload_db
+def delete_backlog_item(
     item_id: int,
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
@@ -142,7 +171,8 @@ async def delete_backlog_item(
 
 
 @router.get("/stats")
-async def get_backlog_stats(
+@offload_db
+def get_backlog_stats(
     admin: dict = Depends(require_admin),
     db=Depends(get_db),
 ):
@@ -12,6 +12,7 @@ from app.services.openlibrary_client import (
 )
 from app.services.request_service import get_request_for_tmdb
 from app.database import get_db
+from app.db_executor import run_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -39,7 +40,7 @@ async def search_books(
         except (ValueError, IndexError):
             continue
 
-        existing_request = get_request_for_tmdb(db, work_id, "book", user["user_id"])
+        existing_request = await run_db(db, get_request_for_tmdb, work_id, "book", user["user_id"])
 
         results.append(BookSearchResult(
             ol_work_id=work_id,
@@ -94,7 +95,7 @@ async def get_book_detail(
     # Extract subjects
     subjects = [s for s in data.get("subjects", []) if isinstance(s, str)][:15]
 
-    existing_request = get_request_for_tmdb(db, work_id, "book", user["user_id"])
+    existing_request = await run_db(db, get_request_for_tmdb, work_id, "book", user["user_id"])
 
     return BookDetail(
         ol_work_id=work_id,
@@ -5,6 +5,8 @@ from pydantic import BaseModel
 
 from app.dependencies import get_current_user
 from app.database import get_db
+from app.db_executor import offload_db
+from app.services import notification_dispatcher
 
 router = APIRouter()
 
@@ -36,7 +38,8 @@ def _row_to_dict(row) -> dict:
 
 
 @router.get("/{request_id}/comments", response_model=list[CommentResponse])
-async def get_comments(
+@offload_db
+def get_comments(
     request_id: int,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
@@ -60,7 +63,8 @@ async def get_comments(
 
 
 @router.post("/{request_id}/comments", response_model=CommentResponse, status_code=201)
-async def add_comment(
+@offload_db
+def add_comment(
     request_id: int,
     body: CommentCreate,
     user: dict = Depends(get_current_user),
@@ -95,27 +99,15 @@ async def add_comment(
         ),
     )
 
-    recipients = db.execute(
-        "SELECT DISTINCT user_id FROM request_supporters WHERE request_id = ?",
-        (request_id,),
-    ).fetchall()
-    for recipient in recipients:
-        recipient_user_id = recipient["user_id"]
-        if recipient_user_id == user["user_id"]:
-            continue
-        db.execute(
-            """
-            INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name)
-            VALUES (?, ?, 'comment_added', ?, ?, ?)
-            """,
-            (
-                request_id,
-                recipient_user_id,
-                f"{user['username']} commented on this request.",
-                user["user_id"],
-                user["username"],
-            ),
-        )
+    notification_dispatcher.notify_supporters(
+        db,
+        request_id,
+        event_type="comment_added",
+        message=f"{user['username']} commented on this request.",
+        actor_user_id=user["user_id"],
+        actor_name=user["username"],
+        exclude_user_id=user["user_id"],
+    )
 
     db.commit()
     comment = db.execute(
@@ -125,7 +117,8 @@ async def add_comment(
 
 
 @router.delete("/{request_id}/comments/{comment_id}", status_code=204)
-async def delete_comment(
+@offload_db
+def delete_comment(
     request_id: int,
     comment_id: int,
     user: dict = Depends(get_current_user),
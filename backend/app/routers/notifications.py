@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import sqlite3
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.config import settings
+from app.database import get_db, get_pool
+from app.db_executor import offload_db, run_db
+from app.dependencies import get_current_user, get_stream_user, issue_stream_ticket
+from app.services import notification_bus
 
 router = APIRouter()
 
+STREAM_PAGE_SIZE = 100
+
 
 class NotificationResponse(BaseModel):
     id: int
@@ -19,34 +28,53 @@ class NotificationResponse(BaseModel):
     created_at: str
 
 
+class StreamTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class NotificationSummaryResponse(BaseModel):
     total: int
     unread: int
     by_type: dict[str, int]
 
 
+def _notification_counts(db, user_id: str) -> list[tuple[str, int, int]]:
+    """(type, total, unread) for the user, from the trigger-maintained counters."""
+    try:
+        rows = db.execute(
+            "SELECT type, total, unread FROM notification_counters WHERE user_id = ? AND total > 0",
+            (user_id,),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # Partial schemas without the counters table aggregate the history.
+        rows = db.execute(
+            """
+            SELECT type, COUNT(*) as total, SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END) as unread
+            FROM request_notifications
+            WHERE user_id = ?
+            GROUP BY type
+            """,
+            (user_id,),
+        ).fetchall()
+    return [(row[0], int(row[1] or 0), int(row[2] or 0)) for row in rows]
+
+
+def _unread_count(db, user_id: str) -> int:
+    return sum(unread for _, _, unread in _notification_counts(db, user_id))
+
+
 @router.get("/summary", response_model=NotificationSummaryResponse)
-async def get_notification_summary(
+@offload_db
+def get_notification_summary(
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
 ):
-    rows = db.execute(
-        """
-        SELECT type, COUNT(*) as total, SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END) as unread
-        FROM request_notifications
-        WHERE user_id = ?
-        GROUP BY type
-        """,
-        (user["user_id"],),
-    ).fetchall()
-
     by_type: dict[str, int] = {}
     total = 0
     unread = 0
-    for row in rows:
-        row_total = int(row["total"] or 0)
-        row_unread = int(row["unread"] or 0)
-        by_type[row["type"]] = row_unread
+    for type_, row_total, row_unread in _notification_counts(db, user["user_id"]):
+        by_type[type_] = row_unread
         total += row_total
         unread += row_unread
 
@@ -57,8 +85,99 @@ async def get_notification_summary(
     }
 
 
+def _stream_snapshot(db, user_id: str) -> tuple[int, int]:
+    last_id = db.execute(
+        "SELECT COALESCE(MAX(id), 0) FROM request_notifications WHERE user_id = ?",
+        (user_id,),
+    ).fetchone()[0]
+    return _unread_count(db, user_id), int(last_id)
+
+
+def _stream_changes(db, user_id: str, after_id: int) -> tuple[list[dict], int]:
+    rows = db.execute(
+        """
+        SELECT id, request_id, user_id, type, message, actor_user_id, actor_name, is_read, created_at
+        FROM request_notifications
+        WHERE user_id = ? AND id > ?
+        ORDER BY id
+        LIMIT ?
+        """,
+        (user_id, after_id, STREAM_PAGE_SIZE),
+    ).fetchall()
+    return [{**dict(row), "is_read": bool(row["is_read"])} for row in rows], _unread_count(db, user_id)
+
+
+def _sse(event: str, data: dict, event_id: int | None = None) -> str:
+    prefix = "" if event_id is None else f"id: {event_id}\n"
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def notification_events(user_id: str, last_event_id: int | None = None, heartbeat_seconds: float | None = None):
+    """Server-sent events for one user's notifications.
+
+    Opens with an ``unread`` event carrying the current count, then sleeps on
+    the notification bus. Only when the user's notifications change does it
+    borrow a pooled connection to read the new rows (``notification`` events,
+    with the row id as the SSE id so a reconnect resumes after it) and the
+    unread count (an ``unread`` event with the delta). Idle streams send a
+    comment every heartbeat and never touch the database.
+    """
+    heartbeat = heartbeat_seconds or settings.notification_stream_heartbeat_seconds
+    # Subscribe before the snapshot so a write between the two still rings.
+    subscription = notification_bus.subscribe(user_id)
+    try:
+        async with get_pool().connection() as db:
+            unread, cursor = await run_db(db, _stream_snapshot, user_id)
+        yield _sse("unread", {"unread": unread, "delta": 0})
+
+        changed = last_event_id is not None and last_event_id < cursor
+        if changed:
+            cursor = last_event_id
+        while True:
+            if not changed:
+                changed = await subscription.wait(heartbeat)
+                if not changed:
+                    yield ": keep-alive\n\n"
+                    continue
+            async with get_pool().connection() as db:
+                rows, current = await run_db(db, _stream_changes, user_id, cursor)
+            for row in rows:
+                cursor = row["id"]
+                yield _sse("notification", row, row["id"])
+            if current != unread:
+                yield _sse("unread", {"unread": current, "delta": current - unread})
+                unread = current
+            changed = len(rows) == STREAM_PAGE_SIZE
+    finally:
+        notification_bus.unsubscribe(subscription)
+
+
+@router.post("/stream-ticket", response_model=StreamTicketResponse)
+async def create_stream_ticket(user: dict = Depends(get_current_user)):
+    """Exchange the session token for a short-lived ``/stream?ticket=`` ticket."""
+    ticket, expires_in = issue_stream_ticket(user)
+    return {"ticket": ticket, "expires_in": expires_in}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    user: dict = Depends(get_stream_user),
+    last_event_id: str | None = Header(None),
+):
+    try:
+        resume_after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_after = None
+    return StreamingResponse(
+        notification_events(user["user_id"], resume_after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("", response_model=list[NotificationResponse])
-async def list_notifications(
+@offload_db
+def list_notifications(
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
 ):
@@ -82,7 +201,8 @@ async def list_notifications(
 
 
 @router.post("/{notification_id}/read")
-async def mark_notification_read(
+@offload_db
+def mark_notification_read(
     notification_id: int,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
@@ -99,11 +219,13 @@ async def mark_notification_read(
         (notification_id,),
     )
     db.commit()
+    notification_bus.mark_pending(db, [user["user_id"]])
     return {"ok": True}
 
 
 @router.post("/read-all")
-async def mark_all_notifications_read(
+@offload_db
+def mark_all_notifications_read(
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
 ):
@@ -112,4 +234,5 @@ async def mark_all_notifications_read(
         (user["user_id"],),
     )
     db.commit()
+    notification_bus.mark_pending(db, [user["user_id"]])
     return {"ok": True, "updated": cursor.rowcount}
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
+from app import conditional_get
 from app.dependencies import get_current_user
 from app.database import get_db
+from app.db_executor import offload_db
 from app.schemas import RequestCreate, RequestResponse, PaginatedResponse, RequestTimelineEvent
 from app.services import request_service
 
@@ -9,7 +11,8 @@ router = APIRouter()
 
 
 @router.post("", response_model=RequestResponse)
-async def create_request(
+@offload_db
+def create_request(
     body: RequestCreate,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
@@ -30,27 +33,54 @@ async def create_request(
 
 
 @router.get("", response_model=PaginatedResponse)
-async def get_my_requests(
+@offload_db
+def get_my_requests(
     status: str | None = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str | None = Query(None, max_length=512),
+    include_total: bool = Query(True),
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
 ):
-    return request_service.get_user_requests(db, user["user_id"], status, page, limit)
+    try:
+        return request_service.get_user_requests(
+            db,
+            user["user_id"],
+            status,
+            page,
+            limit,
+            cursor=cursor,
+            cursor_mode=pagination == "cursor",
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/household")
-async def get_household_queue(
+@offload_db
+def get_household_queue(
+    request: Request,
+    response: Response,
     status: str = Query("open"),
     media_type: str | None = Query(None, pattern="^(movie|tv|book)$"),
     q: str | None = Query(None, max_length=120),
     sort: str = Query("priority", pattern="^(priority|supporters|newest|oldest)$"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: str | None = Query(None, max_length=512),
+    include_total: bool = Query(True),
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
 ):
+    not_modified = conditional_get.check(
+        request, response, "household_queue", conditional_get.data_version(db), user
+    )
+    if not_modified:
+        return not_modified
     try:
         return request_service.get_household_queue(
             db,
@@ -61,13 +91,17 @@ async def get_household_queue(
             page=page,
             limit=limit,
             sort=sort,
+            cursor=cursor,
+            cursor_mode=pagination == "cursor",
+            include_total=include_total,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{request_id}", response_model=RequestResponse)
-async def get_request(
+@offload_db
+def get_request(
     request_id: int,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
@@ -81,7 +115,8 @@ async def get_request(
 
 
 @router.get("/{request_id}/timeline", response_model=list[RequestTimelineEvent])
-async def get_request_timeline(
+@offload_db
+def get_request_timeline(
     request_id: int,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
@@ -99,7 +134,8 @@ async def get_request_timeline(
 
 
 @router.delete("/{request_id}")
-async def cancel_request(
+@offload_db
+def cancel_request(
     request_id: int,
     user: dict = Depends(get_current_user),
     db=Depends(get_db),
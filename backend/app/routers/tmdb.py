@@ -5,48 +5,32 @@ import logging
 from app.dependencies import get_current_user
 from app.schemas import TMDBSearchResult, TMDBMovieDetail, TMDBTvDetail, RequestPreflight
 from app.services.tmdb_client import tmdb_client
-from app.services.jellyfin_client import jellyfin_client
+from app.services import library_match_service
 from app.services.request_service import get_request_for_tmdb, get_community_request, compute_preflight
 from app.database import get_db
+from app.db_executor import run_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-async def check_in_library(user: dict, title: str, tmdb_id: int, media_type: str) -> bool:
+async def check_in_library(user: dict, title: str, tmdb_id: int, media_type: str, db=None) -> bool:
     """Check if a title exists in the Jellyfin library by searching and matching TMDB ID."""
-    item_id = await find_library_item_id(user, title, tmdb_id, media_type)
+    item_id = await find_library_item_id(user, title, tmdb_id, media_type, db)
     return item_id is not None
 
 
 async def find_library_item_id(
-    user: dict, title: str, tmdb_id: int, media_type: str
+    user: dict, title: str, tmdb_id: int, media_type: str, db=None
 ) -> str | None:
     """Resolve the Jellyfin item id for a given (title, tmdb_id, media_type).
 
     Returns None if the title isn't on the server. Used by both the simple
     in-library check and the preflight endpoint (which wants the id so it
-    can hand back a watch URL).
+    can hand back a watch URL). With ``db`` the local library mirror is
+    used once it has synced.
     """
-    if media_type not in {"movie", "tv"}:
-        return None
-    try:
-        item_type = "Movie" if media_type == "movie" else "Series"
-        data = await jellyfin_client.get_items(
-            user_id=user["user_id"],
-            token=user["jellyfin_token"],
-            include_item_types=item_type,
-            search_term=title,
-            limit=10,
-        )
-        for item in data.get("Items", []):
-            provider_ids = item.get("ProviderIds", {})
-            if str(provider_ids.get("Tmdb", "")) == str(tmdb_id):
-                return item.get("Id")
-        return None
-    except Exception:
-        logger.debug("Failed to check Jellyfin library for %s", title)
-        return None
+    return await library_match_service.find_library_item_id(user, title, tmdb_id, media_type, conn=db)
 
 
 @router.get("/search")
@@ -72,6 +56,17 @@ async def search(
     except httpx.HTTPStatusError:
         raise HTTPException(status_code=502, detail="TMDB API error")
 
+    # Resolve library presence for the whole page at once instead of one
+    # Jellyfin round trip per result.
+    library_items = await library_match_service.find_library_items(
+        user,
+        [
+            (r.get("title") or r.get("name", ""), r.get("id"), r.get("media_type", "movie"))
+            for r in results
+        ],
+        conn=db,
+    )
+
     search_results = []
     for r in results:
         media_type = r.get("media_type", "movie")
@@ -79,8 +74,8 @@ async def search(
         title = r.get("title") or r.get("name", "")
         release_date = r.get("release_date") or r.get("first_air_date")
 
-        existing_request = get_request_for_tmdb(db, tmdb_id, media_type, user["user_id"])
-        in_library = await check_in_library(user, title, tmdb_id, media_type)
+        existing_request = await run_db(db, get_request_for_tmdb, tmdb_id, media_type, user["user_id"])
+        in_library = library_items.get((media_type, tmdb_id)) is not None
 
         search_results.append(TMDBSearchResult(
             tmdb_id=tmdb_id,
@@ -120,9 +115,9 @@ async def get_movie(
         for c in (data.get("credits", {}).get("cast", []))[:10]
     ]
 
-    existing_request = get_request_for_tmdb(db, tmdb_id, "movie", user["user_id"])
-    community_request = get_community_request(db, tmdb_id, "movie", user["user_id"])
-    in_library = await check_in_library(user, data.get("title", ""), tmdb_id, "movie")
+    existing_request = await run_db(db, get_request_for_tmdb, tmdb_id, "movie", user["user_id"])
+    community_request = await run_db(db, get_community_request, tmdb_id, "movie", user["user_id"])
+    in_library = await check_in_library(user, data.get("title", ""), tmdb_id, "movie", db)
 
     return TMDBMovieDetail(
         tmdb_id=data["id"],
@@ -163,9 +158,9 @@ async def get_tv_show(
         for c in (data.get("credits", {}).get("cast", []))[:10]
     ]
 
-    existing_request = get_request_for_tmdb(db, tmdb_id, "tv", user["user_id"])
-    community_request = get_community_request(db, tmdb_id, "tv", user["user_id"])
-    in_library = await check_in_library(user, data.get("name", ""), tmdb_id, "tv")
+    existing_request = await run_db(db, get_request_for_tmdb, tmdb_id, "tv", user["user_id"])
+    community_request = await run_db(db, get_community_request, tmdb_id, "tv", user["user_id"])
+    in_library = await check_in_library(user, data.get("name", ""), tmdb_id, "tv", db)
 
     return TMDBTvDetail(
         tmdb_id=data["id"],
@@ -232,11 +227,12 @@ async def get_request_preflight(
     library_item_id: str | None = None
     in_library = False
     if media_type in {"movie", "tv"} and title:
-        library_item_id = await find_library_item_id(user, title, tmdb_id, media_type)
+        library_item_id = await find_library_item_id(user, title, tmdb_id, media_type, db)
         in_library = library_item_id is not None
 
-    payload = compute_preflight(
+    payload = await run_db(
         db,
+        compute_preflight,
         tmdb_id=tmdb_id,
         media_type=media_type,
         user_id=user["user_id"],
@@ -84,10 +84,11 @@ class RequestTimelineEvent(BaseModel):
 
 class PaginatedResponse(BaseModel):
     items: list
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class DuplicateGroupResponse(BaseModel):
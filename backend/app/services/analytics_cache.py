@@ -0,0 +1,169 @@
+"""Memoized admin analytics and SLA target simulations.
+
+The admin dashboard requests ``/analytics`` and ``/sla-policy/simulate``
+together, and applying the recommended SLA computes analytics once more;
+each call used to rebuild everything from the raw tables. Results are now
+kept per database, keyed by what they depend on:
+
+- analytics: ``("analytics", sla_days)``
+- simulations: ``("simulation", normalized targets, current target)``
+
+Every entry records the ``request_data`` version (see
+``database.REQUEST_DATA_TABLES``) it was computed at, so any write to
+requests, history or supporters invalidates it on the next read. Entries
+also expire after ``analytics_cache_max_age_seconds`` because open-request
+ages move with the clock. Each database keeps the ``MAX_ENTRIES`` most
+recently used results.
+
+With ``analytics_cache_refresh_interval_seconds`` set, a background task in
+main.py calls :func:`refresh` to recompute stale entries (and the current
+policy's analytics) ahead of the next dashboard load.
+
+Results carry a ``cache`` block: hit or miss, the version, when and how fast
+the result was computed and its age. Databases without ``data_versions``,
+in-memory databases and reads inside an open transaction (whose version may
+count writes that roll back) are never cached.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.services import analytics_service
+from app.services.data_versions import database_key, read_data_version
+
+REQUEST_DATA_VERSION_SCOPE = "request_data"
+MAX_ENTRIES = 32
+
+
+class CachedResult:
+    def __init__(self, result: dict, version: int | None, compute_ms: float):
+        self.result = result
+        self.version = version
+        self.compute_ms = compute_ms
+        self.computed_at = time.time()
+
+    def age_seconds(self) -> float:
+        return max(time.time() - self.computed_at, 0.0)
+
+    def response(self, hit: bool) -> dict:
+        payload = dict(self.result)
+        payload["cache"] = {
+            "hit": hit,
+            "data_version": self.version,
+            "computed_at": datetime.fromtimestamp(self.computed_at, timezone.utc).isoformat(),
+            "age_seconds": round(self.age_seconds(), 1),
+            "compute_ms": self.compute_ms,
+        }
+        return payload
+
+
+_entries: dict[str, OrderedDict[tuple, CachedResult]] = {}
+_entries_lock = threading.Lock()
+
+
+def _compute(conn: sqlite3.Connection, key: tuple, version: int | None) -> CachedResult:
+    started = time.perf_counter()
+    if key[0] == "analytics":
+        result = analytics_service.get_analytics(conn, sla_days=key[1])
+    else:
+        result = analytics_service.get_sla_target_simulation(conn, list(key[1]), current_target_days=key[2])
+    return CachedResult(result, version, round((time.perf_counter() - started) * 1000, 1))
+
+
+def _is_fresh(entry: CachedResult | None, version: int) -> bool:
+    return (
+        entry is not None
+        and entry.version == version
+        and entry.age_seconds() < settings.analytics_cache_max_age_seconds
+    )
+
+
+def _store(db_key: str, key: tuple, entry: CachedResult) -> None:
+    with _entries_lock:
+        entries = _entries.setdefault(db_key, OrderedDict())
+        entries[key] = entry
+        entries.move_to_end(key)
+        while len(entries) > MAX_ENTRIES:
+            entries.popitem(last=False)
+
+
+def _get(conn: sqlite3.Connection, key: tuple) -> dict:
+    db_key = database_key(conn)
+    version = read_data_version(conn, REQUEST_DATA_VERSION_SCOPE)
+    if db_key is None or version is None or conn.in_transaction or settings.analytics_cache_max_age_seconds <= 0:
+        return _compute(conn, key, version).response(hit=False)
+
+    with _entries_lock:
+        entry = _entries.get(db_key, {}).get(key)
+        if _is_fresh(entry, version):
+            _entries[db_key].move_to_end(key)
+            return entry.response(hit=True)
+
+    # Computed outside the lock so one slow rebuild does not hold up other keys.
+    entry = _compute(conn, key, version)
+    _store(db_key, key, entry)
+    return entry.response(hit=False)
+
+
+def _simulation_key(target_days: list[int], current_target_days: int | None) -> tuple:
+    targets = tuple(sorted({max(int(target), 1) for target in target_days if int(target) > 0}))
+    current = max(int(current_target_days), 1) if current_target_days else None
+    return ("simulation", targets, current)
+
+
+def get_analytics(conn: sqlite3.Connection, sla_days: int = 7) -> dict:
+    """``analytics_service.get_analytics`` through the cache."""
+    return _get(conn, ("analytics", max(int(sla_days or 7), 1)))
+
+
+def get_sla_target_simulation(
+    conn: sqlite3.Connection,
+    target_days: list[int],
+    current_target_days: int | None = None,
+) -> dict:
+    """``analytics_service.get_sla_target_simulation`` through the cache."""
+    return _get(conn, _simulation_key(target_days, current_target_days))
+
+
+def refresh(conn: sqlite3.Connection, sla_days: int | None = None) -> int:
+    """Recompute entries that are stale or will expire before the next refresh.
+
+    ``sla_days`` (the current policy target) is always kept warm. Returns the
+    number of results recomputed.
+    """
+    db_key = database_key(conn)
+    version = read_data_version(conn, REQUEST_DATA_VERSION_SCOPE)
+    if db_key is None or version is None or conn.in_transaction or settings.analytics_cache_max_age_seconds <= 0:
+        return 0
+    horizon = settings.analytics_cache_max_age_seconds - settings.analytics_cache_refresh_interval_seconds
+    with _entries_lock:
+        entries = dict(_entries.get(db_key, {}))
+    keys = list(entries)
+    if sla_days is not None and ("analytics", max(int(sla_days), 1)) not in entries:
+        keys.insert(0, ("analytics", max(int(sla_days), 1)))
+
+    refreshed = 0
+    for key in keys:
+        entry = entries.get(key)
+        if entry is not None and entry.version == version and entry.age_seconds() < horizon:
+            continue
+        _store(db_key, key, _compute(conn, key, version))
+        refreshed += 1
+    return refreshed
+
+
+def invalidate(conn: sqlite3.Connection | None = None) -> None:
+    """Drop cached results (for one database, or all of them)."""
+    with _entries_lock:
+        if conn is None:
+            _entries.clear()
+            return
+        db_key = database_key(conn)
+        if db_key is not None:
+            _entries.pop(db_key, None)
@@ -0,0 +1,322 @@
+"""Pre-aggregated daily rollups behind the admin analytics dashboard.
+
+The dashboard used to aggregate the full ``requests``, ``request_history``
+and ``request_supporters`` tables on every hit. Those aggregates now live in
+small rollup tables:
+
+- ``analytics_daily_requests``: requests per created day, media type and
+  current status (status moves shift a request between rows).
+- ``analytics_daily_fulfillments``: 'fulfilled' history entries per day and
+  media type, bucketed by whole lead-time days (capped at
+  ``database.LEAD_BUCKET_CAP``; -1 when no lead time can be computed) with the
+  lead-time sum of each bucket, i.e. a per-day lead-time histogram.
+- ``analytics_daily_supporters``: supporter rows per day they were added.
+- ``analytics_requester_totals``: requests per original requester.
+
+Triggers (see ``database.init_db``) keep the tables current on every write;
+:func:`ensure_built` backfills them once at startup.
+A nightly :func:`compact_rollups` run rebuilds the rows still kept per day
+from the source tables (correcting any drift, e.g. from deleted history
+whose request is gone), drops empty rows and folds days older than the
+retention window into one row per month, so the dashboard reads a few
+hundred rows however long the history grows.
+
+The read helpers fall back to aggregating the source tables when the rollup
+tables are missing (partial schemas in unit tests).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.database import lead_bucket_sql, lead_days_sql
+
+# Source aggregates for the daily tables, for rows created on or after a day.
+_REBUILD_DAILY = {
+    "analytics_daily_requests": """
+        INSERT INTO analytics_daily_requests (day, media_type, status, requests)
+        SELECT COALESCE(date(created_at), ''), media_type, status, COUNT(*)
+        FROM requests
+        WHERE COALESCE(date(created_at), '') >= ?
+        GROUP BY 1, 2, 3
+    """,
+    "analytics_daily_fulfillments": f"""
+        INSERT INTO analytics_daily_fulfillments (day, media_type, lead_bucket, fulfilled, lead_days_sum)
+        SELECT COALESCE(date(rh.created_at), ''), COALESCE(r.media_type, 'unknown'),
+               {lead_bucket_sql('rh.created_at')}, COUNT(*), SUM({lead_days_sql('rh.created_at')})
+        FROM request_history rh
+        LEFT JOIN requests r ON r.id = rh.request_id
+        WHERE rh.new_status = 'fulfilled'
+          AND COALESCE(date(rh.created_at), '') >= ?
+        GROUP BY 1, 2, 3
+    """,
+    "analytics_daily_supporters": """
+        INSERT INTO analytics_daily_supporters (day, supporters)
+        SELECT COALESCE(date(created_at), ''), COUNT(*)
+        FROM request_supporters
+        WHERE COALESCE(date(created_at), '') >= ?
+        GROUP BY 1
+    """,
+}
+
+# Grouping columns and counter columns of each daily table.
+_DAILY_COLUMNS = {
+    "analytics_daily_requests": (("media_type", "status"), ("requests",)),
+    "analytics_daily_fulfillments": (("media_type", "lead_bucket"), ("fulfilled", "lead_days_sum")),
+    "analytics_daily_supporters": ((), ("supporters",)),
+}
+
+
+def rollups_ready(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT 1 FROM analytics_rollup_state LIMIT 0")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def _rebuild(conn: sqlite3.Connection, since_day: str) -> None:
+    for table, sql in _REBUILD_DAILY.items():
+        conn.execute(f"DELETE FROM {table} WHERE day >= ?", (since_day,))
+        conn.execute(sql, (since_day,))
+    conn.execute("DELETE FROM analytics_requester_totals")
+    conn.execute(
+        """
+        INSERT INTO analytics_requester_totals (username, requests)
+        SELECT username, COUNT(*) FROM requests GROUP BY username
+        """
+    )
+
+
+def rebuild_rollups(conn: sqlite3.Connection) -> None:
+    """Recompute every rollup row from the source tables."""
+    _rebuild(conn, "")
+    conn.execute(
+        "UPDATE analytics_rollup_state SET built_at = ? WHERE id = 1",
+        (datetime.now(timezone.utc).isoformat(),),
+    )
+    conn.commit()
+
+
+def ensure_built(conn: sqlite3.Connection) -> bool:
+    """Backfill the rollups if they have never been built; True if it did."""
+    if conn.execute("SELECT built_at FROM analytics_rollup_state WHERE id = 1").fetchone()[0] is not None:
+        return False
+    rebuild_rollups(conn)
+    return True
+
+
+def _fold_months(conn: sqlite3.Connection, table: str, before_day: str) -> int:
+    keys, counters = _DAILY_COLUMNS[table]
+    month = "strftime('%Y-%m-01', day)"
+    rows = conn.execute(
+        f"""
+        SELECT {month} AS month{''.join(', ' + key for key in keys)},
+               {', '.join(f'SUM({c})' for c in counters)}, COUNT(*)
+        FROM {table}
+        WHERE day != '' AND day < ?
+        GROUP BY month{''.join(', ' + key for key in keys)}
+        """,
+        (before_day,),
+    ).fetchall()
+    if not rows:
+        return 0
+    conn.execute(f"DELETE FROM {table} WHERE day != '' AND day < ?", (before_day,))
+    columns = ", ".join(["day", *keys, *counters])
+    conn.executemany(
+        f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' for _ in range(1 + len(keys) + len(counters)))})",
+        [tuple(row)[:-1] for row in rows],
+    )
+    # Daily rows merged away into their month's row.
+    return sum(row[-1] for row in rows) - len(rows)
+
+
+def compact_rollups(conn: sqlite3.Connection, daily_retention_days: int | None = None) -> dict:
+    """Nightly maintenance: rebuild the daily rows, prune empty ones, fold old days."""
+    started = time.perf_counter()
+    # At least 13 months stay daily: the dashboard's monthly window starts
+    # mid-month a year back. Whole months only, so a folded row never
+    # straddles the window.
+    retention = max(int(daily_retention_days or settings.analytics_rollup_daily_retention_days), 400)
+    fold_before = conn.execute(
+        "SELECT date('now', ?, 'start of month')",
+        (f"-{retention} days",),
+    ).fetchone()[0]
+
+    # Rows still held per day are rebuilt from source; folded months are final.
+    _rebuild(conn, fold_before)
+    pruned = 0
+    for table, (_, counters) in _DAILY_COLUMNS.items():
+        pruned += conn.execute(f"DELETE FROM {table} WHERE {counters[0]} = 0").rowcount
+    pruned += conn.execute("DELETE FROM analytics_requester_totals WHERE requests = 0").rowcount
+    folded = sum(_fold_months(conn, table, fold_before) for table in _DAILY_COLUMNS)
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    conn.execute(
+        """
+        UPDATE analytics_rollup_state
+        SET compacted_at = ?, folded_before = ?, last_duration_ms = ?
+        WHERE id = 1
+        """,
+        (datetime.now(timezone.utc).isoformat(), fold_before, duration_ms),
+    )
+    conn.commit()
+    return {
+        "folded_before": fold_before,
+        "pruned_rows": pruned,
+        "folded_rows": folded,
+        "duration_ms": duration_ms,
+    }
+
+
+# --- Dashboard reads -------------------------------------------------------
+
+
+def request_counts(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """(media_type, status, total) across all requests."""
+    if rollups_ready(conn):
+        return conn.execute(
+            """
+            SELECT media_type, status, SUM(requests) AS total
+            FROM analytics_daily_requests
+            GROUP BY media_type, status
+            HAVING SUM(requests) > 0
+            """
+        ).fetchall()
+    return conn.execute(
+        "SELECT media_type, status, COUNT(*) AS total FROM requests GROUP BY media_type, status"
+    ).fetchall()
+
+
+def monthly_volume(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """Requests submitted per month over the last 12 months, and how many are fulfilled."""
+    if rollups_ready(conn):
+        return conn.execute(
+            """
+            SELECT substr(day, 1, 7) AS month,
+                   SUM(requests) AS submitted,
+                   SUM(CASE WHEN status = 'fulfilled' THEN requests ELSE 0 END) AS fulfilled
+            FROM analytics_daily_requests
+            WHERE day >= date('now', '-12 months')
+            GROUP BY month
+            HAVING SUM(requests) > 0
+            ORDER BY month ASC
+            """
+        ).fetchall()
+    return conn.execute(
+        """
+        SELECT strftime('%Y-%m', created_at) as month,
+               COUNT(*) as submitted,
+               SUM(CASE WHEN status = 'fulfilled' THEN 1 ELSE 0 END) as fulfilled
+        FROM requests
+        WHERE created_at >= date('now', '-12 months')
+        GROUP BY month
+        ORDER BY month ASC
+        """
+    ).fetchall()
+
+
+def weekly_throughput(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """Fulfillments per week over the last 8 weeks."""
+    if rollups_ready(conn):
+        return conn.execute(
+            """
+            SELECT strftime('%Y-W%W', day) AS week, SUM(fulfilled) AS fulfilled
+            FROM analytics_daily_fulfillments
+            WHERE day >= date('now', '-56 days')
+            GROUP BY week
+            HAVING SUM(fulfilled) > 0
+            ORDER BY week ASC
+            """
+        ).fetchall()
+    return conn.execute(
+        """
+        SELECT strftime('%Y-W%W', rh.created_at) as week,
+               COUNT(*) as fulfilled
+        FROM request_history rh
+        WHERE rh.new_status = 'fulfilled'
+          AND rh.created_at >= date('now', '-56 days')
+        GROUP BY week
+        ORDER BY week ASC
+        """
+    ).fetchall()
+
+
+def lead_time_histogram(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """Fulfillments per whole lead-time day (the last bucket is "or more")."""
+    if rollups_ready(conn):
+        return conn.execute(
+            """
+            SELECT lead_bucket AS days, SUM(fulfilled) AS fulfilled
+            FROM analytics_daily_fulfillments
+            WHERE lead_bucket >= 0
+            GROUP BY lead_bucket
+            HAVING SUM(fulfilled) > 0
+            ORDER BY lead_bucket ASC
+            """
+        ).fetchall()
+    return conn.execute(
+        f"""
+        SELECT {lead_bucket_sql('rh.created_at')} AS days, COUNT(*) AS fulfilled
+        FROM request_history rh
+        JOIN requests r ON r.id = rh.request_id
+        WHERE rh.new_status = 'fulfilled'
+        GROUP BY days
+        HAVING days >= 0
+        ORDER BY days ASC
+        """
+    ).fetchall()
+
+
+def top_requesters(conn: sqlite3.Connection, limit: int = 5) -> list[sqlite3.Row]:
+    if rollups_ready(conn):
+        return conn.execute(
+            """
+            SELECT username, requests AS cnt
+            FROM analytics_requester_totals
+            WHERE requests > 0
+            ORDER BY requests DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    return conn.execute(
+        """
+        SELECT username, COUNT(*) as cnt
+        FROM requests
+        GROUP BY username
+        ORDER BY cnt DESC
+        LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def total_supporters(conn: sqlite3.Connection) -> int:
+    if rollups_ready(conn):
+        return int(conn.execute("SELECT COALESCE(SUM(supporters), 0) FROM analytics_daily_supporters").fetchone()[0])
+    return int(conn.execute("SELECT COUNT(*) FROM request_supporters").fetchone()[0])
+
+
+def get_rollup_state(conn: sqlite3.Connection) -> dict | None:
+    try:
+        row = conn.execute(
+            """
+            SELECT built_at, compacted_at, folded_before, last_duration_ms
+            FROM analytics_rollup_state
+            WHERE id = 1
+            """
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if not row:
+        return None
+    return {
+        "built_at": row[0],
+        "compacted_at": row[1],
+        "folded_before": row[2],
+        "last_duration_ms": row[3],
+    }
@@ -1,45 +1,31 @@
 import math
 import sqlite3
-import statistics
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-
-ESCALATION_MARKER = "[AUTO-ESCALATED]"
-
-
-def _parse_dt(value) -> datetime | None:
-    if not isinstance(value, str):
-        return None
-    for parser in (
-        datetime.fromisoformat,
-        lambda raw: datetime.strptime(raw, "%Y-%m-%d %H:%M:%S"),
-    ):
-        try:
-            parsed = parser(value)
-            if parsed.tzinfo is None:
-                parsed = parsed.replace(tzinfo=timezone.utc)
-            return parsed
-        except (ValueError, TypeError):
-            continue
-    return None
+from app.services import analytics_rollups, timestamps
+from app.services.lead_time_service import get_lead_time_store
+from app.services.request_columns import created_epoch_sql
+from app.services.sla_engine import SLAEngine
 
 
-def _percentile(values: list[float], percentile: float) -> float | None:
-    if not values:
-        return None
-    if len(values) == 1:
-        return values[0]
-
-    sorted_vals = sorted(values)
-    rank = (len(sorted_vals) - 1) * percentile
-    lower_idx = math.floor(rank)
-    upper_idx = math.ceil(rank)
+ESCALATION_MARKER = "[AUTO-ESCALATED]"
 
-    if lower_idx == upper_idx:
-        return sorted_vals[lower_idx]
 
-    weight = rank - lower_idx
-    return sorted_vals[lower_idx] + (sorted_vals[upper_idx] - sorted_vals[lower_idx]) * weight
+def _open_request_ages(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """Media type and whole-day age of every open request, computed in SQL."""
+    age = timestamps.age_days_sql(created_epoch_sql())
+    return conn.execute(
+        f"""
+        SELECT media_type, age
+        FROM (
+            SELECT r.media_type, {age} AS age
+            FROM requests r
+            WHERE r.status IN ('pending', 'approved')
+        )
+        WHERE age IS NOT NULL
+        """,
+        (int(datetime.now(timezone.utc).timestamp()),),
+    ).fetchall()
 
 
 def get_analytics(conn: sqlite3.Connection, sla_days: int = 7) -> dict:
@@ -163,11 +149,19 @@ def _build_sla_policy_advisor(
 
 
 def _compute_analytics(conn: sqlite3.Connection, sla_days: int) -> dict:
-    # --- Summary KPIs ---
-    total_requests_all_time = conn.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
-    fulfilled_all_time = conn.execute(
-        "SELECT COUNT(*) FROM requests WHERE status = 'fulfilled'"
-    ).fetchone()[0]
+    # --- Summary KPIs (from the daily rollups) ---
+    status_totals: dict[str, int] = {}
+    media_type_totals: dict[str, dict[str, int]] = {}
+    for row in analytics_rollups.request_counts(conn):
+        total = int(row["total"] or 0)
+        status_totals[row["status"]] = status_totals.get(row["status"], 0) + total
+        media_totals = media_type_totals.setdefault(row["media_type"], {"total": 0, "fulfilled": 0})
+        media_totals["total"] += total
+        if row["status"] == "fulfilled":
+            media_totals["fulfilled"] += total
+
+    total_requests_all_time = sum(status_totals.values())
+    fulfilled_all_time = status_totals.get("fulfilled", 0)
 
     fulfillment_rate = (
         round(fulfilled_all_time / total_requests_all_time * 100, 1)
@@ -176,40 +170,20 @@ def _compute_analytics(conn: sqlite3.Connection, sla_days: int) -> dict:
     )
 
     # --- Lead time (days from request created_at to fulfilled history entry) ---
-    history_rows = conn.execute(
-        """
-        SELECT r.created_at AS req_created, rh.created_at AS fulfilled_at, r.media_type AS media_type
-        FROM request_history rh
-        JOIN requests r ON r.id = rh.request_id
-        WHERE rh.new_status = 'fulfilled'
-        """
-    ).fetchall()
-
-    lead_times: list[float] = []
-    lead_times_by_media_type: dict[str, list[float]] = {}
-    for row in history_rows:
-        req_dt = _parse_dt(row["req_created"])
-        ful_dt = _parse_dt(row["fulfilled_at"])
-        if req_dt and ful_dt and ful_dt >= req_dt:
-            delta = (ful_dt - req_dt).total_seconds() / 86400.0
-            lead_times.append(delta)
-            media_type = row["media_type"] or "unknown"
-            lead_times_by_media_type.setdefault(media_type, []).append(delta)
+    lead_time_store = get_lead_time_store(conn)
+    overall = lead_time_store.overall
+    lead_times = overall.values
 
     avg_lead_time_days: float | None = None
     median_lead_time_days: float | None = None
     p90_lead_time_days: float | None = None
 
     if lead_times:
-        avg_lead_time_days = round(sum(lead_times) / len(lead_times), 1)
-        median_lead_time_days = round(statistics.median(lead_times), 1)
-        if len(lead_times) >= 10:
-            # statistics.quantiles requires at least 2 data points; n=10 for deciles
-            p90_lead_time_days = round(statistics.quantiles(lead_times, n=10)[8], 1)
-        else:
-            p90_lead_time_days = round(max(lead_times), 1)
-
-    fulfilled_within_sla_count = sum(1 for value in lead_times if value <= sla_days)
+        avg_lead_time_days = round(overall.total_days / overall.sample_size, 1)
+        median_lead_time_days = round(overall.median, 1)
+        p90_lead_time_days = round(overall.p90, 1)
+
+    fulfilled_within_sla_count = overall.count_within(sla_days)
     fulfilled_outside_sla_count = max(len(lead_times) - fulfilled_within_sla_count, 0)
     fulfilled_within_sla_rate = (
         round(fulfilled_within_sla_count / len(lead_times) * 100, 1)
@@ -220,18 +194,14 @@ def _compute_analytics(conn: sqlite3.Connection, sla_days: int) -> dict:
     # --- Weekly SLA trend (last 8 weeks) ---
     weekly_sla_buckets: dict[str, dict[str, int]] = {}
     weekly_window_now = datetime.now(timezone.utc)
-    for row in history_rows:
-        req_dt = _parse_dt(row["req_created"])
-        ful_dt = _parse_dt(row["fulfilled_at"])
-        if not req_dt or not ful_dt or ful_dt < req_dt:
-            continue
+    for ful_dt, lead_days in lead_time_store.fulfilled_since(weekly_window_now - timedelta(days=57)):
         if (weekly_window_now - ful_dt).days > 56:
             continue
 
         week_key = ful_dt.strftime("%Y-W%W")
         bucket = weekly_sla_buckets.setdefault(week_key, {"within": 0, "total": 0})
         bucket["total"] += 1
-        if ((ful_dt - req_dt).total_seconds() / 86400.0) <= sla_days:
+        if lead_days <= sla_days:
             bucket["within"] += 1
 
     weekly_sla_hit_rate = []
@@ -264,83 +234,62 @@ def _compute_analytics(conn: sqlite3.Connection, sla_days: int) -> dict:
     recommended_sla_days: int | None = None
     recommended_sla_within_rate: float | None = None
     if lead_times:
-        p75 = _percentile(lead_times, 0.75)
+        p75 = overall.p75
         if p75 is not None:
             # Use p75 as a practical target that keeps expectations realistic
             recommended_sla_days = max(1, math.ceil(p75))
-            within_recommended = sum(1 for value in lead_times if value <= recommended_sla_days)
+            within_recommended = overall.count_within(recommended_sla_days)
             recommended_sla_within_rate = round(within_recommended / len(lead_times) * 100, 1)
 
     # --- Backlog pressure ---
-    open_count = conn.execute(
-        "SELECT COUNT(*) FROM requests WHERE status IN ('pending', 'approved')"
-    ).fetchone()[0]
-    pending_count = conn.execute(
-        "SELECT COUNT(*) FROM requests WHERE status = 'pending'"
-    ).fetchone()[0]
-    approved_count = conn.execute(
-        "SELECT COUNT(*) FROM requests WHERE status = 'approved'"
-    ).fetchone()[0]
-    denied_count = conn.execute(
-        "SELECT COUNT(*) FROM requests WHERE status = 'denied'"
-    ).fetchone()[0]
+    pending_count = status_totals.get("pending", 0)
+    approved_count = status_totals.get("approved", 0)
+    denied_count = status_totals.get("denied", 0)
+    open_count = pending_count + approved_count
     escalated_count = conn.execute(
         "SELECT COUNT(*) FROM requests WHERE status IN ('pending', 'approved') AND admin_note LIKE ?",
         (f"%{ESCALATION_MARKER}%",),
     ).fetchone()[0]
 
-    now = datetime.now(timezone.utc)
-    open_rows = conn.execute(
-        "SELECT created_at FROM requests WHERE status IN ('pending', 'approved')"
-    ).fetchall()
     open_ages = []
-    for row in open_rows:
-        dt = _parse_dt(row["created_at"])
-        if dt:
-            open_ages.append(max((now - dt).days, 0))
+    open_ages_by_media_type: dict[str, list[int]] = {}
+    for row in _open_request_ages(conn):
+        open_ages.append(row["age"])
+        open_ages_by_media_type.setdefault(row["media_type"] or "unknown", []).append(row["age"])
     oldest_open_days = max(open_ages) if open_ages else 0
-    open_breaching_sla = sum(1 for age in open_ages if age > sla_days)
-    open_due_soon = sum(1 for age in open_ages if max(sla_days - age, 0) <= 2 and age <= sla_days)
+    open_engine = SLAEngine(open_ages=open_ages)
+    open_breaching_sla = open_engine.breaching([sla_days])[0]
+    open_due_soon = open_engine.due_soon([sla_days], [2])[0]
     open_breaching_recommended_sla = (
-        sum(1 for age in open_ages if age > recommended_sla_days)
+        open_engine.breaching([recommended_sla_days])[0]
         if recommended_sla_days is not None
         else None
     )
 
-    open_rows_with_type = conn.execute(
-        "SELECT media_type, created_at FROM requests WHERE status IN ('pending', 'approved')"
-    ).fetchall()
-    open_ages_by_media_type: dict[str, list[int]] = {}
-    for row in open_rows_with_type:
-        dt = _parse_dt(row["created_at"])
-        if not dt:
-            continue
-        media_type = row["media_type"] or "unknown"
-        open_ages_by_media_type.setdefault(media_type, []).append(max((now - dt).days, 0))
 
     media_type_sla_insights: list[dict] = []
+    lead_times_by_media_type = lead_time_store.by_media_type
     for media_type in sorted(set(list(lead_times_by_media_type.keys()) + list(open_ages_by_media_type.keys()))):
-        media_leads = sorted(lead_times_by_media_type.get(media_type, []))
-        sample_size = len(media_leads)
-        median_days = round(statistics.median(media_leads), 1) if media_leads else None
+        media_distribution = lead_times_by_media_type.get(media_type)
+        sample_size = media_distribution.sample_size if media_distribution else 0
+        median_days = round(media_distribution.median, 1) if sample_size else None
 
         recommended_target_days = None
         recommended_hit_rate = None
-        if media_leads:
-            media_p75 = _percentile(media_leads, 0.75)
+        if sample_size:
+            media_p75 = media_distribution.p75
             if media_p75 is not None:
                 recommended_target_days = max(1, math.ceil(media_p75))
-                within = sum(1 for value in media_leads if value <= recommended_target_days)
+                within = media_distribution.count_within(recommended_target_days)
                 recommended_hit_rate = round(within / sample_size * 100, 1)
 
-        open_media_ages = open_ages_by_media_type.get(media_type, [])
-        open_count_for_type = len(open_media_ages)
-        open_breaching_global_policy = sum(1 for age in open_media_ages if age > sla_days)
-        open_breaching_recommended = (
-            sum(1 for age in open_media_ages if age > recommended_target_days)
-            if recommended_target_days is not None
-            else None
+        media_engine = SLAEngine(open_ages=open_ages_by_media_type.get(media_type, []))
+        open_count_for_type = media_engine.open_sample_size
+        breaching = media_engine.breaching(
+            [sla_days] if recommended_target_days is None else [sla_days, recommended_target_days]
         )
+        open_breaching_global_policy = breaching[0]
+        open_breaching_recommended = breaching[1] if recommended_target_days is not None else None
 
         media_type_sla_insights.append(
             {
@@ -356,68 +305,35 @@ def _compute_analytics(conn: sqlite3.Connection, sla_days: int) -> dict:
         )
 
     # --- Top requesters (top 5 by total requests ever as original requester) ---
-    top_requester_rows = conn.execute(
-        """
-        SELECT username, COUNT(*) as cnt
-        FROM requests
-        GROUP BY username
-        ORDER BY cnt DESC
-        LIMIT 5
-        """
-    ).fetchall()
-    top_requesters = [{"username": r["username"], "count": r["cnt"]} for r in top_requester_rows]
+    top_requesters = [
+        {"username": r["username"], "count": r["cnt"]} for r in analytics_rollups.top_requesters(conn, 5)
+    ]
 
     # --- Media type breakdown ---
-    media_type_rows = conn.execute(
-        """
-        SELECT media_type,
-               COUNT(*) as total,
-               SUM(CASE WHEN status = 'fulfilled' THEN 1 ELSE 0 END) as fulfilled
-        FROM requests
-        GROUP BY media_type
-        ORDER BY total DESC
-        """
-    ).fetchall()
     by_media_type = [
-        {"media_type": r["media_type"], "total": r["total"], "fulfilled": r["fulfilled"] or 0}
-        for r in media_type_rows
+        {"media_type": media_type, "total": totals["total"], "fulfilled": totals["fulfilled"]}
+        for media_type, totals in sorted(media_type_totals.items(), key=lambda item: (-item[1]["total"], item[0]))
+        if totals["total"]
     ]
 
     # --- Monthly request volume (last 12 months) ---
-    monthly_rows = conn.execute(
-        """
-        SELECT strftime('%Y-%m', created_at) as month,
-               COUNT(*) as submitted,
-               SUM(CASE WHEN status = 'fulfilled' THEN 1 ELSE 0 END) as fulfilled
-        FROM requests
-        WHERE created_at >= date('now', '-12 months')
-        GROUP BY month
-        ORDER BY month ASC
-        """
-    ).fetchall()
     monthly_volume = [
         {"month": r["month"], "submitted": r["submitted"], "fulfilled": r["fulfilled"] or 0}
-        for r in monthly_rows
+        for r in analytics_rollups.monthly_volume(conn)
     ]
 
     # --- Weekly throughput: fulfilled per week (last 8 weeks) ---
-    weekly_rows = conn.execute(
-        """
-        SELECT strftime('%Y-W%W', rh.created_at) as week,
-               COUNT(*) as fulfilled
-        FROM request_history rh
-        WHERE rh.new_status = 'fulfilled'
-          AND rh.created_at >= date('now', '-56 days')
-        GROUP BY week
-        ORDER BY week ASC
-        """
-    ).fetchall()
-    weekly_throughput = [{"week": r["week"], "fulfilled": r["fulfilled"]} for r in weekly_rows]
+    weekly_throughput = [
+        {"week": r["week"], "fulfilled": r["fulfilled"]} for r in analytics_rollups.weekly_throughput(conn)
+    ]
+
+    # --- Lead-time histogram (whole days; the last bucket is "or more") ---
+    lead_time_histogram = [
+        {"days": r["days"], "fulfilled": r["fulfilled"]} for r in analytics_rollups.lead_time_histogram(conn)
+    ]
 
     # --- Supporter engagement ---
-    total_supporters_ever = conn.execute(
-        "SELECT COUNT(*) FROM request_supporters"
-    ).fetchone()[0]
+    total_supporters_ever = analytics_rollups.total_supporters(conn)
 
     avg_supporters_per_request: float = 0.0
     if total_requests_all_time > 0:
@@ -463,6 +379,7 @@ def _compute_analytics(conn: sqlite3.Connection, sla_days: int) -> dict:
         "by_media_type": by_media_type,
         "monthly_volume": monthly_volume,
         "weekly_throughput": weekly_throughput,
+        "lead_time_histogram": lead_time_histogram,
         "weekly_sla_hit_rate": weekly_sla_hit_rate,
         "sla_trend_delta": sla_trend_delta,
         "sla_trend_direction": sla_trend_direction,
@@ -481,84 +398,32 @@ def _compute_sla_target_simulation(
     if not normalized_targets:
         normalized_targets = [7]
 
-    history_rows = conn.execute(
-        """
-        SELECT r.created_at AS req_created, rh.created_at AS fulfilled_at
-        FROM request_history rh
-        JOIN requests r ON r.id = rh.request_id
-        WHERE rh.new_status = 'fulfilled'
-        """
-    ).fetchall()
+    lead_distribution = get_lead_time_store(conn).overall
+    lead_times = lead_distribution.values
 
-    lead_times: list[float] = []
-    for row in history_rows:
-        req_dt = _parse_dt(row["req_created"])
-        ful_dt = _parse_dt(row["fulfilled_at"])
-        if req_dt and ful_dt and ful_dt >= req_dt:
-            lead_times.append((ful_dt - req_dt).total_seconds() / 86400.0)
-
-    now = datetime.now(timezone.utc)
-    open_rows = conn.execute(
-        "SELECT created_at FROM requests WHERE status IN ('pending', 'approved')"
-    ).fetchall()
-    open_ages: list[int] = []
-    for row in open_rows:
-        dt = _parse_dt(row["created_at"])
-        if dt:
-            open_ages.append(max((now - dt).days, 0))
+    open_ages = [row["age"] for row in _open_request_ages(conn)]
 
     def _risk_score(*, breached: int, due_soon: int, hit_rate: float | None) -> float:
         miss_rate = 50.0 if hit_rate is None else max(0.0, 100.0 - hit_rate)
         return round((breached * 100.0) + (due_soon * 35.0) + (miss_rate * 0.5), 1)
 
-    scenarios: list[dict] = []
-    for target in normalized_targets:
-        warning_days = min(max(target - 2, 0), max(target - 1, 0))
-        if lead_times:
-            within = sum(1 for value in lead_times if value <= target)
-            hit_rate = round(within / len(lead_times) * 100, 1)
-        else:
-            within = 0
-            hit_rate = None
-
-        breached = sum(1 for age in open_ages if age > target)
-        due_soon = sum(1 for age in open_ages if target - warning_days <= age <= target)
-        scenarios.append(
-            {
-                "target_days": target,
-                "warning_days": warning_days,
-                "historical_hit_rate": hit_rate,
-                "historical_within_count": within,
-                "historical_sample_size": len(lead_times),
-                "open_breaching": breached,
-                "open_due_soon": due_soon,
-                "operational_risk_score": _risk_score(breached=breached, due_soon=due_soon, hit_rate=hit_rate),
-            }
+    current_target = max(int(current_target_days), 1) if current_target_days else None
+    evaluated_targets = list(normalized_targets)
+    if current_target is not None and current_target not in normalized_targets:
+        evaluated_targets.append(current_target)
+
+    # Every target (plus the current one) is answered in one batched pass.
+    engine = SLAEngine.for_distribution(lead_distribution, open_ages)
+    evaluated = engine.evaluate(evaluated_targets)
+    for row in evaluated:
+        row["operational_risk_score"] = _risk_score(
+            breached=row["open_breaching"],
+            due_soon=row["open_due_soon"],
+            hit_rate=row["historical_hit_rate"],
         )
 
-    current_target = max(int(current_target_days), 1) if current_target_days else None
-    baseline_scenario = next((row for row in scenarios if row["target_days"] == current_target), None)
-
-    if baseline_scenario is None and current_target is not None:
-        warning_days = min(max(current_target - 2, 0), max(current_target - 1, 0))
-        if lead_times:
-            within = sum(1 for value in lead_times if value <= current_target)
-            hit_rate = round(within / len(lead_times) * 100, 1)
-        else:
-            within = 0
-            hit_rate = None
-        breached = sum(1 for age in open_ages if age > current_target)
-        due_soon = sum(1 for age in open_ages if current_target - warning_days <= age <= current_target)
-        baseline_scenario = {
-            "target_days": current_target,
-            "warning_days": warning_days,
-            "historical_hit_rate": hit_rate,
-            "historical_within_count": within,
-            "historical_sample_size": len(lead_times),
-            "open_breaching": breached,
-            "open_due_soon": due_soon,
-            "operational_risk_score": _risk_score(breached=breached, due_soon=due_soon, hit_rate=hit_rate),
-        }
+    scenarios = evaluated[: len(normalized_targets)]
+    baseline_scenario = next((row for row in evaluated if row["target_days"] == current_target), None)
 
     for row in scenarios:
         if baseline_scenario is None:
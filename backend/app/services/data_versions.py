@@ -0,0 +1,34 @@
+"""Per-database cache keys and the trigger-maintained ``data_versions`` rows.
+
+Several services keep process-wide caches keyed by database file and
+invalidated when a ``data_versions`` scope moves (see ``database.init_db``
+for the triggers): lead-time stores, the open-queue snapshot, list counts
+and admin analytics.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+
+def database_key(conn: sqlite3.Connection) -> str | None:
+    """Path of ``conn``'s main database, or None for in-memory databases."""
+    try:
+        for row in conn.execute("PRAGMA database_list").fetchall():
+            if row[1] == "main":
+                return row[2] or None
+    except sqlite3.Error:
+        return None
+    return None
+
+
+def read_data_version(conn: sqlite3.Connection, scope: str) -> int | None:
+    """Current trigger-maintained version for ``scope``, or None if untracked."""
+    try:
+        row = conn.execute(
+            "SELECT version FROM data_versions WHERE scope = ?",
+            (scope,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return int(row[0]) if row else None
@@ -0,0 +1,112 @@
+"""Change-driven auto-fulfillment.
+
+The old background check loaded every open request and searched Jellyfin
+for each one by title every five minutes, committing each fulfillment
+separately, so its cost grew with the backlog even when the library had not
+changed. Fulfillment now runs against the local library mirror
+(library_mirror_service), which is itself refreshed incrementally from
+Jellyfin's ``MinDateLastSaved`` feed:
+
+- Two watermarks are kept in ``fulfillment_state``: the newest
+  ``library_items.synced_at`` and the highest request id already examined.
+- A cycle joins open requests to library items by TMDB id in SQL, limited to
+  items synced, or requests created, after those watermarks.
+- All matches are fulfilled, and the watermarks advanced, in one transaction.
+
+A full mirror sync restamps every item, so the daily full sync doubles as a
+complete re-check (e.g. for requests reopened after their title was added).
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from app.services import library_mirror_service
+from app.services.request_service import auto_fulfill_requests
+
+logger = logging.getLogger(__name__)
+
+
+def get_fulfillment_state(conn: sqlite3.Connection) -> dict | None:
+    try:
+        row = conn.execute(
+            """
+            SELECT item_watermark, request_watermark, last_run_at,
+                   last_duration_ms, last_matched, last_fulfilled
+            FROM fulfillment_state
+            WHERE id = 1
+            """
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if not row:
+        return None
+    return {
+        "item_watermark": row[0],
+        "request_watermark": row[1],
+        "last_run_at": row[2],
+        "last_duration_ms": row[3],
+        "last_matched": row[4],
+        "last_fulfilled": row[5],
+    }
+
+
+def run_fulfillment_cycle(conn: sqlite3.Connection) -> dict:
+    """Fulfill open requests newly matched by the library mirror."""
+    started = time.perf_counter()
+    state = get_fulfillment_state(conn) or {}
+
+    # Capture the new watermarks before matching: anything committed after
+    # this point is simply re-examined next cycle.
+    item_watermark, request_watermark = conn.execute(
+        "SELECT (SELECT MAX(synced_at) FROM library_items), (SELECT MAX(id) FROM requests)"
+    ).fetchone()
+
+    matches = library_mirror_service.get_open_requests_in_library(
+        conn,
+        items_synced_after=state.get("item_watermark") or "",
+        requests_after_id=state.get("request_watermark") or 0,
+    )
+
+    fulfilled = auto_fulfill_requests(
+        conn,
+        [(match["id"], match["jellyfin_item_id"]) for match in matches],
+        commit=False,
+    )
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    conn.execute(
+        """
+        UPDATE fulfillment_state
+        SET item_watermark = COALESCE(?, item_watermark),
+            request_watermark = COALESCE(?, request_watermark),
+            last_run_at = ?,
+            last_duration_ms = ?,
+            last_matched = ?,
+            last_fulfilled = ?
+        WHERE id = 1
+        """,
+        (
+            item_watermark,
+            request_watermark,
+            datetime.now(timezone.utc).isoformat(),
+            duration_ms,
+            len(matches),
+            len(fulfilled),
+        ),
+    )
+    conn.commit()
+
+    for match in matches:
+        logger.info("Auto-fulfilled request #%d (%s) - found in library", match["id"], match["title"])
+
+    return {
+        "matched": len(matches),
+        "fulfilled": len(fulfilled),
+        "duration_ms": duration_ms,
+        "item_watermark": item_watermark,
+        "request_watermark": request_watermark,
+    }
@@ -0,0 +1,107 @@
+"""Shared, long-lived HTTP clients for the upstream APIs.
+
+Creating an ``httpx.AsyncClient`` per call meant a fresh TCP (and TLS)
+handshake for every TMDB, Jellyfin and Open Library request. Each upstream
+now has one pooled client with keep-alive, created on first use and closed
+from the app lifespan. Limits and timeouts come from settings. HTTP/2 is
+offered through ALPN when the ``h2`` package is installed, so upstreams
+that support it (TMDB, Open Library, a Jellyfin behind a TLS proxy)
+multiplex over one connection and the rest stay on HTTP/1.1 keep-alive.
+
+Connection reuse is measured with httpcore's ``trace`` request extension:
+every request is counted, and so is every new TCP connection, so
+``stats()`` can report how many requests rode an existing connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+
+import httpx
+
+from app.config import settings
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class SharedHTTPClient:
+    """One pooled ``httpx.AsyncClient`` per upstream, bound to the running loop."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.requests = 0
+        self.connections_opened = 0
+        self.clients_created = 0
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    @property
+    def http2(self) -> bool:
+        return settings.http2_enabled and HTTP2_AVAILABLE
+
+    def _build(self) -> httpx.AsyncClient:
+        self.clients_created += 1
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                settings.http_timeout_seconds,
+                connect=settings.http_connect_timeout_seconds,
+            ),
+            event_hooks={"request": [self._on_request]},
+        )
+
+    def get(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the loop that opened them; a new loop
+        # (tests, scripts using asyncio.run) gets its own client.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._build()
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed and self._loop is asyncio.get_running_loop():
+            await client.aclose()
+        self._loop = None
+
+    def stats(self) -> dict:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "http2": self.http2,
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reused_requests": reused,
+            "reuse_rate": round(reused / self.requests * 100, 1) if self.requests else None,
+            "clients_created": self.clients_created,
+        }
+
+
+tmdb_http = SharedHTTPClient("tmdb")
+jellyfin_http = SharedHTTPClient("jellyfin")
+openlibrary_http = SharedHTTPClient("openlibrary")
+
+SHARED_CLIENTS = (tmdb_http, jellyfin_http, openlibrary_http)
+
+
+async def close_http_clients() -> None:
+    for shared in SHARED_CLIENTS:
+        await shared.aclose()
+
+
+def http_client_stats() -> dict:
+    return {shared.name: shared.stats() for shared in SHARED_CLIENTS}
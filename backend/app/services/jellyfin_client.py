@@ -1,6 +1,5 @@
-import httpx
-
 from app.config import settings
+from app.services.http_clients import jellyfin_http
 
 
 class JellyfinClient:
@@ -23,26 +22,26 @@ class JellyfinClient:
         return header
 
     async def authenticate(self, username: str, password: str) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/Users/AuthenticateByName",
-                json={"Username": username, "Pw": password},
-                headers={
-                    "Authorization": self._auth_header(),
-                    "Content-Type": "application/json",
-                },
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = jellyfin_http.get()
+        resp = await client.post(
+            f"{self.base_url}/Users/AuthenticateByName",
+            json={"Username": username, "Pw": password},
+            headers={
+                "Authorization": self._auth_header(),
+                "Content-Type": "application/json",
+            },
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_user_views(self, user_id: str, token: str) -> list:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/Users/{user_id}/Views",
-                headers={"Authorization": self._auth_header(token)},
-            )
-            resp.raise_for_status()
-            return resp.json().get("Items", [])
+        client = jellyfin_http.get()
+        resp = await client.get(
+            f"{self.base_url}/Users/{user_id}/Views",
+            headers={"Authorization": self._auth_header(token)},
+        )
+        resp.raise_for_status()
+        return resp.json().get("Items", [])
 
     async def get_items(
         self,
@@ -55,6 +54,7 @@ class JellyfinClient:
         sort_by: str = "SortName",
         sort_order: str = "Ascending",
         parent_id: str | None = None,
+        any_provider_id_equals: list[str] | None = None,
     ) -> dict:
         params = {
             "IncludeItemTypes": include_item_types,
@@ -71,25 +71,61 @@ class JellyfinClient:
             params["SearchTerm"] = search_term
         if parent_id:
             params["ParentId"] = parent_id
+        if any_provider_id_equals:
+            # "Provider.Id" pairs, e.g. "Tmdb.603"; lets one call match a whole page.
+            params["AnyProviderIdEquals"] = ",".join(any_provider_id_equals)
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/Users/{user_id}/Items",
-                params=params,
-                headers={"Authorization": self._auth_header(token)},
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = jellyfin_http.get()
+        resp = await client.get(
+            f"{self.base_url}/Users/{user_id}/Items",
+            params=params,
+            headers={"Authorization": self._auth_header(token)},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def get_library_page(
+        self,
+        user_id: str,
+        token: str,
+        start_index: int = 0,
+        limit: int = 500,
+        min_date_last_saved: str | None = None,
+    ) -> dict:
+        """Movies and series with only the fields the library mirror stores."""
+        params = {
+            "IncludeItemTypes": "Movie,Series",
+            "Recursive": "true",
+            "StartIndex": start_index,
+            "Limit": limit,
+            "SortBy": "SortName",
+            "SortOrder": "Ascending",
+            "Fields": "ProviderIds,DateLastSaved",
+            "EnableImages": "false",
+            "EnableUserData": "false",
+        }
+        if min_date_last_saved:
+            params["MinDateLastSaved"] = min_date_last_saved
+
+        client = jellyfin_http.get()
+        resp = await client.get(
+            f"{self.base_url}/Users/{user_id}/Items",
+            params=params,
+            headers={"Authorization": self._auth_header(token)},
+            timeout=30.0,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_latest_items(self, user_id: str, token: str, limit: int = 20) -> list:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/Users/{user_id}/Items/Latest",
-                params={"Limit": limit, "Fields": "Overview,ProductionYear,ProviderIds"},
-                headers={"Authorization": self._auth_header(token)},
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = jellyfin_http.get()
+        resp = await client.get(
+            f"{self.base_url}/Users/{user_id}/Items/Latest",
+            params={"Limit": limit, "Fields": "Overview,ProductionYear,ProviderIds"},
+            headers={"Authorization": self._auth_header(token)},
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def search_item_by_title(
         self,
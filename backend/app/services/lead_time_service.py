@@ -0,0 +1,274 @@
+"""Fulfillment lead-time distributions.
+
+Every ETA estimate in request_service and every lead-time metric in
+analytics_service is derived from the same data: the time between a request
+being created and its 'fulfilled' history entry. This module loads that data
+once per database, keeps it as sorted arrays per media type (plus a
+household-wide one) with the commonly used percentiles precomputed, and
+serves lookups from memory.
+
+Freshness is tracked with the ``lead_times`` row in ``data_versions``, which
+triggers bump whenever fulfilled history rows or the requests they point at
+change. When the version moved only because new fulfilled history rows were
+appended, those rows are merged into a copy of the cached store that then
+replaces it, so concurrent readers never see a partial update; any other
+change (deletes, edited timestamps) drops the cache and it is rebuilt on the
+next read.
+
+Databases without the ``data_versions`` table (partial schemas in unit
+tests) and in-memory databases are never cached: each call loads fresh data.
+Stores loaded inside an open transaction are not cached or merged into
+either, since the rows they saw may never commit and another connection can
+later commit different rows under the same version.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    np = None
+
+from app.services.data_versions import database_key, read_data_version
+from app.services.request_columns import created_epoch_sql
+from app.services.timestamps import SECONDS_PER_DAY
+
+LEAD_TIME_VERSION_SCOPE = "lead_times"
+
+_FULFILLED_HISTORY_SQL = """
+    SELECT rh.id AS history_id, {req_epoch} AS req_epoch, {fulfilled_epoch} AS fulfilled_epoch,
+           r.media_type AS media_type
+    FROM request_history rh
+    JOIN requests r ON r.id = rh.request_id
+    WHERE rh.new_status = 'fulfilled'
+"""
+
+
+def _confidence(sample_size: int) -> str:
+    return "high" if sample_size >= 15 else ("medium" if sample_size >= 6 else "low")
+
+
+class LeadTimeDistribution:
+    """Sorted lead times (in days) with precomputed summary statistics.
+
+    Treated as immutable once built: :meth:`merged` returns a new instance, so
+    readers on other threads never see a half-updated distribution.
+    """
+
+    def __init__(self, values: list[float] | None = None, presorted: bool = False):
+        self.values: list[float] = list(values or []) if presorted else sorted(values or [])
+        self._refresh()
+
+    def merged(self, values: list[float]) -> "LeadTimeDistribution":
+        """A new distribution with ``values`` added."""
+        # Two sorted runs: timsort merges them in linear time.
+        return LeadTimeDistribution(sorted(self.values + sorted(values)), presorted=True)
+
+    def _refresh(self) -> None:
+        values = self.values
+        count = len(values)
+        self._array = None
+        self.sample_size = count
+        self.total_days = math.fsum(values)
+        if count:
+            middle = count // 2
+            self.median = values[middle] if count % 2 else (values[middle - 1] + values[middle]) / 2
+        else:
+            self.median = None
+        self.p50 = self.percentile(0.5)
+        self.p75 = self.percentile(0.75)
+        self.p80 = self.percentile(0.8)
+        if count >= 10:
+            # statistics.quantiles(values, n=10)[8] (exclusive method), read by index.
+            position = 9 * (count + 1)
+            index, remainder = divmod(position, 10)
+            self.p90 = (values[index - 1] * (10 - remainder) + values[index] * remainder) / 10
+        else:
+            self.p90 = values[-1] if values else None
+        self.confidence = _confidence(self.sample_size)
+
+    def percentile(self, pct: float) -> float | None:
+        values = self.values
+        if not values:
+            return None
+        if len(values) == 1:
+            return values[0]
+        rank = (len(values) - 1) * pct
+        lower = math.floor(rank)
+        upper = math.ceil(rank)
+        if lower == upper:
+            return values[lower]
+        weight = rank - lower
+        return values[lower] + (values[upper] - values[lower]) * weight
+
+    def as_array(self):
+        """The sorted values as a NumPy array, built once per change.
+
+        Requires NumPy; see ``sla_engine.NUMPY_AVAILABLE``.
+        """
+        if self._array is None:
+            self._array = np.asarray(self.values, dtype=np.float64)
+        return self._array
+
+    def count_within(self, days: float) -> int:
+        """Number of samples with a lead time of at most ``days``."""
+        return bisect.bisect_right(self.values, days)
+
+
+class LeadTimeStore:
+    """Household-wide and per-media-type lead-time distributions.
+
+    Published stores are never mutated; :meth:`with_rows` builds the next one.
+    """
+
+    def __init__(self, version: int | None = None):
+        self.version = version
+        self.max_history_id = 0
+        self.overall = LeadTimeDistribution()
+        self.by_media_type: dict[str, LeadTimeDistribution] = {}
+        # (fulfilled_at epoch, lead_days) ordered by fulfilled_at for recency windows.
+        self._fulfilled: list[tuple[int, float]] = []
+        self._fulfilled_keys: list[int] = []
+
+    def with_rows(self, rows: list[sqlite3.Row], version: int | None) -> "LeadTimeStore":
+        """A new store with the fulfilled history ``rows`` folded in."""
+        store = LeadTimeStore(version)
+        store.max_history_id = self.max_history_id
+        overall: list[float] = []
+        grouped: dict[str, list[float]] = {}
+        fulfilled: list[tuple[int, float]] = []
+        for row in rows:
+            store.max_history_id = max(store.max_history_id, int(row["history_id"]))
+            req_epoch = row["req_epoch"]
+            ful_epoch = row["fulfilled_epoch"]
+            if req_epoch is None or ful_epoch is None or ful_epoch < req_epoch:
+                continue
+            delta = (ful_epoch - req_epoch) / SECONDS_PER_DAY
+            overall.append(delta)
+            grouped.setdefault(row["media_type"] or "unknown", []).append(delta)
+            fulfilled.append((ful_epoch, delta))
+
+        store.overall = self.overall.merged(overall) if overall else self.overall
+        store.by_media_type = dict(self.by_media_type)
+        for media_type, values in grouped.items():
+            current = self.by_media_type.get(media_type)
+            store.by_media_type[media_type] = current.merged(values) if current else LeadTimeDistribution(values)
+        if fulfilled:
+            # Stable sort keeps equal fulfilled_at samples in history id order.
+            store._fulfilled = sorted(self._fulfilled + fulfilled, key=lambda sample: sample[0])
+            store._fulfilled_keys = [sample[0] for sample in store._fulfilled]
+        else:
+            store._fulfilled = self._fulfilled
+            store._fulfilled_keys = self._fulfilled_keys
+        return store
+
+    def median_days(self) -> float | None:
+        return self.overall.median
+
+    def household_window(self) -> dict | None:
+        distribution = self.overall
+        if not distribution.sample_size:
+            return None
+        return {
+            "sample_size": distribution.sample_size,
+            "p50_days": distribution.p50,
+            "p80_days": distribution.p80,
+            "confidence": distribution.confidence,
+        }
+
+    def fulfillment_window(self, media_type: str | None) -> dict | None:
+        """p50/p80 window for a media type, falling back to the household."""
+        distribution = self.by_media_type.get(media_type or "")
+        source = "media_type"
+        if distribution is None or not distribution.sample_size:
+            distribution = self.overall
+            source = "household"
+        if not distribution.sample_size:
+            return None
+        return {
+            "sample_size": distribution.sample_size,
+            "p50_days": distribution.p50,
+            "p80_days": distribution.p80,
+            "confidence": distribution.confidence,
+            "source": source,
+            "media_type": media_type,
+        }
+
+    def fulfilled_since(self, cutoff: datetime) -> list[tuple[datetime, float]]:
+        """(fulfilled_at, lead_days) samples fulfilled at or after ``cutoff``."""
+        start = bisect.bisect_left(self._fulfilled_keys, cutoff.timestamp())
+        return [
+            (datetime.fromtimestamp(fulfilled_epoch, timezone.utc), lead_days)
+            for fulfilled_epoch, lead_days in self._fulfilled[start:]
+        ]
+
+
+_stores: dict[str, LeadTimeStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _fetch_fulfilled_rows(conn: sqlite3.Connection, after_history_id: int = 0) -> list[sqlite3.Row]:
+    original_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    query = _FULFILLED_HISTORY_SQL.format(
+        req_epoch=created_epoch_sql("r"),
+        fulfilled_epoch=created_epoch_sql("rh"),
+    )
+    try:
+        return conn.execute(
+            query + " AND rh.id > ? ORDER BY rh.id ASC",
+            (after_history_id,),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.row_factory = original_factory
+
+
+def _load_store(conn: sqlite3.Connection, version: int | None) -> LeadTimeStore:
+    return LeadTimeStore().with_rows(_fetch_fulfilled_rows(conn), version)
+
+
+def get_lead_time_store(conn: sqlite3.Connection) -> LeadTimeStore:
+    """Return the lead-time store for ``conn``'s database, refreshing if stale."""
+    db_key = database_key(conn)
+    version = read_data_version(conn, LEAD_TIME_VERSION_SCOPE)
+    if db_key is None or version is None:
+        return _load_store(conn, version)
+
+    with _stores_lock:
+        store = _stores.get(db_key)
+        if store is not None and store.version == version:
+            return store
+        if conn.in_transaction:
+            return _load_store(conn, version)
+
+        if store is not None and store.version is not None and version > store.version:
+            new_rows = _fetch_fulfilled_rows(conn, store.max_history_id)
+            if len(new_rows) == version - store.version:
+                # Built aside and swapped in: threads still holding the old
+                # store keep reading a consistent snapshot.
+                store = store.with_rows(new_rows, version)
+                _stores[db_key] = store
+                return store
+
+        store = _load_store(conn, version)
+        _stores[db_key] = store
+        return store
+
+
+def invalidate(conn: sqlite3.Connection | None = None) -> None:
+    """Drop cached stores (for one database, or all of them)."""
+    with _stores_lock:
+        if conn is None:
+            _stores.clear()
+            return
+        db_key = database_key(conn)
+        if db_key is not None:
+            _stores.pop(db_key, None)
@@ -0,0 +1,211 @@
+"""Library presence for TMDB titles.
+
+Search result pages, detail pages and the request preflight all need to know
+whether a TMDB title is already on the Jellyfin server (and its item id).
+Resolving that one title at a time meant one Jellyfin round trip per search
+result. This module resolves a whole page at once:
+
+- While the local library mirror (library_mirror_service) is fresh, answers
+  for admins come from an indexed lookup there with no network round trip.
+  The mirror is built with an admin token, so other users only use it when
+  ``library_mirror_shared_visibility`` says the server has no per-user
+  library restrictions; otherwise their own token decides what they see.
+- Otherwise answers are memoized per user for a short TTL, so paging back and forth or
+  opening a detail page right after a search costs nothing.
+- Misses are looked up in one batched Jellyfin query filtered by TMDB provider
+  id (``AnyProviderIdEquals``).
+- Servers that ignore that filter are detected (the response contains items
+  that were not asked for) and remembered; for them, the remaining misses fall
+  back to per-title searches run concurrently with bounded parallelism.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Iterable
+
+from app.config import settings
+from app.db_executor import run_db
+from app.services import library_mirror_service
+from app.services.jellyfin_client import jellyfin_client
+
+logger = logging.getLogger(__name__)
+
+LIBRARY_MEDIA_TYPES = {"movie": "Movie", "tv": "Series"}
+_ITEM_TYPE_TO_MEDIA_TYPE = {item_type: media_type for media_type, item_type in LIBRARY_MEDIA_TYPES.items()}
+
+# Upper bound on memoized answers before expired entries are pruned.
+MAX_MEMO_ENTRIES = 5000
+
+LibraryKey = tuple[str, int]  # (media_type, tmdb_id)
+
+_memo: dict[tuple[str, str, int], tuple[float, str | None]] = {}
+_provider_filter_supported: bool | None = None
+
+
+def _memo_get(user_id: str, key: LibraryKey, now: float) -> tuple[bool, str | None]:
+    entry = _memo.get((user_id, *key))
+    if entry is None or entry[0] <= now:
+        return False, None
+    return True, entry[1]
+
+
+def _memo_put(user_id: str, key: LibraryKey, item_id: str | None, now: float) -> None:
+    if len(_memo) >= MAX_MEMO_ENTRIES:
+        for memo_key in [memo_key for memo_key, (expires, _) in _memo.items() if expires <= now]:
+            del _memo[memo_key]
+        if len(_memo) >= MAX_MEMO_ENTRIES:
+            _memo.clear()
+    _memo[(user_id, *key)] = (now + settings.library_match_ttl_seconds, item_id)
+
+
+def clear_memo() -> None:
+    global _provider_filter_supported
+    _memo.clear()
+    _provider_filter_supported = None
+
+
+def _item_key(item: dict) -> LibraryKey | None:
+    media_type = _ITEM_TYPE_TO_MEDIA_TYPE.get(item.get("Type", ""))
+    tmdb_raw = str((item.get("ProviderIds") or {}).get("Tmdb", "")).strip()
+    if media_type is None or not tmdb_raw.isdigit():
+        return None
+    return media_type, int(tmdb_raw)
+
+
+async def _lookup_by_provider_ids(user: dict, keys: list[LibraryKey]) -> dict[LibraryKey, str | None] | None:
+    """One batched lookup; None when the server ignored the provider filter."""
+    global _provider_filter_supported
+    requested = set(keys)
+    tmdb_ids = {tmdb_id for _, tmdb_id in keys}
+    data = await jellyfin_client.get_items(
+        user_id=user["user_id"],
+        token=user["jellyfin_token"],
+        include_item_types=",".join(sorted({LIBRARY_MEDIA_TYPES[media_type] for media_type, _ in keys})),
+        any_provider_id_equals=[f"Tmdb.{tmdb_id}" for tmdb_id in sorted(tmdb_ids)],
+        limit=len(tmdb_ids) * 2,
+    )
+
+    found: dict[LibraryKey, str | None] = {}
+    for item in data.get("Items", []):
+        key = _item_key(item)
+        if key is None or key[1] not in tmdb_ids:
+            _provider_filter_supported = False
+            return None
+        if key in requested and key not in found:
+            found[key] = item.get("Id")
+
+    _provider_filter_supported = True
+    return {key: found.get(key) for key in keys}
+
+
+async def _search_by_title(user: dict, title: str, key: LibraryKey) -> str | None:
+    media_type, tmdb_id = key
+    data = await jellyfin_client.get_items(
+        user_id=user["user_id"],
+        token=user["jellyfin_token"],
+        include_item_types=LIBRARY_MEDIA_TYPES[media_type],
+        search_term=title,
+        limit=10,
+    )
+    for item in data.get("Items", []):
+        provider_ids = item.get("ProviderIds", {})
+        if str(provider_ids.get("Tmdb", "")) == str(tmdb_id):
+            return item.get("Id")
+    return None
+
+
+def _lookup_in_mirror(conn: sqlite3.Connection, keys: list[LibraryKey]) -> dict[LibraryKey, str | None] | None:
+    if not library_mirror_service.mirror_ready(conn):
+        return None
+    return library_mirror_service.lookup_library_items(conn, keys)
+
+
+async def find_library_items(
+    user: dict,
+    titles: Iterable[tuple[str, int, str]],
+    conn: sqlite3.Connection | None = None,
+) -> dict[LibraryKey, str | None]:
+    """Resolve Jellyfin item ids for ``(title, tmdb_id, media_type)`` entries.
+
+    Returns a mapping keyed by ``(media_type, tmdb_id)``; the value is the
+    Jellyfin item id, or None when the title is not on the server (or is not a
+    movie/series). Pass ``conn`` to answer from the local library mirror when
+    it is ready and ``user`` may see the whole library.
+    """
+    titles = list(titles)
+    if conn is not None and (user.get("is_admin") or settings.library_mirror_shared_visibility):
+        keys = [
+            (media_type, int(tmdb_id))
+            for _, tmdb_id, media_type in titles
+            if media_type in LIBRARY_MEDIA_TYPES and tmdb_id is not None
+        ]
+        mirrored = await run_db(conn, _lookup_in_mirror, keys)
+        if mirrored is not None:
+            for _, tmdb_id, media_type in titles:
+                mirrored.setdefault((media_type, tmdb_id), None)
+            return mirrored
+
+    now = time.monotonic()
+    user_id = str(user.get("user_id", ""))
+    results: dict[LibraryKey, str | None] = {}
+    titles_by_key: dict[LibraryKey, str] = {}
+
+    for title, tmdb_id, media_type in titles:
+        if media_type not in LIBRARY_MEDIA_TYPES or tmdb_id is None:
+            results[(media_type, tmdb_id)] = None
+            continue
+        key = (media_type, int(tmdb_id))
+        hit, item_id = _memo_get(user_id, key, now)
+        if hit:
+            results[key] = item_id
+        else:
+            titles_by_key.setdefault(key, title or "")
+
+    misses = list(titles_by_key)
+    if not misses:
+        return results
+
+    resolved: dict[LibraryKey, str | None] | None = None
+    if _provider_filter_supported is not False:
+        try:
+            resolved = await _lookup_by_provider_ids(user, misses)
+        except Exception:
+            logger.debug("Batched Jellyfin provider lookup failed", exc_info=True)
+
+    if resolved is None:
+        semaphore = asyncio.Semaphore(max(settings.library_match_concurrency, 1))
+
+        async def bounded(key: LibraryKey) -> str | None:
+            async with semaphore:
+                return await _search_by_title(user, titles_by_key[key], key)
+
+        item_ids = await asyncio.gather(*(bounded(key) for key in misses), return_exceptions=True)
+        resolved = {}
+        for key, item_id in zip(misses, item_ids):
+            if isinstance(item_id, Exception):
+                # Not memoized: a failed lookup should be retried next time.
+                logger.debug("Failed to check Jellyfin library for %s", titles_by_key[key])
+                results[key] = None
+                continue
+            resolved[key] = item_id
+
+    now = time.monotonic()
+    for key, item_id in resolved.items():
+        _memo_put(user_id, key, item_id, now)
+        results[key] = item_id
+    return results
+
+
+async def find_library_item_id(
+    user: dict,
+    title: str,
+    tmdb_id: int,
+    media_type: str,
+    conn: sqlite3.Connection | None = None,
+) -> str | None:
+    results = await find_library_items(user, [(title, tmdb_id, media_type)], conn=conn)
+    return results.get((media_type, tmdb_id))
@@ -0,0 +1,307 @@
+"""Local mirror of the Jellyfin library.
+
+Library presence checks, auto-fulfillment and the request preflight used to
+search Jellyfin by title and scan ``ProviderIds`` for a TMDB match on every
+call. This module keeps a ``library_items`` table of every movie and series on
+the server keyed by TMDB/IMDb/TVDB id, so those checks become indexed SQLite
+lookups.
+
+Sync model:
+- Full sync at startup and then every FULL_SYNC_INTERVAL_HOURS: every page is
+  fetched and rows that were not seen are removed (Jellyfin has no delete
+  feed, so this is how removals are picked up).
+- Incremental sync in between: only items saved since the newest
+  ``DateLastSaved`` already mirrored (``MinDateLastSaved``) are fetched and
+  upserted.
+
+The mirror is read through the token of an admin who has logged in, since
+admins see the whole library. It therefore reflects what an admin can see:
+library_match_service only answers non-admin users from it when
+``library_mirror_shared_visibility`` is set (no per-user library or parental
+restrictions on the server); otherwise they keep per-user live lookups.
+
+``mirror_ready`` is False until a full sync has completed, and again when the
+last one is older than MAX_MIRROR_AGE_HOURS (e.g. the admin token expired and
+every sync fails), so callers fall back to live Jellyfin searches instead of
+serving a frozen mirror.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from app.db_executor import run_db
+from app.services.jellyfin_client import jellyfin_client
+
+logger = logging.getLogger(__name__)
+
+FULL_SYNC_INTERVAL_HOURS = 24
+MAX_MIRROR_AGE_HOURS = 2 * FULL_SYNC_INTERVAL_HOURS
+PAGE_SIZE = 500
+
+_ITEM_TYPE_TO_MEDIA_TYPE = {"Movie": "movie", "Series": "tv"}
+
+
+def _utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_iso(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _provider_id(provider_ids: dict, name: str) -> str | None:
+    for key, value in provider_ids.items():
+        if key.lower() == name and value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def _item_row(item: dict, synced_at: str) -> tuple | None:
+    media_type = _ITEM_TYPE_TO_MEDIA_TYPE.get(item.get("Type", ""))
+    if media_type is None or not item.get("Id"):
+        return None
+    provider_ids = item.get("ProviderIds") or {}
+    tmdb_raw = _provider_id(provider_ids, "tmdb")
+    return (
+        item["Id"],
+        media_type,
+        item.get("Name") or "",
+        int(tmdb_raw) if tmdb_raw and tmdb_raw.isdigit() else None,
+        _provider_id(provider_ids, "imdb"),
+        _provider_id(provider_ids, "tvdb"),
+        item.get("DateLastSaved"),
+        synced_at,
+    )
+
+
+def get_sync_state(conn: sqlite3.Connection) -> dict | None:
+    try:
+        row = conn.execute(
+            """
+            SELECT last_full_sync_at, last_incremental_sync_at, max_date_last_saved
+            FROM library_sync_state
+            WHERE id = 1
+            """
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if not row:
+        return None
+    return {
+        "last_full_sync_at": row[0],
+        "last_incremental_sync_at": row[1],
+        "max_date_last_saved": row[2],
+    }
+
+
+def mirror_ready(conn: sqlite3.Connection, now: datetime | None = None) -> bool:
+    """True while the last full sync is recent enough to trust the mirror."""
+    state = get_sync_state(conn)
+    last_full = _parse_iso(state["last_full_sync_at"]) if state else None
+    if last_full is None:
+        return False
+    return (now or datetime.now(timezone.utc)) - last_full < timedelta(hours=MAX_MIRROR_AGE_HOURS)
+
+
+def get_sync_credentials(conn: sqlite3.Connection) -> tuple[str, str] | None:
+    row = conn.execute(
+        """
+        SELECT user_id, jellyfin_token
+        FROM user_roles
+        WHERE role = 'admin' AND jellyfin_token IS NOT NULL AND jellyfin_token != ''
+        LIMIT 1
+        """
+    ).fetchone()
+    if not row:
+        return None
+    return row[0], row[1]
+
+
+def apply_library_items(
+    conn: sqlite3.Connection,
+    items: list[dict],
+    *,
+    full: bool,
+    synced_at: str,
+) -> dict:
+    """Upsert fetched items; a full sync also removes items no longer on the server."""
+    rows = [row for row in (_item_row(item, synced_at) for item in items) if row is not None]
+    conn.executemany(
+        """
+        INSERT INTO library_items (
+            jellyfin_item_id, media_type, name, tmdb_id, imdb_id, tvdb_id, date_last_saved, synced_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(jellyfin_item_id) DO UPDATE SET
+            media_type = excluded.media_type,
+            name = excluded.name,
+            tmdb_id = excluded.tmdb_id,
+            imdb_id = excluded.imdb_id,
+            tvdb_id = excluded.tvdb_id,
+            date_last_saved = excluded.date_last_saved,
+            synced_at = excluded.synced_at
+        """,
+        rows,
+    )
+
+    removed = 0
+    if full:
+        removed = conn.execute(
+            "DELETE FROM library_items WHERE synced_at != ?",
+            (synced_at,),
+        ).rowcount
+
+    saved_stamps = [row[6] for row in rows if row[6]]
+    newest_saved = max(saved_stamps) if saved_stamps else None
+    conn.execute(
+        f"""
+        UPDATE library_sync_state
+        SET {"last_full_sync_at" if full else "last_incremental_sync_at"} = ?,
+            max_date_last_saved = CASE
+                WHEN ? IS NULL THEN max_date_last_saved
+                WHEN max_date_last_saved IS NULL OR ? > max_date_last_saved THEN ?
+                ELSE max_date_last_saved
+            END
+        WHERE id = 1
+        """,
+        (synced_at, newest_saved, newest_saved, newest_saved),
+    )
+    conn.commit()
+    return {"upserted": len(rows), "removed": removed}
+
+
+async def fetch_library_items(
+    user_id: str,
+    token: str,
+    min_date_last_saved: str | None = None,
+) -> list[dict]:
+    items: list[dict] = []
+    start_index = 0
+    while True:
+        page = await jellyfin_client.get_library_page(
+            user_id,
+            token,
+            start_index=start_index,
+            limit=PAGE_SIZE,
+            min_date_last_saved=min_date_last_saved,
+        )
+        page_items = page.get("Items", [])
+        items.extend(page_items)
+        start_index += len(page_items)
+        total = page.get("TotalRecordCount")
+        if len(page_items) < PAGE_SIZE or (total is not None and start_index >= int(total)):
+            return items
+
+
+def _needs_full_sync(state: dict | None, now: datetime) -> bool:
+    last_full = _parse_iso(state["last_full_sync_at"]) if state else None
+    return last_full is None or now - last_full >= timedelta(hours=FULL_SYNC_INTERVAL_HOURS)
+
+
+async def sync_library(connect, *, full: bool | None = None) -> dict | None:
+    """Bring the mirror up to date; returns a summary, or None without admin credentials.
+
+    ``connect`` returns an async context manager yielding a connection (e.g.
+    ``get_pool().connection``). A connection is only held around the database
+    steps, not while the library is fetched from Jellyfin.
+    """
+    async with connect() as conn:
+        credentials = await run_db(conn, get_sync_credentials)
+        state = await run_db(conn, get_sync_state)
+    if credentials is None:
+        logger.debug("No admin Jellyfin token available for library mirror sync")
+        return None
+
+    if full is None:
+        full = _needs_full_sync(state, datetime.now(timezone.utc))
+
+    min_date_last_saved = None if full or not state else state["max_date_last_saved"]
+    user_id, token = credentials
+    items = await fetch_library_items(user_id, token, min_date_last_saved=min_date_last_saved)
+    async with connect() as conn:
+        result = await run_db(conn, apply_library_items, items, full=full, synced_at=_utcnow_iso())
+    return {"mode": "full" if full else "incremental", "fetched": len(items), **result}
+
+
+def lookup_library_items(
+    conn: sqlite3.Connection,
+    keys: list[tuple[str, int]],
+) -> dict[tuple[str, int], str | None]:
+    """Jellyfin item ids for ``(media_type, tmdb_id)`` keys, None where absent."""
+    results: dict[tuple[str, int], str | None] = {key: None for key in keys}
+    if not keys:
+        return results
+    rows = conn.execute(
+        """
+        SELECT li.media_type, li.tmdb_id, MIN(li.jellyfin_item_id) AS jellyfin_item_id
+        FROM json_each(?) AS wanted
+        JOIN library_items li
+          ON li.media_type = json_extract(wanted.value, '$[0]')
+         AND li.tmdb_id = json_extract(wanted.value, '$[1]')
+        GROUP BY li.media_type, li.tmdb_id
+        """,
+        (json.dumps([[media_type, tmdb_id] for media_type, tmdb_id in keys]),),
+    ).fetchall()
+    for row in rows:
+        results[(row[0], row[1])] = row[2]
+    return results
+
+
+def find_library_item(conn: sqlite3.Connection, media_type: str, tmdb_id: int) -> str | None:
+    try:
+        row = conn.execute(
+            """
+            SELECT jellyfin_item_id FROM library_items
+            WHERE media_type = ? AND tmdb_id = ?
+            ORDER BY jellyfin_item_id
+            LIMIT 1
+            """,
+            (media_type, tmdb_id),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def get_open_requests_in_library(
+    conn: sqlite3.Connection,
+    *,
+    items_synced_after: str | None = None,
+    requests_after_id: int | None = None,
+) -> list[dict]:
+    """Open requests whose TMDB id is present in the mirrored library.
+
+    With watermarks, only pairs where the library item was synced after
+    ``items_synced_after`` or the request is newer than ``requests_after_id``
+    are returned, so unchanged pairs are not re-examined every cycle.
+    """
+    watermark_filter = ""
+    params: tuple = ()
+    if items_synced_after is not None or requests_after_id is not None:
+        watermark_filter = "AND (li.synced_at > ? OR r.id > ?)"
+        params = (items_synced_after or "", requests_after_id or 0)
+    rows = conn.execute(
+        f"""
+        SELECT r.id, r.title, MIN(li.jellyfin_item_id) AS jellyfin_item_id
+        FROM requests r
+        JOIN library_items li ON li.media_type = r.media_type AND li.tmdb_id = r.tmdb_id
+        WHERE r.status IN ('pending', 'approved')
+          {watermark_filter}
+        GROUP BY r.id
+        ORDER BY r.id
+        """,
+        params,
+    ).fetchall()
+    return [{"id": row[0], "title": row[1], "jellyfin_item_id": row[2]} for row in rows]
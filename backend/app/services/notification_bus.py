@@ -0,0 +1,121 @@
+"""In-process pub/sub that wakes notification streams.
+
+Every open tab used to poll ``/api/notifications/summary`` every 30 seconds,
+so an idle household cost a query per tab per poll. The SSE stream in
+routers/notifications.py instead subscribes here and sleeps until one of its
+user's notifications changes.
+
+Messages are only doorbells ("user X has something new"): the stream reads
+the actual rows itself, so a ring for a transaction that later rolled back
+just costs one empty read. Writers call :func:`mark_pending` next to the
+INSERT/UPDATE, and :func:`flush` runs as a pool check-in hook (see
+``database.add_checkin_hook``) when the connection is handed back, i.e.
+after the request's work committed, so a woken stream never reads ahead of
+the commit. Users without a subscriber are skipped, so
+nothing is tracked when no stream is open.
+
+Subscribers live on the event loop while writers run on db_executor lanes;
+rings cross over with ``call_soon_threadsafe``. The bus is per process, so
+a stream only hears writes made by its own uvicorn worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from typing import Iterable
+
+from app.database import add_checkin_hook
+
+
+class Subscription:
+    """One open stream's doorbell; rings coalesce until the stream waits again."""
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._rung = False
+
+    def _set(self) -> None:
+        self._rung = True
+        self._event.set()
+
+    def ring(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._set)
+        except RuntimeError:
+            # Loop already closed; the stream is gone.
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds; True if rung, False on timeout."""
+        if not self._rung:
+            # A plain timer instead of wait_for: thousands of idle streams
+            # should not each spawn a task per heartbeat.
+            timer = self._loop.call_later(timeout, self._event.set)
+            try:
+                await self._event.wait()
+            finally:
+                timer.cancel()
+        rung, self._rung = self._rung, False
+        self._event.clear()
+        return rung
+
+
+_lock = threading.Lock()
+_subscribers: dict[str, set[Subscription]] = {}
+_pending: dict[int, set[str]] = {}
+
+
+def subscribe(user_id: str) -> Subscription:
+    subscription = Subscription(user_id, asyncio.get_running_loop())
+    with _lock:
+        _subscribers.setdefault(user_id, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription) -> None:
+    with _lock:
+        subscribers = _subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del _subscribers[subscription.user_id]
+
+
+def subscriber_count() -> int:
+    with _lock:
+        return sum(len(subscribers) for subscribers in _subscribers.values())
+
+
+def publish(user_ids: Iterable[str]) -> int:
+    """Ring every subscription of ``user_ids`` now; returns how many were rung."""
+    with _lock:
+        targets = [sub for user_id in set(user_ids) for sub in _subscribers.get(user_id, ())]
+    for subscription in targets:
+        subscription.ring()
+    return len(targets)
+
+
+def mark_pending(conn: sqlite3.Connection, user_ids: Iterable[str]) -> None:
+    """Ring ``user_ids`` once ``conn`` is flushed (pool check-in, after commit)."""
+    with _lock:
+        if not _subscribers:
+            return
+        watched = {user_id for user_id in user_ids if user_id in _subscribers}
+        if watched:
+            _pending.setdefault(id(conn), set()).update(watched)
+
+
+def flush(conn: sqlite3.Connection) -> int:
+    with _lock:
+        user_ids = _pending.pop(id(conn), None)
+    if not user_ids:
+        return 0
+    return publish(user_ids)
+
+
+add_checkin_hook(flush)
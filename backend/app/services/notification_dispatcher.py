@@ -0,0 +1,233 @@
+"""Request notification fan-out.
+
+A request event notifies everyone supporting the request. Fan-out used to be
+a Python loop issuing one INSERT per supporter inside the request's
+transaction, so a popular title turned every status change or comment into
+hundreds of round trips. Here each event is a single ``INSERT ... SELECT``
+from ``request_supporters``, whatever the supporter count.
+
+With ``notification_outbox_enabled`` the request path goes further and only
+enqueues the event (one row in ``notification_outbox``); the background
+worker in main.py drains the outbox with ``drain_outbox``, which expands all
+queued events into notifications with a pair of set-based statements.
+Recipients are resolved when the outbox is drained, normally a couple of
+seconds after the event. Databases without the outbox table (partial
+schemas) always fan out directly.
+
+Each fan-out statement returns its recipients so open notification streams
+(notification_bus) are woken once the transaction is handed back.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from app.config import settings
+from app.services import notification_bus
+
+
+def _fan_out(conn: sqlite3.Connection, sql: str, params: tuple) -> int:
+    """Run one ``INSERT ... RETURNING user_id`` fan-out; returns rows written."""
+    recipients = [row[0] for row in conn.execute(sql, params).fetchall()]
+    notification_bus.mark_pending(conn, recipients)
+    return len(recipients)
+
+
+def _enqueue(
+    conn: sqlite3.Connection,
+    events: list[tuple[int, str]],
+    event_type: str,
+    *,
+    actor_user_id: str | None,
+    actor_name: str | None,
+    exclude_user_id: str | None = None,
+    recipients: list[str] | None = None,
+) -> bool:
+    """Queue (request_id, message) events; False if there is no outbox to queue to."""
+    if not settings.notification_outbox_enabled:
+        return False
+    try:
+        conn.execute(
+            """
+            INSERT INTO notification_outbox
+                (request_id, type, message, actor_user_id, actor_name, exclude_user_id, recipients)
+            SELECT json_extract(e.value, '$[0]'), ?, json_extract(e.value, '$[1]'), ?, ?, ?, ?
+            FROM json_each(?) e
+            ORDER BY e.key
+            """,
+            (
+                event_type,
+                actor_user_id,
+                actor_name,
+                exclude_user_id,
+                None if recipients is None else json.dumps(recipients),
+                json.dumps(events),
+            ),
+        )
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def notify_supporters(
+    conn: sqlite3.Connection,
+    request_id: int,
+    event_type: str,
+    message: str,
+    actor_user_id: str | None = None,
+    actor_name: str | None = None,
+    exclude_user_id: str | None = None,
+) -> None:
+    """Notify every supporter of ``request_id`` (except ``exclude_user_id``)."""
+    if _enqueue(
+        conn,
+        [(request_id, message)],
+        event_type,
+        actor_user_id=actor_user_id,
+        actor_name=actor_name,
+        exclude_user_id=exclude_user_id,
+    ):
+        return
+    try:
+        _fan_out(
+            conn,
+            """
+            INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name)
+            SELECT DISTINCT request_id, user_id, ?, ?, ?, ?
+            FROM request_supporters
+            WHERE request_id = ? AND user_id IS NOT ?
+            RETURNING user_id
+            """,
+            (event_type, message, actor_user_id, actor_name, request_id, exclude_user_id),
+        )
+    except sqlite3.OperationalError:
+        # Notification table may be absent in isolated unit tests using partial schemas.
+        return
+
+
+def notify_supporters_batch(
+    conn: sqlite3.Connection,
+    messages: list[tuple[int, str]],
+    event_type: str,
+    actor_user_id: str | None = None,
+    actor_name: str | None = None,
+) -> None:
+    """Notify the supporters of many requests, one message per request, in one statement."""
+    if not messages:
+        return
+    if _enqueue(conn, messages, event_type, actor_user_id=actor_user_id, actor_name=actor_name):
+        return
+    try:
+        _fan_out(
+            conn,
+            """
+            INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name)
+            SELECT DISTINCT s.request_id, s.user_id, ?, json_extract(m.value, '$[1]'), ?, ?
+            FROM json_each(?) m
+            JOIN request_supporters s ON s.request_id = json_extract(m.value, '$[0]')
+            RETURNING user_id
+            """,
+            (event_type, actor_user_id, actor_name, json.dumps(messages)),
+        )
+    except sqlite3.OperationalError:
+        return
+
+
+def notify_users(
+    conn: sqlite3.Connection,
+    request_id: int,
+    user_ids: set[str] | list[str],
+    event_type: str,
+    message: str,
+    actor_user_id: str | None = None,
+    actor_name: str | None = None,
+) -> int:
+    """Notify an explicit set of users about ``request_id``; returns how many."""
+    recipients = sorted(set(user_ids))
+    if not recipients:
+        return 0
+    if _enqueue(
+        conn,
+        [(request_id, message)],
+        event_type,
+        actor_user_id=actor_user_id,
+        actor_name=actor_name,
+        recipients=recipients,
+    ):
+        return len(recipients)
+    try:
+        return _fan_out(
+            conn,
+            """
+            INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name)
+            SELECT ?, value, ?, ?, ?, ?
+            FROM json_each(?)
+            ORDER BY key
+            RETURNING user_id
+            """,
+            (request_id, event_type, message, actor_user_id, actor_name, json.dumps(recipients)),
+        )
+    except sqlite3.OperationalError:
+        return 0
+
+
+def drain_outbox(conn: sqlite3.Connection, batch_size: int | None = None) -> dict:
+    """Expand up to ``batch_size`` queued events into notifications and commit.
+
+    Events are taken in id order; each batch is two INSERT ... SELECTs (one
+    for supporter fan-out, one for explicit recipient lists) and a DELETE.
+    """
+    batch_size = max(int(batch_size or settings.notification_outbox_batch_size), 1)
+    try:
+        row = conn.execute(
+            "SELECT MAX(id), COUNT(*) FROM (SELECT id FROM notification_outbox ORDER BY id LIMIT ?)",
+            (batch_size,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return {"events": 0, "notifications": 0}
+    last_id, events = row[0], row[1]
+    if not events:
+        return {"events": 0, "notifications": 0}
+
+    notifications = _fan_out(
+        conn,
+        """
+        INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name, created_at)
+        SELECT o.request_id, t.user_id, o.type, o.message, o.actor_user_id, o.actor_name, o.created_at
+        FROM (
+            -- One row per event and supporter; identical events each notify.
+            SELECT DISTINCT o.id, s.user_id
+            FROM notification_outbox o
+            JOIN request_supporters s ON s.request_id = o.request_id
+            WHERE o.id <= ? AND o.recipients IS NULL AND s.user_id IS NOT o.exclude_user_id
+        ) t
+        JOIN notification_outbox o ON o.id = t.id
+        ORDER BY o.id, t.user_id
+        RETURNING user_id
+        """,
+        (last_id,),
+    )
+    notifications += _fan_out(
+        conn,
+        """
+        INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name, created_at)
+        SELECT o.request_id, r.value, o.type, o.message, o.actor_user_id, o.actor_name, o.created_at
+        FROM notification_outbox o, json_each(o.recipients) r
+        WHERE o.id <= ? AND o.recipients IS NOT NULL
+          AND EXISTS (SELECT 1 FROM requests WHERE id = o.request_id)
+        ORDER BY o.id, r.key
+        RETURNING user_id
+        """,
+        (last_id,),
+    )
+    conn.execute("DELETE FROM notification_outbox WHERE id <= ?", (last_id,))
+    conn.commit()
+    return {"events": events, "notifications": notifications}
+
+
+def pending_outbox_events(conn: sqlite3.Connection) -> int:
+    try:
+        return conn.execute("SELECT COUNT(*) FROM notification_outbox").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
@@ -1,4 +1,4 @@
-import httpx
+from app.services.http_clients import openlibrary_http
 
 
 OPENLIBRARY_BASE = "https://openlibrary.org"
@@ -22,37 +22,37 @@ def format_work_key(work_id: int) -> str:
 
 class OpenLibraryClient:
     async def search_books(self, query: str, page: int = 1, limit: int = 20) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{OPENLIBRARY_BASE}/search.json",
-                params={
-                    "q": query,
-                    "page": page,
-                    "limit": limit,
-                    "fields": "key,title,author_name,first_publish_year,cover_i,number_of_pages_median,subject,edition_count,ratings_average",
-                },
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = openlibrary_http.get()
+        resp = await client.get(
+            f"{OPENLIBRARY_BASE}/search.json",
+            params={
+                "q": query,
+                "page": page,
+                "limit": limit,
+                "fields": "key,title,author_name,first_publish_year,cover_i,number_of_pages_median,subject,edition_count,ratings_average",
+            },
+            timeout=15,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_work_details(self, work_key: str) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{OPENLIBRARY_BASE}/works/{work_key}.json",
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = openlibrary_http.get()
+        resp = await client.get(
+            f"{OPENLIBRARY_BASE}/works/{work_key}.json",
+            timeout=15,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_author(self, author_key: str) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{OPENLIBRARY_BASE}/authors/{author_key}.json",
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = openlibrary_http.get()
+        resp = await client.get(
+            f"{OPENLIBRARY_BASE}/authors/{author_key}.json",
+            timeout=15,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
 
 openlibrary_client = OpenLibraryClient()
@@ -0,0 +1,166 @@
+"""Keyset (cursor) pagination and cached row counts for list endpoints.
+
+``LIMIT ? OFFSET ?`` makes deep pages walk and discard every earlier row, and
+the separate ``COUNT(*)`` doubles the work of each page. List endpoints can
+opt in to cursor mode instead:
+
+- A sort is a list of keys ``(sql_expr, descending, value)``, always ending
+  in a unique column so the order is total. ``value`` is the row column (or
+  a callable on the row) holding that key's value.
+- The last row's key values are encoded into an opaque ``next_cursor``; the
+  next page is ``WHERE <keys after cursor> ORDER BY <keys> LIMIT n``, an
+  index seek whose cost does not depend on how deep the page is.
+- Totals are optional. When requested they come from :func:`cached_count`,
+  which reuses a count until the trigger-maintained data version of its
+  scope moves.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import math
+import sqlite3
+import threading
+from typing import Any, Callable, Mapping, Sequence, Union
+
+from app.services.data_versions import database_key, read_data_version
+
+KeyValue = Union[str, Callable[[Mapping], Any]]
+SortKey = tuple[str, bool, KeyValue]  # (sql_expr, descending, value)
+
+PAGINATION_MODES = ("offset", "cursor")
+
+# Upper bound on cached counts before the cache is reset.
+MAX_CACHED_COUNTS = 512
+
+_counts: dict[tuple, tuple[int, int]] = {}
+_counts_lock = threading.Lock()
+
+
+def order_by(keys: Sequence[SortKey]) -> str:
+    return ", ".join(f"{expr} {'DESC' if descending else 'ASC'}" for expr, descending, _ in keys)
+
+
+def _key_values(row: Mapping, keys: Sequence[SortKey]) -> list:
+    return [value(row) if callable(value) else row[value] for _, _, value in keys]
+
+
+def encode_cursor(sort: str, row: Mapping, keys: Sequence[SortKey]) -> str:
+    payload = json.dumps([sort, _key_values(row, keys)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, keys: Sequence[SortKey]) -> list:
+    """Key values stored in ``cursor``; ValueError if it is malformed or for another sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_predicate(keys: Sequence[SortKey], values: Sequence) -> tuple[str, list]:
+    """SQL (and params) selecting rows strictly after ``values`` in ``keys`` order.
+
+    Expanded as ``k1 >= ? AND (k1 > ? OR (k1 = ? AND (k2 > ? OR ...)))``
+    (comparisons flipped for descending keys) so mixed directions work and
+    the leading conjunct gives the planner a range to seek on.
+    """
+    clause = ""
+    params: list = []
+    for (expr, descending, _), value in reversed(list(zip(keys, values))):
+        op = "<" if descending else ">"
+        if clause:
+            clause = f"({expr} {op} ? OR ({expr} = ? AND {clause}))"
+            params = [value, value, *params]
+        else:
+            clause = f"{expr} {op} ?"
+            params = [value]
+    lead_expr, lead_descending, _ = keys[0]
+    lead_op = "<=" if lead_descending else ">="
+    return f"({lead_expr} {lead_op} ? AND {clause})", [values[0], *params]
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    base_query: str,
+    params: Sequence,
+    keys: Sequence[SortKey],
+    *,
+    sort: str,
+    limit: int,
+    cursor: str | None,
+    has_where: bool,
+) -> tuple[list, str | None]:
+    """One keyset page of ``base_query`` (a SELECT ... FROM ... [WHERE ...]).
+
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    query = base_query
+    query_params = list(params)
+    if cursor:
+        predicate, predicate_params = keyset_predicate(keys, decode_cursor(cursor, sort, keys))
+        query += f" {'AND' if has_where else 'WHERE'} {predicate}"
+        query_params += predicate_params
+    rows = conn.execute(
+        f"{query} ORDER BY {order_by(keys)} LIMIT ?",
+        query_params + [limit + 1],
+    ).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort, rows[-1], keys)
+
+
+def page_payload(
+    items: list,
+    *,
+    total: int | None,
+    page: int,
+    limit: int,
+    cursor_mode: bool,
+    next_cursor: str | None = None,
+) -> dict:
+    """Response body shared by the paginated list endpoints."""
+    return {
+        "items": items,
+        "total": total,
+        "page": None if cursor_mode else page,
+        "limit": limit,
+        "total_pages": (math.ceil(total / limit) if total > 0 else 1) if total is not None else None,
+        "next_cursor": next_cursor,
+    }
+
+
+def cached_count(conn: sqlite3.Connection, scope: str, sql: str, params: Sequence) -> int:
+    """``COUNT`` query result, reused until the ``scope`` data version changes.
+
+    Counts read inside an open transaction are not cached: they may include
+    writes that roll back while the version number is reused by a later commit.
+    """
+    db_key = database_key(conn)
+    version = read_data_version(conn, scope)
+    if db_key is None or version is None or conn.in_transaction:
+        return conn.execute(sql, list(params)).fetchone()[0]
+
+    cache_key = (db_key, scope, sql, tuple(params))
+    with _counts_lock:
+        cached = _counts.get(cache_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    total = conn.execute(sql, list(params)).fetchone()[0]
+    with _counts_lock:
+        if len(_counts) >= MAX_CACHED_COUNTS:
+            _counts.clear()
+        _counts[cache_key] = (version, total)
+    return total
+
+
+def clear_counts() -> None:
+    with _counts_lock:
+        _counts.clear()
@@ -0,0 +1,123 @@
+"""Materialized ranking of the open request queue.
+
+Queue positions ("#3 of 12, 2 approved ahead") depend on every open request,
+so computing them on each read means re-querying and re-ranking the whole
+open queue. This module keeps one ranked snapshot per database instead: the
+open request ids in queue order (supporters desc, oldest first), their
+statuses and running approved/supporter totals. A position lookup is a dict
+hit plus two list reads.
+
+Freshness is tracked with the ``open_queue`` row in ``data_versions``. Its
+triggers fire only on writes that can move the queue (a request entering or
+leaving the open statuses, switching between them, or changing supporter
+count or creation time), whichever code path makes them: request creation,
+status updates, bulk updates, duplicate merges, deletes and the lifecycle
+rules. Reads that see a different version rebuild the snapshot; all other
+writes (notes, titles, comments) leave it in place.
+
+Databases without the ``data_versions`` table (partial schemas in unit
+tests) and in-memory databases are never cached: each call builds a fresh
+snapshot. Neither are reads inside an open transaction: the version they see
+may include writes that roll back, and another connection could later commit
+a different queue under the same number.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+
+from app.services.data_versions import database_key, read_data_version
+from app.services.request_columns import supporter_count_sql
+
+OPEN_QUEUE_VERSION_SCOPE = "open_queue"
+
+
+class QueueSnapshot:
+    """Open requests in queue order with prefix totals for O(1) lookups."""
+
+    def __init__(self, rows: list, version: int | None = None):
+        self.version = version
+        self.request_ids: list[int] = []
+        self.statuses: list[str] = []
+        self.positions: dict[int, int] = {}
+        # approved_ahead[i] / supporters_ahead[i]: totals over rows before i.
+        self.approved_ahead: list[int] = []
+        self.supporters_ahead: list[int] = []
+
+        approved = 0
+        supporters = 0
+        for index, row in enumerate(rows):
+            request_id = int(row["id"])
+            self.request_ids.append(request_id)
+            self.statuses.append(row["status"])
+            self.positions[request_id] = index
+            self.approved_ahead.append(approved)
+            self.supporters_ahead.append(supporters)
+            if row["status"] == "approved":
+                approved += 1
+            supporters += int(row["supporter_count"] or 0)
+
+        self.size = len(self.request_ids)
+        self.pack_cutoff = max(5, math.ceil(self.size * 0.35))
+
+    def position(self, request_id: int) -> int | None:
+        """1-based queue position, or None if the request is not open."""
+        index = self.positions.get(request_id)
+        return None if index is None else index + 1
+
+    def ahead(self, request_id: int) -> tuple[int, int] | None:
+        """(approved, supporters) ahead of an open request."""
+        index = self.positions.get(request_id)
+        if index is None:
+            return None
+        return self.approved_ahead[index], self.supporters_ahead[index]
+
+
+def _load_snapshot(conn: sqlite3.Connection, version: int | None) -> QueueSnapshot:
+    original_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT r.id, r.status, {supporter_count_sql()} AS supporter_count
+            FROM requests r
+            WHERE r.status IN ('pending', 'approved')
+            ORDER BY supporter_count DESC, r.created_at ASC, r.id ASC
+            """
+        ).fetchall()
+    finally:
+        conn.row_factory = original_factory
+    return QueueSnapshot(rows, version)
+
+
+_snapshots: dict[str, QueueSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_queue_snapshot(conn: sqlite3.Connection) -> QueueSnapshot:
+    """Return the open-queue snapshot for ``conn``'s database, rebuilding if stale."""
+    db_key = database_key(conn)
+    version = read_data_version(conn, OPEN_QUEUE_VERSION_SCOPE)
+    if db_key is None or version is None or conn.in_transaction:
+        return _load_snapshot(conn, version)
+
+    with _snapshots_lock:
+        snapshot = _snapshots.get(db_key)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        snapshot = _load_snapshot(conn, version)
+        _snapshots[db_key] = snapshot
+        return snapshot
+
+
+def invalidate(conn: sqlite3.Connection | None = None) -> None:
+    """Drop cached snapshots (for one database, or all of them)."""
+    with _snapshots_lock:
+        if conn is None:
+            _snapshots.clear()
+            return
+        db_key = database_key(conn)
+        if db_key is not None:
+            _snapshots.pop(db_key, None)
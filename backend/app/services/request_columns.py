@@ -0,0 +1,18 @@
+"""SQL expressions for the trigger-maintained request columns.
+
+``database.add_maintained_request_columns`` adds these columns and the
+triggers that keep them current, in production and in the partial unit-test
+schemas alike, so queries read them directly.
+"""
+
+from __future__ import annotations
+
+
+def supporter_count_sql(alias: str = "r") -> str:
+    """SQL expression for ``alias``'s supporter count."""
+    return f"{alias}.supporter_count"
+
+
+def created_epoch_sql(alias: str = "r") -> str:
+    """SQL expression for ``alias``'s created_at as UTC epoch seconds."""
+    return f"{alias}.created_at_epoch"
@@ -1,28 +1,63 @@
+import json
 import sqlite3
 import math
-import statistics
+import time
 from datetime import datetime, timezone, timedelta
 
 from app.config import settings
+from app.lifecycle_flags import (
+    DENIED_AUTO_CLOSE_MARKER,
+    ESCALATION_MARKER,
+    LIFECYCLE_FLAG_DENIED_CLOSED,
+    LIFECYCLE_FLAG_ESCALATED,
+    LIFECYCLE_FLAG_PENDING_REMINDER,
+    PENDING_REMINDER_MARKER,
+)
+from app.services.lead_time_service import get_lead_time_store
+from app.services.pagination import cached_count, fetch_page, order_by, page_payload
+from app.services.queue_snapshot import QueueSnapshot, get_queue_snapshot
+from app.services.request_columns import created_epoch_sql, supporter_count_sql
+from app.services import notification_dispatcher, timestamps
 
 
 OPEN_REQUEST_STATUSES = ("pending", "approved")
 ESCALATION_MIN_SUPPORTERS = 3
 ESCALATION_MIN_AGE_DAYS = 10
-ESCALATION_MARKER = "[AUTO-ESCALATED]"
 DUPLICATE_MERGE_MARKER = "[DUPLICATE-MERGE]"
 DUPLICATE_SOURCE_MERGED_MARKER = "[DUPLICATE-MERGED]"
 
 PENDING_REMINDER_MIN_AGE_DAYS = 3
-PENDING_REMINDER_MARKER = "[AUTO-PENDING-REMINDER]"
 DENIED_AUTO_CLOSE_MIN_AGE_DAYS = 14
-DENIED_AUTO_CLOSE_MARKER = "[AUTO-CLOSED-DENIED]"
 SLA_ESCALATION_MARKER = "[SLA-ESCALATION]"
 BLOCKER_SET_MARKER = "[BLOCKER-SET]"
 BLOCKER_CLEAR_MARKER = "[BLOCKER-CLEARED]"
 
 DEFAULT_SLA_WARNING_DAYS = 2
 
+# Sort keys for list pagination: (sql_expr, descending, row value). Every
+# sort ends in r.id so keyset cursors see a total order.
+USER_REQUEST_SORT_KEYS = [("r.created_at", True, "created_at"), ("r.id", True, "id")]
+_QUEUE_STATUS_RANK = {"approved": 0, "pending": 1}
+_QUEUE_STATUS_RANK_SQL = "CASE WHEN r.status = 'approved' THEN 0 WHEN r.status = 'pending' THEN 1 ELSE 2 END"
+
+
+def _request_sort_keys(sort: str, supporter_count: str, *, status_rank: bool) -> list[tuple]:
+    by_supporters = [
+        (supporter_count, True, "supporter_count"),
+        ("r.created_at", False, "created_at"),
+        ("r.id", False, "id"),
+    ]
+    if sort == "newest":
+        return USER_REQUEST_SORT_KEYS
+    if sort == "oldest":
+        return [("r.created_at", False, "created_at"), ("r.id", False, "id")]
+    if sort == "supporters" or not status_rank:
+        return by_supporters
+    return [
+        (_QUEUE_STATUS_RANK_SQL, False, lambda row: _QUEUE_STATUS_RANK.get(row["status"], 2)),
+        *by_supporters,
+    ]
+
 
 def _parse_request_datetime(value: str | None) -> datetime:
     if isinstance(value, str):
@@ -38,212 +73,146 @@ def _parse_request_datetime(value: str | None) -> datetime:
 
 
 def _serialize_request(conn: sqlite3.Connection, row: sqlite3.Row, user_id: str | None = None) -> dict:
-    req = dict(row)
+    return _serialize_requests(conn, [row], user_id)[0]
 
-    supporters = conn.execute(
-        "SELECT username FROM request_supporters WHERE request_id = ? ORDER BY created_at ASC",
-        (req["id"],),
-    ).fetchall()
-    supporter_names = [r["username"] for r in supporters]
-    req["supporters"] = supporter_names
-    req["supporter_count"] = len(supporter_names)
-
-    created_dt = _parse_request_datetime(req.get("created_at"))
-    days_open = max((datetime.now(timezone.utc) - created_dt).days, 0)
-    req["days_open"] = days_open
-    req["priority_score"] = round((req["supporter_count"] * 3) + min(days_open, 30), 1)
-    req["queue_position"] = None
-    req["queue_size"] = None
-    req["queue_ahead_count"] = None
-    req["approved_ahead_count"] = None
-    req["pending_ahead_count"] = None
-    req["supporters_ahead_count"] = None
-    req["queue_band"] = None
-    req["queue_reason"] = None
-    req["blocker_label"] = None
-    req["next_step_label"] = None
-    req["next_step_by"] = None
-    req["blocker_reason"] = None
-    req["blocker_note"] = None
-    req["blocker_review_on"] = None
-    req["blocker_is_overdue"] = False
-
-    req["is_owner"] = user_id == req["user_id"] if user_id else False
-    req["user_supporting"] = False
-    if user_id:
-        req["user_supporting"] = bool(
-            conn.execute(
-                "SELECT 1 FROM request_supporters WHERE request_id = ? AND user_id = ?",
-                (req["id"], user_id),
-            ).fetchone()
-        )
-    # Generate watch URL if jellyfin_item_id is set
-    jellyfin_item_id = req.get("jellyfin_item_id")
-    if jellyfin_item_id:
-        base = settings.jellyfin_url.rstrip("/")
-        req["watch_url"] = f"{base}/web/index.html#!/details?id={jellyfin_item_id}"
-    else:
-        req["watch_url"] = None
 
-    blocker = _get_request_blocker(conn, req["id"])
-    if blocker:
-        req["blocker_reason"] = blocker["reason"]
-        req["blocker_note"] = blocker.get("note")
-        req["blocker_review_on"] = blocker["review_on"]
-        review_dt = _parse_request_datetime(blocker["review_on"])
-        req["blocker_is_overdue"] = review_dt.date() < datetime.now(timezone.utc).date()
-    return req
+def _serialize_requests(
+    conn: sqlite3.Connection,
+    rows: list[sqlite3.Row] | list[dict],
+    user_id: str | None = None,
+) -> list[dict]:
+    """Serialize a page of request rows with a fixed number of queries.
 
+    Supporters (and with them the viewer's ``user_supporting`` flag) and
+    blockers are fetched for the whole page at once, so the statement count
+    does not grow with the number of rows.
+    """
+    if not rows:
+        return []
 
-def _get_request_blocker(conn: sqlite3.Connection, request_id: int) -> dict | None:
-    try:
-        row = conn.execute(
-            "SELECT request_id, reason, note, review_on, updated_by, created_at, updated_at FROM request_blockers WHERE request_id = ?",
-            (request_id,),
-        ).fetchone()
-    except sqlite3.OperationalError:
-        return None
-    return dict(row) if row else None
+    request_ids = [row["id"] for row in rows]
+    supporters_by_request = _get_supporters_by_request(conn, request_ids)
+    blockers_by_request = _get_request_blockers(conn, request_ids)
 
+    now = datetime.now(timezone.utc)
+    now_epoch = int(now.timestamp())
+    today = now.date()
+    base = settings.jellyfin_url.rstrip("/")
 
-def _estimate_median_fulfillment_days(conn: sqlite3.Connection) -> float | None:
-    try:
-        rows = conn.execute(
-            """
-            SELECT r.created_at AS req_created, rh.created_at AS fulfilled_at
-            FROM request_history rh
-            JOIN requests r ON r.id = rh.request_id
-            WHERE rh.new_status = 'fulfilled'
-            """
-        ).fetchall()
-    except sqlite3.OperationalError:
-        return None
+    items: list[dict] = []
+    for row in rows:
+        req = dict(row)
 
-    lead_times: list[float] = []
+        supporters = supporters_by_request.get(req["id"], [])
+        supporter_names = [username for _, username in supporters]
+        req["supporters"] = supporter_names
+        req["supporter_count"] = len(supporter_names)
+
+        days_open = timestamps.days_between(timestamps.row_created_epoch(req), now_epoch)
+        req["days_open"] = days_open
+        req["priority_score"] = round((req["supporter_count"] * 3) + min(days_open, 30), 1)
+        req["queue_position"] = None
+        req["queue_size"] = None
+        req["queue_ahead_count"] = None
+        req["approved_ahead_count"] = None
+        req["pending_ahead_count"] = None
+        req["supporters_ahead_count"] = None
+        req["queue_band"] = None
+        req["queue_reason"] = None
+        req["blocker_label"] = None
+        req["next_step_label"] = None
+        req["next_step_by"] = None
+        req["blocker_reason"] = None
+        req["blocker_note"] = None
+        req["blocker_review_on"] = None
+        req["blocker_is_overdue"] = False
+
+        req["is_owner"] = user_id == req["user_id"] if user_id else False
+        req["user_supporting"] = False
+        if user_id:
+            req["user_supporting"] = any(supporter_id == user_id for supporter_id, _ in supporters)
+        # Generate watch URL if jellyfin_item_id is set
+        jellyfin_item_id = req.get("jellyfin_item_id")
+        if jellyfin_item_id:
+            req["watch_url"] = f"{base}/web/index.html#!/details?id={jellyfin_item_id}"
+        else:
+            req["watch_url"] = None
+
+        blocker = blockers_by_request.get(req["id"])
+        if blocker:
+            req["blocker_reason"] = blocker["reason"]
+            req["blocker_note"] = blocker.get("note")
+            req["blocker_review_on"] = blocker["review_on"]
+            review_dt = _parse_request_datetime(blocker["review_on"])
+            req["blocker_is_overdue"] = review_dt.date() < today
+        items.append(req)
+    return items
+
+
+def _get_supporters_by_request(
+    conn: sqlite3.Connection,
+    request_ids: list[int],
+) -> dict[int, list[tuple[str, str]]]:
+    # json_each keeps this a single bound parameter no matter how many ids
+    # the page holds, so large admin pages never hit SQLITE_MAX_VARIABLE_NUMBER.
+    rows = conn.execute(
+        """
+        SELECT request_id, user_id, username
+        FROM request_supporters
+        WHERE request_id IN (SELECT value FROM json_each(?))
+        ORDER BY request_id ASC, created_at ASC
+        """,
+        (json.dumps(request_ids),),
+    ).fetchall()
+    supporters: dict[int, list[tuple[str, str]]] = {}
     for row in rows:
-        req_dt = _parse_request_datetime(row["req_created"])
-        ful_dt = _parse_request_datetime(row["fulfilled_at"])
-        if ful_dt >= req_dt:
-            lead_times.append((ful_dt - req_dt).total_seconds() / 86400.0)
+        supporters.setdefault(row["request_id"], []).append((row["user_id"], row["username"]))
+    return supporters
 
-    if not lead_times:
-        return None
-    return statistics.median(lead_times)
 
+def _get_request_blocker(conn: sqlite3.Connection, request_id: int) -> dict | None:
+    return _get_request_blockers(conn, [request_id]).get(request_id)
 
-def _estimate_fulfillment_window(conn: sqlite3.Connection) -> dict | None:
+
+def _get_request_blockers(conn: sqlite3.Connection, request_ids: list[int]) -> dict[int, dict]:
     try:
         rows = conn.execute(
             """
-            SELECT r.created_at AS req_created, rh.created_at AS fulfilled_at
-            FROM request_history rh
-            JOIN requests r ON r.id = rh.request_id
-            WHERE rh.new_status = 'fulfilled'
-            """
+            SELECT request_id, reason, note, review_on, updated_by, created_at, updated_at
+            FROM request_blockers
+            WHERE request_id IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(request_ids),),
         ).fetchall()
     except sqlite3.OperationalError:
-        return None
-
-    lead_times: list[float] = []
-    for row in rows:
-        req_dt = _parse_request_datetime(row["req_created"])
-        ful_dt = _parse_request_datetime(row["fulfilled_at"])
-        if ful_dt >= req_dt:
-            lead_times.append((ful_dt - req_dt).total_seconds() / 86400.0)
+        return {}
+    return {row["request_id"]: dict(row) for row in rows}
 
-    if not lead_times:
-        return None
-
-    lead_times.sort()
 
-    def _percentile(values: list[float], pct: float) -> float:
-        if len(values) == 1:
-            return values[0]
-        position = (len(values) - 1) * pct
-        lower = math.floor(position)
-        upper = math.ceil(position)
-        if lower == upper:
-            return values[int(position)]
-        weight = position - lower
-        return values[lower] * (1 - weight) + values[upper] * weight
+def _estimate_median_fulfillment_days(conn: sqlite3.Connection) -> float | None:
+    return get_lead_time_store(conn).median_days()
 
-    p50 = _percentile(lead_times, 0.5)
-    p80 = _percentile(lead_times, 0.8)
-    sample_size = len(lead_times)
-    confidence = "high" if sample_size >= 15 else ("medium" if sample_size >= 6 else "low")
 
-    return {
-        "sample_size": sample_size,
-        "p50_days": p50,
-        "p80_days": p80,
-        "confidence": confidence,
-    }
+def _estimate_fulfillment_window(conn: sqlite3.Connection) -> dict | None:
+    return get_lead_time_store(conn).household_window()
 
 
 def _estimate_fulfillment_window_for_media_type(
     conn: sqlite3.Connection,
     media_type: str | None,
 ) -> dict | None:
-    try:
-        rows = conn.execute(
-            """
-            SELECT r.created_at AS req_created, rh.created_at AS fulfilled_at, r.media_type AS media_type
-            FROM request_history rh
-            JOIN requests r ON r.id = rh.request_id
-            WHERE rh.new_status = 'fulfilled'
-            """
-        ).fetchall()
-    except sqlite3.OperationalError:
-        return None
-
-    grouped: dict[str, list[float]] = {}
-    overall: list[float] = []
-    for row in rows:
-        req_dt = _parse_request_datetime(row["req_created"])
-        ful_dt = _parse_request_datetime(row["fulfilled_at"])
-        if ful_dt < req_dt:
-            continue
-        delta = (ful_dt - req_dt).total_seconds() / 86400.0
-        overall.append(delta)
-        grouped.setdefault(row["media_type"] or "unknown", []).append(delta)
-
-    values = grouped.get(media_type or "") or overall
-    if not values:
-        return None
-
-    values = sorted(values)
-
-    def _percentile(pct: float) -> float:
-        if len(values) == 1:
-            return values[0]
-        position = (len(values) - 1) * pct
-        lower = math.floor(position)
-        upper = math.ceil(position)
-        if lower == upper:
-            return values[int(position)]
-        weight = position - lower
-        return values[lower] * (1 - weight) + values[upper] * weight
-
-    sample_size = len(values)
-    confidence = "high" if sample_size >= 15 else ("medium" if sample_size >= 6 else "low")
-    return {
-        "sample_size": sample_size,
-        "p50_days": _percentile(0.5),
-        "p80_days": _percentile(0.8),
-        "confidence": confidence,
-        "source": "media_type" if grouped.get(media_type or "") else "household",
-        "media_type": media_type,
-    }
+    return get_lead_time_store(conn).fulfillment_window(media_type)
 
 
 def _iso_after_days(days: int) -> str:
     return (datetime.now(timezone.utc) + timedelta(days=max(days, 0))).date().isoformat()
 
 
-def _iso_from_created(created_at: str | None, total_days: int) -> str | None:
-    if not created_at:
+def _iso_from_created(req: dict, total_days: int) -> str | None:
+    created_epoch = timestamps.row_created_epoch(req) if req.get("created_at") else None
+    if created_epoch is None:
         return None
-    created_dt = _parse_request_datetime(created_at)
+    created_dt = datetime.fromtimestamp(created_epoch, timezone.utc)
     return (created_dt + timedelta(days=max(total_days, 0))).date().isoformat()
 
 
@@ -340,7 +309,7 @@ def _apply_request_promise_context(
 
     if status == "pending":
         warning_age = max(policy_target_days - policy_warning_days, 0)
-        req["follow_up_by"] = _iso_from_created(req.get("created_at"), policy_target_days)
+        req["follow_up_by"] = _iso_from_created(req, policy_target_days)
         req["follow_up_label"] = f"Check back if review is still pending after {policy_target_days}d."
         if days_open > policy_target_days:
             req["promise_status"] = "breached"
@@ -359,7 +328,7 @@ def _apply_request_promise_context(
     if fulfillment_window:
         start_days = max(int(round(fulfillment_window["p50_days"])), 0)
         end_days = max(int(math.ceil(fulfillment_window["p80_days"])), start_days)
-        req["follow_up_by"] = _iso_from_created(req.get("created_at"), end_days)
+        req["follow_up_by"] = _iso_from_created(req, end_days)
         req["follow_up_label"] = "Follow up if it slips past the typical delivery window."
         if days_open <= start_days:
             req["promise_status"] = "ahead"
@@ -379,55 +348,105 @@ def _apply_request_promise_context(
     req["promise_summary"] = "Approved and waiting for library availability."
 
 
-def _build_queue_transparency_context(open_rows: list[sqlite3.Row]) -> dict[int, dict]:
+def _build_queue_transparency_context(
+    open_rows: list[sqlite3.Row],
+    request_ids: set[int] | None = None,
+) -> dict[int, dict]:
+    """Queue position context for open requests, in one pass over the queue.
+
+    Approved/pending/supporter counts ahead of each row are carried as running
+    prefix totals. Pass ``request_ids`` to materialize entries for just those
+    requests; the totals still advance over every row so positions match.
+    """
     queue_size = len(open_rows)
     contexts: dict[int, dict] = {}
+    pack_cutoff = max(5, math.ceil(queue_size * 0.35))
 
+    approved_ahead = 0
+    supporters_ahead = 0
     for idx, row in enumerate(open_rows):
         request_id = row["id"]
-        queue_position = idx + 1
-        ahead_rows = open_rows[:idx]
-        ahead_count = len(ahead_rows)
-        approved_ahead = sum(1 for ahead in ahead_rows if ahead["status"] == "approved")
-        pending_ahead = ahead_count - approved_ahead
-        supporters_ahead = sum(int(ahead["supporter_count"] or 0) for ahead in ahead_rows)
-
-        if queue_position == 1:
-            queue_band = "up_next"
-            queue_reason = "You are first in line right now."
-        elif queue_position <= 3:
-            queue_band = "near_front"
-            queue_reason = f"Only {ahead_count} request{'s' if ahead_count != 1 else ''} ahead of you."
-        elif queue_position <= max(5, math.ceil(queue_size * 0.35)):
-            queue_band = "in_pack"
-            queue_reason = f"Mid-pack, with {ahead_count} requests ahead of you."
-        else:
-            queue_band = "long_tail"
-            queue_reason = f"Lower in the household queue, with {ahead_count} requests ahead of you."
-
-        blocker_bits: list[str] = []
-        if approved_ahead:
-            blocker_bits.append(f"{approved_ahead} already approved")
-        if pending_ahead:
-            blocker_bits.append(f"{pending_ahead} still waiting for review")
-        if supporters_ahead:
-            blocker_bits.append(f"{supporters_ahead} total supporters ahead")
-
-        contexts[request_id] = {
-            "queue_position": queue_position,
-            "queue_size": queue_size,
-            "queue_ahead_count": ahead_count,
-            "approved_ahead_count": approved_ahead,
-            "pending_ahead_count": pending_ahead,
-            "supporters_ahead_count": supporters_ahead,
-            "queue_band": queue_band,
-            "queue_reason": queue_reason,
-            "blocker_label": "Ahead of you: " + ", ".join(blocker_bits) if blocker_bits else None,
-        }
+        if request_ids is None or request_id in request_ids:
+            contexts[request_id] = _queue_context_entry(
+                queue_position=idx + 1,
+                queue_size=queue_size,
+                pack_cutoff=pack_cutoff,
+                approved_ahead=approved_ahead,
+                supporters_ahead=supporters_ahead,
+            )
+            if request_ids is not None and len(contexts) == len(request_ids):
+                break
+
+        if row["status"] == "approved":
+            approved_ahead += 1
+        supporters_ahead += int(row["supporter_count"] or 0)
 
     return contexts
 
 
+def _snapshot_queue_context(snapshot: QueueSnapshot, request_ids: set[int]) -> dict[int, dict]:
+    """Queue position context for ``request_ids`` read from the open-queue snapshot."""
+    contexts: dict[int, dict] = {}
+    for request_id in request_ids:
+        position = snapshot.position(request_id)
+        if position is None:
+            continue
+        approved_ahead, supporters_ahead = snapshot.ahead(request_id)
+        contexts[request_id] = _queue_context_entry(
+            queue_position=position,
+            queue_size=snapshot.size,
+            pack_cutoff=snapshot.pack_cutoff,
+            approved_ahead=approved_ahead,
+            supporters_ahead=supporters_ahead,
+        )
+    return contexts
+
+
+def _queue_context_entry(
+    *,
+    queue_position: int,
+    queue_size: int,
+    pack_cutoff: int,
+    approved_ahead: int,
+    supporters_ahead: int,
+) -> dict:
+    ahead_count = queue_position - 1
+    pending_ahead = ahead_count - approved_ahead
+
+    if queue_position == 1:
+        queue_band = "up_next"
+        queue_reason = "You are first in line right now."
+    elif queue_position <= 3:
+        queue_band = "near_front"
+        queue_reason = f"Only {ahead_count} request{'s' if ahead_count != 1 else ''} ahead of you."
+    elif queue_position <= pack_cutoff:
+        queue_band = "in_pack"
+        queue_reason = f"Mid-pack, with {ahead_count} requests ahead of you."
+    else:
+        queue_band = "long_tail"
+        queue_reason = f"Lower in the household queue, with {ahead_count} requests ahead of you."
+
+    blocker_bits: list[str] = []
+    if approved_ahead:
+        blocker_bits.append(f"{approved_ahead} already approved")
+    if pending_ahead:
+        blocker_bits.append(f"{pending_ahead} still waiting for review")
+    if supporters_ahead:
+        blocker_bits.append(f"{supporters_ahead} total supporters ahead")
+
+    return {
+        "queue_position": queue_position,
+        "queue_size": queue_size,
+        "queue_ahead_count": ahead_count,
+        "approved_ahead_count": approved_ahead,
+        "pending_ahead_count": pending_ahead,
+        "supporters_ahead_count": supporters_ahead,
+        "queue_band": queue_band,
+        "queue_reason": queue_reason,
+        "blocker_label": "Ahead of you: " + ", ".join(blocker_bits) if blocker_bits else None,
+    }
+
+
 def _build_admin_reply_pack_item(req: dict) -> dict | None:
     if req.get("status") not in OPEN_REQUEST_STATUSES:
         return None
@@ -498,37 +517,6 @@ def _build_admin_reply_pack_item(req: dict) -> dict | None:
     }
 
 
-def _create_request_notifications(
-    conn: sqlite3.Connection,
-    request_id: int,
-    event_type: str,
-    message: str,
-    actor_user_id: str | None = None,
-    actor_name: str | None = None,
-    exclude_user_id: str | None = None,
-) -> None:
-    try:
-        recipients = conn.execute(
-            "SELECT DISTINCT user_id FROM request_supporters WHERE request_id = ?",
-            (request_id,),
-        ).fetchall()
-
-        for recipient in recipients:
-            recipient_user_id = recipient["user_id"]
-            if exclude_user_id and recipient_user_id == exclude_user_id:
-                continue
-            conn.execute(
-                """
-                INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (request_id, recipient_user_id, event_type, message, actor_user_id, actor_name),
-            )
-    except sqlite3.OperationalError:
-        # Notification table may be absent in isolated unit tests using partial schemas.
-        return
-
-
 def _resolve_actor_name(conn: sqlite3.Connection, user_id: str) -> str:
     try:
         actor_name = conn.execute(
@@ -553,31 +541,6 @@ def _append_admin_note(existing_note: str | None, new_note: str) -> str:
     return f"{note}\n\n{new_note}"
 
 
-def _create_request_notifications_for_users(
-    conn: sqlite3.Connection,
-    request_id: int,
-    user_ids: set[str] | list[str],
-    event_type: str,
-    message: str,
-    actor_user_id: str | None = None,
-    actor_name: str | None = None,
-) -> int:
-    created = 0
-    try:
-        for user_id in sorted(set(user_ids)):
-            conn.execute(
-                """
-                INSERT INTO request_notifications (request_id, user_id, type, message, actor_user_id, actor_name)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (request_id, user_id, event_type, message, actor_user_id, actor_name),
-            )
-            created += 1
-    except sqlite3.OperationalError:
-        return 0
-    return created
-
-
 def _add_system_comment(
     conn: sqlite3.Connection,
     request_id: int,
@@ -673,8 +636,7 @@ def get_sla_worklist(
     ).fetchall()
 
     items: list[dict] = []
-    for row in rows:
-        serialized = _serialize_request(conn, row)
+    for serialized in _serialize_requests(conn, rows):
         days_open = serialized.get("days_open", 0)
         days_until_breach = target_days - days_open
         if days_until_breach < 0:
@@ -719,9 +681,10 @@ def get_sla_worklist(
 
 
 def get_admin_reply_pack(conn: sqlite3.Connection, limit: int = 8) -> dict:
+    supporter_count = supporter_count_sql()
     rows = conn.execute(
-        """
-        SELECT r.*, (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
+        f"""
+        SELECT r.*, {supporter_count} as supporter_count
         FROM requests r
         WHERE r.status IN ('pending', 'approved')
         ORDER BY supporter_count DESC, r.created_at ASC, r.id ASC
@@ -730,12 +693,11 @@ def get_admin_reply_pack(conn: sqlite3.Connection, limit: int = 8) -> dict:
 
     queue_context = _build_queue_transparency_context(rows)
     policy = get_sla_policy(conn)
-    median_fulfillment_days = _estimate_median_fulfillment_days(conn)
-    fulfillment_windows: dict[str, dict | None] = {}
+    lead_times = get_lead_time_store(conn)
+    median_fulfillment_days = lead_times.median_days()
     items: list[dict] = []
 
-    for row in rows:
-        req = _serialize_request(conn, row)
+    for req in _serialize_requests(conn, rows):
         req.update(queue_context.get(req["id"], {}))
         label, next_step_by = _build_next_step_hint(
             req=req,
@@ -746,9 +708,7 @@ def get_admin_reply_pack(conn: sqlite3.Connection, limit: int = 8) -> dict:
         req["next_step_by"] = next_step_by
 
         media_type = req.get("media_type") or "unknown"
-        if media_type not in fulfillment_windows:
-            fulfillment_windows[media_type] = _estimate_fulfillment_window_for_media_type(conn, media_type)
-        fulfillment_window = fulfillment_windows[media_type]
+        fulfillment_window = lead_times.fulfillment_window(media_type)
 
         if req.get("status") == "approved" and fulfillment_window:
             remaining_start = max(int(round(fulfillment_window["p50_days"])) - req["days_open"], 0)
@@ -794,9 +754,10 @@ def get_admin_reply_pack(conn: sqlite3.Connection, limit: int = 8) -> dict:
 
 
 def get_requester_digest_pack(conn: sqlite3.Connection, limit: int = 6) -> dict:
+    supporter_count = supporter_count_sql()
     rows = conn.execute(
-        """
-        SELECT r.*, (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
+        f"""
+        SELECT r.*, {supporter_count} as supporter_count
         FROM requests r
         WHERE r.status IN ('pending', 'approved')
         ORDER BY r.username COLLATE NOCASE ASC, r.created_at ASC, r.id ASC
@@ -811,12 +772,11 @@ def get_requester_digest_pack(conn: sqlite3.Connection, limit: int = 6) -> dict:
 
     queue_context = _build_queue_transparency_context(rows)
     policy = get_sla_policy(conn)
-    median_fulfillment_days = _estimate_median_fulfillment_days(conn)
-    fulfillment_windows: dict[str, dict | None] = {}
+    lead_times = get_lead_time_store(conn)
+    median_fulfillment_days = lead_times.median_days()
     grouped: dict[str, dict] = {}
 
-    for row in rows:
-        req = _serialize_request(conn, row)
+    for req in _serialize_requests(conn, rows):
         req.update(queue_context.get(req["id"], {}))
         label, next_step_by = _build_next_step_hint(
             req=req,
@@ -827,9 +787,7 @@ def get_requester_digest_pack(conn: sqlite3.Connection, limit: int = 6) -> dict:
         req["next_step_by"] = next_step_by
 
         media_type = req.get("media_type") or "unknown"
-        if media_type not in fulfillment_windows:
-            fulfillment_windows[media_type] = _estimate_fulfillment_window_for_media_type(conn, media_type)
-        fulfillment_window = fulfillment_windows[media_type]
+        fulfillment_window = lead_times.fulfillment_window(media_type)
 
         if req.get("status") == "approved" and fulfillment_window:
             remaining_start = max(int(round(fulfillment_window["p50_days"])) - req["days_open"], 0)
@@ -953,64 +911,73 @@ def bulk_escalate_sla_breaches(
     changed_by: str,
     note: str | None = None,
 ) -> dict:
+    """Escalate open requests from the SLA worklist in a fixed number of statements."""
     if not request_ids:
         return {"updated": [], "missing": []}
 
+    request_ids = list(dict.fromkeys(request_ids))
+    ids_json = json.dumps(request_ids)
+    found = {
+        row["id"]
+        for row in conn.execute(
+            "SELECT id FROM requests WHERE id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
+        ).fetchall()
+    }
+    missing = [request_id for request_id in request_ids if request_id not in found]
+
     now = datetime.utcnow().isoformat()
-    actor_name = _resolve_actor_name(conn, changed_by)
     policy = get_sla_policy(conn)
+    created_epoch = created_epoch_sql()
+    note_suffix = "" if not note else f" {note.strip()}"
+    escalated = _stage_request_notes(
+        conn,
+        where_sql="r.id IN (SELECT value FROM json_each(?)) AND r.status IN ('pending', 'approved')",
+        note_sql=(
+            f"'{SLA_ESCALATION_MARKER} Escalated after ' || "
+            f"COALESCE({timestamps.age_days_sql(created_epoch)}, 0) || "
+            "' days open (SLA target: ' || ? || 'd).' || ?"
+        ),
+        params=(int(datetime.now(timezone.utc).timestamp()), policy["target_days"], note_suffix, ids_json),
+    )
+    if not escalated:
+        return {"updated": [], "missing": missing}
 
-    updated: list[dict] = []
-    missing: list[int] = []
-    for request_id in request_ids:
-        row = conn.execute("SELECT * FROM requests WHERE id = ?", (request_id,)).fetchone()
-        if not row:
-            missing.append(request_id)
-            continue
-
-        req = dict(row)
-        if req["status"] not in OPEN_REQUEST_STATUSES:
-            continue
-
-        days_open = max((datetime.now(timezone.utc) - _parse_request_datetime(req.get("created_at"))).days, 0)
-        marker_note = (
-            f"{SLA_ESCALATION_MARKER} Escalated after {days_open} days open "
-            f"(SLA target: {policy['target_days']}d)."
-        )
-        full_note = marker_note if not note else f"{marker_note} {note.strip()}"
-        merged_note = _append_admin_note(req.get("admin_note"), full_note)
-
-        conn.execute(
-            "UPDATE requests SET admin_note = ?, updated_at = ? WHERE id = ?",
-            (merged_note, now, request_id),
-        )
+    escalated_ids = [row[0] for row in conn.execute("SELECT request_id FROM request_note_batch").fetchall()]
+    try:
         conn.execute(
             """
-            INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO request_comments (request_id, user_id, username, is_admin, body, created_at)
+            SELECT request_id, 'system', 'System', 1, note, ?
+            FROM request_note_batch
+            ORDER BY request_id
             """,
-            (request_id, req["status"], req["status"], changed_by, full_note),
+            (now,),
         )
-        _add_system_comment(conn, request_id, full_note, now)
-        _create_request_notifications(
-            conn,
-            request_id,
-            event_type="sla_escalated",
-            message=f"Request received SLA escalation attention from {actor_name}.",
-            actor_user_id=changed_by,
-            actor_name=actor_name,
-        )
-        updated.append(get_request_by_id(conn, request_id))
-
+    except sqlite3.OperationalError:
+        pass
+    _apply_staged_notes(conn, changed_by=changed_by, updated_at=now)
+    actor_name = _resolve_actor_name(conn, changed_by)
+    notification_dispatcher.notify_supporters_batch(
+        conn,
+        [(request_id, f"Request received SLA escalation attention from {actor_name}.") for request_id in escalated_ids],
+        event_type="sla_escalated",
+        actor_user_id=changed_by,
+        actor_name=actor_name,
+    )
     conn.commit()
+
+    escalated_set = set(escalated_ids)
+    updated = get_requests_by_ids(conn, [request_id for request_id in request_ids if request_id in escalated_set])
     return {"updated": updated, "missing": missing}
 
 
 def _get_active_duplicate_candidate_rows(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    supporter_count = supporter_count_sql()
     return conn.execute(
-        """
+        f"""
         SELECT r.*,
-               (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
+               {supporter_count} as supporter_count
         FROM requests r
         WHERE r.status IN ('pending', 'approved')
         ORDER BY CASE r.status WHEN 'approved' THEN 0 ELSE 1 END, r.created_at ASC, r.id ASC
@@ -1018,6 +985,12 @@ def _get_active_duplicate_candidate_rows(conn: sqlite3.Connection) -> list[sqlit
     ).fetchall()
 
 
+def _created_order(row) -> tuple[bool, int, int]:
+    """Oldest first by created_at_epoch then id; unparseable timestamps sort last."""
+    epoch = row["created_at_epoch"]
+    return (epoch is None, epoch or 0, row["id"])
+
+
 def _build_duplicate_groups(
     conn: sqlite3.Connection,
     rows: list[sqlite3.Row],
@@ -1064,25 +1037,22 @@ def _build_duplicate_groups(
     for item in items:
         grouped_items.setdefault(find(item["id"]), []).append(item)
 
-    duplicate_groups: list[dict] = []
-    for group_items in grouped_items.values():
-        if len(group_items) < 2:
-            continue
+    candidate_groups = [group_items for group_items in grouped_items.values() if len(group_items) >= 2]
+    serialized_by_id = {
+        req["id"]: req
+        for req in _serialize_requests(conn, [item for group_items in candidate_groups for item in group_items])
+    }
 
-        group_items.sort(
-            key=lambda item: (
-                0 if item["status"] == "approved" else 1,
-                _parse_request_datetime(item.get("created_at")),
-                item["id"],
-            )
-        )
+    duplicate_groups: list[dict] = []
+    for group_items in candidate_groups:
+        group_items.sort(key=lambda item: (0 if item["status"] == "approved" else 1, *_created_order(item)))
         title_counts: dict[str, int] = {}
         tmdb_counts: dict[int, int] = {}
         for item in group_items:
             title_counts[item["normalized_title"]] = title_counts.get(item["normalized_title"], 0) + 1
             tmdb_counts[item["tmdb_id"]] = tmdb_counts.get(item["tmdb_id"], 0) + 1
 
-        requests = [_serialize_request(conn, item) for item in group_items]
+        requests = [serialized_by_id[item["id"]] for item in group_items]
         duplicate_groups.append(
             {
                 "group_id": f"dup-{'-'.join(str(item['id']) for item in group_items)}",
@@ -1155,7 +1125,7 @@ def create_request(
             "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, ?)",
             (existing_open["id"], user_id, username),
         )
-        _create_request_notifications(
+        notification_dispatcher.notify_supporters(
             conn,
             existing_open["id"],
             event_type="new_supporter",
@@ -1183,15 +1153,40 @@ def create_request(
 
 
 def get_request_by_id(conn: sqlite3.Connection, request_id: int, user_id: str | None = None) -> dict | None:
-    row = conn.execute("SELECT * FROM requests WHERE id = ?", (request_id,)).fetchone()
-    if row:
-        req = _serialize_request(conn, row, user_id)
-        policy = get_sla_policy(conn)
-        window = _estimate_fulfillment_window_for_media_type(conn, req.get("media_type"))
+    requests = get_requests_by_ids(conn, [request_id], user_id)
+    return requests[0] if requests else None
+
+
+def get_requests_by_ids(
+    conn: sqlite3.Connection,
+    request_ids: list[int],
+    user_id: str | None = None,
+) -> list[dict]:
+    """Request detail payloads for ``request_ids`` (in that order), batched.
+
+    The statement count does not depend on how many ids are asked for;
+    unknown ids are left out.
+    """
+    if not request_ids:
+        return []
+    rows = conn.execute(
+        "SELECT * FROM requests WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(request_ids),),
+    ).fetchall()
+    if not rows:
+        return []
+    position = {request_id: index for index, request_id in enumerate(request_ids)}
+    rows = sorted(rows, key=lambda row: position[row["id"]])
+
+    policy = get_sla_policy(conn)
+    lead_times = get_lead_time_store(conn)
+    median_fulfillment_days = lead_times.median_days()
+    requests = _serialize_requests(conn, rows, user_id)
+    for req in requests:
         label, next_step_by = _build_next_step_hint(
             req=req,
             policy_target_days=policy["target_days"],
-            median_fulfillment_days=_estimate_median_fulfillment_days(conn),
+            median_fulfillment_days=median_fulfillment_days,
         )
         req["next_step_label"] = label
         req["next_step_by"] = next_step_by
@@ -1199,10 +1194,9 @@ def get_request_by_id(conn: sqlite3.Connection, request_id: int, user_id: str |
             req,
             policy_target_days=policy["target_days"],
             policy_warning_days=policy["warning_days"],
-            fulfillment_window=window,
+            fulfillment_window=lead_times.fulfillment_window(req.get("media_type")),
         )
-        return req
-    return None
+    return requests
 
 
 def _timeline_actor_name(conn: sqlite3.Connection, changed_by: str | None, fallback_username: str | None = None) -> str | None:
@@ -1347,6 +1341,10 @@ def get_user_requests(
     status: str | None = None,
     page: int = 1,
     limit: int = 20,
+    *,
+    cursor: str | None = None,
+    cursor_mode: bool = False,
+    include_total: bool = True,
 ) -> dict:
     where = "WHERE s.user_id = ?"
     params: list = [user_id]
@@ -1354,38 +1352,37 @@ def get_user_requests(
         where += " AND r.status = ?"
         params.append(status)
 
-    total = conn.execute(
-        f"SELECT COUNT(*) FROM requests r JOIN request_supporters s ON s.request_id = r.id {where}",
-        params,
-    ).fetchone()[0]
-    offset = (page - 1) * limit
-    rows = conn.execute(
-        f"""
-        SELECT r.*
-        FROM requests r
-        JOIN request_supporters s ON s.request_id = r.id
-        {where}
-        ORDER BY r.created_at DESC
-        LIMIT ? OFFSET ?
-        """,
-        params + [limit, offset],
-    ).fetchall()
+    from_sql = f"FROM requests r JOIN request_supporters s ON s.request_id = r.id {where}"
+    total = cached_count(conn, "requests", f"SELECT COUNT(*) {from_sql}", params) if include_total else None
+    cursor_mode = cursor_mode or cursor is not None
+    next_cursor = None
+    if cursor_mode:
+        rows, next_cursor = fetch_page(
+            conn, f"SELECT r.* {from_sql}", params, USER_REQUEST_SORT_KEYS,
+            sort="newest", limit=limit, cursor=cursor, has_where=True,
+        )
+    else:
+        offset = (page - 1) * limit
+        rows = conn.execute(
+            f"""
+            SELECT r.*
+            {from_sql}
+            ORDER BY {order_by(USER_REQUEST_SORT_KEYS)}
+            LIMIT ? OFFSET ?
+            """,
+            params + [limit, offset],
+        ).fetchall()
 
-    items = [_serialize_request(conn, r, user_id) for r in rows]
+    items = _serialize_requests(conn, rows, user_id)
 
-    open_rows = conn.execute(
-        """
-        SELECT r.*, (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
-        FROM requests r
-        WHERE r.status IN ('pending', 'approved')
-        ORDER BY supporter_count DESC, r.created_at ASC, r.id ASC
-        """
-    ).fetchall()
-    queue_context = _build_queue_transparency_context(open_rows)
+    queue_context = _snapshot_queue_context(
+        get_queue_snapshot(conn),
+        {req["id"] for req in items if req.get("status") in OPEN_REQUEST_STATUSES},
+    )
 
     policy = get_sla_policy(conn)
-    median_fulfillment_days = _estimate_median_fulfillment_days(conn)
-    fulfillment_windows: dict[str, dict | None] = {}
+    lead_times = get_lead_time_store(conn)
+    median_fulfillment_days = lead_times.median_days()
     for req in items:
         if req.get("status") in OPEN_REQUEST_STATUSES:
             req.update(queue_context.get(req["id"], {}))
@@ -1403,9 +1400,7 @@ def get_user_requests(
         req["eta_confidence"] = None
 
         media_type = req.get("media_type") or "unknown"
-        if media_type not in fulfillment_windows:
-            fulfillment_windows[media_type] = _estimate_fulfillment_window_for_media_type(conn, media_type)
-        fulfillment_window = fulfillment_windows[media_type]
+        fulfillment_window = lead_times.fulfillment_window(media_type)
 
         if req.get("status") == "approved" and fulfillment_window:
             remaining_start = max(int(round(fulfillment_window["p50_days"])) - req["days_open"], 0)
@@ -1428,13 +1423,9 @@ def get_user_requests(
             fulfillment_window=fulfillment_window,
         )
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": math.ceil(total / limit) if total > 0 else 1,
-    }
+    return page_payload(
+        items, total=total, page=page, limit=limit, cursor_mode=cursor_mode, next_cursor=next_cursor
+    )
 
 
 def get_household_queue(
@@ -1447,6 +1438,9 @@ def get_household_queue(
     page: int = 1,
     limit: int = 20,
     sort: str = "priority",
+    cursor: str | None = None,
+    cursor_mode: bool = False,
+    include_total: bool = True,
 ) -> dict:
     where_parts: list[str] = []
     params: list = []
@@ -1469,47 +1463,49 @@ def get_household_queue(
         params.append(f"%{search.strip().lower()}%")
 
     where = ("WHERE " + " AND ".join(where_parts)) if where_parts else ""
-    sort_sql = {
-        "newest": "r.created_at DESC",
-        "oldest": "r.created_at ASC",
-        "supporters": "supporter_count DESC, r.created_at ASC",
-        "priority": "CASE WHEN r.status = 'approved' THEN 0 WHEN r.status = 'pending' THEN 1 ELSE 2 END, supporter_count DESC, r.created_at ASC",
-    }.get(sort, "CASE WHEN r.status = 'approved' THEN 0 WHEN r.status = 'pending' THEN 1 ELSE 2 END, supporter_count DESC, r.created_at ASC")
-
+    supporter_count = supporter_count_sql()
+    sort = sort if sort in {"newest", "oldest", "supporters"} else "priority"
+    keys = _request_sort_keys(sort, supporter_count, status_rank=True)
     base_query = f"""
         SELECT r.*,
-               (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) AS supporter_count
+               {supporter_count} AS supporter_count
         FROM requests r
         {where}
     """
 
-    total = conn.execute(f"SELECT COUNT(*) FROM ({base_query}) queued", params).fetchone()[0]
-    offset = (page - 1) * limit
-    rows = conn.execute(
-        f"""
-        {base_query}
-        ORDER BY {sort_sql}
-        LIMIT ? OFFSET ?
-        """,
-        params + [limit, offset],
-    ).fetchall()
+    total = (
+        cached_count(conn, "requests", f"SELECT COUNT(*) FROM requests r {where}", params)
+        if include_total
+        else None
+    )
+    cursor_mode = cursor_mode or cursor is not None
+    next_cursor = None
+    if cursor_mode:
+        rows, next_cursor = fetch_page(
+            conn, base_query, params, keys, sort=sort, limit=limit, cursor=cursor, has_where=bool(where)
+        )
+    else:
+        offset = (page - 1) * limit
+        rows = conn.execute(
+            f"""
+            {base_query}
+            ORDER BY {order_by(keys)}
+            LIMIT ? OFFSET ?
+            """,
+            params + [limit, offset],
+        ).fetchall()
 
-    open_rows = conn.execute(
-        """
-        SELECT r.*, (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
-        FROM requests r
-        WHERE r.status IN ('pending', 'approved')
-        ORDER BY supporter_count DESC, r.created_at ASC, r.id ASC
-        """
-    ).fetchall()
-    queue_context = _build_queue_transparency_context(open_rows)
+    queue = get_queue_snapshot(conn)
+    queue_context = _snapshot_queue_context(
+        queue,
+        {row["id"] for row in rows if row["status"] in OPEN_REQUEST_STATUSES},
+    )
     policy = get_sla_policy(conn)
-    median_fulfillment_days = _estimate_median_fulfillment_days(conn)
-    fulfillment_windows: dict[str, dict | None] = {}
+    lead_times = get_lead_time_store(conn)
+    median_fulfillment_days = lead_times.median_days()
 
     items: list[dict] = []
-    for row in rows:
-        req = _serialize_request(conn, row, user_id)
+    for req in _serialize_requests(conn, rows, user_id):
         if req.get("status") in OPEN_REQUEST_STATUSES:
             req.update(queue_context.get(req["id"], {}))
 
@@ -1522,13 +1518,11 @@ def get_household_queue(
         req["next_step_by"] = next_step_by
 
         media_key = req.get("media_type") or "unknown"
-        if media_key not in fulfillment_windows:
-            fulfillment_windows[media_key] = _estimate_fulfillment_window_for_media_type(conn, media_key)
         _apply_request_promise_context(
             req,
             policy_target_days=policy["target_days"],
             policy_warning_days=policy["warning_days"],
-            fulfillment_window=fulfillment_windows[media_key],
+            fulfillment_window=lead_times.fulfillment_window(media_key),
         )
         items.append(req)
 
@@ -1539,7 +1533,7 @@ def get_household_queue(
             COALESCE(SUM(CASE WHEN r.status = 'pending' THEN 1 ELSE 0 END), 0) AS pending,
             COALESCE(SUM(CASE WHEN r.status = 'approved' THEN 1 ELSE 0 END), 0) AS approved,
             COALESCE(SUM(CASE WHEN r.status IN ('pending', 'approved') THEN 1 ELSE 0 END), 0) AS open_total,
-            COALESCE(SUM((SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id)), 0) AS total_supporters
+            COALESCE(SUM({supporter_count}), 0) AS total_supporters
         FROM requests r
         {where}
         """,
@@ -1547,11 +1541,10 @@ def get_household_queue(
     ).fetchone()
 
     return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": math.ceil(total / limit) if total > 0 else 1,
+        **page_payload(
+            items, total=total, page=page, limit=limit, cursor_mode=cursor_mode, next_cursor=next_cursor
+        ),
+        "queue_version": queue.version,
         "summary": dict(summary_row) if summary_row else {
             "total": 0,
             "pending": 0,
@@ -1571,6 +1564,10 @@ def get_all_requests(
     limit: int = 20,
     sort: str = "priority",
     include_auto_closed_denied: bool = False,
+    *,
+    cursor: str | None = None,
+    cursor_mode: bool = False,
+    include_total: bool = True,
 ) -> dict:
     where_parts = []
     params: list = []
@@ -1588,43 +1585,56 @@ def get_all_requests(
         params.append(f"%{DENIED_AUTO_CLOSE_MARKER}%")
 
     where = ("WHERE " + " AND ".join(where_parts)) if where_parts else ""
-    total = conn.execute(f"SELECT COUNT(*) FROM requests r {where}", params).fetchone()[0]
-    offset = (page - 1) * limit
-    sort_sql = {
-        "newest": "r.created_at DESC",
-        "oldest": "r.created_at ASC",
-        "supporters": "supporter_count DESC, r.created_at ASC",
-        "priority": "supporter_count DESC, r.created_at ASC",
-    }.get(sort, "supporter_count DESC, r.created_at ASC")
-
-    rows = conn.execute(
-        f"""
+    total = (
+        cached_count(conn, "requests", f"SELECT COUNT(*) FROM requests r {where}", params)
+        if include_total
+        else None
+    )
+    supporter_count = supporter_count_sql()
+    sort = sort if sort in {"newest", "oldest", "supporters"} else "priority"
+    keys = _request_sort_keys(sort, supporter_count, status_rank=False)
+    base_query = f"""
         SELECT r.*,
-               (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
+               {supporter_count} as supporter_count
         FROM requests r
         {where}
-        ORDER BY {sort_sql}
-        LIMIT ? OFFSET ?
-        """,
-        params + [limit, offset],
-    ).fetchall()
+    """
 
-    return {
-        "items": [_serialize_request(conn, r, user_id) for r in rows],
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": math.ceil(total / limit) if total > 0 else 1,
-    }
+    cursor_mode = cursor_mode or cursor is not None
+    next_cursor = None
+    if cursor_mode:
+        rows, next_cursor = fetch_page(
+            conn, base_query, params, keys, sort=sort, limit=limit, cursor=cursor, has_where=bool(where)
+        )
+    else:
+        offset = (page - 1) * limit
+        rows = conn.execute(
+            f"""
+            {base_query}
+            ORDER BY {order_by(keys)}
+            LIMIT ? OFFSET ?
+            """,
+            params + [limit, offset],
+        ).fetchall()
+
+    return page_payload(
+        _serialize_requests(conn, rows, user_id),
+        total=total,
+        page=page,
+        limit=limit,
+        cursor_mode=cursor_mode,
+        next_cursor=next_cursor,
+    )
 
 
 def get_request_review_loop(conn: sqlite3.Connection, limit: int = 8) -> dict:
     try:
+        supporter_count = supporter_count_sql()
         rows = conn.execute(
-            """
+            f"""
             SELECT rb.request_id, rb.reason, rb.note, rb.review_on, rb.updated_at,
                    r.status, r.title, r.media_type, r.username, r.created_at,
-                   (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) AS supporter_count
+                   {supporter_count} AS supporter_count
             FROM request_blockers rb
             JOIN requests r ON r.id = rb.request_id
             WHERE r.status IN ('pending', 'approved')
@@ -1636,11 +1646,17 @@ def get_request_review_loop(conn: sqlite3.Connection, limit: int = 8) -> dict:
     except sqlite3.OperationalError:
         rows = []
 
+    request_rows = conn.execute(
+        "SELECT * FROM requests WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps([row["request_id"] for row in rows]),),
+    ).fetchall()
+    requests_by_id = {req["id"]: req for req in _serialize_requests(conn, request_rows)}
+
     today = datetime.now(timezone.utc).date()
     items: list[dict] = []
     summary = {"overdue": 0, "today": 0, "upcoming": 0, "total": 0}
     for row in rows:
-        req = get_request_by_id(conn, row["request_id"])
+        req = requests_by_id.get(row["request_id"])
         if not req:
             continue
         review_date = _parse_request_datetime(row["review_on"]).date()
@@ -1712,7 +1728,7 @@ def upsert_request_blocker(
         (request_id, row["status"], row["status"], changed_by, history_note),
     )
     display_actor_name = _resolve_actor_name(conn, changed_by)
-    _create_request_notifications(
+    notification_dispatcher.notify_supporters(
         conn,
         request_id,
         event_type="status_note",
@@ -1738,7 +1754,7 @@ def clear_request_blocker(conn: sqlite3.Connection, request_id: int, *, changed_
         (request_id, row["status"], row["status"], changed_by, f"{BLOCKER_CLEAR_MARKER} {blocker['reason']}"),
     )
     display_actor_name = _resolve_actor_name(conn, changed_by)
-    _create_request_notifications(
+    notification_dispatcher.notify_supporters(
         conn,
         request_id,
         event_type="status_note",
@@ -1796,7 +1812,7 @@ def update_request_status(
         _delete_request_blocker_if_supported(conn, request_id)
     if old_status != new_status:
         display_actor_name = _resolve_actor_name(conn, changed_by)
-        _create_request_notifications(
+        notification_dispatcher.notify_supporters(
             conn,
             request_id,
             event_type="status_changed",
@@ -1815,45 +1831,70 @@ def bulk_update_request_status(
     changed_by: str,
     admin_note: str | None = None,
 ) -> dict:
-    """Bulk update request statuses and write request_history entries for each change."""
+    """Bulk update request statuses and write request_history entries for each change.
+
+    Runs in a fixed number of statements however many ids are given: the
+    history rows, status update, blocker cleanup and notification fan-out
+    are each one set-based statement over the id list.
+    """
     if not request_ids:
         return {"updated": [], "missing": []}
 
-    updated: list[dict] = []
-    missing: list[int] = []
-    now = datetime.utcnow().isoformat()
-
-    for request_id in request_ids:
-        row = conn.execute("SELECT * FROM requests WHERE id = ?", (request_id,)).fetchone()
-        if not row:
-            missing.append(request_id)
-            continue
+    request_ids = list(dict.fromkeys(request_ids))
+    ids_json = json.dumps(request_ids)
+    old_statuses = {
+        row["id"]: row["status"]
+        for row in conn.execute(
+            "SELECT id, status FROM requests WHERE id IN (SELECT value FROM json_each(?))",
+            (ids_json,),
+        ).fetchall()
+    }
+    missing = [request_id for request_id in request_ids if request_id not in old_statuses]
+    if not old_statuses:
+        return {"updated": [], "missing": missing}
 
-        old_status = row["status"]
-        conn.execute(
-            "UPDATE requests SET status = ?, admin_note = ?, updated_at = ? WHERE id = ?",
-            (new_status, admin_note, now, request_id),
-        )
-        conn.execute(
-            """INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
-               VALUES (?, ?, ?, ?, ?)""",
-            (request_id, old_status, new_status, changed_by, admin_note),
-        )
-        if new_status not in OPEN_REQUEST_STATUSES:
-            _delete_request_blocker_if_supported(conn, request_id)
-        if old_status != new_status:
-            display_actor_name = _resolve_actor_name(conn, changed_by)
-            _create_request_notifications(
-                conn,
-                request_id,
-                event_type="status_changed",
-                message=f"Request moved from {old_status} to {new_status}.",
-                actor_user_id=changed_by,
-                actor_name=display_actor_name,
+    now = datetime.utcnow().isoformat()
+    conn.execute(
+        """
+        INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
+        SELECT r.id, r.status, ?, ?, ?
+        FROM json_each(?) j
+        JOIN requests r ON r.id = j.value
+        ORDER BY j.key
+        """,
+        (new_status, changed_by, admin_note, ids_json),
+    )
+    conn.execute(
+        """
+        UPDATE requests SET status = ?, admin_note = ?, updated_at = ?
+        WHERE id IN (SELECT value FROM json_each(?))
+        """,
+        (new_status, admin_note, now, ids_json),
+    )
+    if new_status not in OPEN_REQUEST_STATUSES:
+        try:
+            conn.execute(
+                "DELETE FROM request_blockers WHERE request_id IN (SELECT value FROM json_each(?))",
+                (ids_json,),
             )
-        updated.append(get_request_by_id(conn, request_id))
-
+        except sqlite3.OperationalError:
+            pass
+    changed = [
+        (request_id, f"Request moved from {old_status} to {new_status}.")
+        for request_id, old_status in old_statuses.items()
+        if old_status != new_status
+    ]
+    if changed:
+        notification_dispatcher.notify_supporters_batch(
+            conn,
+            changed,
+            event_type="status_changed",
+            actor_user_id=changed_by,
+            actor_name=_resolve_actor_name(conn, changed_by),
+        )
     conn.commit()
+
+    updated = get_requests_by_ids(conn, [request_id for request_id in request_ids if request_id in old_statuses])
     return {"updated": updated, "missing": missing}
 
 
@@ -1948,20 +1989,11 @@ def merge_duplicate_requests(
     if not target_group or any(source_id not in target_group for source_id in deduped_source_ids):
         raise ValueError("Selected requests are not in the same duplicate group")
 
-    ordered_sources = sorted(
-        source_rows,
-        key=lambda row: (
-            _parse_request_datetime(row.get("created_at")),
-            row["id"],
-        ),
-    )
+    ordered_sources = sorted(source_rows, key=_created_order)
     actor_name = _resolve_actor_name(conn, changed_by)
     now = datetime.utcnow().isoformat()
     merged_rows = [target_row, *ordered_sources]
-    earliest_request = min(
-        merged_rows,
-        key=lambda row: (_parse_request_datetime(row.get("created_at")), row["id"]),
-    )
+    earliest_request = min(merged_rows, key=_created_order)
     target_note_seed = (target_row.get("admin_note") or "").strip()
     if not target_note_seed:
         for source_row in ordered_sources:
@@ -2097,7 +2129,7 @@ def merge_duplicate_requests(
                 (source_row["id"], source_row["status"], changed_by, source_admin_note),
             )
 
-        notifications_created = _create_request_notifications_for_users(
+        notifications_created = notification_dispatcher.notify_users(
             conn,
             target_request_id,
             source_impacted_user_ids,
@@ -2121,54 +2153,134 @@ def merge_duplicate_requests(
     }
 
 
-def run_high_demand_escalation(
-    conn: sqlite3.Connection,
-    now: datetime | None = None,
-    min_supporters: int = ESCALATION_MIN_SUPPORTERS,
-    min_age_days: int = ESCALATION_MIN_AGE_DAYS,
-) -> dict:
-    """Escalate old, high-demand open requests by tagging them for admin attention."""
-    now = now or datetime.now(timezone.utc)
-    escalated = 0
+_WHITESPACE_SQL = "char(32, 9, 10, 13)"
 
-    rows = conn.execute(
+
+def _stage_request_notes(conn: sqlite3.Connection, *, where_sql: str, note_sql: str, params: tuple) -> int:
+    """Stage a (request, status, note) row for every request matched by ``where_sql``.
+
+    The staged notes are written by ``_apply_staged_notes``; together they
+    tag any number of requests in a fixed number of statements. ``params``
+    binds ``note_sql`` first, then ``where_sql``.
+    """
+    conn.execute(
         """
-        SELECT r.*, (SELECT COUNT(*) FROM request_supporters s WHERE s.request_id = r.id) as supporter_count
-        FROM requests r
-        WHERE r.status IN ('pending', 'approved')
+        CREATE TEMP TABLE IF NOT EXISTS request_note_batch (
+            request_id  INTEGER PRIMARY KEY,
+            status      TEXT NOT NULL,
+            note        TEXT NOT NULL
+        )
         """
-    ).fetchall()
+    )
+    conn.execute("DELETE FROM request_note_batch")
+    return conn.execute(
+        f"""
+        INSERT INTO request_note_batch (request_id, status, note)
+        SELECT r.id, r.status, {note_sql}
+        FROM requests r
+        WHERE {where_sql}
+        """,
+        params,
+    ).rowcount
 
-    for row in rows:
-        req = dict(row)
-        created_dt = _parse_request_datetime(req.get("created_at"))
-        age_days = max((now - created_dt).days, 0)
 
-        if req["supporter_count"] < min_supporters or age_days < min_age_days:
-            continue
+def _apply_staged_notes(
+    conn: sqlite3.Connection,
+    *,
+    changed_by: str,
+    updated_at: str,
+    extra_set_sql: str = "",
+    extra_params: tuple = (),
+) -> None:
+    """Append each staged note to its request's admin_note and history, then clear the batch."""
+    conn.execute(
+        """
+        INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
+        SELECT request_id, status, status, ?, note
+        FROM request_note_batch
+        ORDER BY request_id
+        """,
+        (changed_by,),
+    )
+    # Same result as _append_admin_note, row by row.
+    conn.execute(
+        f"""
+        UPDATE requests
+        SET admin_note = CASE
+                WHEN trim(COALESCE(requests.admin_note, ''), {_WHITESPACE_SQL}) = '' THEN b.note
+                ELSE trim(requests.admin_note, {_WHITESPACE_SQL}) || char(10, 10) || b.note
+            END,
+            updated_at = ?{extra_set_sql}
+        FROM request_note_batch b
+        WHERE requests.id = b.request_id
+        """,
+        (updated_at, *extra_params),
+    )
+    conn.execute("DELETE FROM request_note_batch")
 
-        existing_note = req.get("admin_note") or ""
-        if ESCALATION_MARKER in existing_note:
-            continue
 
-        escalation_note = (
-            f"{ESCALATION_MARKER} High-demand request has been open {age_days} days "
-            f"with {req['supporter_count']} supporters."
-        )
-        merged_note = f"{existing_note}\n\n{escalation_note}".strip() if existing_note else escalation_note
+def _apply_lifecycle_rule(
+    conn: sqlite3.Connection,
+    *,
+    flag: int,
+    where_sql: str,
+    note_sql: str,
+    params: tuple,
+    now: datetime,
+) -> int:
+    """Tag every request matched by ``where_sql`` with a rule note, as one batch.
 
-        conn.execute(
-            "UPDATE requests SET admin_note = ?, updated_at = ? WHERE id = ?",
-            (merged_note, now.isoformat(), req["id"]),
-        )
-        conn.execute(
-            """INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
-               VALUES (?, ?, ?, 'system', ?)""",
-            (req["id"], req["status"], req["status"], escalation_note),
+    Requests whose ``lifecycle_flags`` already carry the rule's bit (its
+    marker is in ``admin_note``; see app/lifecycle_flags.py) are skipped; the
+    rest get a history row, the note and the flag in three statements.
+    """
+    matched = _stage_request_notes(
+        conn,
+        where_sql=f"{where_sql} AND (r.lifecycle_flags & ?) = 0",
+        note_sql=note_sql,
+        params=(*params, flag),
+    )
+    if matched:
+        # Setting the bit alongside the note keeps the lifecycle_flags trigger a no-op.
+        _apply_staged_notes(
+            conn,
+            changed_by="system",
+            updated_at=now.isoformat(),
+            extra_set_sql=", lifecycle_flags = lifecycle_flags | ?",
+            extra_params=(flag,),
         )
-        escalated += 1
+    return matched
 
-    conn.commit()
+
+def run_high_demand_escalation(
+    conn: sqlite3.Connection,
+    now: datetime | None = None,
+    min_supporters: int = ESCALATION_MIN_SUPPORTERS,
+    min_age_days: int = ESCALATION_MIN_AGE_DAYS,
+    commit: bool = True,
+) -> dict:
+    """Escalate old, high-demand open requests by tagging them for admin attention."""
+    now = now or datetime.now(timezone.utc)
+    now_epoch = int(now.timestamp())
+    supporter_count = supporter_count_sql()
+    created_epoch = created_epoch_sql()
+
+    escalated = _apply_lifecycle_rule(
+        conn,
+        flag=LIFECYCLE_FLAG_ESCALATED,
+        where_sql=(
+            f"r.status IN ('pending', 'approved') AND {created_epoch} <= ? AND {supporter_count} >= ?"
+        ),
+        note_sql=(
+            f"'{ESCALATION_MARKER} High-demand request has been open ' || "
+            f"((? - {created_epoch}) / {timestamps.SECONDS_PER_DAY}) || ' days with ' || "
+            f"{supporter_count} || ' supporters.'"
+        ),
+        params=(now_epoch, now_epoch - min_age_days * timestamps.SECONDS_PER_DAY, min_supporters),
+        now=now,
+    )
+    if commit:
+        conn.commit()
     return {"escalated": escalated}
 
 
@@ -2176,45 +2288,26 @@ def run_pending_approval_reminders(
     conn: sqlite3.Connection,
     now: datetime | None = None,
     min_age_days: int = PENDING_REMINDER_MIN_AGE_DAYS,
+    commit: bool = True,
 ) -> dict:
     """Add an admin-visible note/history reminder for stale pending requests."""
     now = now or datetime.now(timezone.utc)
-    reminded = 0
-
-    rows = conn.execute(
-        """
-        SELECT r.*
-        FROM requests r
-        WHERE r.status = 'pending'
-        """
-    ).fetchall()
+    now_epoch = int(now.timestamp())
+    created_epoch = created_epoch_sql()
 
-    for row in rows:
-        req = dict(row)
-        created_dt = _parse_request_datetime(req.get("created_at"))
-        age_days = max((now - created_dt).days, 0)
-        if age_days < min_age_days:
-            continue
-
-        existing_note = req.get("admin_note") or ""
-        if PENDING_REMINDER_MARKER in existing_note:
-            continue
-
-        reminder_note = f"{PENDING_REMINDER_MARKER} Pending approval for {age_days} days."
-        merged_note = f"{existing_note}\n\n{reminder_note}".strip() if existing_note else reminder_note
-
-        conn.execute(
-            "UPDATE requests SET admin_note = ?, updated_at = ? WHERE id = ?",
-            (merged_note, now.isoformat(), req["id"]),
-        )
-        conn.execute(
-            """INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
-               VALUES (?, ?, ?, 'system', ?)""",
-            (req["id"], req["status"], req["status"], reminder_note),
-        )
-        reminded += 1
-
-    conn.commit()
+    reminded = _apply_lifecycle_rule(
+        conn,
+        flag=LIFECYCLE_FLAG_PENDING_REMINDER,
+        where_sql=f"r.status = 'pending' AND {created_epoch} <= ?",
+        note_sql=(
+            f"'{PENDING_REMINDER_MARKER} Pending approval for ' || "
+            f"((? - {created_epoch}) / {timestamps.SECONDS_PER_DAY}) || ' days.'"
+        ),
+        params=(now_epoch, now_epoch - min_age_days * timestamps.SECONDS_PER_DAY),
+        now=now,
+    )
+    if commit:
+        conn.commit()
     return {"reminded": reminded}
 
 
@@ -2222,45 +2315,26 @@ def run_stale_denied_auto_close(
     conn: sqlite3.Connection,
     now: datetime | None = None,
     min_age_days: int = DENIED_AUTO_CLOSE_MIN_AGE_DAYS,
+    commit: bool = True,
 ) -> dict:
     """Mark stale denied requests as auto-closed for cleaner admin queue handling."""
     now = now or datetime.now(timezone.utc)
-    auto_closed = 0
+    now_epoch = int(now.timestamp())
+    updated_epoch = "CAST(strftime('%s', COALESCE(NULLIF(r.updated_at, ''), r.created_at)) AS INTEGER)"
 
-    rows = conn.execute(
-        """
-        SELECT r.*
-        FROM requests r
-        WHERE r.status = 'denied'
-        """
-    ).fetchall()
-
-    for row in rows:
-        req = dict(row)
-        updated_dt = _parse_request_datetime(req.get("updated_at") or req.get("created_at"))
-        age_days = max((now - updated_dt).days, 0)
-        if age_days < min_age_days:
-            continue
-
-        existing_note = req.get("admin_note") or ""
-        if DENIED_AUTO_CLOSE_MARKER in existing_note:
-            continue
-
-        close_note = f"{DENIED_AUTO_CLOSE_MARKER} Denied request closed after {age_days} days without changes."
-        merged_note = f"{existing_note}\n\n{close_note}".strip() if existing_note else close_note
-
-        conn.execute(
-            "UPDATE requests SET admin_note = ?, updated_at = ? WHERE id = ?",
-            (merged_note, now.isoformat(), req["id"]),
-        )
-        conn.execute(
-            """INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
-               VALUES (?, ?, ?, 'system', ?)""",
-            (req["id"], req["status"], req["status"], close_note),
-        )
-        auto_closed += 1
-
-    conn.commit()
+    auto_closed = _apply_lifecycle_rule(
+        conn,
+        flag=LIFECYCLE_FLAG_DENIED_CLOSED,
+        where_sql=f"r.status = 'denied' AND {updated_epoch} <= ?",
+        note_sql=(
+            f"'{DENIED_AUTO_CLOSE_MARKER} Denied request closed after ' || "
+            f"((? - {updated_epoch}) / {timestamps.SECONDS_PER_DAY}) || ' days without changes.'"
+        ),
+        params=(now_epoch, now_epoch - min_age_days * timestamps.SECONDS_PER_DAY),
+        now=now,
+    )
+    if commit:
+        conn.commit()
     return {"auto_closed_denied": auto_closed}
 
 
@@ -2268,16 +2342,31 @@ def run_request_lifecycle_rules(
     conn: sqlite3.Connection,
     now: datetime | None = None,
 ) -> dict:
+    """Run every lifecycle rule in one transaction, timing each rule."""
     now = now or datetime.now(timezone.utc)
-
-    escalation_result = run_high_demand_escalation(conn, now=now)
-    reminder_result = run_pending_approval_reminders(conn, now=now)
-    auto_close_result = run_stale_denied_auto_close(conn, now=now)
+    result: dict = {}
+    timings_ms: dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        for name, rule in (
+            ("escalation", run_high_demand_escalation),
+            ("pending_reminder", run_pending_approval_reminders),
+            ("denied_auto_close", run_stale_denied_auto_close),
+        ):
+            rule_started = time.perf_counter()
+            result.update(rule(conn, now=now, commit=False))
+            timings_ms[name] = round((time.perf_counter() - rule_started) * 1000, 2)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
 
     return {
-        "escalated": escalation_result["escalated"],
-        "reminded": reminder_result["reminded"],
-        "auto_closed_denied": auto_close_result["auto_closed_denied"],
+        "escalated": result["escalated"],
+        "reminded": result["reminded"],
+        "auto_closed_denied": result["auto_closed_denied"],
+        "timings_ms": timings_ms,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
     }
 
 
@@ -2291,11 +2380,22 @@ def get_request_stats(conn: sqlite3.Connection) -> dict:
         "SELECT COUNT(DISTINCT user_id) FROM request_supporters"
     ).fetchone()[0]
 
-    now = datetime.now(timezone.utc)
-    open_rows = conn.execute(
-        "SELECT created_at FROM requests WHERE status IN ('pending', 'approved')"
-    ).fetchall()
-    open_ages = [max((now - _parse_request_datetime(r["created_at"])).days, 0) for r in open_rows]
+    open_age = timestamps.age_days_sql(created_epoch_sql())
+    open_age_row = conn.execute(
+        f"""
+        SELECT
+            COALESCE(SUM(age >= 3), 0) AS over_3,
+            COALESCE(SUM(age >= 7), 0) AS over_7,
+            COALESCE(SUM(age >= 14), 0) AS over_14,
+            COALESCE(MAX(age), 0) AS oldest
+        FROM (
+            SELECT COALESCE({open_age}, 0) AS age
+            FROM requests r
+            WHERE r.status IN ('pending', 'approved')
+        )
+        """,
+        (int(datetime.now(timezone.utc).timestamp()),),
+    ).fetchone()
 
     escalated_open = conn.execute(
         """
@@ -2324,10 +2424,10 @@ def get_request_stats(conn: sqlite3.Connection) -> dict:
         "denied": stats.get("denied", 0),
         "fulfilled": stats.get("fulfilled", 0),
         "unique_users": unique_users,
-        "open_over_3_days": sum(1 for age in open_ages if age >= 3),
-        "open_over_7_days": sum(1 for age in open_ages if age >= 7),
-        "open_over_14_days": sum(1 for age in open_ages if age >= 14),
-        "oldest_open_days": max(open_ages) if open_ages else 0,
+        "open_over_3_days": open_age_row["over_3"],
+        "open_over_7_days": open_age_row["over_7"],
+        "open_over_14_days": open_age_row["over_14"],
+        "oldest_open_days": open_age_row["oldest"],
         "escalated_open": escalated_open,
         "closed_denied": closed_denied,
     }
@@ -2341,31 +2441,61 @@ def get_open_requests(conn: sqlite3.Connection) -> list[dict]:
     return [dict(r) for r in rows]
 
 
-def auto_fulfill_request(conn: sqlite3.Connection, request_id: int) -> None:
+def auto_fulfill_request(
+    conn: sqlite3.Connection,
+    request_id: int,
+    jellyfin_item_id: str | None = None,
+) -> None:
     """Mark a request as fulfilled by the system."""
+    auto_fulfill_requests(conn, [(request_id, jellyfin_item_id)])
+
+
+def auto_fulfill_requests(
+    conn: sqlite3.Connection,
+    matches: list[tuple[int, str | None]],
+    *,
+    commit: bool = True,
+) -> list[int]:
+    """Fulfill ``(request_id, jellyfin_item_id)`` matches in one transaction.
+
+    Returns the ids that existed and were updated. Pass ``commit=False`` to
+    leave the transaction open for the caller.
+    """
+    if not matches:
+        return []
+    item_ids = dict(matches)
+    rows = conn.execute(
+        "SELECT id, status FROM requests WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+        (json.dumps(list(item_ids)),),
+    ).fetchall()
+    if not rows:
+        return []
+
     now = datetime.utcnow().isoformat()
-    row = conn.execute("SELECT status FROM requests WHERE id = ?", (request_id,)).fetchone()
-    if not row:
-        return
-    old_status = row["status"]
-    conn.execute(
-        "UPDATE requests SET status = 'fulfilled', admin_note = 'Auto-fulfilled: found in library', updated_at = ? WHERE id = ?",
-        (now, request_id),
+    conn.executemany(
+        """
+        UPDATE requests
+        SET status = 'fulfilled', admin_note = 'Auto-fulfilled: found in library', updated_at = ?,
+            jellyfin_item_id = COALESCE(?, jellyfin_item_id)
+        WHERE id = ?
+        """,
+        [(now, item_ids[row["id"]], row["id"]) for row in rows],
     )
-    conn.execute(
+    conn.executemany(
         """INSERT INTO request_history (request_id, old_status, new_status, changed_by, note)
            VALUES (?, ?, 'fulfilled', 'system', 'Auto-fulfilled: found in Jellyfin library')""",
-        (request_id, old_status),
+        [(row["id"], row["status"]) for row in rows],
     )
-    _create_request_notifications(
+    notification_dispatcher.notify_supporters_batch(
         conn,
-        request_id,
-        event_type="status_changed",
-        message=f"Request moved from {old_status} to fulfilled.",
-        actor_user_id="system",
-        actor_name="System",
+        [(row["id"], f"Request moved from {row['status']} to fulfilled.") for row in rows],
+        "status_changed",
+        "system",
+        "System",
     )
-    conn.commit()
+    if commit:
+        conn.commit()
+    return [row["id"] for row in rows]
 
 
 def get_request_for_tmdb(
@@ -0,0 +1,255 @@
+"""Retention for the append-only activity tables.
+
+``request_notifications``, ``request_comments`` and ``request_history`` only
+ever grow: every lifecycle run, auto-fulfillment and comment adds rows. The
+nightly :func:`run_retention` pass removes what the configured policies no
+longer keep:
+
+- read notifications older than ``retention_notification_read_days`` (or the
+  per-type override in ``retention_notification_type_days``), rolled up into
+  ``notification_digests`` (one row per user, type and month) first;
+- unread notifications older than ``retention_notification_unread_days``;
+- comments older than ``retention_comment_days`` on closed requests;
+- note-only history rows (status unchanged, never 'fulfilled') older than
+  ``retention_history_note_days``. Status transitions are kept; lead times,
+  the timeline and the analytics rollups are built from them.
+
+A days value of 0 keeps the rows forever. With ``retention_archive_enabled``
+removed rows are copied to ``<table>_archive`` (created by init_db for
+``database.ARCHIVED_TABLES``) instead of being dropped.
+
+Rows go in batches of ``retention_batch_size`` ids, each batch its own short
+transaction, so the write lock is never held for more than one batch. Ids
+are walked upward from where the previous batch stopped, so a run reads each
+table once however many batches it takes. The run stops at
+``retention_time_budget_seconds`` and the next run picks up the rest. Freed
+pages are then returned with ``PRAGMA incremental_vacuum`` (databases created
+with auto_vacuum=INCREMENTAL; older files just reuse them) and the planner
+statistics refreshed with ``PRAGMA optimize``.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+
+VACUUM_PAGES_PER_STEP = 1000
+
+
+def _cutoff(now: datetime, days: int) -> str:
+    # Day granularity: stored timestamps mix 'YYYY-MM-DD HH:MM:SS' and
+    # isoformat(), which only compare consistently up to the date.
+    return (now - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def retention_policies(now: datetime | None = None) -> list[dict]:
+    """The enabled policies as {name, table, where, params, digest}."""
+    now = now or datetime.now(timezone.utc)
+    policies: list[dict] = []
+    type_days = settings.retention_notification_type_day_map
+    for type_, days in sorted(type_days.items()):
+        if days > 0:
+            policies.append(
+                {
+                    "name": f"notifications_read:{type_}",
+                    "table": "request_notifications",
+                    "where": "is_read = 1 AND type = ? AND created_at < ?",
+                    "params": (type_, _cutoff(now, days)),
+                    "digest": True,
+                }
+            )
+    if settings.retention_notification_read_days > 0:
+        policies.append(
+            {
+                "name": "notifications_read",
+                "table": "request_notifications",
+                "where": "is_read = 1 AND type NOT IN (SELECT value FROM json_each(?)) AND created_at < ?",
+                "params": (json.dumps(sorted(type_days)), _cutoff(now, settings.retention_notification_read_days)),
+                "digest": True,
+            }
+        )
+    if settings.retention_notification_unread_days > 0:
+        policies.append(
+            {
+                "name": "notifications_unread",
+                "table": "request_notifications",
+                "where": "is_read = 0 AND created_at < ?",
+                "params": (_cutoff(now, settings.retention_notification_unread_days),),
+                "digest": False,
+            }
+        )
+    if settings.retention_comment_days > 0:
+        policies.append(
+            {
+                "name": "comments",
+                "table": "request_comments",
+                "where": (
+                    "created_at < ? AND request_id IN "
+                    "(SELECT id FROM requests WHERE status IN ('fulfilled', 'denied'))"
+                ),
+                "params": (_cutoff(now, settings.retention_comment_days),),
+                "digest": False,
+            }
+        )
+    if settings.retention_history_note_days > 0:
+        policies.append(
+            {
+                "name": "history_notes",
+                "table": "request_history",
+                "where": "old_status IS new_status AND new_status <> 'fulfilled' AND created_at < ?",
+                "params": (_cutoff(now, settings.retention_history_note_days),),
+                "digest": False,
+            }
+        )
+    return policies
+
+
+def _archive_columns(conn: sqlite3.Connection, table: str) -> str | None:
+    if not settings.retention_archive_enabled:
+        return None
+    source = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    archived = {row[1] for row in conn.execute(f"PRAGMA table_info({table}_archive)")}
+    return ", ".join(column for column in source if column in archived) or None
+
+
+def _run_batch(
+    conn: sqlite3.Connection,
+    policy: dict,
+    after_id: int,
+    max_id: int,
+    batch_size: int,
+    archive_columns: str | None,
+) -> tuple[int, int, int] | None:
+    """Remove the next batch; (last id, rows removed, digest rows touched) or None when done."""
+    table = policy["table"]
+    ids = [
+        row[0]
+        for row in conn.execute(
+            f"""
+            SELECT id FROM {table}
+            WHERE id > ? AND id <= ? AND {policy["where"]}
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_id, max_id, *policy["params"], batch_size),
+        )
+    ]
+    if not ids:
+        return None
+
+    batch = json.dumps(ids)
+    in_batch = "id IN (SELECT value FROM json_each(?))"
+    digested = 0
+    try:
+        if policy["digest"]:
+            digested = conn.execute(
+                f"""
+                INSERT INTO notification_digests (user_id, type, month, notifications, first_created_at, last_created_at)
+                SELECT user_id, type, COALESCE(strftime('%Y-%m', created_at), ''), COUNT(*),
+                       MIN(created_at), MAX(created_at)
+                FROM request_notifications
+                WHERE {in_batch}
+                GROUP BY 1, 2, 3
+                ON CONFLICT (user_id, type, month) DO UPDATE SET
+                    notifications = notifications + excluded.notifications,
+                    first_created_at = MIN(first_created_at, excluded.first_created_at),
+                    last_created_at = MAX(last_created_at, excluded.last_created_at)
+                """,
+                (batch,),
+            ).rowcount
+        if archive_columns:
+            conn.execute(
+                f"INSERT INTO {table}_archive ({archive_columns}) SELECT {archive_columns} FROM {table} WHERE {in_batch}",
+                (batch,),
+            )
+        removed = conn.execute(f"DELETE FROM {table} WHERE {in_batch}", (batch,)).rowcount
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return ids[-1], removed, digested
+
+
+def _pragma_int(conn: sqlite3.Connection, name: str) -> int:
+    return int(conn.execute(f"PRAGMA {name}").fetchone()[0])
+
+
+def _reclaim(conn: sqlite3.Connection, deadline: float) -> int:
+    """Hand free pages back to the filesystem; returns pages released."""
+    if _pragma_int(conn, "auto_vacuum") != 2:
+        return 0
+    start_pages = _pragma_int(conn, "page_count")
+    # At least one step even when the deletes used up the budget.
+    while _pragma_int(conn, "freelist_count"):
+        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})").fetchall()
+        conn.commit()
+        if time.monotonic() >= deadline:
+            break
+    return start_pages - _pragma_int(conn, "page_count")
+
+
+def run_retention(
+    conn: sqlite3.Connection,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+    time_budget_seconds: float | None = None,
+) -> dict:
+    """One time-boxed retention pass over every enabled policy."""
+    started = time.perf_counter()
+    budget = settings.retention_time_budget_seconds if time_budget_seconds is None else time_budget_seconds
+    deadline = time.monotonic() + max(float(budget), 0.0)
+    batch_size = max(int(batch_size or settings.retention_batch_size), 1)
+    page_size = _pragma_int(conn, "page_size")
+    free_before = _pragma_int(conn, "freelist_count")
+
+    policies: dict[str, dict] = {}
+    max_ids: dict[str, int] = {}
+    archive_columns: dict[str, str | None] = {}
+    batches = 0
+    complete = True
+    for policy in retention_policies(now):
+        table = policy["table"]
+        result = policies[policy["name"]] = {"rows": 0, "archived": 0, "digest_rows": 0}
+        try:
+            if table not in max_ids:
+                # Rows written during the run are left for the next one.
+                max_ids[table] = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+                archive_columns[table] = _archive_columns(conn, table)
+        except sqlite3.OperationalError:
+            # Partial schemas without the table have nothing to retain.
+            continue
+        after_id = 0
+        while True:
+            if time.monotonic() >= deadline:
+                complete = False
+                break
+            step = _run_batch(conn, policy, after_id, max_ids[table], batch_size, archive_columns[table])
+            if step is None:
+                break
+            after_id, removed, digested = step
+            result["rows"] += removed
+            if archive_columns[table]:
+                result["archived"] += removed
+            result["digest_rows"] += digested
+            batches += 1
+        if not complete:
+            break
+
+    freed_pages = max(_pragma_int(conn, "freelist_count") - free_before, 0)
+    released_pages = _reclaim(conn, deadline)
+    conn.execute("PRAGMA optimize")
+    return {
+        "policies": policies,
+        "rows_removed": sum(result["rows"] for result in policies.values()),
+        "rows_archived": sum(result["archived"] for result in policies.values()),
+        "digest_rows": sum(result["digest_rows"] for result in policies.values()),
+        "batches": batches,
+        "complete": complete,
+        "freed_bytes": freed_pages * page_size,
+        "reclaimed_bytes": released_pages * page_size,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,62 @@
+"""Integer epoch timestamps for age and lead-time math.
+
+``created_at`` columns hold a mix of SQLite ``CURRENT_TIMESTAMP`` text and
+Python ``isoformat()`` strings, so every age used to mean parsing a string
+per row, often twice (``fromisoformat`` then ``strptime``). ``requests`` and
+``request_history`` now carry a trigger-maintained ``created_at_epoch``
+(UTC seconds), and ages are computed on those integers, either in SQL or
+with integer arithmetic in Python.
+
+Every schema has the column (``database.add_maintained_request_columns``
+adds it, also to partial unit-test schemas; ``request_columns`` names it in
+SQL); rows fetched without it get the value from a one-off parse in Python.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Mapping
+
+SECONDS_PER_DAY = 86400
+
+
+def age_days_sql(epoch_sql: str) -> str:
+    """Whole days from ``epoch_sql`` to a bound ``?`` "now" epoch.
+
+    Never negative; NULL when the timestamp is unknown.
+    """
+    return f"MAX((? - {epoch_sql}) / {SECONDS_PER_DAY}, 0)"
+
+
+def now_epoch() -> int:
+    return int(time.time())
+
+
+def _parse(value) -> int | None:
+    if not isinstance(value, str):
+        return None
+    for parser in (datetime.fromisoformat, lambda raw: datetime.strptime(raw, "%Y-%m-%d %H:%M:%S")):
+        try:
+            parsed = parser(value)
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp())
+    return None
+
+
+def row_created_epoch(row: Mapping) -> int | None:
+    """A row's created_at epoch, from its epoch column when it was selected."""
+    keys = row.keys()
+    if "created_at_epoch" in keys and row["created_at_epoch"] is not None:
+        return int(row["created_at_epoch"])
+    return _parse(row["created_at"]) if "created_at" in keys else None
+
+
+def days_between(start_epoch: int | None, end_epoch: int) -> int:
+    """Whole days from ``start_epoch`` to ``end_epoch``; 0 if unknown or in the future."""
+    if start_epoch is None:
+        return 0
+    return max((end_epoch - start_epoch) // SECONDS_PER_DAY, 0)
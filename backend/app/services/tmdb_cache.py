@@ -0,0 +1,208 @@
+"""In-process cache for TMDB responses.
+
+Detail pages, the request preflight (for the same title seconds later) and
+the series continuation radar all fetch the same TMDB details, and popular
+searches repeat. Responses are cached here as their JSON text:
+
+- Per-endpoint TTLs (details change rarely, search results more often).
+- Bounded memory: at most ``tmdb_cache_max_entries`` responses, least
+  recently used evicted first.
+- Request coalescing: concurrent misses for the same key share one upstream
+  call instead of each hitting TMDB. The call runs in a task owned by the
+  cache, so a caller that goes away (client disconnect) does not cancel it
+  for the others.
+- Hit/miss counters for the admin health check.
+- Optional SQLite second tier (``tmdb_cache_db_path``) so the cache survives
+  restarts; entries found there are promoted into memory. Expired rows are
+  pruned by an indexed delete at most every PRUNE_INTERVAL_SECONDS.
+
+Failed upstream calls are never cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.config import settings
+from app.db_executor import db_executor, run_db
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+class SQLiteCacheTier:
+    """Persistent second tier keyed like the in-memory cache."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._next_prune_at = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tmdb_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tmdb_cache_expires_at ON tmdb_cache(expires_at)")
+            conn.commit()
+            db_executor.bind(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, key: str, now: float) -> tuple[str, float] | None:
+        row = conn.execute(
+            "SELECT payload, expires_at FROM tmdb_cache WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, key: str, payload: str, expires_at: float, prune_before: float | None) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO tmdb_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+            (key, payload, expires_at),
+        )
+        if prune_before is not None:
+            conn.execute("DELETE FROM tmdb_cache WHERE expires_at <= ?", (prune_before,))
+        conn.commit()
+
+    async def get(self, key: str) -> tuple[str, float] | None:
+        return await run_db(self._connection(), self._read, key, time.time())
+
+    async def set(self, key: str, payload: str, expires_at: float) -> None:
+        now = time.time()
+        prune_before = None
+        if now >= self._next_prune_at:
+            self._next_prune_at = now + PRUNE_INTERVAL_SECONDS
+            prune_before = now
+        await run_db(self._connection(), self._write, key, payload, expires_at, prune_before)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            db_executor.release(conn)
+            conn.close()
+
+
+class ResponseCache:
+    """TTL + LRU cache of response payloads with coalesced misses."""
+
+    def __init__(self, max_entries: int, persistent: SQLiteCacheTier | None = None):
+        self.max_entries = max(int(max_entries), 1)
+        self.persistent = persistent
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _get_fresh(self, key: str, now: float) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def _store(self, key: str, payload: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, key: str, ttl_seconds: float, fetch: Callable[[], Awaitable[str]]) -> str:
+        payload = self._get_fresh(key, time.time())
+        if payload is not None:
+            self.hits += 1
+            return payload
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+        else:
+            pending = asyncio.ensure_future(self._load(key, ttl_seconds, fetch))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda task: self._fetch_done(key, task))
+        # Shielded: cancelling one caller leaves the fetch running for the rest.
+        return await asyncio.shield(pending)
+
+    def _fetch_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody waited for doesn't log "never retrieved".
+            task.exception()
+
+    async def _load(self, key: str, ttl_seconds: float, fetch: Callable[[], Awaitable[str]]) -> str:
+        if self.persistent is not None:
+            try:
+                stored = await self.persistent.get(key)
+            except sqlite3.Error:
+                logger.warning("TMDB cache: persistent tier read failed", exc_info=True)
+                stored = None
+            if stored is not None:
+                payload, expires_at = stored
+                self.persistent_hits += 1
+                self._store(key, payload, expires_at)
+                return payload
+
+        self.misses += 1
+        payload = await fetch()
+        expires_at = time.time() + ttl_seconds
+        self._store(key, payload, expires_at)
+        if self.persistent is not None:
+            try:
+                await self.persistent.set(key, payload, expires_at)
+            except sqlite3.Error:
+                logger.warning("TMDB cache: persistent tier write failed", exc_info=True)
+        return payload
+
+    def close(self) -> None:
+        if self.persistent is not None:
+            self.persistent.close()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.persistent_hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.persistent_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((lookups - self.misses) / lookups * 100, 1) if lookups else None,
+            "persistent": self.persistent.path if self.persistent else None,
+        }
+
+
+tmdb_cache = ResponseCache(
+    settings.tmdb_cache_max_entries,
+    persistent=SQLiteCacheTier(settings.tmdb_cache_db_path) if settings.tmdb_cache_db_path else None,
+)
@@ -1,6 +1,8 @@
-import httpx
+import json
 
 from app.config import settings
+from app.services.http_clients import tmdb_http
+from app.services.tmdb_cache import tmdb_cache
 
 
 class TMDBClient:
@@ -14,56 +16,57 @@ class TMDBClient:
             params.update(extra)
         return params
 
-    async def search_multi(self, query: str, page: int = 1) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/search/multi",
-                params=self._params({"query": query, "page": page}),
-            )
+    async def _get_json(self, path: str, params: dict, ttl_seconds: float) -> dict:
+        """GET ``path`` through the response cache; every call returns a fresh dict."""
+        key = path + "?" + "&".join(f"{name}={params[name]}" for name in sorted(params))
+
+        async def fetch() -> str:
+            resp = await tmdb_http.get().get(f"{self.base_url}{path}", params=self._params(params))
             resp.raise_for_status()
-            data = resp.json()
-            # Filter to only movie and tv results
-            data["results"] = [
-                r for r in data.get("results", [])
-                if r.get("media_type") in ("movie", "tv")
-            ]
-            return data
+            return resp.text
+
+        return json.loads(await tmdb_cache.get_or_fetch(key, ttl_seconds, fetch))
+
+    async def search_multi(self, query: str, page: int = 1) -> dict:
+        data = await self._get_json(
+            "/search/multi",
+            {"query": query, "page": page},
+            settings.tmdb_cache_search_ttl_seconds,
+        )
+        # Filter to only movie and tv results
+        data["results"] = [
+            r for r in data.get("results", [])
+            if r.get("media_type") in ("movie", "tv")
+        ]
+        return data
 
     async def search_movies(self, query: str, page: int = 1) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/search/movie",
-                params=self._params({"query": query, "page": page}),
-            )
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_json(
+            "/search/movie",
+            {"query": query, "page": page},
+            settings.tmdb_cache_search_ttl_seconds,
+        )
 
     async def search_tv(self, query: str, page: int = 1) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/search/tv",
-                params=self._params({"query": query, "page": page}),
-            )
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_json(
+            "/search/tv",
+            {"query": query, "page": page},
+            settings.tmdb_cache_search_ttl_seconds,
+        )
 
     async def get_movie_details(self, tmdb_id: int) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/movie/{tmdb_id}",
-                params=self._params({"append_to_response": "credits"}),
-            )
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_json(
+            f"/movie/{tmdb_id}",
+            {"append_to_response": "credits"},
+            settings.tmdb_cache_details_ttl_seconds,
+        )
 
     async def get_tv_details(self, tmdb_id: int) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/tv/{tmdb_id}",
-                params=self._params({"append_to_response": "credits"}),
-            )
-            resp.raise_for_status()
-            return resp.json()
+        return await self._get_json(
+            f"/tv/{tmdb_id}",
+            {"append_to_response": "credits"},
+            settings.tmdb_cache_details_ttl_seconds,
+        )
 
 
 tmdb_client = TMDBClient()
@@ -0,0 +1,85 @@
+"""Shared fixtures for the benchmark scripts.
+
+Benchmarks run against a throwaway on-disk database built with the real
+``init_db`` schema so indexes, triggers and migrations match production.
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from app import database
+
+
+def make_benchmark_db() -> sqlite3.Connection:
+    handle, path = tempfile.mkstemp(prefix="mediamanager-bench-", suffix=".db")
+    os.close(handle)
+    database.DB_PATH = path
+    database.init_db()
+    return database.get_db_connection()
+
+
+def seed_requests(
+    conn: sqlite3.Connection,
+    count: int,
+    *,
+    open_ratio: float = 0.6,
+    max_extra_supporters: int = 3,
+    seed: int = 7,
+) -> None:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    request_rows = []
+    supporter_rows = []
+    history_rows = []
+    for index in range(1, count + 1):
+        created = now - timedelta(days=rng.randint(0, 365), hours=rng.randint(0, 23))
+        roll = rng.random()
+        if roll < open_ratio:
+            status = "approved" if rng.random() < 0.4 else "pending"
+        else:
+            status = "fulfilled" if rng.random() < 0.75 else "denied"
+        media_type = rng.choice(("movie", "tv", "book"))
+        user_id = f"user-{rng.randint(1, 40)}"
+        created_iso = created.isoformat()
+        request_rows.append(
+            (index, user_id, user_id, 10_000 + index, media_type, f"Title {index}", status, created_iso, created_iso)
+        )
+        supporter_rows.append((index, user_id, user_id, created_iso))
+        for extra in range(rng.randint(0, max_extra_supporters)):
+            supporter_rows.append((index, f"fan-{index}-{extra}", f"fan{extra}", created_iso))
+        if status == "fulfilled":
+            fulfilled_at = (created + timedelta(days=rng.uniform(0.5, 30))).isoformat()
+            history_rows.append((index, "approved", "fulfilled", "admin", None, fulfilled_at))
+
+    conn.executemany(
+        """
+        INSERT INTO requests (id, user_id, username, tmdb_id, media_type, title, status, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        request_rows,
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO request_supporters (request_id, user_id, username, created_at) VALUES (?, ?, ?, ?)",
+        supporter_rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO request_history (request_id, old_status, new_status, changed_by, note, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        history_rows,
+    )
+    conn.commit()
+
+
+def count_statements(conn: sqlite3.Connection, fn) -> int:
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return len(statements)
@@ -0,0 +1,69 @@
+"""Per-request cost of opening a connection versus checking one out of the pool.
+
+Mimics the notifications summary poll: get a connection, run the summary
+query, give the connection back.
+
+Run from ``backend/``::
+
+    python -m benchmarks.db_connection_setup
+"""
+
+import time
+
+from app import database
+from benchmarks._seed import make_benchmark_db, seed_requests
+
+ITERATIONS = 2000
+SUMMARY_SQL = """
+    SELECT type, COUNT(*) AS total, SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END) AS unread
+    FROM request_notifications
+    WHERE user_id = ?
+    GROUP BY type
+"""
+
+
+def _connect_per_request() -> None:
+    conn = database.get_db_connection()
+    try:
+        conn.execute(SUMMARY_SQL, ("user-1",)).fetchall()
+    finally:
+        conn.close()
+
+
+def _pooled(pool: database.ConnectionPool) -> None:
+    conn = pool.checkout()
+    try:
+        conn.execute(SUMMARY_SQL, ("user-1",)).fetchall()
+    finally:
+        pool.checkin(conn)
+
+
+def _time(fn) -> float:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - started) / ITERATIONS * 1_000_000
+
+
+def main() -> None:
+    conn = make_benchmark_db()
+    seed_requests(conn, 500)
+    conn.executemany(
+        "INSERT INTO request_notifications (request_id, user_id, type, message) VALUES (?, 'user-1', 'comment_added', 'hi')",
+        [((index % 500) + 1,) for index in range(200)],
+    )
+    conn.commit()
+    conn.close()
+
+    pool = database.get_pool()
+    pool.warm()
+
+    print(f"{'strategy':<22}{'us/request':>12}")
+    print(f"{'connect per request':<22}{_time(_connect_per_request):>12.1f}")
+    print(f"{'pooled checkout':<22}{_time(lambda: _pooled(pool)):>12.1f}")
+    print(pool.stats())
+    database.close_pools()
+
+
+if __name__ == "__main__":
+    main()
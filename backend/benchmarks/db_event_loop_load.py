@@ -0,0 +1,125 @@
+"""Latency of a lightweight endpoint while heavy admin endpoints run.
+
+Drives the admin and notifications routers in-process and polls
+``/api/notifications/summary`` (what every open tab hits every 30 seconds)
+on an idle server and then while analytics, duplicate grouping and SLA
+worklist requests are hammered concurrently. It runs once with SQLite work
+on the executor lanes and once with the calls made inline on the event loop
+(the old behaviour) for comparison. Inline, every probe queues behind whole
+heavy requests; on the lanes the remaining tail is GIL contention with the
+worker threads.
+
+Run from ``backend/``::
+
+    python -m benchmarks.db_event_loop_load
+"""
+
+import asyncio
+import statistics
+import time
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+
+from app.db_executor import db_executor
+from app.dependencies import get_current_user, require_admin
+from app.routers import admin, notifications
+from benchmarks._seed import make_benchmark_db, seed_requests
+
+PROBE_SECONDS = 3.0
+PROBE_INTERVAL = 0.005
+HEAVY_WORKERS = 2
+HEAVY_PATHS = ("/api/admin/analytics", "/api/admin/requests/duplicates", "/api/admin/sla-worklist")
+
+
+def _seed_notifications(conn, user_id: str, count: int) -> None:
+    conn.executemany(
+        """
+        INSERT INTO request_notifications (request_id, user_id, type, message, is_read)
+        VALUES (?, ?, 'status_changed', 'Moved to approved', ?)
+        """,
+        [((index % 500) + 1, user_id, index % 3 == 0) for index in range(count)],
+    )
+    conn.commit()
+
+
+async def _probe(client: httpx.AsyncClient, stop_at: float) -> list[float]:
+    # Latency is measured from when the probe was due, so time spent waiting
+    # for a blocked event loop to get around to sending it is included.
+    latencies: list[float] = []
+    due = time.perf_counter()
+    while due < stop_at:
+        response = await client.get("/api/notifications/summary")
+        finished = time.perf_counter()
+        latencies.append((finished - due) * 1000)
+        response.raise_for_status()
+        due = finished + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+    return latencies
+
+
+async def _hammer(client: httpx.AsyncClient, stop_at: float, offset: int) -> int:
+    completed = 0
+    while time.perf_counter() < stop_at:
+        path = HEAVY_PATHS[(completed + offset) % len(HEAVY_PATHS)]
+        response = await client.get(path)
+        response.raise_for_status()
+        completed += 1
+    return completed
+
+
+def _report(label: str, latencies: list[float], heavy_completed: int | None = None) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    heavy = "" if heavy_completed is None else f"{heavy_completed:>8}"
+    print(
+        f"{label:<14}{len(ordered):>8}{statistics.median(ordered):>10.1f}"
+        f"{p99:>10.1f}{ordered[-1]:>10.1f}{heavy}"
+    )
+
+
+async def run(label: str) -> None:
+    conn = make_benchmark_db()
+    seed_requests(conn, 8000)
+    _seed_notifications(conn, "user-1", 2000)
+    conn.close()
+
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/admin")
+    app.include_router(notifications.router, prefix="/api/notifications")
+
+    async def fake_user():
+        return {"user_id": "user-1", "username": "user-1", "is_admin": True}
+
+    app.dependency_overrides[get_current_user] = fake_user
+    app.dependency_overrides[require_admin] = fake_user
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'scenario':<14}{'probes':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'heavy':>8}")
+
+        idle = await _probe(client, time.perf_counter() + PROBE_SECONDS)
+        _report(f"{label} idle", idle)
+
+        stop_at = time.perf_counter() + PROBE_SECONDS
+        results = await asyncio.gather(
+            _probe(client, stop_at),
+            *(_hammer(client, stop_at, offset) for offset in range(HEAVY_WORKERS)),
+        )
+        _report(label, results[0], sum(results[1:]))
+
+
+async def _run_inline(lane, fn, *args, **kwargs):
+    # Baseline: what the routes did before, blocking the event loop.
+    return fn(*args, **kwargs)
+
+
+def main() -> None:
+    asyncio.run(run("lanes"))
+    with patch.object(db_executor, "_run_on_lane", _run_inline):
+        asyncio.run(run("inline"))
+
+
+if __name__ == "__main__":
+    main()
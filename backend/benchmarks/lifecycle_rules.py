@@ -0,0 +1,36 @@
+"""Daily lifecycle rules over a large request backlog.
+
+The first pass tags every eligible request (the worst case: most of a year
+of backlog at once); the second is the steady state, where nearly every
+request already carries its rule flag.
+
+Run from ``backend/``::
+
+    python -m benchmarks.lifecycle_rules
+"""
+
+from benchmarks._seed import make_benchmark_db, seed_requests
+from app.services import request_service
+
+
+def _report(label: str, result: dict) -> None:
+    timings = " ".join(f"{name}={ms:.1f}ms" for name, ms in result["timings_ms"].items())
+    print(
+        f"{label:>8}: {result['duration_ms']:>8.1f} ms total "
+        f"(escalated={result['escalated']} reminded={result['reminded']} "
+        f"auto_closed_denied={result['auto_closed_denied']}) {timings}"
+    )
+
+
+def main() -> None:
+    for size in (10_000, 100_000):
+        conn = make_benchmark_db()
+        seed_requests(conn, size)
+        print(f"{size} requests")
+        _report("first", request_service.run_request_lifecycle_rules(conn))
+        _report("steady", request_service.run_request_lifecycle_rules(conn))
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Server load from idle notification tabs: SSE stream vs 30-second polling.
+
+Opens N notification streams (one per user), lets them sit idle for one
+30-second polling interval (keep-alives included) and measures database
+reads and process CPU over it. The polling baseline sends the N
+``/api/notifications/summary`` requests the same tabs would make in that
+interval through the router. Streams only read the database when a user's
+notifications change, so idle reads stay at zero whatever N is and the
+remaining CPU is the keep-alives; polling pays a full request per tab. The last column times one fan-out
+reaching a subscribed tab.
+
+Run from ``backend/``::
+
+    python -m benchmarks.notification_stream
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app import database
+from app.db_executor import run_db
+from app.dependencies import get_current_user
+from app.routers import notifications
+from app.services import notification_dispatcher
+from benchmarks._seed import make_benchmark_db, seed_requests
+
+TAB_COUNTS = (10, 100, 1000, 5000)
+POLL_INTERVAL_SECONDS = 30.0
+
+
+async def _poll_once(user_ids: list[str]) -> None:
+    app = FastAPI()
+    app.include_router(notifications.router, prefix="/api/notifications")
+
+    async def bench_user(request: Request):
+        return {"user_id": request.headers["x-bench-user"]}
+
+    app.dependency_overrides[get_current_user] = bench_user
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for user_id in user_ids:
+            response = await client.get("/api/notifications/summary", headers={"x-bench-user": user_id})
+            response.raise_for_status()
+
+
+def _notify(conn, request_id: int, user_id: str) -> None:
+    notification_dispatcher.notify_users(conn, request_id, [user_id], "status_changed", "Moved.")
+    conn.commit()
+
+
+async def _drain(stream, frames: list[str]) -> None:
+    async for frame in stream:
+        frames.append(frame)
+
+
+async def run(tabs: int) -> None:
+    pool = database.get_pool()
+    user_ids = [f"fan-{index}-0" for index in range(1, tabs + 1)]
+    streams = [notifications.notification_events(user_id) for user_id in user_ids]
+    frames: list[list[str]] = [[] for _ in streams]
+    tasks = [asyncio.create_task(_drain(stream, sink)) for stream, sink in zip(streams, frames)]
+    while not all(frames):
+        await asyncio.sleep(0.01)
+
+    checkouts = pool.checkouts
+    cpu = time.process_time()
+    await asyncio.sleep(POLL_INTERVAL_SECONDS)
+    idle_reads = pool.checkouts - checkouts
+    idle_cpu = (time.process_time() - cpu) * 1000
+
+    checkouts = pool.checkouts
+    started = time.process_time()
+    await _poll_once(user_ids)
+    poll_cpu = (time.process_time() - started) * 1000
+    poll_reads = pool.checkouts - checkouts
+
+    target = frames[0]
+    before = len(target)
+    started = time.perf_counter()
+    async with pool.connection() as conn:
+        await run_db(conn, _notify, 1, user_ids[0])
+    while not any(frame.startswith("id:") for frame in target[before:]):
+        await asyncio.sleep(0.001)
+    push_ms = (time.perf_counter() - started) * 1000
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    print(
+        f"{tabs:>6}{idle_reads:>14}{idle_cpu:>14.1f}{poll_reads:>14}{poll_cpu:>14.1f}{push_ms:>12.2f}"
+    )
+
+
+def main() -> None:
+    conn = make_benchmark_db()
+    seed_requests(conn, max(TAB_COUNTS))
+    conn.execute(
+        """
+        INSERT INTO request_notifications (request_id, user_id, type, message)
+        SELECT request_id, user_id, 'status_changed', 'Moved to approved'
+        FROM request_supporters
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    print(f"Per {POLL_INTERVAL_SECONDS:.0f}s interval with every tab idle:")
+    print(f"{'tabs':>6}{'stream reads':>14}{'stream cpu ms':>14}{'poll reads':>14}{'poll cpu ms':>14}{'push ms':>12}")
+    for tabs in TAB_COUNTS:
+        asyncio.run(run(tabs))
+    database.close_pools()
+
+
+if __name__ == "__main__":
+    main()
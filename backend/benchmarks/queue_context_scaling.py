@@ -0,0 +1,40 @@
+"""Per-call cost of the queue transparency context as the open queue grows.
+
+Run from ``backend/``::
+
+    python -m benchmarks.queue_context_scaling
+"""
+
+import time
+
+from app.services import request_service
+
+
+def _open_rows(size: int) -> list[dict]:
+    return [
+        {"id": idx, "status": "approved" if idx % 3 == 0 else "pending", "supporter_count": idx % 4 + 1}
+        for idx in range(1, size + 1)
+    ]
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    print(f"{'open rows':>10}{'full ms':>12}{'us/row':>10}{'5 ids ms':>12}")
+    for size in (10_000, 25_000, 50_000, 100_000):
+        rows = _open_rows(size)
+        wanted = {1, size // 4, size // 2, (size * 3) // 4, size}
+        full = _best_of(lambda: request_service._build_queue_transparency_context(rows))
+        subset = _best_of(lambda: request_service._build_queue_transparency_context(rows, request_ids=wanted))
+        print(f"{size:>10}{full * 1000:>12.1f}{full / size * 1e6:>10.2f}{subset * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
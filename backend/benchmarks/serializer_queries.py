@@ -0,0 +1,44 @@
+"""Statement count of the admin list endpoints as the page size grows.
+
+Run from ``backend/``::
+
+    python -m benchmarks.serializer_queries
+"""
+
+import time
+
+from app.services import request_service
+from benchmarks._seed import count_statements, make_benchmark_db, seed_requests
+
+
+def main() -> None:
+    conn = make_benchmark_db()
+    seed_requests(conn, 3000)
+
+    print(f"{'endpoint':<24}{'limit':>8}{'statements':>12}{'ms':>10}")
+    for limit in (10, 50, 100, 250, 500):
+        started = time.perf_counter()
+        statements = count_statements(
+            conn,
+            lambda: request_service.get_all_requests(conn, page=1, limit=limit, sort="priority"),
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{'get_all_requests':<24}{limit:>8}{statements:>12}{elapsed_ms:>10.1f}")
+
+    for limit in (10, 50, 100):
+        started = time.perf_counter()
+        statements = count_statements(
+            conn,
+            lambda: request_service.get_household_queue(conn, user_id="user-1", page=1, limit=limit),
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{'get_household_queue':<24}{limit:>8}{statements:>12}{elapsed_ms:>10.1f}")
+
+    started = time.perf_counter()
+    statements = count_statements(conn, lambda: request_service.get_sla_worklist(conn, limit=1000))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{'get_sla_worklist':<24}{'all':>8}{statements:>12}{elapsed_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""SLA target simulation: per-target rescans vs. the batched SLA engine.
+
+The "scan" column is the previous implementation (one pass over every lead
+time and open age per target); "bisect" and "numpy" are ``SLAEngine``
+without and with NumPy, including the one-off sort of both samples;
+"cached" reuses the lead-time array the way the lead-time store does.
+
+Run from ``backend/``::
+
+    python -m benchmarks.sla_simulation
+"""
+
+import random
+import time
+
+from app.services import sla_engine
+from app.services.sla_engine import SLAEngine, np
+
+
+def _scan(lead_times: list[float], open_ages: list[int], targets: list[int]) -> list[tuple]:
+    results = []
+    for target in targets:
+        warning_days = sla_engine.warning_days_for(target)
+        within = sum(1 for value in lead_times if value <= target)
+        breached = sum(1 for age in open_ages if age > target)
+        due_soon = sum(1 for age in open_ages if target - warning_days <= age <= target)
+        results.append((within, breached, due_soon))
+    return results
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    rng = random.Random(7)
+    print(f"numpy available: {sla_engine.NUMPY_AVAILABLE}")
+    print(f"{'samples':>10}{'targets':>9}{'scan ms':>10}{'bisect ms':>11}{'numpy ms':>10}{'cached ms':>13}")
+    for size in (1_000, 10_000, 100_000):
+        lead_times = sorted(rng.uniform(0, 60) for _ in range(size))
+        open_ages = [rng.randint(0, 90) for _ in range(size // 2)]
+        lead_array = np.asarray(lead_times) if sla_engine.NUMPY_AVAILABLE else None
+        for targets in ([3, 5, 7, 10, 14], list(range(1, 91))):
+            scan = _best_of(lambda: _scan(lead_times, open_ages, targets))
+            bisected = _best_of(lambda: SLAEngine(lead_times, open_ages, use_numpy=False).evaluate(targets))
+            if sla_engine.NUMPY_AVAILABLE:
+                vectorized = f"{_best_of(lambda: SLAEngine(lead_times, open_ages, use_numpy=True).evaluate(targets)) * 1000:>10.2f}"
+                # The lead-time store keeps its NumPy array between calls.
+                cached = f"{_best_of(lambda: SLAEngine(lead_array, open_ages, use_numpy=True).evaluate(targets)) * 1000:>13.2f}"
+            else:
+                vectorized, cached = f"{'n/a':>10}", f"{'n/a':>13}"
+            print(f"{size:>10}{len(targets):>9}{scan * 1000:>10.1f}{bisected * 1000:>11.2f}{vectorized}{cached}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Shared fixture for tests that need the full schema in a database file.
+
+A file rather than ``:memory:`` because the caches keyed on ``data_versions``
+skip in-memory databases, and because some tests open a second connection.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import database
+
+
+def remove_database_files(path: str) -> None:
+    """Delete a SQLite database file together with its WAL and shared-memory files."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+class TempDatabaseTestCase(unittest.TestCase):
+    """Runs ``database.init_db`` on a temporary file and opens ``self.conn`` on it."""
+
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.init_db()
+        self.conn = self.connect()
+
+    def tearDown(self):
+        self.conn.close()
+        remove_database_files(self.db_path)
+
+    def init_db(self) -> None:
+        with patch.object(database, "DB_PATH", self.db_path):
+            database.init_db()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app import database
 from app.database import get_db
 from app.dependencies import require_admin
 from app.routers import admin
@@ -144,6 +145,7 @@ class SimulateSlaTargetsRouteTests(unittest.TestCase):
             VALUES (1, 7, 2, '2026-03-30T00:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.app = FastAPI()
         self.app.include_router(admin.router, prefix="/api/admin")
@@ -177,6 +179,14 @@ class SimulateSlaTargetsRouteTests(unittest.TestCase):
         self.assertEqual(len(body["scenarios"]), 3)
         self.assertIn("operational_risk_score", body["scenarios"][0])
 
+    def test_simulation_accepts_dense_target_ranges(self):
+        response = self.client.get('/api/admin/sla-policy/simulate?targets=1-90')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["target_days"] for row in response.json()["scenarios"]], list(range(1, 91)))
+
+        response = self.client.get('/api/admin/sla-policy/simulate?targets=80-95')
+        self.assertEqual(response.status_code, 400)
+
 
 class RequesterDigestPackRouteTests(unittest.TestCase):
     def setUp(self):
@@ -258,6 +268,7 @@ class RequesterDigestPackRouteTests(unittest.TestCase):
                 (11, 'approved', 'fulfilled', 'admin-1', NULL, '2026-04-08T10:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.app = FastAPI()
         self.app.include_router(admin.router, prefix="/api/admin")
@@ -359,6 +370,7 @@ class RequestBlockerRouteTests(unittest.TestCase):
             VALUES (1, 'u1', 'alice', '2026-04-01T10:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.app = FastAPI()
         self.app.include_router(admin.router, prefix="/api/admin")
@@ -0,0 +1,117 @@
+import sqlite3
+import unittest
+from unittest.mock import patch
+
+from app.config import settings
+from app.services import analytics_cache, analytics_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class AnalyticsCacheTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('u1', 'alice', 11, 'movie', 'Heat', 'pending')
+            """
+        ).lastrowid
+        self.conn.commit()
+        analytics_cache.invalidate()
+
+    def tearDown(self):
+        analytics_cache.invalidate()
+        super().tearDown()
+
+    def _spy(self, name: str):
+        return patch.object(analytics_service, name, wraps=getattr(analytics_service, name))
+
+    def test_second_read_is_served_from_cache_until_a_write(self):
+        with self._spy("get_analytics") as compute:
+            first = analytics_cache.get_analytics(self.conn, sla_days=7)
+            second = analytics_cache.get_analytics(self.conn, sla_days=7)
+            other_sla = analytics_cache.get_analytics(self.conn, sla_days=5)
+            self.assertEqual(compute.call_count, 2)
+
+            self.assertFalse(first["cache"]["hit"])
+            self.assertTrue(second["cache"]["hit"])
+            self.assertFalse(other_sla["cache"]["hit"])
+            self.assertEqual(second["cache"]["compute_ms"], first["cache"]["compute_ms"])
+            self.assertEqual(second["open_count"], 1)
+
+            # A history row bumps request_data, so the next read recomputes.
+            self.conn.execute(
+                "INSERT INTO request_history (request_id, old_status, new_status, changed_by) VALUES (?, 'pending', 'approved', 'admin')",
+                (self.request_id,),
+            )
+            self.conn.execute("UPDATE requests SET status = 'approved' WHERE id = ?", (self.request_id,))
+            self.conn.commit()
+            after_write = analytics_cache.get_analytics(self.conn, sla_days=7)
+            self.assertEqual(compute.call_count, 3)
+        self.assertFalse(after_write["cache"]["hit"])
+        self.assertGreater(after_write["cache"]["data_version"], first["cache"]["data_version"])
+        self.assertEqual(after_write["approved_count"], 1)
+
+    def test_entries_expire_after_max_age(self):
+        with self._spy("get_analytics") as compute:
+            with patch("app.services.analytics_cache.time.time", return_value=1_000):
+                analytics_cache.get_analytics(self.conn)
+            with patch("app.services.analytics_cache.time.time", return_value=1_000 + 120):
+                cached = analytics_cache.get_analytics(self.conn)
+            with patch("app.services.analytics_cache.time.time", return_value=1_000 + 301):
+                expired = analytics_cache.get_analytics(self.conn)
+            self.assertEqual(compute.call_count, 2)
+        self.assertEqual((cached["cache"]["hit"], cached["cache"]["age_seconds"]), (True, 120.0))
+        self.assertFalse(expired["cache"]["hit"])
+
+    def test_simulation_key_ignores_target_order_and_duplicates(self):
+        with self._spy("get_sla_target_simulation") as compute:
+            first = analytics_cache.get_sla_target_simulation(self.conn, [7, 3, 5], current_target_days=7)
+            same = analytics_cache.get_sla_target_simulation(self.conn, [3, 5, 7, 7], current_target_days=7)
+            other_current = analytics_cache.get_sla_target_simulation(self.conn, [3, 5, 7], current_target_days=5)
+            self.assertEqual(compute.call_count, 2)
+        self.assertTrue(same["cache"]["hit"])
+        self.assertFalse(other_current["cache"]["hit"])
+        self.assertEqual([scenario["target_days"] for scenario in first["scenarios"]], [3, 5, 7])
+
+    def test_refresh_recomputes_stale_entries_and_warms_the_policy_target(self):
+        with self._spy("get_analytics") as compute:
+            self.assertEqual(analytics_cache.refresh(self.conn, sla_days=7), 1)
+            self.assertEqual(analytics_cache.refresh(self.conn, sla_days=7), 0)
+            self.assertTrue(analytics_cache.get_analytics(self.conn, sla_days=7)["cache"]["hit"])
+
+            self.conn.execute("UPDATE requests SET title = 'Heat (1995)' WHERE id = ?", (self.request_id,))
+            self.conn.commit()
+            self.assertEqual(analytics_cache.refresh(self.conn, sla_days=7), 1)
+            self.assertTrue(analytics_cache.get_analytics(self.conn, sla_days=7)["cache"]["hit"])
+            self.assertEqual(compute.call_count, 2)
+
+    def test_uncommitted_reads_are_not_cached(self):
+        with self._spy("get_analytics") as compute:
+            self.conn.execute("UPDATE requests SET status = 'approved' WHERE id = ?", (self.request_id,))
+            phantom = analytics_cache.get_analytics(self.conn, sla_days=7)
+            self.conn.rollback()
+            # A different write commits at the version the rolled-back one had.
+            self.conn.execute("UPDATE requests SET title = 'Heat (1995)' WHERE id = ?", (self.request_id,))
+            self.conn.commit()
+            committed = analytics_cache.get_analytics(self.conn, sla_days=7)
+            self.assertEqual(compute.call_count, 2)
+        self.assertEqual(committed["cache"]["data_version"], phantom["cache"]["data_version"])
+        self.assertEqual(phantom["approved_count"], 1)
+        self.assertFalse(committed["cache"]["hit"])
+        self.assertEqual(committed["approved_count"], 0)
+
+    def test_disabled_or_unversioned_databases_always_compute(self):
+        with self._spy("get_analytics") as compute:
+            with patch.object(settings, "analytics_cache_max_age_seconds", 0):
+                analytics_cache.get_analytics(self.conn)
+                analytics_cache.get_analytics(self.conn)
+            self.assertEqual(compute.call_count, 2)
+
+        conn = sqlite3.connect(":memory:")
+        self.assertEqual(analytics_cache.refresh(conn, sla_days=7), 0)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
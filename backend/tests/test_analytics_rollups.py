@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+
+from app.services import analytics_rollups, analytics_service
+from tests.db_fixture import TempDatabaseTestCase
+
+# Dashboard fields derived from the rollups.
+ROLLUP_FIELDS = (
+    "total_requests_all_time",
+    "fulfilled_all_time",
+    "open_count",
+    "pending_count",
+    "approved_count",
+    "denied_count",
+    "top_requesters",
+    "by_media_type",
+    "monthly_volume",
+    "weekly_throughput",
+    "lead_time_histogram",
+    "total_supporters_ever",
+)
+
+
+class AnalyticsRollupTests(TempDatabaseTestCase):
+    def _seed(self):
+        statuses = ("pending", "approved", "fulfilled", "denied")
+        for index in range(40):
+            media_type = ("movie", "tv", "book")[index % 3]
+            request_id = self.conn.execute(
+                """
+                INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at)
+                VALUES (?, ?, ?, ?, ?, 'pending', datetime('now', ?))
+                """,
+                (f"u{index % 6}", f"user{index % 6}", index, media_type, f"Title {index}", f"-{index * 17} days"),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO request_supporters (request_id, user_id, username, created_at) VALUES (?, ?, 'x', datetime('now', ?))",
+                [(request_id, f"u{n}", f"-{index * 17 - n} days") for n in range(index % 3 + 1)],
+            )
+            status = statuses[index % 4]
+            if status == "fulfilled":
+                self.conn.execute(
+                    """
+                    INSERT INTO request_history (request_id, old_status, new_status, changed_by, created_at)
+                    VALUES (?, 'approved', 'fulfilled', 'system', datetime('now', ?))
+                    """,
+                    (request_id, f"-{max(index * 17 - index, 0)} days"),
+                )
+            self.conn.execute("UPDATE requests SET status = ? WHERE id = ?", (status, request_id))
+        # Owner handoff, a cancelled request and a deleted supporter.
+        self.conn.execute("UPDATE requests SET username = 'user9' WHERE tmdb_id = 1")
+        self.conn.execute("DELETE FROM requests WHERE tmdb_id = 4")
+        self.conn.execute("DELETE FROM request_supporters WHERE id = (SELECT MIN(id) FROM request_supporters)")
+        self.conn.commit()
+
+    def _daily_row_count(self):
+        return sum(
+            self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("analytics_daily_requests", "analytics_daily_fulfillments", "analytics_daily_supporters")
+        )
+
+    def _source_analytics(self):
+        # The same dashboard computed straight from the source tables.
+        with patch.object(analytics_rollups, "rollups_ready", return_value=False):
+            return analytics_service.get_analytics(self.conn)
+
+    def _assert_matches_source(self):
+        from_rollups = analytics_service.get_analytics(self.conn)
+        from_source = self._source_analytics()
+        for field in ROLLUP_FIELDS:
+            with self.subTest(field=field):
+                value = from_rollups[field]
+                expected = from_source[field]
+                if field == "top_requesters":
+                    value = sorted(value, key=lambda item: (-item["count"], item["username"]))
+                    expected = sorted(expected, key=lambda item: (-item["count"], item["username"]))
+                self.assertEqual(value, expected)
+
+    def test_triggers_keep_rollups_in_step_with_writes(self):
+        self._seed()
+        self._assert_matches_source()
+        self.assertTrue(analytics_service.get_analytics(self.conn)["lead_time_histogram"])
+
+    def test_backfill_and_compaction_preserve_the_dashboard(self):
+        self._seed()
+        self.conn.execute("UPDATE analytics_rollup_state SET built_at = NULL")
+        for table in ("analytics_daily_requests", "analytics_daily_fulfillments", "analytics_daily_supporters"):
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.commit()
+        self.assertTrue(analytics_rollups.ensure_built(self.conn))
+        self.assertFalse(analytics_rollups.ensure_built(self.conn))
+        self._assert_matches_source()
+
+        daily_rows = self._daily_row_count()
+        result = analytics_rollups.compact_rollups(self.conn)
+
+        self.assertGreater(result["folded_rows"], 0)
+        self.assertEqual(self._daily_row_count(), daily_rows - result["folded_rows"])
+        old_days = self.conn.execute(
+            "SELECT DISTINCT substr(day, 9) FROM analytics_daily_requests WHERE day < ?",
+            (result["folded_before"],),
+        ).fetchall()
+        self.assertEqual([row[0] for row in old_days], ["01"])
+        self._assert_matches_source()
+        self.assertIsNotNone(analytics_rollups.get_rollup_state(self.conn)["compacted_at"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import sqlite3
 import unittest
 from datetime import datetime, timedelta, timezone
 
+from app import database
 from app.services.analytics_service import get_analytics, get_sla_target_simulation
 
 
@@ -43,6 +44,7 @@ class AnalyticsSlaTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         # Fulfilled in 2 days (within SLA)
         self.conn.execute(
@@ -0,0 +1,111 @@
+import unittest
+
+from app.services import lead_time_service, request_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class BulkRequestActionTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        lead_time_service.invalidate()
+        self.conn.execute("INSERT INTO user_roles (user_id, username, role) VALUES ('admin-1', 'Casey Admin', 'admin')")
+        self.conn.commit()
+
+    def tearDown(self):
+        lead_time_service.invalidate()
+        super().tearDown()
+
+    def _seed(self, count: int, status: str = "pending") -> list[int]:
+        ids = []
+        for index in range(count):
+            request_id = self.conn.execute(
+                """
+                INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at)
+                VALUES (?, ?, ?, 'movie', ?, ?, datetime('now', '-9 days'))
+                """,
+                (f"u{index}", f"user{index}", 5000 + index, f"Title {index}", status),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'fan')",
+                [(request_id, f"u{index}"), (request_id, f"fan-{index}")],
+            )
+            ids.append(request_id)
+        self.conn.commit()
+        return ids
+
+    def _statements(self, call) -> int:
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            self.conn.set_trace_callback(None)
+        # Row triggers re-trace the statement that fired them; per-row work
+        # issued from Python would show up as distinct (differently bound) SQL.
+        return len(set(statements))
+
+    def test_bulk_status_update_statement_count_does_not_grow_with_batch(self):
+        small = self._seed(3)
+        large = self._seed(40)
+        update = request_service.bulk_update_request_status
+        # Warm the per-database caches (lead-time store) before counting.
+        update(self.conn, self._seed(1), "approved", "admin-1")
+
+        small_count = self._statements(lambda: update(self.conn, small + [999_999], "approved", "admin-1", "Queued"))
+        large_count = self._statements(lambda: update(self.conn, large + large[:5], "approved", "admin-1", "Queued"))
+
+        self.assertEqual(small_count, large_count)
+        result = update(self.conn, [large[0], 999_999], "denied", "admin-1")
+        self.assertEqual(result["missing"], [999_999])
+        self.assertEqual([item["status"] for item in result["updated"]], ["denied"])
+
+        history = self.conn.execute(
+            "SELECT COUNT(*) FROM request_history WHERE request_id IN (SELECT value FROM json_each(?))",
+            (str(large),),
+        ).fetchone()[0]
+        self.assertEqual(history, len(large) + 1)
+        notifications = self.conn.execute(
+            "SELECT request_id, user_id, message, actor_name FROM request_notifications WHERE request_id = ? ORDER BY id",
+            (large[0],),
+        ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in notifications],
+            [
+                (large[0], "fan-0", "Request moved from pending to approved.", "Casey Admin"),
+                (large[0], "u0", "Request moved from pending to approved.", "Casey Admin"),
+                (large[0], "fan-0", "Request moved from approved to denied.", "Casey Admin"),
+                (large[0], "u0", "Request moved from approved to denied.", "Casey Admin"),
+            ],
+        )
+
+    def test_bulk_sla_escalation_statement_count_does_not_grow_with_batch(self):
+        small = self._seed(3)
+        large = self._seed(40)
+        closed = self._seed(1, status="fulfilled")
+        self.conn.execute("UPDATE requests SET admin_note = 'Existing note ' WHERE id = ?", (large[0],))
+        self.conn.commit()
+        escalate = request_service.bulk_escalate_sla_breaches
+        warm_up = self._seed(1)
+        escalate(self.conn, warm_up, "admin-1")
+
+        small_count = self._statements(lambda: escalate(self.conn, small, "admin-1"))
+        large_count = self._statements(lambda: escalate(self.conn, large + closed + [999_999], "admin-1", note=" Tonight "))
+
+        self.assertEqual(small_count, large_count)
+        result = escalate(self.conn, closed + [999_999], "admin-1")
+        self.assertEqual(result, {"updated": [], "missing": [999_999]})
+
+        note = self.conn.execute("SELECT admin_note FROM requests WHERE id = ?", (large[0],)).fetchone()[0]
+        self.assertEqual(note, "Existing note\n\n[SLA-ESCALATION] Escalated after 9 days open (SLA target: 7d). Tonight")
+        self.assertEqual(
+            self.conn.execute("SELECT COUNT(*) FROM request_comments WHERE body LIKE '[SLA-ESCALATION]%'").fetchone()[0],
+            len(warm_up) + len(small) + len(large),
+        )
+        self.assertEqual(
+            self.conn.execute("SELECT COUNT(*) FROM request_notifications WHERE type = 'sla_escalated'").fetchone()[0],
+            2 * (len(warm_up) + len(small) + len(large)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import sqlite3
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import conditional_get
+from app.database import get_db
+from app.dependencies import get_current_user, require_admin
+from app.routers import admin, requests
+from app.services import request_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class ConditionalGetTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('u1', 'alice', 11, 'movie', 'Heat', 'pending')
+            """
+        ).lastrowid
+        self.conn.execute(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, 'u1', 'alice')",
+            (self.request_id,),
+        )
+        self.conn.commit()
+        conditional_get.reset_stats()
+
+        app = FastAPI()
+        app.include_router(requests.router, prefix="/api/requests")
+        app.include_router(admin.router, prefix="/api/admin")
+
+        def override_db():
+            yield self.conn
+
+        async def override_user():
+            return {"user_id": "u1", "username": "alice", "is_admin": True}
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_current_user] = override_user
+        app.dependency_overrides[require_admin] = override_user
+        self.app = app
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.client.close()
+        self.app.dependency_overrides.clear()
+        conditional_get.reset_stats()
+        super().tearDown()
+
+    def test_matching_etag_returns_304_without_running_the_service(self):
+        first = self.client.get("/api/requests/household?sort=newest")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["etag"]
+        self.assertEqual(first.headers["cache-control"], "private, no-cache")
+
+        with patch.object(request_service, "get_household_queue", side_effect=AssertionError("service ran")):
+            cached = self.client.get("/api/requests/household?sort=newest", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.headers["etag"], etag)
+        self.assertEqual(cached.content, b"")
+
+        other_query = self.client.get("/api/requests/household?sort=oldest", headers={"If-None-Match": etag})
+        self.assertEqual(other_query.status_code, 200)
+        self.assertNotEqual(other_query.headers["etag"], etag)
+
+        # A comment is a request-table write, so every tag moves.
+        self.conn.execute(
+            "INSERT INTO request_comments (request_id, user_id, username, body) VALUES (?, 'u1', 'alice', 'hi')",
+            (self.request_id,),
+        )
+        self.conn.commit()
+        changed = self.client.get("/api/requests/household?sort=newest", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+
+        stats = self.client.get("/api/admin/stats")
+        revalidated = self.client.get("/api/admin/stats", headers={"If-None-Match": stats.headers["etag"]})
+        self.assertEqual(revalidated.status_code, 304)
+
+        self.assertEqual(
+            conditional_get.stats(),
+            {
+                "household_queue": {"requests": 4, "not_modified": 1, "hit_rate": 0.25},
+                "admin_stats": {"requests": 2, "not_modified": 1, "hit_rate": 0.5},
+            },
+        )
+
+    def test_time_bucket_rolls_the_etag(self):
+        with patch("app.conditional_get.time.time", return_value=1_000):
+            etag = self.client.get("/api/admin/stats").headers["etag"]
+        with patch("app.conditional_get.time.time", return_value=1_000 + 301):
+            later = self.client.get("/api/admin/stats", headers={"If-None-Match": etag})
+        self.assertEqual(later.status_code, 200)
+
+    def test_partial_schema_without_versions_sends_no_etag(self):
+        conn = sqlite3.connect(":memory:")
+        self.assertIsNone(conditional_get.data_version(conn))
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
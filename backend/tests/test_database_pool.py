@@ -0,0 +1,99 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from app import database
+from app.database import ConnectionPool, PoolTimeout
+from tests.db_fixture import remove_database_files
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.pool = ConnectionPool(self.db_path, size=2, timeout=0.2)
+
+    def tearDown(self):
+        self.pool.close()
+        remove_database_files(self.db_path)
+
+    def test_pragmas_are_applied_once_per_connection(self):
+        conn = self.pool.checkout()
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+            self.assertGreater(conn.execute("PRAGMA busy_timeout").fetchone()[0], 0)
+            self.assertLess(conn.execute("PRAGMA cache_size").fetchone()[0], 0)
+        finally:
+            self.pool.checkin(conn)
+
+    def test_connections_are_reused_and_counted(self):
+        first = self.pool.checkout()
+        self.pool.checkin(first)
+        second = self.pool.checkout()
+        self.pool.checkin(second)
+
+        self.assertIs(first, second)
+        stats = self.pool.stats()
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["checkouts"], 2)
+
+    def test_checkin_rolls_back_abandoned_transactions(self):
+        conn = self.pool.checkout()
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        conn.execute("INSERT INTO items (id) VALUES (1)")
+        self.pool.checkin(conn)
+
+        conn = self.pool.checkout()
+        try:
+            self.assertFalse(conn.in_transaction)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+        finally:
+            self.pool.checkin(conn)
+
+    def test_exhausted_pool_waits_then_times_out(self):
+        held = [self.pool.checkout(), self.pool.checkout()]
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.checkout()
+
+        releaser = threading.Timer(0.05, self.pool.checkin, args=(held.pop(),))
+        releaser.start()
+        conn = self.pool.checkout(timeout=2)
+        releaser.join()
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["waits"], 2)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["in_use"], 2)
+        for leftover in held + [conn]:
+            self.pool.checkin(leftover)
+
+    def test_get_db_hands_out_pooled_connections(self):
+        async def scenario():
+            seen = []
+            for _ in range(3):
+                async with database.get_pool().connection() as conn:
+                    seen.append(conn)
+            return seen
+
+        with patch.object(database, "DB_PATH", self.db_path):
+            try:
+                seen = asyncio.run(scenario())
+                stats = database.get_pool().stats()
+            finally:
+                database.close_pools()
+
+        self.assertTrue(all(conn is seen[0] for conn in seen))
+        self.assertEqual(stats["checkouts"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import unittest
+
+from app.db_executor import DBExecutor, db_executor, offload_db, run_db
+
+
+class DBExecutorTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = DBExecutor(3)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_connection_work_stays_on_one_lane_thread(self):
+        async def scenario():
+            conn = await self.executor.connect(lambda: sqlite3.connect(":memory:"))
+            try:
+                threads = {
+                    await self.executor.run(conn, lambda: threading.current_thread().name)
+                    for _ in range(10)
+                }
+                rows = await self.executor.run(conn, lambda: conn.execute("SELECT 1").fetchone())
+            finally:
+                await self.executor.close(conn)
+            return threads, rows
+
+        threads, rows = asyncio.run(scenario())
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(next(iter(threads)).startswith("db-lane-"))
+        self.assertEqual(tuple(rows), (1,))
+        self.assertEqual(self.executor.stats()["pinned_connections"], 0)
+
+    def test_connections_are_spread_across_bounded_lanes(self):
+        async def scenario():
+            conns = [await self.executor.connect(lambda: sqlite3.connect(":memory:")) for _ in range(6)]
+            try:
+                return {self.executor.lane_for(conn) for conn in conns}
+            finally:
+                for conn in conns:
+                    await self.executor.close(conn)
+
+        lanes = asyncio.run(scenario())
+        self.assertEqual(lanes, {0, 1, 2})
+
+    def test_errors_propagate_to_the_awaiting_caller(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.addCleanup(conn.close)
+
+        async def scenario():
+            await self.executor.run(conn, conn.execute, "SELECT * FROM missing_table")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            asyncio.run(scenario())
+
+
+class OffloadDbTests(unittest.TestCase):
+    def test_slow_route_body_does_not_block_the_event_loop(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.addCleanup(conn.close)
+
+        @offload_db
+        def slow_route(db=None):
+            time.sleep(0.3)
+            return "done"
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker_task = asyncio.create_task(ticker())
+            result = await slow_route(db=conn)
+            ticker_task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(scenario())
+        self.assertEqual(result, "done")
+        self.assertGreater(ticks, 10)
+
+    def test_run_db_passes_the_connection_first(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.addCleanup(conn.close)
+
+        def service(passed_conn, value, *, scale):
+            return passed_conn is conn, value * scale
+
+        self.assertEqual(asyncio.run(run_db(conn, service, 2, scale=3)), (True, 6))
+        self.assertLess(db_executor.lane_for(conn), db_executor.size)
+
+
+if __name__ == "__main__":
+    unittest.main()
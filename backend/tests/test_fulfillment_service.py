@@ -0,0 +1,114 @@
+import unittest
+
+from app.services import fulfillment_service, library_mirror_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+def _item(item_id, item_type, tmdb):
+    return {"Id": item_id, "Type": item_type, "Name": item_id, "ProviderIds": {"Tmdb": str(tmdb)}}
+
+
+class FulfillmentCycleTests(TempDatabaseTestCase):
+    def _request(self, tmdb_id, media_type="movie", status="pending", supporter="u1"):
+        request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES (?, 'alice', ?, ?, ?, ?)
+            """,
+            (supporter, tmdb_id, media_type, f"Title {tmdb_id}", status),
+        ).lastrowid
+        self.conn.execute(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'alice')",
+            (request_id, supporter),
+        )
+        self.conn.commit()
+        return request_id
+
+    def _sync(self, items, synced_at, full=False):
+        library_mirror_service.apply_library_items(self.conn, items, full=full, synced_at=synced_at)
+
+    def _status(self, request_id):
+        return self.conn.execute("SELECT status, jellyfin_item_id FROM requests WHERE id = ?", (request_id,)).fetchone()
+
+    def test_matches_are_fulfilled_in_one_cycle_with_history_and_notifications(self):
+        matrix = self._request(603)
+        dune = self._request(438631)
+        denied = self._request(1399, media_type="tv", status="denied")
+        self._sync([_item("jf-1", "Movie", 603), _item("jf-2", "Series", 1399)], "2026-05-01T00:00:00+00:00", full=True)
+
+        result = fulfillment_service.run_fulfillment_cycle(self.conn)
+
+        self.assertEqual(result["matched"], 1)
+        self.assertEqual(result["fulfilled"], 1)
+        self.assertEqual(tuple(self._status(matrix)), ("fulfilled", "jf-1"))
+        self.assertEqual(self._status(dune)["status"], "pending")
+        self.assertEqual(self._status(denied)["status"], "denied")
+        history = self.conn.execute(
+            "SELECT old_status, new_status, changed_by FROM request_history WHERE request_id = ?", (matrix,)
+        ).fetchall()
+        self.assertEqual([tuple(row) for row in history], [("pending", "fulfilled", "system")])
+        notified = self.conn.execute(
+            "SELECT COUNT(*) FROM request_notifications WHERE request_id = ?", (matrix,)
+        ).fetchone()[0]
+        self.assertEqual(notified, 1)
+
+        state = fulfillment_service.get_fulfillment_state(self.conn)
+        self.assertEqual(state["item_watermark"], "2026-05-01T00:00:00+00:00")
+        self.assertEqual(state["last_fulfilled"], 1)
+        self.assertIsNotNone(state["last_duration_ms"])
+
+    def test_notifications_for_all_matches_are_one_statement(self):
+        first = self._request(603)
+        second = self._request(438631)
+        self._sync([_item("jf-1", "Movie", 603), _item("jf-2", "Movie", 438631)], "2026-05-01T00:00:00+00:00", full=True)
+
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        result = fulfillment_service.run_fulfillment_cycle(self.conn)
+        self.conn.set_trace_callback(None)
+
+        self.assertEqual(result["fulfilled"], 2)
+        self.assertEqual(len({sql for sql in statements if "INSERT INTO request_notifications" in sql}), 1)
+        notified = self.conn.execute(
+            "SELECT request_id, message FROM request_notifications ORDER BY request_id"
+        ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in notified],
+            [(first, "Request moved from pending to fulfilled."), (second, "Request moved from pending to fulfilled.")],
+        )
+
+    def test_only_changes_since_the_watermark_are_examined(self):
+        self._sync([_item("jf-1", "Movie", 603)], "2026-05-01T00:00:00+00:00", full=True)
+        fulfillment_service.run_fulfillment_cycle(self.conn)
+
+        # Reopened after the last cycle: neither the item nor the request is new.
+        reopened = self._request(603)
+        self.conn.execute("UPDATE fulfillment_state SET request_watermark = ?", (reopened,))
+        self.conn.commit()
+        self.assertEqual(fulfillment_service.run_fulfillment_cycle(self.conn)["matched"], 0)
+
+        # A newly added item and a newly created request are both picked up.
+        dune = self._request(438631)
+        self._sync([_item("jf-3", "Movie", 438631)], "2026-05-01T00:05:00+00:00")
+        result = fulfillment_service.run_fulfillment_cycle(self.conn)
+        self.assertEqual(result["matched"], 1)
+        self.assertEqual(self._status(dune)["status"], "fulfilled")
+
+        # A later full sync restamps every item, so the reopened request is re-checked.
+        self._sync([_item("jf-1", "Movie", 603), _item("jf-3", "Movie", 438631)], "2026-05-02T00:00:00+00:00", full=True)
+        self.assertEqual(fulfillment_service.run_fulfillment_cycle(self.conn)["fulfilled"], 1)
+        self.assertEqual(self._status(reopened)["status"], "fulfilled")
+
+    def test_new_request_for_a_title_already_in_the_library_is_fulfilled(self):
+        self._sync([_item("jf-1", "Movie", 603)], "2026-05-01T00:00:00+00:00", full=True)
+        fulfillment_service.run_fulfillment_cycle(self.conn)
+
+        request_id = self._request(603)
+        result = fulfillment_service.run_fulfillment_cycle(self.conn)
+
+        self.assertEqual(result["fulfilled"], 1)
+        self.assertEqual(self._status(request_id)["status"], "fulfilled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.http_clients import SharedHTTPClient
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SharedHTTPClientTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sequential_requests_reuse_one_connection(self):
+        shared = SharedHTTPClient("test")
+
+        async def scenario():
+            for _ in range(5):
+                resp = await shared.get().get(self.url)
+                self.assertEqual(resp.json(), {"ok": True})
+            same_client = shared.get() is shared.get()
+            await shared.aclose()
+            return same_client
+
+        self.assertTrue(asyncio.run(scenario()))
+        stats = shared.stats()
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["reused_requests"], 4)
+        self.assertEqual(stats["reuse_rate"], 80.0)
+        self.assertEqual(stats["clients_created"], 1)
+
+    def test_new_event_loop_gets_a_fresh_client(self):
+        shared = SharedHTTPClient("test")
+
+        async def one_request():
+            await shared.get().get(self.url)
+
+        asyncio.run(one_request())
+        asyncio.run(one_request())
+
+        self.assertEqual(shared.stats()["clients_created"], 2)
+        self.assertEqual(shared.stats()["requests"], 2)
+        self.assertEqual(shared.stats()["connections_opened"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
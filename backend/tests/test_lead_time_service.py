@@ -0,0 +1,128 @@
+import sqlite3
+import statistics
+import unittest
+
+from app import database
+from app.services import lead_time_service
+from app.services.lead_time_service import LeadTimeDistribution, get_lead_time_store
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class LeadTimeStoreTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        lead_time_service.invalidate()
+
+    def tearDown(self):
+        lead_time_service.invalidate()
+        super().tearDown()
+
+    def _fulfill(self, tmdb_id: int, media_type: str, created_at: str, fulfilled_at: str, commit: bool = True) -> int:
+        cursor = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at, updated_at)
+            VALUES ('u1', 'alice', ?, ?, ?, 'fulfilled', ?, ?)
+            """,
+            (tmdb_id, media_type, f"Title {tmdb_id}", created_at, fulfilled_at),
+        )
+        self.conn.execute(
+            """
+            INSERT INTO request_history (request_id, old_status, new_status, changed_by, note, created_at)
+            VALUES (?, 'approved', 'fulfilled', 'admin', '', ?)
+            """,
+            (cursor.lastrowid, fulfilled_at),
+        )
+        if commit:
+            self.conn.commit()
+        return cursor.lastrowid
+
+    def test_store_is_cached_until_fulfilled_history_changes(self):
+        request_id = self._fulfill(1, "movie", "2026-03-01T00:00:00+00:00", "2026-03-03T00:00:00+00:00")
+
+        store = get_lead_time_store(self.conn)
+        self.assertIs(get_lead_time_store(self.conn), store)
+        self.assertEqual(store.overall.values, [2.0])
+
+        # Unrelated writes do not touch the lead-time version.
+        self.conn.execute("UPDATE requests SET admin_note = 'noted' WHERE id = ?", (request_id,))
+        self.conn.commit()
+        self.assertIs(get_lead_time_store(self.conn), store)
+
+    def test_new_fulfillments_are_folded_in_incrementally(self):
+        self._fulfill(1, "movie", "2026-03-01T00:00:00+00:00", "2026-03-03T00:00:00+00:00")
+        store = get_lead_time_store(self.conn)
+
+        self._fulfill(2, "tv", "2026-03-01T00:00:00+00:00", "2026-03-11T00:00:00+00:00")
+        refreshed = get_lead_time_store(self.conn)
+
+        # A new store is swapped in; the one other threads may hold is untouched.
+        self.assertIsNot(refreshed, store)
+        self.assertIs(get_lead_time_store(self.conn), refreshed)
+        self.assertEqual(store.overall.values, [2.0])
+        self.assertIs(refreshed.by_media_type["movie"], store.by_media_type["movie"])
+        self.assertEqual(refreshed.overall.values, [2.0, 10.0])
+        self.assertEqual(refreshed.by_media_type["tv"].values, [10.0])
+        self.assertEqual(refreshed.overall.count_within(7), 1)
+        self.assertEqual(refreshed.fulfillment_window("tv")["source"], "media_type")
+
+    def test_uncommitted_fulfillments_are_not_cached(self):
+        self._fulfill(1, "movie", "2026-03-01T00:00:00+00:00", "2026-03-03T00:00:00+00:00")
+        store = get_lead_time_store(self.conn)
+
+        self._fulfill(2, "movie", "2026-03-01T00:00:00+00:00", "2026-03-21T00:00:00+00:00", commit=False)
+        self.assertTrue(self.conn.in_transaction)
+        self.assertEqual(get_lead_time_store(self.conn).overall.values, [2.0, 20.0])
+        self.conn.rollback()
+
+        self.assertIs(get_lead_time_store(self.conn), store)
+        self._fulfill(3, "tv", "2026-03-01T00:00:00+00:00", "2026-03-11T00:00:00+00:00")
+        self.assertEqual(get_lead_time_store(self.conn).overall.values, [2.0, 10.0])
+
+    def test_merged_statistics_match_the_statistics_module(self):
+        values = [float(value % 17) + value / 100 for value in range(37)]
+        distribution = LeadTimeDistribution(values[:20]).merged(values[20:])
+
+        self.assertEqual(distribution.values, sorted(values))
+        self.assertEqual(distribution.median, statistics.median(values))
+        self.assertAlmostEqual(distribution.p90, statistics.quantiles(values, n=10)[8])
+        for size in (10, 11, 12, 19):
+            self.assertAlmostEqual(
+                LeadTimeDistribution(values[:size]).p90,
+                statistics.quantiles(values[:size], n=10)[8],
+            )
+
+    def test_deleted_history_forces_a_rebuild(self):
+        self._fulfill(1, "movie", "2026-03-01T00:00:00+00:00", "2026-03-03T00:00:00+00:00")
+        slow_id = self._fulfill(2, "movie", "2026-03-01T00:00:00+00:00", "2026-03-05T00:00:00+00:00")
+        store = get_lead_time_store(self.conn)
+
+        self.conn.execute("DELETE FROM request_history WHERE request_id = ?", (slow_id,))
+        self.conn.commit()
+        rebuilt = get_lead_time_store(self.conn)
+
+        self.assertIsNot(rebuilt, store)
+        self.assertEqual(rebuilt.overall.values, [2.0])
+
+    def test_partial_schema_without_version_table_is_not_cached(self):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(
+            """
+            CREATE TABLE requests (id INTEGER PRIMARY KEY, media_type TEXT, created_at TEXT);
+            CREATE TABLE request_history (
+                id INTEGER PRIMARY KEY, request_id INTEGER, new_status TEXT, created_at TEXT
+            );
+            INSERT INTO requests VALUES (1, 'movie', '2026-03-01T00:00:00+00:00');
+            INSERT INTO request_history VALUES (1, 1, 'fulfilled', '2026-03-04T00:00:00+00:00');
+            """
+        )
+        database.add_maintained_request_columns(conn)
+        try:
+            store = get_lead_time_store(conn)
+            self.assertEqual(store.median_days(), 3.0)
+            self.assertIsNot(get_lead_time_store(conn), store)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
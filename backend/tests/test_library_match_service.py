@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app.services import library_match_service
+from app.services.jellyfin_client import jellyfin_client
+
+USER = {"user_id": "user-1", "jellyfin_token": "token"}
+
+LIBRARY = [
+    {"Id": "jf-movie-603", "Type": "Movie", "Name": "The Matrix", "ProviderIds": {"Tmdb": "603"}},
+    {"Id": "jf-tv-1399", "Type": "Series", "Name": "Game of Thrones", "ProviderIds": {"Tmdb": "1399"}},
+    {"Id": "jf-movie-27205", "Type": "Movie", "Name": "Inception", "ProviderIds": {"Tmdb": "27205"}},
+]
+
+PAGE = [
+    ("The Matrix", 603, "movie"),
+    ("Game of Thrones", 1399, "tv"),
+    ("Dune", 438631, "movie"),
+    ("Some Book", 42, "book"),
+]
+
+
+class FakeJellyfin:
+    def __init__(self, honour_provider_filter: bool = True, fail_titles: set[str] | None = None):
+        self.honour_provider_filter = honour_provider_filter
+        self.fail_titles = fail_titles or set()
+        self.calls: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_items(self, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            types = set(kwargs.get("include_item_types", "").split(","))
+            items = [item for item in LIBRARY if item["Type"] in types]
+            provider_ids = kwargs.get("any_provider_id_equals")
+            if provider_ids and self.honour_provider_filter:
+                wanted = {value.split(".", 1)[1] for value in provider_ids}
+                items = [item for item in items if item["ProviderIds"]["Tmdb"] in wanted]
+            search_term = kwargs.get("search_term")
+            if search_term in self.fail_titles:
+                raise RuntimeError("jellyfin unavailable")
+            if search_term:
+                items = [item for item in items if search_term.lower() in item["Name"].lower()]
+            return {"Items": items[: kwargs.get("limit", 50)]}
+        finally:
+            self.in_flight -= 1
+
+
+class LibraryMatchServiceTests(unittest.TestCase):
+    def setUp(self):
+        library_match_service.clear_memo()
+        self.addCleanup(library_match_service.clear_memo)
+
+    def _resolve(self, fake: FakeJellyfin, page=PAGE):
+        with patch.object(jellyfin_client, "get_items", fake.get_items):
+            return asyncio.run(library_match_service.find_library_items(USER, page))
+
+    def test_page_is_resolved_in_one_batched_provider_lookup(self):
+        fake = FakeJellyfin()
+
+        results = self._resolve(fake)
+
+        self.assertEqual(len(fake.calls), 1)
+        self.assertEqual(
+            fake.calls[0]["any_provider_id_equals"],
+            ["Tmdb.603", "Tmdb.1399", "Tmdb.438631"],
+        )
+        self.assertEqual(results[("movie", 603)], "jf-movie-603")
+        self.assertEqual(results[("tv", 1399)], "jf-tv-1399")
+        self.assertIsNone(results[("movie", 438631)])
+        self.assertIsNone(results[("book", 42)])
+
+    def test_results_are_memoized_per_user(self):
+        fake = FakeJellyfin()
+        self._resolve(fake)
+        self._resolve(fake)
+        self.assertEqual(len(fake.calls), 1)
+
+        with patch.object(jellyfin_client, "get_items", fake.get_items):
+            asyncio.run(
+                library_match_service.find_library_items(
+                    {"user_id": "user-2", "jellyfin_token": "other"},
+                    PAGE,
+                )
+            )
+        self.assertEqual(len(fake.calls), 2)
+
+    def test_ignored_provider_filter_falls_back_to_bounded_concurrent_searches(self):
+        fake = FakeJellyfin(honour_provider_filter=False)
+
+        with patch.object(library_match_service.settings, "library_match_concurrency", 2):
+            results = self._resolve(fake)
+
+        self.assertEqual(results[("movie", 603)], "jf-movie-603")
+        self.assertEqual(results[("tv", 1399)], "jf-tv-1399")
+        self.assertIsNone(results[("movie", 438631)])
+        # One probing batched call, then one search per library title.
+        self.assertEqual(len(fake.calls), 4)
+        self.assertLessEqual(fake.max_in_flight, 2)
+
+        library_match_service._memo.clear()
+        self._resolve(fake, [("Inception", 27205, "movie")])
+        self.assertNotIn("any_provider_id_equals", fake.calls[-1])
+
+    def test_failed_title_searches_are_not_memoized(self):
+        fake = FakeJellyfin(honour_provider_filter=False, fail_titles={"The Matrix"})
+        results = self._resolve(fake)
+        self.assertIsNone(results[("movie", 603)])
+
+        fake.fail_titles.clear()
+        results = self._resolve(fake)
+        self.assertEqual(results[("movie", 603)], "jf-movie-603")
+
+
+if __name__ == "__main__":
+    unittest.main()
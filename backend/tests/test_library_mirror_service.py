@@ -0,0 +1,188 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from app.config import settings
+from app.services import library_match_service, library_mirror_service
+from app.services.jellyfin_client import jellyfin_client
+from tests.db_fixture import TempDatabaseTestCase
+
+
+def _item(item_id, item_type, name, tmdb=None, imdb=None, saved="2026-04-01T00:00:00.0000000Z"):
+    provider_ids = {}
+    if tmdb is not None:
+        provider_ids["Tmdb"] = str(tmdb)
+    if imdb is not None:
+        provider_ids["Imdb"] = imdb
+    return {"Id": item_id, "Type": item_type, "Name": name, "ProviderIds": provider_ids, "DateLastSaved": saved}
+
+
+class FakeLibrary:
+    def __init__(self, items):
+        self.items = list(items)
+        self.calls: list[dict] = []
+        self.on_fetch = None
+
+    async def get_library_page(self, user_id, token, start_index=0, limit=500, min_date_last_saved=None):
+        self.calls.append({"start_index": start_index, "min_date_last_saved": min_date_last_saved})
+        if self.on_fetch:
+            self.on_fetch()
+        items = [
+            item for item in self.items
+            if not min_date_last_saved or item["DateLastSaved"] >= min_date_last_saved
+        ]
+        return {"Items": items[start_index:start_index + limit], "TotalRecordCount": len(items)}
+
+
+class LibraryMirrorTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn.execute(
+            "INSERT INTO user_roles (user_id, username, role, jellyfin_token) VALUES ('admin-1', 'admin', 'admin', 'tok')"
+        )
+        self.conn.commit()
+        self.library = FakeLibrary(
+            [
+                _item("jf-1", "Movie", "The Matrix", tmdb=603, imdb="tt0133093"),
+                _item("jf-2", "Series", "Game of Thrones", tmdb=1399),
+                _item("jf-3", "Movie", "Home Video"),
+                _item("jf-4", "BoxSet", "Collection", tmdb=2344),
+            ]
+        )
+        library_match_service.clear_memo()
+
+    @asynccontextmanager
+    async def _connect(self):
+        self.checked_out += 1
+        try:
+            yield self.conn
+        finally:
+            self.checked_out -= 1
+
+    def _sync(self, **kwargs):
+        self.checked_out = 0
+        with patch.object(jellyfin_client, "get_library_page", self.library.get_library_page):
+            return asyncio.run(library_mirror_service.sync_library(self._connect, **kwargs))
+
+    def test_full_sync_populates_indexed_mirror(self):
+        self.assertFalse(library_mirror_service.mirror_ready(self.conn))
+
+        result = self._sync()
+
+        self.assertEqual(result["mode"], "full")
+        self.assertEqual(result["upserted"], 3)
+        self.assertTrue(library_mirror_service.mirror_ready(self.conn))
+        self.assertEqual(library_mirror_service.find_library_item(self.conn, "movie", 603), "jf-1")
+        self.assertIsNone(library_mirror_service.find_library_item(self.conn, "tv", 603))
+        self.assertEqual(
+            library_mirror_service.lookup_library_items(self.conn, [("movie", 603), ("tv", 1399), ("movie", 1)]),
+            {("movie", 603): "jf-1", ("tv", 1399): "jf-2", ("movie", 1): None},
+        )
+        imdb = self.conn.execute("SELECT imdb_id FROM library_items WHERE jellyfin_item_id = 'jf-1'").fetchone()[0]
+        self.assertEqual(imdb, "tt0133093")
+
+    def test_no_connection_is_held_while_fetching_from_jellyfin(self):
+        held_during_fetch = []
+        self.library.on_fetch = lambda: held_during_fetch.append(self.checked_out)
+
+        self._sync()
+
+        self.assertEqual(held_during_fetch, [0])
+
+    def test_mirror_goes_stale_when_full_syncs_stop_succeeding(self):
+        self._sync()
+        last_full = datetime.fromisoformat(library_mirror_service.get_sync_state(self.conn)["last_full_sync_at"])
+        max_age = timedelta(hours=library_mirror_service.MAX_MIRROR_AGE_HOURS)
+
+        self.assertTrue(library_mirror_service.mirror_ready(self.conn, now=last_full + max_age - timedelta(minutes=1)))
+        self.assertFalse(library_mirror_service.mirror_ready(self.conn, now=last_full + max_age))
+
+    def test_incremental_sync_fetches_only_recently_saved_items(self):
+        self._sync()
+        self.library.items.append(
+            _item("jf-5", "Movie", "Dune", tmdb=438631, saved="2026-05-01T00:00:00.0000000Z")
+        )
+
+        result = self._sync()
+
+        self.assertEqual(result["mode"], "incremental")
+        self.assertEqual(self.library.calls[-1]["min_date_last_saved"], "2026-04-01T00:00:00.0000000Z")
+        self.assertEqual(library_mirror_service.find_library_item(self.conn, "movie", 438631), "jf-5")
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM library_items").fetchone()[0], 4)
+
+    def test_full_sync_removes_items_no_longer_on_the_server(self):
+        self._sync()
+        self.library.items = [item for item in self.library.items if item["Id"] != "jf-2"]
+
+        result = self._sync(full=True)
+
+        self.assertEqual(result["removed"], 1)
+        self.assertIsNone(library_mirror_service.find_library_item(self.conn, "tv", 1399))
+
+    def test_open_requests_are_matched_by_tmdb_id(self):
+        self._sync()
+        self.conn.executemany(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('u1', 'alice', ?, ?, ?, ?)
+            """,
+            [
+                (603, "movie", "The Matrix", "pending"),
+                (1399, "movie", "Wrong type", "approved"),
+                (1399, "tv", "Game of Thrones", "denied"),
+            ],
+        )
+        self.conn.commit()
+
+        matches = library_mirror_service.get_open_requests_in_library(self.conn)
+
+        self.assertEqual([(m["title"], m["jellyfin_item_id"]) for m in matches], [("The Matrix", "jf-1")])
+
+    def test_library_match_uses_the_mirror_without_network(self):
+        self._sync()
+
+        async def unexpected(**kwargs):
+            raise AssertionError("Jellyfin should not be queried once the mirror is ready")
+
+        with patch.object(jellyfin_client, "get_items", unexpected):
+            results = asyncio.run(
+                library_match_service.find_library_items(
+                    {"user_id": "admin-1", "jellyfin_token": "tok", "is_admin": True},
+                    [("The Matrix", 603, "movie"), ("Dune", 438631, "movie")],
+                    conn=self.conn,
+                )
+            )
+
+        self.assertEqual(results, {("movie", 603): "jf-1", ("movie", 438631): None})
+
+    def test_non_admins_keep_their_own_library_visibility(self):
+        self._sync()
+        user = {"user_id": "kid", "jellyfin_token": "kid-token", "is_admin": False}
+        calls = []
+
+        async def restricted_library(**kwargs):
+            calls.append(kwargs["token"])
+            return {"Items": []}
+
+        with patch.object(jellyfin_client, "get_items", restricted_library):
+            results = asyncio.run(
+                library_match_service.find_library_items(user, [("The Matrix", 603, "movie")], conn=self.conn)
+            )
+        self.assertEqual(results, {("movie", 603): None})
+        self.assertEqual(calls, ["kid-token"])
+
+        library_match_service.clear_memo()
+        with patch.object(settings, "library_mirror_shared_visibility", True), patch.object(
+            jellyfin_client, "get_items", restricted_library
+        ):
+            shared = asyncio.run(
+                library_match_service.find_library_items(user, [("The Matrix", 603, "movie")], conn=self.conn)
+            )
+        self.assertEqual(shared, {("movie", 603): "jf-1"})
+        self.assertEqual(calls, ["kid-token"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import sqlite3
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app.services import request_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class SetBasedLifecycleRuleTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn.execute("DELETE FROM requests")
+        self.now = datetime(2026, 3, 21, 0, 0, tzinfo=timezone.utc)
+
+    def _request(self, title: str, status: str, created_at: str, *, supporters: int = 1, admin_note=None) -> int:
+        request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, admin_note, created_at, updated_at)
+            VALUES ('u1', 'alice', 1, 'movie', ?, ?, ?, ?, ?)
+            """,
+            (title, status, admin_note, created_at, created_at),
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'fan')",
+            [(request_id, f"s{index}") for index in range(supporters)],
+        )
+        return request_id
+
+    def _row(self, request_id: int) -> sqlite3.Row:
+        return self.conn.execute(
+            "SELECT admin_note, lifecycle_flags FROM requests WHERE id = ?", (request_id,)
+        ).fetchone()
+
+    def test_rules_tag_eligible_rows_once_and_report_timings(self):
+        escalate = self._request("Big Ask", "pending", "2026-03-01 00:00:00", supporters=3, admin_note="  Keep an eye on it")
+        fresh = self._request("Fresh Demand", "pending", "2026-03-20T00:00:00+00:00", supporters=5)
+        denied = self._request("Old Denial", "denied", "2026-02-01T00:00:00+00:00")
+        self.conn.commit()
+
+        first = request_service.run_request_lifecycle_rules(self.conn, now=self.now)
+        second = request_service.run_request_lifecycle_rules(self.conn, now=self.now)
+
+        self.assertEqual((first["escalated"], first["reminded"], first["auto_closed_denied"]), (1, 1, 1))
+        self.assertEqual((second["escalated"], second["reminded"], second["auto_closed_denied"]), (0, 0, 0))
+        self.assertEqual(set(first["timings_ms"]), {"escalation", "pending_reminder", "denied_auto_close"})
+        self.assertGreaterEqual(first["duration_ms"], 0)
+
+        escalated = self._row(escalate)
+        self.assertEqual(
+            escalated["admin_note"],
+            "Keep an eye on it\n\n"
+            "[AUTO-ESCALATED] High-demand request has been open 20 days with 3 supporters.\n\n"
+            "[AUTO-PENDING-REMINDER] Pending approval for 20 days.",
+        )
+        self.assertEqual(
+            escalated["lifecycle_flags"],
+            request_service.LIFECYCLE_FLAG_ESCALATED | request_service.LIFECYCLE_FLAG_PENDING_REMINDER,
+        )
+        self.assertEqual(self._row(fresh)["lifecycle_flags"], 0)
+        self.assertEqual(
+            self._row(denied)["admin_note"],
+            "[AUTO-CLOSED-DENIED] Denied request closed after 48 days without changes.",
+        )
+
+        history = self.conn.execute(
+            "SELECT request_id, old_status, new_status, changed_by FROM request_history ORDER BY id"
+        ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in history],
+            [
+                (escalate, "pending", "pending", "system"),
+                (escalate, "pending", "pending", "system"),
+                (denied, "denied", "denied", "system"),
+            ],
+        )
+
+        # The flags follow the note: clearing it re-arms both rules.
+        self.conn.execute("UPDATE requests SET admin_note = NULL WHERE id = ?", (escalate,))
+        self.conn.commit()
+        self.assertEqual(self._row(escalate)["lifecycle_flags"], 0)
+        rerun = request_service.run_request_lifecycle_rules(self.conn, now=self.now)
+        self.assertEqual((rerun["escalated"], rerun["reminded"]), (1, 1))
+
+    def test_rule_failure_rolls_back_the_whole_run(self):
+        self._request("Big Ask", "pending", "2026-03-01 00:00:00", supporters=3)
+        self.conn.commit()
+
+        with patch.object(request_service, "run_stale_denied_auto_close", side_effect=sqlite3.OperationalError("boom")):
+            with self.assertRaises(sqlite3.OperationalError):
+                request_service.run_request_lifecycle_rules(self.conn, now=self.now)
+
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM request_history").fetchone()[0], 0)
+        self.assertEqual(self.conn.execute("SELECT MAX(lifecycle_flags) FROM requests").fetchone()[0], 0)
+
+    def test_migration_carries_existing_markers_into_flags(self):
+        request_id = self._request("Tagged", "pending", "2026-03-01 00:00:00", admin_note="[AUTO-PENDING-REMINDER] old")
+        self.conn.commit()
+        self.conn.close()
+        raw = sqlite3.connect(self.db_path)
+        raw.execute("DROP INDEX idx_requests_status_created_epoch")
+        raw.execute("DROP TRIGGER trg_requests_lifecycle_flags_insert")
+        raw.execute("DROP TRIGGER trg_requests_lifecycle_flags_update")
+        raw.execute("ALTER TABLE requests DROP COLUMN lifecycle_flags")
+        raw.commit()
+        raw.close()
+
+        self.init_db()
+        self.conn = self.connect()
+
+        self.assertEqual(self._row(request_id)["lifecycle_flags"], request_service.LIFECYCLE_FLAG_PENDING_REMINDER)
+
+    def test_migration_resets_flags_that_no_longer_match_the_note(self):
+        request_id = self._request("Reopened", "pending", "2026-03-01 00:00:00", admin_note="Reopened by admin")
+        self.conn.commit()
+        self.conn.close()
+        raw = sqlite3.connect(self.db_path)
+        raw.execute("DROP TRIGGER trg_requests_lifecycle_flags_update")
+        raw.execute("UPDATE requests SET lifecycle_flags = 7 WHERE id = ?", (request_id,))
+        raw.commit()
+        raw.close()
+
+        self.init_db()
+        self.conn = self.connect()
+
+        self.assertEqual(self._row(request_id)["lifecycle_flags"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
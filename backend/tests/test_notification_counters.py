@@ -0,0 +1,93 @@
+import unittest
+
+from app.routers import notifications
+from app.services import notification_dispatcher
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class NotificationCounterTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('owner', 'owner', 77, 'movie', 'Popular Title', 'pending')
+            """
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'fan')",
+            [(self.request_id, user_id) for user_id in ("owner", "u1", "u2")],
+        )
+        self.conn.commit()
+
+    def connect(self):
+        conn = super().connect()
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _summary(self, user_id: str) -> dict:
+        return notifications.get_notification_summary.__wrapped__(user={"user_id": user_id}, db=self.conn)
+
+    def _aggregate(self, user_id: str) -> dict:
+        rows = self.conn.execute(
+            """
+            SELECT type, COUNT(*) AS total, SUM(is_read = 0) AS unread
+            FROM request_notifications WHERE user_id = ? GROUP BY type
+            """,
+            (user_id,),
+        ).fetchall()
+        return {
+            "total": sum(row["total"] for row in rows),
+            "unread": sum(row["unread"] for row in rows),
+            "by_type": {row["type"]: row["unread"] for row in rows},
+        }
+
+    def _seed_notifications(self):
+        notification_dispatcher.notify_supporters(self.conn, self.request_id, "status_changed", "Moved.")
+        notification_dispatcher.notify_supporters(self.conn, self.request_id, "comment_added", "Hi.", exclude_user_id="u1")
+        notification_dispatcher.notify_users(self.conn, self.request_id, ["u1"], "request_merged", "Merged.")
+        self.conn.commit()
+
+    def test_counters_track_inserts_reads_and_deletes(self):
+        self._seed_notifications()
+        self.assertEqual(
+            self._summary("u1"),
+            {"total": 2, "unread": 2, "by_type": {"status_changed": 1, "request_merged": 1}},
+        )
+
+        first = self.conn.execute("SELECT id FROM request_notifications WHERE user_id = 'u1' ORDER BY id").fetchone()[0]
+        notifications.mark_notification_read.__wrapped__(notification_id=first, user={"user_id": "u1"}, db=self.conn)
+        self.assertEqual(self._summary("u1")["by_type"], {"status_changed": 0, "request_merged": 1})
+        # Re-marking a read notification leaves the counters alone.
+        notifications.mark_notification_read.__wrapped__(notification_id=first, user={"user_id": "u1"}, db=self.conn)
+        notifications.mark_all_notifications_read.__wrapped__(user={"user_id": "u2"}, db=self.conn)
+        self.conn.execute("UPDATE request_notifications SET is_read = 0 WHERE user_id = 'owner' AND type = 'status_changed'")
+        self.conn.commit()
+
+        for user_id in ("owner", "u1", "u2"):
+            self.assertEqual(self._summary(user_id), self._aggregate(user_id))
+        self.assertEqual(self._summary("u2")["unread"], 0)
+
+        self.conn.execute("DELETE FROM requests WHERE id = ?", (self.request_id,))
+        self.conn.commit()
+        self.assertEqual(self._summary("u1"), {"total": 0, "unread": 0, "by_type": {}})
+
+    def test_migration_backfills_counters_from_history(self):
+        self._seed_notifications()
+        self.conn.execute("UPDATE request_notifications SET is_read = 1 WHERE type = 'comment_added'")
+        self.conn.commit()
+        expected = {user_id: self._aggregate(user_id) for user_id in ("owner", "u1", "u2")}
+        self.conn.execute("DROP TABLE notification_counters")
+        for name in ("insert", "update", "delete"):
+            self.conn.execute(f"DROP TRIGGER trg_notification_counters_{name}")
+        self.conn.commit()
+        self.conn.close()
+
+        self.init_db()
+        self.conn = self.connect()
+
+        self.assertEqual({user_id: self._summary(user_id) for user_id in expected}, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import sqlite3
+import unittest
+from unittest.mock import patch
+
+from app.config import settings
+from app.services import notification_dispatcher
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class NotificationDispatcherTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request_id = self._request(supporters=250)
+
+    def tearDown(self):
+        super().tearDown()
+
+    def _request(self, supporters: int) -> int:
+        request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('u0', 'owner', 77, 'movie', 'Popular Title', 'pending')
+            """
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'fan')",
+            [(request_id, f"u{index}") for index in range(supporters)],
+        )
+        self.conn.commit()
+        return request_id
+
+    def _notifications(self) -> list[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM request_notifications ORDER BY id").fetchall()
+
+    def _notify(self):
+        notification_dispatcher.notify_supporters(
+            self.conn,
+            self.request_id,
+            event_type="comment_added",
+            message="owner commented on this request.",
+            actor_user_id="u0",
+            actor_name="owner",
+            exclude_user_id="u0",
+        )
+
+    def test_fan_out_is_one_statement_for_any_number_of_supporters(self):
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        self._notify()
+        self.conn.set_trace_callback(None)
+
+        self.assertEqual(len({sql for sql in statements if "request_notifications" in sql}), 1)
+        rows = self._notifications()
+        self.assertEqual(len(rows), 249)
+        self.assertNotIn("u0", {row["user_id"] for row in rows})
+        self.assertTrue(all(row["actor_name"] == "owner" and row["type"] == "comment_added" for row in rows))
+
+        created = notification_dispatcher.notify_users(
+            self.conn, self.request_id, ["b", "a", "a"], event_type="request_merged", message="Merged."
+        )
+        self.assertEqual(created, 2)
+        self.assertEqual([row["user_id"] for row in self._notifications()[-2:]], ["a", "b"])
+
+    def test_outbox_defers_fan_out_to_the_drain(self):
+        other_id = self._request(supporters=3)
+        with patch.object(settings, "notification_outbox_enabled", True):
+            self._notify()
+            notification_dispatcher.notify_supporters_batch(
+                self.conn, [(other_id, "Moved.")], event_type="status_changed", actor_name="Admin"
+            )
+            created = notification_dispatcher.notify_users(
+                self.conn, other_id, {"x", "y"}, event_type="request_merged", message="Merged."
+            )
+            self.conn.commit()
+
+            self.assertEqual(created, 2)
+            self.assertEqual(self._notifications(), [])
+            self.assertEqual(notification_dispatcher.pending_outbox_events(self.conn), 3)
+
+            first = notification_dispatcher.drain_outbox(self.conn, batch_size=2)
+            second = notification_dispatcher.drain_outbox(self.conn, batch_size=2)
+            idle = notification_dispatcher.drain_outbox(self.conn, batch_size=2)
+
+        self.assertEqual(first, {"events": 2, "notifications": 249 + 3})
+        self.assertEqual(second, {"events": 1, "notifications": 2})
+        self.assertEqual(idle, {"events": 0, "notifications": 0})
+        self.assertEqual(notification_dispatcher.pending_outbox_events(self.conn), 0)
+
+        rows = self._notifications()
+        self.assertEqual(len(rows), 254)
+        self.assertEqual(
+            {(row["user_id"], row["type"]) for row in rows if row["request_id"] == other_id},
+            {
+                ("u0", "status_changed"),
+                ("u1", "status_changed"),
+                ("u2", "status_changed"),
+                ("x", "request_merged"),
+                ("y", "request_merged"),
+            },
+        )
+        self.assertTrue(all(row["created_at"] for row in rows))
+
+    def test_drain_keeps_identical_events_from_the_same_second(self):
+        other_id = self._request(supporters=2)
+        with patch.object(settings, "notification_outbox_enabled", True):
+            for _ in range(2):
+                notification_dispatcher.notify_supporters(
+                    self.conn, other_id, event_type="comment_added", message="owner commented on this request."
+                )
+            self.conn.execute("UPDATE notification_outbox SET created_at = '2026-03-01 12:00:00'")
+            self.conn.commit()
+
+            result = notification_dispatcher.drain_outbox(self.conn)
+
+        self.assertEqual(result, {"events": 2, "notifications": 4})
+        self.assertEqual(
+            sorted(row["user_id"] for row in self._notifications()),
+            ["u0", "u0", "u1", "u1"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
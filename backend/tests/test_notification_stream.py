@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import database
+from app.db_executor import run_db
+from app.routers import notifications
+from app.services import notification_bus, notification_dispatcher
+from tests.db_fixture import remove_database_files
+
+
+def _notify_and_commit(conn, request_id: int) -> None:
+    notification_dispatcher.notify_supporters(conn, request_id, "status_changed", "Moved.", exclude_user_id="owner")
+    conn.commit()
+
+
+def _read_all_and_commit(conn, user_id: str) -> None:
+    conn.execute("UPDATE request_notifications SET is_read = 1 WHERE user_id = ?", (user_id,))
+    conn.commit()
+    notification_bus.mark_pending(conn, [user_id])
+
+
+def _event(frame: str) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class NotificationStreamTests(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.db_patch = patch.object(database, "DB_PATH", self.db_path)
+        self.db_patch.start()
+        database.init_db()
+        conn = database.get_db_connection()
+        self.request_id = conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('owner', 'owner', 77, 'movie', 'Popular Title', 'pending')
+            """
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'fan')",
+            [(self.request_id, "owner"), (self.request_id, "fan-1")],
+        )
+        conn.execute(
+            "INSERT INTO request_notifications (request_id, user_id, type, message) VALUES (?, 'fan-1', 'old', 'Old.')",
+            (self.request_id,),
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        database.close_pools()
+        self.db_patch.stop()
+        remove_database_files(self.db_path)
+
+    def test_pending_rings_are_dropped_without_subscribers(self):
+        conn = database.get_db_connection()
+        try:
+            notification_bus.mark_pending(conn, ["fan-1"])
+            self.assertEqual(notification_bus.flush(conn), 0)
+        finally:
+            conn.close()
+
+    def test_stream_pushes_new_notifications_and_unread_deltas_after_commit(self):
+        async def scenario():
+            stream = notifications.notification_events("fan-1", heartbeat_seconds=0.05)
+            frames = [await anext(stream)]
+            # Idle: only keep-alive comments, no database reads.
+            with patch.object(notifications, "_stream_changes", side_effect=AssertionError("idle read")):
+                frames.append(await anext(stream))
+
+            async with database.get_pool().connection() as conn:
+                await run_db(conn, _notify_and_commit, self.request_id)
+            frames += [await anext(stream), await anext(stream)]
+
+            async with database.get_pool().connection() as conn:
+                await run_db(conn, _read_all_and_commit, "fan-1")
+            frames.append(await anext(stream))
+            self.assertEqual(notification_bus.subscriber_count(), 1)
+            await stream.aclose()
+            return frames
+
+        frames = asyncio.run(scenario())
+
+        self.assertEqual(notification_bus.subscriber_count(), 0)
+        self.assertEqual(_event(frames[0]), ("unread", {"unread": 1, "delta": 0}))
+        self.assertEqual(frames[1], ": keep-alive\n\n")
+        event, data = _event(frames[2])
+        self.assertEqual((event, data["type"], data["message"], data["is_read"]), ("notification", "status_changed", "Moved.", False))
+        self.assertTrue(frames[2].startswith(f"id: {data['id']}\n"))
+        self.assertEqual(_event(frames[3]), ("unread", {"unread": 2, "delta": 1}))
+        self.assertEqual(_event(frames[4]), ("unread", {"unread": 0, "delta": -2}))
+
+    def test_stream_replays_notifications_after_last_event_id(self):
+        async def scenario():
+            stream = notifications.notification_events("fan-1", last_event_id=0, heartbeat_seconds=0.05)
+            frames = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return frames
+
+        frames = asyncio.run(scenario())
+
+        self.assertEqual(_event(frames[0]), ("unread", {"unread": 1, "delta": 0}))
+        self.assertEqual(_event(frames[1])[1]["message"], "Old.")
+
+
+if __name__ == "__main__":
+    unittest.main()
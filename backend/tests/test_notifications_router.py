@@ -1,11 +1,15 @@
 import sqlite3
+import time
 import unittest
 
-from fastapi import FastAPI
+import jwt
+from fastapi import Depends, FastAPI
 from fastapi.testclient import TestClient
 
+from app import database
+from app.config import settings
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import STREAM_TICKET_SCOPE, get_current_user, get_stream_user
 from app.routers import notifications
 
 
@@ -49,6 +53,7 @@ class NotificationsRouterTests(unittest.TestCase):
               (1, 'user-1', 'status_changed', 'Moved to fulfilled', 'Tooney', 0, '2026-04-04T00:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         app = FastAPI()
         app.include_router(notifications.router, prefix='/api/notifications')
@@ -90,5 +95,56 @@ class NotificationsRouterTests(unittest.TestCase):
         self.assertEqual(body['by_type']['status_changed'], 0)
 
 
+class StreamTicketTests(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(notifications.router, prefix='/api/notifications')
+
+        @app.get('/stream-user')
+        async def stream_user(user: dict = Depends(get_stream_user)):
+            return user
+
+        def override_db():
+            yield None
+
+        app.dependency_overrides[get_db] = override_db
+        self.client = TestClient(app)
+        session = jwt.encode(
+            {'user_id': 'user-1', 'username': 'andrew', 'is_admin': False, 'jellyfin_token': 'jf-secret'},
+            settings.secret_key,
+            algorithm='HS256',
+        )
+        self.session = session
+        self.auth = {'Authorization': f'Bearer {session}'}
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_ticket_opens_the_stream_but_not_the_api(self):
+        response = self.client.post('/api/notifications/stream-ticket', headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['expires_in'], settings.notification_stream_ticket_ttl_seconds)
+        ticket = response.json()['ticket']
+
+        user = self.client.get('/stream-user', params={'ticket': ticket}).json()
+        self.assertEqual((user['user_id'], user['scope']), ('user-1', STREAM_TICKET_SCOPE))
+        self.assertNotIn('jellyfin_token', user)
+
+        for path in ('/api/notifications/summary', '/api/notifications/stream-ticket'):
+            method = self.client.post if path.endswith('ticket') else self.client.get
+            self.assertEqual(method(path, headers={'Authorization': f'Bearer {ticket}'}).status_code, 401)
+
+    def test_query_string_accepts_only_unexpired_tickets(self):
+        expired = jwt.encode(
+            {'user_id': 'user-1', 'scope': STREAM_TICKET_SCOPE, 'exp': int(time.time()) - 5},
+            settings.secret_key,
+            algorithm='HS256',
+        )
+        self.assertEqual(self.client.get('/stream-user', params={'access_token': self.session}).status_code, 401)
+        self.assertEqual(self.client.get('/stream-user', params={'ticket': self.session}).status_code, 401)
+        self.assertEqual(self.client.get('/stream-user', params={'ticket': expired}).status_code, 401)
+        self.assertEqual(self.client.get('/stream-user', headers=self.auth).status_code, 200)
+
+
 if __name__ == '__main__':
     unittest.main()
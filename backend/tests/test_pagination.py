@@ -0,0 +1,135 @@
+import unittest
+
+from app.routers import backlog
+from app.services import pagination, request_service
+from app.services.data_versions import read_data_version
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class KeysetPaginationTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        pagination.clear_counts()
+
+        statuses = ("pending", "approved", "fulfilled")
+        for index in range(23):
+            # Repeated timestamps and supporter counts force the id tiebreaker.
+            request_id = self.conn.execute(
+                """
+                INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at)
+                VALUES ('u1', 'alice', ?, 'movie', ?, ?, datetime('2026-05-01', ?))
+                """,
+                (index, f"Title {index}", statuses[index % 3], f"-{index % 4} days"),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'x')",
+                [(request_id, f"u{n + 1}") for n in range(index % 3 + 1)],
+            )
+        self.conn.commit()
+
+    def tearDown(self):
+        super().tearDown()
+
+    def _walk(self, fetch):
+        ids: list[int] = []
+        cursor = None
+        while True:
+            page = fetch(cursor)
+            ids.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids
+
+    def test_cursor_pages_match_offset_order_for_every_sort(self):
+        for sort in ("priority", "supporters", "newest", "oldest"):
+            with self.subTest(sort=sort):
+                expected = [
+                    item["id"]
+                    for item in request_service.get_household_queue(
+                        self.conn, user_id="u1", status="all", sort=sort, limit=100
+                    )["items"]
+                ]
+                walked = self._walk(
+                    lambda cursor: request_service.get_household_queue(
+                        self.conn, user_id="u1", status="all", sort=sort, limit=5,
+                        cursor=cursor, cursor_mode=True, include_total=False,
+                    )
+                )
+                self.assertEqual(len(expected), 23)
+                self.assertEqual(walked, expected)
+
+        admin_expected = [item["id"] for item in request_service.get_all_requests(self.conn, limit=100)["items"]]
+        admin_walked = self._walk(
+            lambda cursor: request_service.get_all_requests(self.conn, limit=4, cursor=cursor, cursor_mode=True)
+        )
+        self.assertEqual(admin_walked, admin_expected)
+
+        mine = self._walk(
+            lambda cursor: request_service.get_user_requests(self.conn, "u2", limit=3, cursor=cursor, cursor_mode=True)
+        )
+        self.assertEqual(len(mine), len(set(mine)))
+        self.assertEqual(len(mine), request_service.get_user_requests(self.conn, "u2", limit=100)["total"])
+
+    def test_cursor_mode_payload_and_invalid_cursors(self):
+        page = request_service.get_all_requests(self.conn, limit=5, cursor_mode=True, include_total=False)
+        self.assertIsNone(page["page"])
+        self.assertIsNone(page["total"])
+        self.assertIsNone(page["total_pages"])
+        self.assertIsNotNone(page["next_cursor"])
+
+        with self.assertRaises(ValueError):
+            request_service.get_all_requests(self.conn, cursor="not-a-cursor")
+        # A cursor is only valid for the sort that produced it.
+        with self.assertRaises(ValueError):
+            request_service.get_all_requests(self.conn, sort="newest", cursor=page["next_cursor"])
+
+    def test_cached_count_is_reused_until_the_data_version_moves(self):
+        sql = "SELECT COUNT(*) FROM requests r WHERE r.status = ?"
+        self.assertEqual(pagination.cached_count(self.conn, "requests", sql, ["pending"]), 8)
+
+        # Bypass the triggers: the cached value is served while the version is unchanged.
+        self.conn.execute("DROP TRIGGER trg_requests_version_update")
+        self.conn.execute("UPDATE requests SET status = 'pending' WHERE status = 'approved'")
+        self.conn.commit()
+        self.assertEqual(pagination.cached_count(self.conn, "requests", sql, ["pending"]), 8)
+
+        self.conn.execute("UPDATE data_versions SET version = version + 1 WHERE scope = 'requests'")
+        self.conn.commit()
+        self.assertEqual(pagination.cached_count(self.conn, "requests", sql, ["pending"]), 16)
+
+    def test_counts_read_inside_a_transaction_are_not_cached(self):
+        sql = "SELECT COUNT(*) FROM requests r WHERE r.status = ?"
+        self.conn.execute("UPDATE requests SET status = 'denied' WHERE status = 'pending'")
+        phantom_version = read_data_version(self.conn, "requests")
+        self.assertEqual(pagination.cached_count(self.conn, "requests", sql, ["pending"]), 0)
+        self.conn.rollback()
+
+        # Another write commits at the version the rolled-back update had.
+        self.conn.execute("UPDATE requests SET title = title || '!' WHERE status = 'pending'")
+        self.conn.commit()
+        self.assertEqual(read_data_version(self.conn, "requests"), phantom_version)
+        self.assertEqual(pagination.cached_count(self.conn, "requests", sql, ["pending"]), 8)
+
+    def test_backlog_cursor_pages(self):
+        self.conn.execute("DELETE FROM backlog")
+        self.conn.executemany(
+            "INSERT INTO backlog (user_id, username, type, title, created_at) VALUES ('u1', 'alice', 'bug', ?, '2026-05-01')",
+            [(f"Bug {n}",) for n in range(7)],
+        )
+        self.conn.commit()
+        admin = {"user_id": "admin", "is_admin": True}
+
+        def fetch(cursor):
+            return backlog.get_all_backlog.__wrapped__(
+                status=None, type=None, page=1, limit=3, pagination="cursor",
+                cursor=cursor, include_total=True, admin=admin, db=self.conn,
+            )
+
+        first = fetch(None)
+        self.assertEqual(first["total"], 7)
+        ids = [row[0] for row in self.conn.execute("SELECT id FROM backlog ORDER BY id DESC")]
+        self.assertEqual(self._walk(fetch), ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Hot request-path queries must be served by indexes.
+
+Each hot service call runs against a seeded database with the real schema;
+every statement it issues is captured and run through ``EXPLAIN QUERY PLAN``.
+A plan step that scans a whole table (``SCAN <table>`` without an index) fails
+the test, so a query rewrite or a dropped index that reintroduces a full
+scan is caught here.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import database
+from app.routers import comments, notifications
+from app.services import request_service
+from tests.db_fixture import remove_database_files
+
+# "SCAN r" / "SCAN requests" without "USING ... INDEX"; json_each and
+# subquery/CTE scans are not table scans.
+_FULL_SCAN = re.compile(r"^SCAN (?!.*\bUSING\b.*\bINDEX\b)(?!json_each\b)(?!\(subquery)(\w+)")
+
+
+class HotQueryPlanTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        with patch.object(database, "DB_PATH", cls.db_path):
+            database.init_db()
+        conn = sqlite3.connect(cls.db_path)
+        statuses = ("pending", "approved", "fulfilled", "fulfilled", "fulfilled", "denied")
+        for index in range(600):
+            status = statuses[index % len(statuses)]
+            request_id = conn.execute(
+                """
+                INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, datetime('now', ?))
+                """,
+                (
+                    f"u{index % 40}",
+                    f"user{index % 40}",
+                    1000 + index,
+                    "movie" if index % 3 else "tv",
+                    f"Title {index}",
+                    status,
+                    f"-{index % 90} days",
+                ),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, ?)",
+                [(request_id, f"u{(index + n) % 40}", "x") for n in range(index % 4 + 1)],
+            )
+            conn.execute(
+                "INSERT INTO request_history (request_id, old_status, new_status, changed_by) VALUES (?, 'pending', 'approved', 'u1')",
+                (request_id,),
+            )
+            if status == "fulfilled":
+                conn.execute(
+                    """
+                    INSERT INTO request_history (request_id, old_status, new_status, changed_by, created_at)
+                    VALUES (?, 'pending', 'fulfilled', 'system', datetime('now', ?))
+                    """,
+                    (request_id, f"-{index % 20} days"),
+                )
+            conn.executemany(
+                "INSERT INTO request_notifications (request_id, user_id, type, message) VALUES (?, ?, 'status_changed', 'm')",
+                [(request_id, f"u{(index + n) % 40}") for n in range(3)],
+            )
+            conn.execute(
+                "INSERT INTO request_comments (request_id, user_id, username, body) VALUES (?, 'u1', 'user1', 'hi')",
+                (request_id,),
+            )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_database_files(cls.db_path)
+
+    def setUp(self):
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def tearDown(self):
+        self.conn.rollback()
+        self.conn.close()
+
+    def _assert_no_full_scans(self, call):
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            self.conn.set_trace_callback(None)
+
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+        self.assertTrue(selects, "expected the call to issue queries")
+        for sql in selects:
+            plan = [row[3] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            scans = [step for step in plan if _FULL_SCAN.match(step)]
+            self.assertEqual(scans, [], f"full table scan in:\n{sql}\nplan: {plan}")
+
+    def test_household_queue(self):
+        self._assert_no_full_scans(lambda: request_service.get_household_queue(self.conn, user_id="u1"))
+
+    def test_user_requests(self):
+        self._assert_no_full_scans(lambda: request_service.get_user_requests(self.conn, "u1"))
+
+    def test_request_detail_and_timeline(self):
+        self._assert_no_full_scans(lambda: request_service.get_request_by_id(self.conn, 3, "u1"))
+        self._assert_no_full_scans(lambda: request_service.get_request_timeline(self.conn, 3))
+
+    def test_title_lookups(self):
+        self._assert_no_full_scans(lambda: request_service.get_community_request(self.conn, 1001, "movie", "u1"))
+        self._assert_no_full_scans(lambda: request_service.get_request_for_tmdb(self.conn, 1001, "movie", "u1"))
+        self._assert_no_full_scans(lambda: request_service._recently_fulfilled_for_tmdb(self.conn, 1002, "movie"))
+
+    def test_create_request(self):
+        self._assert_no_full_scans(
+            lambda: request_service.create_request(self.conn, "u99", "newbie", 1001, "movie", "Title 1", None)
+        )
+
+    def test_notifications_and_comments(self):
+        user = {"user_id": "u1", "is_admin": True}
+        self._assert_no_full_scans(lambda: notifications.list_notifications.__wrapped__(user=user, db=self.conn))
+        self._assert_no_full_scans(lambda: notifications.get_notification_summary.__wrapped__(user=user, db=self.conn))
+        self._assert_no_full_scans(lambda: comments.get_comments.__wrapped__(request_id=3, user=user, db=self.conn))
+
+
+if __name__ == "__main__":
+    unittest.main()
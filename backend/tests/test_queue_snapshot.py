@@ -0,0 +1,101 @@
+import sqlite3
+import unittest
+
+from app.services import queue_snapshot, request_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class QueueSnapshotTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        queue_snapshot.invalidate()
+
+    def tearDown(self):
+        queue_snapshot.invalidate()
+        super().tearDown()
+
+    def _request(self, tmdb_id, status="pending", supporters=1, age_days=0):
+        request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at)
+            VALUES ('u1', 'alice', ?, 'movie', ?, ?, datetime('now', ?))
+            """,
+            (tmdb_id, f"Title {tmdb_id}", status, f"-{age_days} days"),
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, 'x')",
+            [(request_id, f"u{n + 1}") for n in range(supporters)],
+        )
+        self.conn.commit()
+        return request_id
+
+    def test_positions_and_prefix_totals(self):
+        low = self._request(1, supporters=1, age_days=5)
+        top = self._request(2, status="approved", supporters=3, age_days=1)
+        middle = self._request(3, supporters=2, age_days=2)
+        closed = self._request(4, status="fulfilled", supporters=5)
+
+        snapshot = queue_snapshot.get_queue_snapshot(self.conn)
+
+        self.assertEqual(snapshot.request_ids, [top, middle, low])
+        self.assertEqual(snapshot.position(low), 3)
+        self.assertEqual(snapshot.ahead(low), (1, 5))
+        self.assertEqual(snapshot.ahead(top), (0, 0))
+        self.assertIsNone(snapshot.position(closed))
+
+        context = request_service.get_household_queue(self.conn, user_id="u1", sort="newest")
+        by_id = {item["id"]: item for item in context["items"]}
+        self.assertEqual(by_id[low]["queue_position"], 3)
+        self.assertEqual(by_id[low]["approved_ahead_count"], 1)
+        self.assertEqual(by_id[low]["supporters_ahead_count"], 5)
+        self.assertEqual(context["queue_version"], snapshot.version)
+
+    def test_uncommitted_reads_are_not_published(self):
+        other = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            self.conn.execute(
+                "INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status) "
+                "VALUES ('u1', 'alice', 1, 'movie', 'Phantom', 'pending')"
+            )
+            phantom = queue_snapshot.get_queue_snapshot(self.conn)
+            self.assertEqual(len(phantom.request_ids), 1)
+            self.conn.rollback()
+
+            # Another connection commits a different change at the same version.
+            committed = other.execute(
+                "INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status) "
+                "VALUES ('u2', 'bob', 2, 'movie', 'Real', 'approved')"
+            ).lastrowid
+            other.commit()
+
+            snapshot = queue_snapshot.get_queue_snapshot(self.conn)
+            self.assertEqual(snapshot.version, phantom.version)
+            self.assertEqual((snapshot.request_ids, snapshot.statuses), ([committed], ["approved"]))
+        finally:
+            other.close()
+
+    def test_snapshot_is_reused_until_the_queue_changes(self):
+        first = self._request(1)
+        second = self._request(2, supporters=2)
+        snapshot = queue_snapshot.get_queue_snapshot(self.conn)
+
+        # Notes and titles do not move the queue.
+        self.conn.execute("UPDATE requests SET admin_note = 'checking', title = 'Renamed' WHERE id = ?", (first,))
+        self.conn.commit()
+        self.assertIs(queue_snapshot.get_queue_snapshot(self.conn), snapshot)
+
+        request_service.create_request(self.conn, "u9", "newbie", 1, "movie", "Title 1", None)
+        rebuilt = queue_snapshot.get_queue_snapshot(self.conn)
+        self.assertGreater(rebuilt.version, snapshot.version)
+        self.assertEqual(rebuilt.request_ids, [first, second])
+
+        request_service.update_request_status(self.conn, second, "fulfilled", "admin", None)
+        self.assertEqual(queue_snapshot.get_queue_snapshot(self.conn).request_ids, [first])
+
+        self.conn.execute("DELETE FROM requests WHERE id = ?", (first,))
+        self.conn.commit()
+        self.assertEqual(queue_snapshot.get_queue_snapshot(self.conn).request_ids, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app import database
 from app.services import request_service
 
 
@@ -66,6 +67,7 @@ def make_db() -> sqlite3.Connection:
     conn = sqlite3.connect(":memory:")
     conn.row_factory = sqlite3.Row
     conn.executescript(SCHEMA)
+    database.add_maintained_request_columns(conn)
     conn.execute(
         "INSERT INTO sla_policy (id, target_days, warning_days) VALUES (1, 7, 2)"
     )
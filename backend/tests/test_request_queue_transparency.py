@@ -5,6 +5,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app import database
 from app.services import request_service
 
 
@@ -56,6 +57,7 @@ def make_db() -> sqlite3.Connection:
     conn = sqlite3.connect(":memory:")
     conn.row_factory = sqlite3.Row
     conn.executescript(SCHEMA)
+    database.add_maintained_request_columns(conn)
     conn.execute(
         "INSERT INTO sla_policy (id, target_days, warning_days) VALUES (1, 7, 2)"
     )
@@ -226,3 +228,47 @@ def test_household_queue_includes_open_summary_and_user_context():
     assert result["items"][0]["user_supporting"] is True
     assert result["items"][0]["queue_position"] == 1
     assert result["items"][1]["queue_position"] == 2
+
+
+def _reference_queue_context(open_rows):
+    contexts = {}
+    for idx, row in enumerate(open_rows):
+        ahead_rows = open_rows[:idx]
+        contexts[row["id"]] = {
+            "queue_position": idx + 1,
+            "approved_ahead_count": sum(1 for ahead in ahead_rows if ahead["status"] == "approved"),
+            "supporters_ahead_count": sum(int(ahead["supporter_count"] or 0) for ahead in ahead_rows),
+        }
+    return contexts
+
+
+def test_prefix_queue_context_matches_per_position_sums():
+    open_rows = [
+        {"id": idx, "status": "approved" if idx % 3 == 0 else "pending", "supporter_count": (idx * 7) % 5}
+        for idx in range(1, 41)
+    ]
+
+    contexts = request_service._build_queue_transparency_context(open_rows)
+    reference = _reference_queue_context(open_rows)
+
+    assert len(contexts) == len(open_rows)
+    for request_id, expected in reference.items():
+        actual = contexts[request_id]
+        assert actual["queue_position"] == expected["queue_position"]
+        assert actual["approved_ahead_count"] == expected["approved_ahead_count"]
+        assert actual["supporters_ahead_count"] == expected["supporters_ahead_count"]
+        assert actual["pending_ahead_count"] == actual["queue_ahead_count"] - expected["approved_ahead_count"]
+
+
+def test_queue_context_can_be_limited_to_selected_requests():
+    open_rows = [
+        {"id": idx, "status": "approved" if idx % 2 else "pending", "supporter_count": 2}
+        for idx in range(1, 21)
+    ]
+
+    full = request_service._build_queue_transparency_context(open_rows)
+    subset = request_service._build_queue_transparency_context(open_rows, request_ids={4, 17, 999})
+
+    assert set(subset) == {4, 17}
+    assert subset[4] == full[4]
+    assert subset[17] == full[17]
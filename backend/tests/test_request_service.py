@@ -1,8 +1,9 @@
 import sqlite3
 import unittest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
+from app import database
 from app.services import request_service
 
 
@@ -36,6 +37,7 @@ class GetAllRequestsFilteringTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         rows = [
             ("u1", "alice", 101, "movie", "Interstellar", "pending", None, "2026-03-10T10:00:00+00:00"),
@@ -164,6 +166,7 @@ class BulkStatusUpdateTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         rows = [
             ("u1", "alice", 101, "movie", "Interstellar", "pending", "2026-03-10T10:00:00+00:00"),
@@ -297,6 +300,7 @@ class RequestBlockerTests(unittest.TestCase):
             VALUES (1, 'u1', 'alice', '2026-04-01T10:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
     def tearDown(self):
         self.conn.close()
@@ -363,6 +367,7 @@ class RequestStatsAgingTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         rows = [
             ("u1", "alice", 111, "movie", "Old Pending", "pending", "2026-03-01T00:00:00+00:00"),
@@ -452,6 +457,7 @@ class HighDemandEscalationTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         # stale + high demand -> should escalate
         self.conn.execute(
@@ -569,6 +575,7 @@ class RequestNotificationTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.conn.execute(
             """
@@ -680,6 +687,7 @@ class DuplicateRequestConsolidationTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
     def tearDown(self):
         self.conn.close()
@@ -749,6 +757,16 @@ class DuplicateRequestConsolidationTests(unittest.TestCase):
         self.assertEqual(group["requests"][0]["id"], request_two)
         self.assertEqual(group["total_supporters"], 4)
 
+    def test_duplicate_groups_order_by_created_epoch_without_parsing_rows(self):
+        later = self.create_request("user-1", "alice", 900, "movie", "Heat", "pending", "2026-03-10 09:00:00")
+        earlier = self.create_request("user-2", "bob", 900, "movie", "Heat", "pending", "2026-03-10T08:00:00+00:00")
+        self.conn.commit()
+
+        with patch.object(request_service, "_parse_request_datetime", side_effect=AssertionError("parsed a row")):
+            groups = request_service.get_duplicate_request_groups(self.conn)
+
+        self.assertEqual([item["id"] for item in groups[0]["requests"]], [earlier, later])
+
     def test_merge_moves_supporters_preserves_target_and_notifies_impacted_users(self):
         target_request = self.create_request(
             "owner-1",
@@ -905,6 +923,7 @@ class LifecycleRuleAutomationTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         fixtures = [
             ("u1", "alice", 500, "movie", "Stale Pending", "pending", None, "2026-03-01T00:00:00+00:00", "2026-03-01T00:00:00+00:00"),
@@ -943,6 +962,31 @@ class LifecycleRuleAutomationTests(unittest.TestCase):
         stats = request_service.get_request_stats(self.conn)
         self.assertEqual(stats["closed_denied"], 1)
 
+    def test_rules_fire_again_after_a_reopen(self):
+        first = request_service.run_request_lifecycle_rules(
+            self.conn, now=datetime(2026, 3, 21, 0, 0, tzinfo=timezone.utc)
+        )
+        self.assertEqual((first["reminded"], first["auto_closed_denied"]), (1, 1))
+        rows = {
+            row["title"]: row["id"]
+            for row in self.conn.execute("SELECT id, title FROM requests")
+        }
+
+        # Reopen and deny the closed request again; send the reminded one back to pending.
+        request_service.update_request_status(self.conn, rows["Stale Denied"], "pending", "admin", admin_note="Reopened")
+        request_service.update_request_status(self.conn, rows["Stale Denied"], "denied", "admin", admin_note="Still no")
+        request_service.update_request_status(self.conn, rows["Stale Pending"], "approved", "admin")
+        request_service.update_request_status(self.conn, rows["Stale Pending"], "pending", "admin", admin_note="Back in queue")
+
+        later = datetime.utcnow().replace(tzinfo=timezone.utc) + timedelta(days=20)
+        second = request_service.run_request_lifecycle_rules(self.conn, now=later)
+        self.assertEqual((second["reminded"], second["auto_closed_denied"]), (1, 1))
+
+        denied = self.conn.execute(
+            "SELECT admin_note FROM requests WHERE id = ?", (rows["Stale Denied"],)
+        ).fetchone()
+        self.assertTrue(denied["admin_note"].startswith("Still no\n\n[AUTO-CLOSED-DENIED]"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1023,6 +1067,7 @@ class SlaPolicyAndWorklistTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.conn.execute("INSERT INTO sla_policy (id, target_days, warning_days, updated_at) VALUES (1, 7, 2, '2026-03-01T00:00:00+00:00')")
         self.conn.execute("INSERT INTO user_roles (user_id, username, role) VALUES ('admin-1', 'Casey Admin', 'admin')")
@@ -1157,6 +1202,7 @@ class UserRequestTransparencyHintsTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.conn.execute("INSERT INTO sla_policy (id, target_days, warning_days, updated_at) VALUES (1, 7, 2, '2026-03-01T00:00:00+00:00')")
 
@@ -1283,6 +1329,7 @@ class RequestTimelineTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         self.conn.execute(
             """
@@ -1384,6 +1431,7 @@ class RequesterDigestPackTests(unittest.TestCase):
             VALUES (1, 7, 2, '2026-04-01T00:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
 
         requests = [
             ("u1", "alice", 101, "movie", "Late Movie", "pending", "2026-03-25T10:00:00+00:00"),
@@ -1458,3 +1506,102 @@ class RequesterDigestPackTests(unittest.TestCase):
 
         usernames = [item["username"] for item in result["items"]]
         self.assertNotIn("bob", usernames)
+
+
+class BatchedSerializerTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(
+            """
+            CREATE TABLE requests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                username TEXT NOT NULL,
+                tmdb_id INTEGER NOT NULL,
+                media_type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                poster_path TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                admin_note TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT,
+                jellyfin_item_id TEXT
+            );
+            CREATE TABLE request_supporters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                username TEXT NOT NULL,
+                created_at TEXT,
+                UNIQUE(request_id, user_id)
+            );
+            CREATE TABLE request_blockers (
+                request_id INTEGER PRIMARY KEY,
+                reason TEXT NOT NULL,
+                note TEXT,
+                review_on TEXT NOT NULL,
+                updated_by TEXT NOT NULL,
+                created_at TEXT,
+                updated_at TEXT
+            );
+            """
+        )
+        database.add_maintained_request_columns(self.conn)
+        for index in range(60):
+            created_at = f"2026-04-{(index % 28) + 1:02d}T10:00:00+00:00"
+            cur = self.conn.execute(
+                """
+                INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at, updated_at)
+                VALUES (?, ?, ?, 'movie', ?, 'pending', ?, ?)
+                """,
+                (f"u{index}", f"user{index}", 1000 + index, f"Title {index}", created_at, created_at),
+            )
+            self.conn.execute(
+                "INSERT INTO request_supporters (request_id, user_id, username, created_at) VALUES (?, ?, ?, ?)",
+                (cur.lastrowid, f"u{index}", f"user{index}", created_at),
+            )
+        self.conn.execute(
+            "INSERT INTO request_supporters (request_id, user_id, username, created_at) VALUES (3, 'viewer', 'viewer', '2026-04-30T10:00:00+00:00')"
+        )
+        self.conn.execute(
+            """
+            INSERT INTO request_blockers (request_id, reason, review_on, updated_by)
+            VALUES (3, 'Waiting for release', '2026-04-20', 'admin-1')
+            """
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _count_statements(self, fn) -> int:
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            fn()
+        finally:
+            self.conn.set_trace_callback(None)
+        return len(statements)
+
+    def test_query_count_is_independent_of_page_size(self):
+        small = self._count_statements(
+            lambda: request_service.get_all_requests(self.conn, sort="oldest", page=1, limit=5)
+        )
+        large = self._count_statements(
+            lambda: request_service.get_all_requests(self.conn, sort="oldest", page=1, limit=50)
+        )
+
+        self.assertEqual(small, large)
+
+    def test_batched_rows_match_single_row_serialization(self):
+        rows = self.conn.execute("SELECT * FROM requests ORDER BY id ASC").fetchall()
+
+        batched = request_service._serialize_requests(self.conn, rows, "viewer")
+        single = [request_service._serialize_request(self.conn, row, "viewer") for row in rows]
+
+        self.assertEqual(batched, single)
+        self.assertTrue(batched[2]["user_supporting"])
+        self.assertEqual(batched[2]["supporters"], ["user2", "viewer"])
+        self.assertEqual(batched[2]["blocker_reason"], "Waiting for release")
+        self.assertFalse(batched[0]["user_supporting"])
@@ -4,6 +4,7 @@ import unittest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app import database
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.routers import requests
@@ -56,6 +57,7 @@ class RequestTimelineRouteTests(unittest.TestCase):
             );
             """
         )
+        database.add_maintained_request_columns(self.conn)
         self.conn.execute(
             """
             INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at, updated_at)
@@ -169,6 +171,7 @@ class HouseholdQueueRouteTests(unittest.TestCase):
             VALUES (1, 7, 2, '2026-04-01T00:00:00+00:00');
             """
         )
+        database.add_maintained_request_columns(self.conn)
         self.conn.execute(
             "INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at, updated_at) VALUES ('owner-1', 'Alice', 101, 'movie', 'The Matrix', 'approved', '2026-04-01T00:00:00+00:00', '2026-04-01T00:00:00+00:00')"
         )
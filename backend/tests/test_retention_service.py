@@ -0,0 +1,147 @@
+import sqlite3
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app import database
+from app.config import settings
+from app.routers import notifications
+from app.services import retention_service
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class RetentionServiceTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = datetime(2026, 6, 1, tzinfo=timezone.utc)
+        self.closed = self._request("fulfilled")
+        self.open = self._request("pending")
+        self.settings = patch.multiple(
+            settings,
+            retention_notification_read_days=30,
+            retention_notification_unread_days=180,
+            retention_notification_type_days="comment_added=0,sla_escalated=7",
+            retention_comment_days=30,
+            retention_history_note_days=30,
+            retention_archive_enabled=True,
+        )
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        super().tearDown()
+
+    def connect(self):
+        with patch.object(database, "DB_PATH", self.db_path):
+            return database.get_db_connection()
+
+    def _request(self, status: str) -> int:
+        return self.conn.execute(
+            "INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status) VALUES ('u1', 'alice', 1, 'movie', 'T', ?)",
+            (status,),
+        ).lastrowid
+
+    def _notifications(self, count: int, type_: str, is_read: int, created_at: str, user_id: str = "u1") -> None:
+        self.conn.executemany(
+            "INSERT INTO request_notifications (request_id, user_id, type, message, is_read, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.open, user_id, type_, "x" * 2000, is_read, created_at)] * count,
+        )
+
+    def _count(self, sql: str) -> int:
+        return self.conn.execute(sql).fetchone()[0]
+
+    def _seed(self):
+        self._notifications(40, "status_changed", 1, "2026-03-10 08:00:00")
+        self._notifications(20, "status_changed", 1, "2026-04-02T09:00:00+00:00", user_id="u2")
+        self._notifications(5, "status_changed", 1, "2026-05-20 08:00:00")  # recent
+        self._notifications(5, "status_changed", 0, "2026-03-10 08:00:00")  # unread, within 180 days
+        self._notifications(3, "status_changed", 0, "2025-10-01 08:00:00")  # unread, too old
+        self._notifications(4, "comment_added", 1, "2025-01-01 08:00:00")  # type kept forever
+        self._notifications(6, "sla_escalated", 1, "2026-05-20 08:00:00")  # override: 7 days
+        for request_id in (self.closed, self.open):
+            self.conn.execute(
+                "INSERT INTO request_comments (request_id, user_id, username, body, created_at) VALUES (?, 'u1', 'alice', 'old', '2026-01-01 00:00:00')",
+                (request_id,),
+            )
+        self.conn.executemany(
+            """
+            INSERT INTO request_history (request_id, old_status, new_status, changed_by, created_at)
+            VALUES (?, ?, ?, 'system', '2026-01-01 00:00:00')
+            """,
+            [
+                (self.open, "pending", "pending"),
+                (self.closed, "approved", "fulfilled"),
+                (self.closed, "fulfilled", "fulfilled"),
+            ],
+        )
+        self.conn.commit()
+
+    def test_policies_remove_old_rows_in_batches_and_report_space(self):
+        self._seed()
+
+        result = retention_service.run_retention(self.conn, now=self.now, batch_size=8)
+
+        self.assertTrue(result["complete"])
+        self.assertEqual(
+            {name: policy["rows"] for name, policy in result["policies"].items()},
+            {
+                "notifications_read:sla_escalated": 6,
+                "notifications_read": 60,
+                "notifications_unread": 3,
+                "comments": 1,
+                "history_notes": 1,
+            },
+        )
+        self.assertEqual(result["rows_removed"], 71)
+        self.assertEqual(result["rows_archived"], 71)
+        self.assertEqual(result["batches"], 1 + 8 + 1 + 1 + 1)
+        self.assertGreater(result["freed_bytes"], 0)
+        self.assertGreater(result["reclaimed_bytes"], 0)
+
+        self.assertEqual(self._count("SELECT COUNT(*) FROM request_notifications"), 5 + 5 + 4)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM request_notifications_archive"), 69)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM request_comments WHERE request_id = %d" % self.open), 1)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM request_history"), 2)
+        digests = self.conn.execute(
+            "SELECT user_id, type, month, notifications FROM notification_digests ORDER BY user_id, type, month"
+        ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in digests],
+            [("u1", "sla_escalated", "2026-05", 6), ("u1", "status_changed", "2026-03", 40), ("u2", "status_changed", "2026-04", 20)],
+        )
+        # Counters follow the deletes, so the summary stays exact.
+        summary = notifications.get_notification_summary.__wrapped__(user={"user_id": "u1"}, db=self.conn)
+        self.assertEqual(summary, {"total": 14, "unread": 5, "by_type": {"status_changed": 5, "comment_added": 0}})
+
+        again = retention_service.run_retention(self.conn, now=self.now, batch_size=8)
+        self.assertEqual((again["rows_removed"], again["batches"]), (0, 0))
+
+    def test_run_stops_at_time_budget_and_resumes(self):
+        self._seed()
+
+        stopped = retention_service.run_retention(self.conn, now=self.now, time_budget_seconds=0)
+        self.assertEqual((stopped["complete"], stopped["batches"], stopped["rows_removed"]), (False, 0, 0))
+
+        resumed = retention_service.run_retention(self.conn, now=self.now)
+        self.assertTrue(resumed["complete"])
+        self.assertEqual(resumed["rows_removed"], 71)
+
+    def test_zero_days_disable_policies(self):
+        with patch.multiple(
+            settings,
+            retention_notification_read_days=0,
+            retention_notification_unread_days=0,
+            retention_notification_type_days="",
+            retention_comment_days=0,
+            retention_history_note_days=0,
+        ):
+            self.assertEqual(retention_service.retention_policies(self.now), [])
+
+    def test_partial_schema_without_tables_is_a_no_op(self):
+        conn = sqlite3.connect(":memory:")
+        result = retention_service.run_retention(conn, now=self.now)
+        self.assertEqual((result["rows_removed"], result["complete"]), (0, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@ import sqlite3
 import unittest
 from datetime import datetime, timezone
 
+from app import database
 from app.services import series_continuation_service as scs
 
 
@@ -62,6 +63,7 @@ def _make_conn() -> sqlite3.Connection:
         );
         """
     )
+    database.add_maintained_request_columns(conn)
     return conn
 
 
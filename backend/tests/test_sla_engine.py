@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from app.services import sla_engine
+from app.services.sla_engine import SLAEngine
+
+
+def _brute_force(lead_times, open_ages, target):
+    warning = sla_engine.warning_days_for(target)
+    return {
+        "within": sum(1 for value in lead_times if value <= target),
+        "breaching": sum(1 for age in open_ages if age > target),
+        "due_soon": sum(1 for age in open_ages if target - warning <= age <= target),
+    }
+
+
+class SLAEngineTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.lead_times = [round(rng.uniform(0, 40), 2) for _ in range(500)] + [3.0, 7.0, 7.0]
+        self.open_ages = [rng.randint(0, 60) for _ in range(300)]
+        self.targets = list(range(1, 91))
+
+    def _assert_matches_brute_force(self, engine):
+        scenarios = engine.evaluate(self.targets)
+        for scenario in scenarios:
+            expected = _brute_force(self.lead_times, self.open_ages, scenario["target_days"])
+            self.assertEqual(scenario["historical_within_count"], expected["within"])
+            self.assertEqual(scenario["open_breaching"], expected["breaching"])
+            self.assertEqual(scenario["open_due_soon"], expected["due_soon"])
+            self.assertEqual(
+                scenario["historical_hit_rate"],
+                round(expected["within"] / len(self.lead_times) * 100, 1),
+            )
+
+    def test_bisect_fallback_matches_brute_force(self):
+        self._assert_matches_brute_force(SLAEngine(self.lead_times, self.open_ages, use_numpy=False))
+
+    @unittest.skipUnless(sla_engine.NUMPY_AVAILABLE, "numpy not installed")
+    def test_numpy_engine_matches_brute_force(self):
+        engine = SLAEngine(self.lead_times, self.open_ages, use_numpy=True)
+        self.assertTrue(engine.use_numpy)
+        self._assert_matches_brute_force(engine)
+
+    def test_empty_samples(self):
+        scenario = SLAEngine().evaluate([7])[0]
+        self.assertIsNone(scenario["historical_hit_rate"])
+        self.assertEqual(scenario["historical_within_count"], 0)
+        self.assertEqual((scenario["open_breaching"], scenario["open_due_soon"]), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from app.services import request_service
+from app.services.request_columns import supporter_count_sql
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class SupporterCountTests(TempDatabaseTestCase):
+    def _request(self, tmdb_id, status="pending"):
+        request_id = self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status)
+            VALUES ('u1', 'alice', ?, 'movie', ?, ?)
+            """,
+            (tmdb_id, f"Title {tmdb_id}", status),
+        ).lastrowid
+        self.conn.commit()
+        return request_id
+
+    def _support(self, request_id, *user_ids):
+        self.conn.executemany(
+            "INSERT INTO request_supporters (request_id, user_id, username) VALUES (?, ?, ?)",
+            [(request_id, user_id, user_id) for user_id in user_ids],
+        )
+        self.conn.commit()
+
+    def _count(self, request_id):
+        return self.conn.execute("SELECT supporter_count FROM requests WHERE id = ?", (request_id,)).fetchone()[0]
+
+    def test_triggers_track_inserts_deletes_and_moves(self):
+        first = self._request(1)
+        second = self._request(2)
+        self._support(first, "u1", "u2", "u3")
+        self._support(second, "u4")
+        self.assertEqual((self._count(first), self._count(second)), (3, 1))
+
+        self.conn.execute("DELETE FROM request_supporters WHERE request_id = ? AND user_id = 'u3'", (first,))
+        self.conn.execute("UPDATE request_supporters SET request_id = ? WHERE user_id = 'u4'", (first,))
+        self.conn.commit()
+        self.assertEqual((self._count(first), self._count(second)), (3, 0))
+
+    def test_init_db_backfills_existing_rows(self):
+        request_id = self._request(1)
+        self._support(request_id, "u1", "u2")
+        self.conn.executescript(
+            """
+            DROP INDEX idx_requests_status_supporters;
+            DROP INDEX idx_requests_open_priority;
+            DROP TRIGGER trg_supporter_count_insert;
+            DROP TRIGGER trg_supporter_count_delete;
+            DROP TRIGGER trg_supporter_count_move;
+            DROP TRIGGER trg_open_queue_version_update;
+            ALTER TABLE requests DROP COLUMN supporter_count;
+            """
+        )
+
+        self.init_db()
+
+        self.assertEqual(self._count(request_id), 2)
+
+    def test_open_queue_reads_the_column_in_index_order(self):
+        statuses = ("pending", "approved", "fulfilled", "fulfilled", "fulfilled", "denied")
+        for tmdb_id in range(600):
+            request_id = self._request(tmdb_id, status=statuses[tmdb_id % len(statuses)])
+            self._support(request_id, *[f"u{n}" for n in range(tmdb_id % 5 + 1)])
+        self.conn.execute("ANALYZE")
+
+        plan = " ".join(
+            row[3]
+            for row in self.conn.execute(
+                f"""
+                EXPLAIN QUERY PLAN
+                SELECT r.*, {supporter_count_sql()} AS supporter_count
+                FROM requests r
+                WHERE r.status IN ('pending', 'approved')
+                ORDER BY supporter_count DESC, r.created_at ASC, r.id ASC
+                """
+            )
+        )
+        self.assertIn("idx_requests_open_priority", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        self.assertNotIn("request_supporters", plan)
+
+        queue = request_service.get_household_queue(self.conn, user_id="u1", sort="supporters")
+        counts = [item["supporter_count"] for item in queue["items"]]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_list_paths_do_not_probe_the_schema(self):
+        request_id = self._request(1)
+        self._support(request_id, "u1", "u2")
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            request_service.get_household_queue(self.conn, user_id="u1", sort="supporters")
+            request_service.get_all_requests(self.conn)
+            request_service.run_request_lifecycle_rules(self.conn)
+        finally:
+            self.conn.set_trace_callback(None)
+
+        self.assertTrue(statements)
+        self.assertEqual([sql for sql in statements if "table_info" in sql or "LIMIT 0" in sql], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
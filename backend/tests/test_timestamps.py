@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from app.services import lead_time_service, request_service, timestamps
+from app.services.data_versions import read_data_version
+from tests.db_fixture import TempDatabaseTestCase
+
+
+class CreatedEpochColumnTests(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        lead_time_service.invalidate()
+
+    def tearDown(self):
+        lead_time_service.invalidate()
+        super().tearDown()
+
+    def _insert_request(self, created_at: str) -> int:
+        return self.conn.execute(
+            """
+            INSERT INTO requests (user_id, username, tmdb_id, media_type, title, status, created_at)
+            VALUES ('u1', 'alice', 1, 'movie', 'Title', 'pending', ?)
+            """,
+            (created_at,),
+        ).lastrowid
+
+    def _epoch(self, table: str, row_id: int) -> int | None:
+        return self.conn.execute(f"SELECT created_at_epoch FROM {table} WHERE id = ?", (row_id,)).fetchone()[0]
+
+    def test_triggers_stamp_epochs_for_every_timestamp_format(self):
+        expected = int(datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc).timestamp())
+        formats = (
+            "2026-03-01 12:30:00",
+            "2026-03-01T12:30:00",
+            "2026-03-01T12:30:00.250000",
+            "2026-03-01T12:30:00+00:00",
+            "2026-03-01T14:30:00+02:00",
+        )
+        for created_at in formats:
+            with self.subTest(created_at=created_at):
+                self.assertEqual(self._epoch("requests", self._insert_request(created_at)), expected)
+
+        request_id = self._insert_request("not a timestamp")
+        self.assertIsNone(self._epoch("requests", request_id))
+        self.conn.execute("UPDATE requests SET created_at = '2026-03-02 12:30:00' WHERE id = ?", (request_id,))
+        self.assertEqual(self._epoch("requests", request_id), expected + 86400)
+
+        history_id = self.conn.execute(
+            """
+            INSERT INTO request_history (request_id, old_status, new_status, changed_by, created_at)
+            VALUES (?, 'pending', 'approved', 'admin', '2026-03-01T12:30:00+00:00')
+            """,
+            (request_id,),
+        ).lastrowid
+        self.assertEqual(self._epoch("request_history", history_id), expected)
+
+    def test_ages_and_lead_times_come_from_epochs(self):
+        now = datetime.now(timezone.utc)
+        request_id = self._insert_request((now - timedelta(days=10, hours=1)).isoformat())
+        self.conn.execute(
+            """
+            INSERT INTO request_history (request_id, old_status, new_status, changed_by, created_at)
+            VALUES (?, 'approved', 'fulfilled', 'system', ?)
+            """,
+            (request_id, (now - timedelta(days=6, hours=1)).strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        open_id = self._insert_request((now - timedelta(days=4, hours=1)).strftime("%Y-%m-%d %H:%M:%S"))
+        self.conn.commit()
+
+        version = read_data_version(self.conn, "lead_times")
+        store = lead_time_service.get_lead_time_store(self.conn)
+        # Stamping the history row's epoch is not a second lead-time change.
+        self.assertEqual(store.version, version)
+        self.assertEqual(store.overall.values, [4.0])
+        self.assertEqual([lead for _, lead in store.fulfilled_since(now - timedelta(days=7))], [4.0])
+
+        row = self.conn.execute("SELECT * FROM requests WHERE id = ?", (open_id,)).fetchone()
+        self.assertEqual(request_service._serialize_request(self.conn, row)["days_open"], 4)
+        self.assertEqual(request_service.get_request_stats(self.conn)["oldest_open_days"], 10)
+        self.assertEqual(timestamps.days_between(timestamps.row_created_epoch(row), timestamps.now_epoch()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.services import tmdb_cache
+from app.services.tmdb_cache import ResponseCache, SQLiteCacheTier
+from tests.db_fixture import remove_database_files
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_hits_are_served_from_memory_until_ttl_expires(self):
+        cache = ResponseCache(max_entries=10)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return f'{{"call": {len(calls)}}}'
+
+        async def scenario():
+            first = await cache.get_or_fetch("movie/1", 60, fetch)
+            second = await cache.get_or_fetch("movie/1", 60, fetch)
+            expired = await cache.get_or_fetch("movie/2", 0, fetch)
+            refetched = await cache.get_or_fetch("movie/2", 0, fetch)
+            return first, second, expired, refetched
+
+        first, second, expired, refetched = asyncio.run(scenario())
+        self.assertEqual(first, second)
+        self.assertNotEqual(expired, refetched)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+
+        async def fetch():
+            return "{}"
+
+        async def scenario():
+            await cache.get_or_fetch("a", 60, fetch)
+            await cache.get_or_fetch("b", 60, fetch)
+            await cache.get_or_fetch("a", 60, fetch)  # "b" is now least recent
+            await cache.get_or_fetch("c", 60, fetch)
+
+        asyncio.run(scenario())
+        self.assertEqual(list(cache._entries), ["a", "c"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_concurrent_misses_share_one_upstream_call(self):
+        cache = ResponseCache(max_entries=10)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return '{"id": 1}'
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get_or_fetch("tv/1", 60, fetch) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, ['{"id": 1}'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["coalesced"], 4)
+
+    def test_cancelled_caller_does_not_cancel_coalesced_followers(self):
+        cache = ResponseCache(max_entries=10)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return '{"id": 2}'
+
+        async def scenario():
+            leader = asyncio.create_task(cache.get_or_fetch("tv/2", 60, fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(cache.get_or_fetch("tv/2", 60, fetch))
+            await asyncio.sleep(0)
+            leader.cancel()  # e.g. the client that triggered the fetch disconnected
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        self.assertEqual(asyncio.run(scenario()), '{"id": 2}')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache._entries["tv/2"][1], '{"id": 2}')
+
+    def test_failures_are_not_cached(self):
+        cache = ResponseCache(max_entries=10)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("upstream down")
+            return "{}"
+
+        async def scenario():
+            with self.assertRaises(RuntimeError):
+                await cache.get_or_fetch("movie/9", 60, flaky)
+            return await cache.get_or_fetch("movie/9", 60, flaky)
+
+        self.assertEqual(asyncio.run(scenario()), "{}")
+        self.assertEqual(len(attempts), 2)
+
+    def test_persistent_tier_survives_a_new_cache(self):
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        first_tier = SQLiteCacheTier(path)
+        second_tier = SQLiteCacheTier(path)
+        try:
+            async def fetch():
+                return '{"title": "Heat"}'
+
+            async def unreachable():
+                raise AssertionError("should have been served from the persistent tier")
+
+            async def scenario():
+                await ResponseCache(10, persistent=first_tier).get_or_fetch("movie/949", 60, fetch)
+                restarted = ResponseCache(10, persistent=second_tier)
+                payload = await restarted.get_or_fetch("movie/949", 60, unreachable)
+                return restarted, payload
+
+            restarted, payload = asyncio.run(scenario())
+            self.assertEqual(payload, '{"title": "Heat"}')
+            self.assertEqual(restarted.stats()["persistent_hits"], 1)
+            self.assertEqual(restarted.stats()["misses"], 0)
+        finally:
+            first_tier.close()
+            second_tier.close()
+            remove_database_files(path)
+
+    def test_persistent_tier_prunes_expired_rows_periodically(self):
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        tier = SQLiteCacheTier(path)
+        try:
+            async def scenario():
+                with patch("app.services.tmdb_cache.time.time", return_value=1_000):
+                    await tier.set("fresh", "{}", 5_000)
+                    await tier.set("expired", "{}", 900)
+                    await tier.set("also-expired", "{}", 900)
+
+                def keys(conn):
+                    return [row[0] for row in conn.execute("SELECT key FROM tmdb_cache ORDER BY key")]
+
+                # The first write pruned; later ones within the interval do not.
+                before = await tmdb_cache.run_db(tier._connection(), keys)
+                with patch("app.services.tmdb_cache.time.time", return_value=1_000 + tmdb_cache.PRUNE_INTERVAL_SECONDS):
+                    await tier.set("next", "{}", 9_000)
+                after = await tmdb_cache.run_db(tier._connection(), keys)
+                return before, after
+
+            before, after = asyncio.run(scenario())
+            self.assertEqual(before, ["also-expired", "expired", "fresh"])
+            self.assertEqual(after, ["fresh", "next"])
+            plan = tier._connection().execute(
+                "EXPLAIN QUERY PLAN DELETE FROM tmdb_cache WHERE expires_at <= 1"
+            ).fetchall()
+            self.assertIn("idx_tmdb_cache_expires_at", " ".join(row[3] for row in plan))
+        finally:
+            tier.close()
+            remove_database_files(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,68 @@ export async function getNotificationSummary(): Promise<NotificationSummary> {
   return data
 }
 
+export interface NotificationStreamHandlers {
+  onUnread: (unread: number, delta: number) => void
+  onNotification: (notification: NotificationRecord) => void
+  // The stream dropped (or could not open); pushed updates may have been missed.
+  onError?: () => void
+}
+
+const STREAM_RETRY_MIN_MS = 1000
+const STREAM_RETRY_MAX_MS = 60000
+
+export async function createNotificationStreamTicket(): Promise<string> {
+  const { data } = await client.post('/notifications/stream-ticket')
+  return data.ticket
+}
+
+// EventSource cannot send the Authorization header, so the stream URL carries a
+// short-lived ticket from an authenticated POST instead of the session token.
+// Tickets expire, so instead of letting EventSource retry the same URL, a dropped
+// stream is closed and reopened with a fresh ticket, backing off while it fails.
+export function subscribeToNotifications(handlers: NotificationStreamHandlers): () => void {
+  const base = import.meta.env.VITE_API_BASE_URL || '/api'
+  let source: EventSource | null = null
+  let retryTimer: ReturnType<typeof setTimeout> | null = null
+  let retryMs = STREAM_RETRY_MIN_MS
+  let closed = false
+
+  const reconnect = () => {
+    source?.close()
+    source = null
+    if (closed) return
+    handlers.onError?.()
+    retryTimer = setTimeout(connect, retryMs)
+    retryMs = Math.min(retryMs * 2, STREAM_RETRY_MAX_MS)
+  }
+
+  function connect() {
+    retryTimer = null
+    createNotificationStreamTicket()
+      .then((ticket) => {
+        if (closed) return
+        source = new EventSource(`${base}/notifications/stream?ticket=${encodeURIComponent(ticket)}`)
+        source.addEventListener('unread', (event) => {
+          retryMs = STREAM_RETRY_MIN_MS
+          const { unread, delta } = JSON.parse((event as MessageEvent).data)
+          handlers.onUnread(unread, delta)
+        })
+        source.addEventListener('notification', (event) => {
+          handlers.onNotification(JSON.parse((event as MessageEvent).data))
+        })
+        source.onerror = reconnect
+      })
+      .catch(reconnect)
+  }
+
+  connect()
+  return () => {
+    closed = true
+    if (retryTimer) clearTimeout(retryTimer)
+    source?.close()
+  }
+}
+
 export async function markNotificationRead(notificationId: number) {
   const { data } = await client.post(`/notifications/${notificationId}/read`)
   return data
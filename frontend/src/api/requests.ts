@@ -344,6 +344,14 @@ export async function triggerJellyfinScan() {
   return data
 }
 
+export interface AnalyticsCacheInfo {
+  hit: boolean
+  data_version: number | null
+  computed_at: string
+  age_seconds: number
+  compute_ms: number
+}
+
 export interface AdminAnalytics {
   total_requests_all_time: number
   fulfilled_all_time: number
@@ -400,6 +408,7 @@ export interface AdminAnalytics {
   }
   total_supporters_ever: number
   avg_supporters_per_request: number
+  cache?: AnalyticsCacheInfo
 }
 
 export async function getAnalytics(): Promise<AdminAnalytics> {
@@ -439,6 +448,7 @@ export interface SlaSimulationResponse {
   historical_sample_size: number
   current_target_days: number | null
   recommended_target_days: number | null
+  cache?: AnalyticsCacheInfo
 }
 
 export async function simulateSlaPolicy(targetDays: number[]): Promise<SlaSimulationResponse> {
@@ -1,8 +1,8 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { NavLink, Outlet } from 'react-router-dom'
-import { useQuery } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { useAuth } from '../context/AuthContext'
-import { getNotificationSummary } from '../api/notifications'
+import { getNotificationSummary, subscribeToNotifications, type NotificationSummary } from '../api/notifications'
 
 const navItems = [
   { to: '/', label: 'Dashboard' },
@@ -17,12 +17,38 @@ const navItems = [
 export default function Layout() {
   const { user, logout } = useAuth()
   const [menuOpen, setMenuOpen] = useState(false)
+  const queryClient = useQueryClient()
   const { data: notificationSummary } = useQuery({
     queryKey: ['notificationSummary'],
     queryFn: getNotificationSummary,
-    refetchInterval: 30000,
+    // Fallback only: the stream below pushes changes as they happen.
+    refetchInterval: 5 * 60 * 1000,
   })
 
+  // The server pushes unread-count changes and new notifications; when the stream
+  // drops, the summary is refetched while it reconnects.
+  useEffect(
+    () =>
+      subscribeToNotifications({
+        onUnread: (unread, delta) => {
+          queryClient.setQueryData<NotificationSummary>(['notificationSummary'], (current) =>
+            current ? { ...current, unread } : current,
+          )
+          if (delta !== 0) {
+            queryClient.invalidateQueries({ queryKey: ['notifications'] })
+          }
+        },
+        onNotification: () => {
+          queryClient.invalidateQueries({ queryKey: ['notifications'] })
+          queryClient.invalidateQueries({ queryKey: ['notificationSummary'] })
+        },
+        onError: () => {
+          queryClient.invalidateQueries({ queryKey: ['notificationSummary'] })
+        },
+      }),
+    [queryClient],
+  )
+
   const closeMenu = () => setMenuOpen(false)
 
   const linkClass = ({ isActive }: { isActive: boolean }) =>